@@ -0,0 +1,344 @@
+"""
+Motor de reglas de alerta sobre ventanas de tiempo.
+
+Las reglas se declaran en config.ALERT_RULES y se evalúan de forma
+incremental con cada lectura, en O(1) amortizado:
+
+- "duration": el valor cumple la condición sin interrupción durante
+  window_s segundos ("IAQ por encima de 150 durante 10 minutos"). Solo se
+  guarda desde cuándo se cumple.
+- "change": diferencia entre la lectura actual y el máximo (op "<") o el
+  mínimo (op ">") de la ventana ("la presión ha bajado más de 3 hPa en 3
+  horas"). El extremo se mantiene con una deque monótona.
+- "mean": media de la ventana, con una suma acumulada que se actualiza al
+  entrar y salir lecturas.
+- "leq": nivel sonoro equivalente de la ventana (media de la energía,
+  10·log10(media(10^(L/10)))), con la misma suma acumulada ("Leq de 15
+  minutos por encima de 65 dB").
+
+Las medias suponen lecturas a intervalos regulares y solo se evalúan cuando
+las lecturas cubren al menos MIN_COVERAGE de la ventana.
+
+Las reglas se indexan por sensor: cada lectura solo reevalúa las reglas de
+su sensor. AlertEngine.extend() se registra con MQTTClient.add_sink(), así
+que recibe todas las lecturas (no solo la última de cada frame) en el hilo
+despachador. Si se le pasa un AnomalyDetector (analysis.anomaly), le
+entrega los mismos lotes y publica sus anomalías como alertas.
+"""
+import abc
+import math
+import operator
+import threading
+from collections import deque, namedtuple
+
+from config import ALERT_RULES
+from utils.logger import setup_logger
+
+# Configurar logger de las alertas
+logger = setup_logger(__name__)
+
+# Cambio de estado de una regla: activa o resuelta, con el valor que la provocó
+Alert = namedtuple("Alert", ["rule", "sensor_id", "active", "timestamp", "value"])
+
+# Fracción de la ventana que deben cubrir las lecturas para evaluar una media
+MIN_COVERAGE = 0.9
+
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+class Rule(abc.ABC):
+    """Regla de alerta de un sensor (clase base)."""
+
+    def __init__(self, name, sensor_id, op, threshold, window_s, hysteresis=0.0):
+        """
+        Inicializa la regla.
+
+        Args:
+            name (str): Nombre de la regla (aparece en las alertas)
+            sensor_id (str): Sensor del que depende
+            op (str): Comparación de la métrica con el umbral (">", ">=", "<", "<=")
+            threshold (float): Umbral
+            window_s (float): Ventana de tiempo en segundos
+            hysteresis (float, optional): Margen para resolver una alerta activa
+
+        Raises:
+            ValueError: Si el operador no es válido
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"operador no válido en la regla {name}: {op}")
+        self.name = name
+        self.sensor_id = sensor_id
+        self.op = op
+        self.threshold = threshold
+        self.window_s = window_s
+        self.hysteresis = hysteresis
+        self._compare = OPERATORS[op]
+        # El umbral de resolución se aleja del de disparo en el sentido de op
+        self._clear_threshold = threshold - hysteresis if op[0] == ">" else threshold + hysteresis
+
+        self.active = False
+        self.last_timestamp = float("-inf")
+        self.late = 0
+
+    def update(self, timestamp, value):
+        """
+        Evalúa la regla con una lectura nueva.
+
+        Args:
+            timestamp (float): Instante de la lectura
+            value (float): Valor de la lectura
+
+        Returns:
+            Alert | None: Alerta si la regla cambia de estado
+        """
+        if timestamp < self.last_timestamp:
+            # Las ventanas avanzan en orden: las lecturas atrasadas se cuentan y se ignoran
+            self.late += 1
+            return None
+        self.last_timestamp = timestamp
+
+        metric = self._metric(timestamp, value)
+        if metric is None:
+            return None
+
+        if not self.active and self._compare(metric, self.threshold):
+            self.active = True
+        elif self.active and not self._compare(metric, self._clear_threshold):
+            self.active = False
+        else:
+            return None
+        return Alert(self.name, self.sensor_id, self.active, timestamp, metric)
+
+    @abc.abstractmethod
+    def _metric(self, timestamp, value):
+        """Actualiza el estado de la ventana y devuelve la métrica (None si aún no la hay)."""
+
+
+class DurationRule(Rule):
+    """El valor cumple la condición durante toda la ventana."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Desde cuándo se cumple la condición (None: no se cumple)
+        self._since = None
+
+    def _metric(self, timestamp, value):
+        # La métrica es el valor; la regla solo se dispara tras window_s cumpliéndose
+        threshold = self._clear_threshold if self.active else self.threshold
+        if not self._compare(value, threshold):
+            self._since = None
+            return value
+        if self._since is None:
+            self._since = timestamp
+        if not self.active and timestamp - self._since < self.window_s:
+            return None
+        return value
+
+
+class ChangeRule(Rule):
+    """Diferencia entre la lectura actual y el extremo de la ventana."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Bajadas ("<"): máximo de la ventana; subidas (">"): mínimo
+        self._falling = self.op[0] == "<"
+        # Deque monótona de (timestamp, valor): el extremo siempre al principio
+        self._extremes = deque()
+
+    def _metric(self, timestamp, value):
+        extremes = self._extremes
+        if self._falling:
+            while extremes and extremes[-1][1] <= value:
+                extremes.pop()
+        else:
+            while extremes and extremes[-1][1] >= value:
+                extremes.pop()
+        extremes.append((timestamp, value))
+
+        start = timestamp - self.window_s
+        while extremes[0][0] < start:
+            extremes.popleft()
+        return value - extremes[0][1]
+
+
+class MeanRule(Rule):
+    """Media de las lecturas de la ventana (suma acumulada)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._samples = deque()
+        self._sum = 0.0
+
+    def _transform(self, value):
+        """Valor que se acumula por lectura."""
+        return value
+
+    def _result(self, mean):
+        """Métrica a partir de la media acumulada."""
+        return mean
+
+    def _metric(self, timestamp, value):
+        samples = self._samples
+        x = self._transform(value)
+        samples.append((timestamp, x))
+        self._sum += x
+
+        start = timestamp - self.window_s
+        while samples[0][0] < start:
+            self._sum -= samples.popleft()[1]
+        if len(samples) == 1:
+            # Sin lecturas antiguas: se evita arrastrar el error de redondeo
+            self._sum = x
+
+        if timestamp - samples[0][0] < self.window_s * MIN_COVERAGE:
+            return None
+        return self._result(self._sum / len(samples))
+
+
+class LeqRule(MeanRule):
+    """Nivel sonoro equivalente de la ventana (media de la energía en dB)."""
+
+    def _transform(self, value):
+        return 10.0 ** (value / 10.0)
+
+    def _result(self, mean):
+        return 10.0 * math.log10(mean) if mean > 0 else float("-inf")
+
+
+RULE_TYPES = {
+    "duration": DurationRule,
+    "change": ChangeRule,
+    "mean": MeanRule,
+    "leq": LeqRule,
+}
+
+
+def build_rule(spec):
+    """
+    Crea una regla a partir de su declaración en config.ALERT_RULES.
+
+    Args:
+        spec (dict): name, sensor, type, op, threshold, window_s y, opcional, hysteresis
+
+    Returns:
+        Rule: Regla creada
+
+    Raises:
+        ValueError: Si el tipo de regla no existe
+    """
+    rule_class = RULE_TYPES.get(spec["type"])
+    if rule_class is None:
+        raise ValueError(f"tipo de regla no válido en {spec['name']}: {spec['type']}")
+    return rule_class(
+        spec["name"], spec["sensor"], spec["op"], spec["threshold"],
+        spec["window_s"], spec.get("hysteresis", 0.0),
+    )
+
+
+class AlertEngine:
+    """Evalúa las reglas de alerta con cada lectura."""
+
+    def __init__(self, rules=None, detector=None):
+        """
+        Inicializa el motor.
+
+        Args:
+            rules (list, optional): Declaraciones de reglas (por defecto config.ALERT_RULES)
+            detector (AnomalyDetector, optional): Detector de anomalías que recibe
+                los mismos lotes; sus anomalías se publican como alertas
+        """
+        self.rules = [build_rule(spec) for spec in (ALERT_RULES if rules is None else rules)]
+        self.detector = detector
+        # Índice por sensor: una lectura solo evalúa las reglas que dependen de ella
+        self._by_sensor = {}
+        for rule in self.rules:
+            self._by_sensor.setdefault(rule.sensor_id, []).append(rule)
+
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self.raised = 0
+        self.cleared = 0
+
+    def add_listener(self, listener):
+        """
+        Registra una función que recibe cada cambio de estado de una regla.
+
+        Se llama en el hilo que entrega las lecturas (el despachador de
+        MQTTClient): no debe tocar widgets directamente (main.py registra
+        MainWindow.alert_changed.emit, que llega a la UI en cola).
+
+        Args:
+            listener (callable): Función listener(alert) con un Alert
+        """
+        self._listeners.append(listener)
+
+    def extend(self, readings):
+        """
+        Evalúa un lote de lecturas.
+
+        Args:
+            readings (list[Reading]): Lecturas en orden de llegada
+
+        Returns:
+            list[Alert]: Cambios de estado producidos por el lote
+        """
+        alerts = []
+        by_sensor = self._by_sensor
+        with self._lock:
+            for reading in readings:
+                rules = by_sensor.get(reading.sensor_id)
+                if not rules:
+                    continue
+                for rule in rules:
+                    alert = rule.update(reading.timestamp, reading.value)
+                    if alert is not None:
+                        alerts.append(alert)
+                self.evaluations += len(rules)
+
+        if self.detector is not None:
+            alerts.extend(self.detector.extend(readings))
+
+        for alert in alerts:
+            if alert.active:
+                self.raised += 1
+                logger.warning(f"Alerta activada: {alert.rule} ({alert.sensor_id} = {alert.value:.2f})")
+            else:
+                self.cleared += 1
+                logger.info(f"Alerta resuelta: {alert.rule} ({alert.sensor_id} = {alert.value:.2f})")
+            for listener in self._listeners:
+                try:
+                    listener(alert)
+                except Exception as e:
+                    logger.error(f"Error en un receptor de alertas: {e}")
+        return alerts
+
+    def active(self):
+        """
+        Devuelve las reglas que están activas.
+
+        Returns:
+            list[str]: Nombres de las reglas activas
+        """
+        with self._lock:
+            return [rule.name for rule in self.rules if rule.active]
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del motor.
+
+        Returns:
+            dict: Evaluaciones, alertas activadas y resueltas, lecturas atrasadas,
+                reglas activas y contadores del detector de anomalías
+        """
+        stats = {
+            "rules": len(self.rules),
+            "evaluations": self.evaluations,
+            "raised": self.raised,
+            "cleared": self.cleared,
+            "late": sum(rule.late for rule in self.rules),
+            "active": self.active(),
+        }
+        if self.detector is not None:
+            stats["anomalies"] = self.detector.get_stats()
+        return stats
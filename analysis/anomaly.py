@@ -0,0 +1,234 @@
+"""
+Detección de anomalías en streaming para todos los sensores a la vez.
+
+Para cada sensor se mantiene una media y una varianza con media móvil
+exponencial (EWMA) en arrays contiguos de NumPy, uno por magnitud e
+indexados por sensor. Cada lote de lecturas del hilo despachador actualiza
+todos los sensores en un paso vectorizado; si un lote trae varias lecturas
+del mismo sensor se aplica en rondas (la k-ésima lectura de cada sensor en
+la ronda k), de modo que el número de iteraciones depende de las lecturas
+por sensor del lote, no del número de sensores. Las lecturas no finitas
+(NaN, infinito) se descartan y se cuentan: una sola dejaría la media del
+sensor en NaN para siempre.
+
+Se detectan dos tipos de anomalía:
+
+- Pico: la puntuación z de la lectura frente a la EWMA previa supera
+  ANOMALY_CONFIG["z_threshold"] (tras warmup_samples lecturas).
+- Valor congelado: el sensor repite el mismo valor stuck_samples lecturas
+  seguidas (sensor averiado o colgado).
+
+Los cambios de estado se devuelven como Alert (los mismos que las reglas de
+analysis.alerts), y AlertEngine los registra y reparte a sus receptores.
+"""
+import threading
+
+import numpy as np
+
+from analysis.alerts import Alert
+from config import SENSORS, ANOMALY_CONFIG
+
+# Nombres de las anomalías en las alertas
+SPIKE_RULE = "Anomalía: pico"
+STUCK_RULE = "Anomalía: valor congelado"
+
+# Capacidad inicial de los arrays (se duplica al llenarse)
+INITIAL_CAPACITY = 64
+
+
+class AnomalyDetector:
+    """EWMA y puntuación z de todos los sensores en arrays de NumPy."""
+
+    def __init__(self, alpha=None, z_threshold=None, warmup=None, stuck_samples=None):
+        """
+        Inicializa el detector.
+
+        Args:
+            alpha (float, optional): Peso de cada lectura nueva en la EWMA
+            z_threshold (float, optional): Puntuación z a partir de la que una lectura es un pico
+            warmup (int, optional): Lecturas de un sensor antes de evaluar picos
+            stuck_samples (int, optional): Lecturas iguales seguidas para dar un valor por congelado
+        """
+        self.alpha = alpha or ANOMALY_CONFIG["alpha"]
+        self.z_threshold = z_threshold or ANOMALY_CONFIG["z_threshold"]
+        self.warmup = warmup or ANOMALY_CONFIG["warmup_samples"]
+        self.stuck_samples = stuck_samples or ANOMALY_CONFIG["stuck_samples"]
+        self._min_std_fraction = ANOMALY_CONFIG["min_std_fraction"]
+
+        # Sensor -> posición en los arrays
+        self._index = {}
+        self._ids = []
+        self._lock = threading.Lock()
+        self._allocate(INITIAL_CAPACITY)
+
+        self.readings = 0
+        self.invalid = 0
+        self.spikes = 0
+        self.stuck = 0
+
+    def _allocate(self, capacity):
+        """Crea (o amplía conservando el contenido) los arrays de estado."""
+        fields = {
+            "mean": np.zeros(capacity),
+            "var": np.zeros(capacity),
+            "count": np.zeros(capacity, dtype=np.int64),
+            "last": np.full(capacity, np.nan),
+            "repeats": np.zeros(capacity, dtype=np.int64),
+            # Desviación típica mínima: evita z enormes en señales casi constantes
+            "min_std": np.full(capacity, 1e-3),
+            "spike": np.zeros(capacity, dtype=bool),
+            "stuck": np.zeros(capacity, dtype=bool),
+        }
+        n = len(self._ids)
+        for name, array in fields.items():
+            if n:
+                array[:n] = getattr(self, "_" + name)[:n]
+            setattr(self, "_" + name, array)
+        self._capacity = capacity
+
+    def _register(self, sensor_id):
+        """Asigna una posición a un sensor nuevo."""
+        position = len(self._ids)
+        if position == self._capacity:
+            self._allocate(self._capacity * 2)
+        self._index[sensor_id] = position
+        self._ids.append(sensor_id)
+        info = SENSORS.get(sensor_id)
+        if info is not None:
+            self._min_std[position] = (info["max_value"] - info["min_value"]) * self._min_std_fraction
+        return position
+
+    def extend(self, readings):
+        """
+        Actualiza el estado con un lote de lecturas y detecta anomalías.
+
+        Args:
+            readings (list[Reading]): Lecturas del lote, en orden de llegada
+
+        Returns:
+            list[Alert]: Anomalías que empiezan o terminan con este lote
+        """
+        if not readings:
+            return []
+
+        with self._lock:
+            index = self._index
+            positions = np.fromiter(
+                (index[r.sensor_id] if r.sensor_id in index else self._register(r.sensor_id) for r in readings),
+                dtype=np.intp, count=len(readings),
+            )
+            values = np.fromiter((r.value for r in readings), dtype=np.float64, count=len(readings))
+            timestamps = np.fromiter((r.timestamp for r in readings), dtype=np.float64, count=len(readings))
+
+            finite = np.isfinite(values)
+            if not finite.all():
+                self.invalid += int(len(finite) - finite.sum())
+                positions, values, timestamps = positions[finite], values[finite], timestamps[finite]
+            if not len(values):
+                return []
+
+            # Ronda de cada lectura: cuántas lecturas anteriores del mismo sensor hay en el lote
+            order = np.argsort(positions, kind="stable")
+            sorted_positions = positions[order]
+            starts = np.flatnonzero(np.r_[True, sorted_positions[1:] != sorted_positions[:-1]])
+            group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+            rounds = np.empty(len(order), dtype=np.intp)
+            rounds[order] = np.arange(len(order)) - group_start
+
+            # Una sola ordenación por ronda (estable: en cada ronda, en orden de llegada)
+            # y cada ronda es un tramo contiguo
+            by_round = np.argsort(rounds, kind="stable")
+            bounds = np.searchsorted(rounds[by_round], np.arange(int(rounds.max()) + 2))
+            positions, values, timestamps = positions[by_round], values[by_round], timestamps[by_round]
+
+            alerts = []
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                alerts.extend(self._step(positions[lo:hi], values[lo:hi], timestamps[lo:hi]))
+            self.readings += len(values)
+        return alerts
+
+    def _step(self, positions, values, timestamps):
+        """Aplica una lectura por sensor (posiciones sin repetir) en un paso vectorizado."""
+        mean = self._mean[positions]
+        var = self._var[positions]
+        count = self._count[positions]
+
+        # Puntuación z frente al estado anterior a la lectura
+        diff = values - mean
+        std = np.maximum(np.sqrt(var), self._min_std[positions])
+        z = diff / std
+        first = count == 0
+
+        # EWMA de la media y de la varianza (forma incremental)
+        increment = self.alpha * diff
+        self._mean[positions] = np.where(first, values, mean + increment)
+        self._var[positions] = np.where(first, 0.0, (1.0 - self.alpha) * (var + diff * increment))
+        self._count[positions] = count + 1
+
+        spike = (count >= self.warmup) & (np.abs(z) > self.z_threshold)
+
+        repeats = np.where(values == self._last[positions], self._repeats[positions] + 1, 0)
+        self._repeats[positions] = repeats
+        self._last[positions] = values
+        stuck = repeats + 1 >= self.stuck_samples
+
+        alerts = []
+        alerts += self._transitions(self._spike, SPIKE_RULE, positions, spike, timestamps, z)
+        alerts += self._transitions(self._stuck, STUCK_RULE, positions, stuck, timestamps, values)
+        return alerts
+
+    def _transitions(self, state, rule, positions, flags, timestamps, metric):
+        """Actualiza un estado por sensor y devuelve las alertas de los que cambian."""
+        changed = np.flatnonzero(state[positions] != flags)
+        if not len(changed):
+            return []
+        state[positions[changed]] = flags[changed]
+
+        raised = int(flags[changed].sum())
+        if rule == SPIKE_RULE:
+            self.spikes += raised
+        else:
+            self.stuck += raised
+        # Solo se recorren los sensores que cambian de estado (pocos)
+        return [
+            Alert(rule, self._ids[positions[i]], bool(flags[i]), float(timestamps[i]), float(metric[i]))
+            for i in changed
+        ]
+
+    def state(self, sensor_id):
+        """
+        Devuelve el estado del detector para un sensor.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+
+        Returns:
+            dict | None: Media, desviación típica, lecturas y anomalías activas (None si no se ha visto)
+        """
+        with self._lock:
+            position = self._index.get(sensor_id)
+            if position is None:
+                return None
+            return {
+                "mean": float(self._mean[position]),
+                "std": float(np.sqrt(self._var[position])),
+                "count": int(self._count[position]),
+                "spike": bool(self._spike[position]),
+                "stuck": bool(self._stuck[position]),
+            }
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del detector.
+
+        Returns:
+            dict: Sensores, lecturas, lecturas no finitas descartadas, picos y
+                valores congelados detectados
+        """
+        return {
+            "sensors": len(self._ids),
+            "readings": self.readings,
+            "invalid": self.invalid,
+            "spikes": self.spikes,
+            "stuck": self.stuck,
+        }
@@ -0,0 +1,340 @@
+"""
+Clasificación de las lecturas en estados (Frío, Normal, Alta, Peligrosa...).
+
+Las bandas se declaran en config.SENSORS["<sensor>"]["status_bands"] como
+(límite superior, estado, color[, incluido]), de menor a mayor; cada banda
+abarca hasta su límite, excluido salvo que el cuarto elemento sea True, y la
+última no tiene límite. Así se conservan los bordes originales del panel
+(25 °C es "Normal" pero 20 °C ya no es "Frío"). Al crear el clasificador se
+compilan en listas ordenadas:
+
+- Un valor suelto se clasifica con bisect (O(log n), sin bucles de if).
+- Una serie de un sensor se clasifica con numpy.searchsorted.
+- Varios sensores a la vez (classify_batch) usan una tabla de límites por
+  sensor y una sola comparación vectorizada.
+
+Además de las bandas de estado, cada sensor tiene bandas de nivel
+(Normal/Aviso/Crítico) compiladas a partir de warning_threshold y
+critical_threshold.
+
+Para que un valor que oscila junto a un límite no haga parpadear el estado,
+update() aplica histéresis (hay que superar el límite en
+SENSORS["<sensor>"]["hysteresis"] unidades para cambiar de banda) y
+antirrebote (el estado nuevo debe repetirse en
+STATUS_CONFIG["debounce_samples"] lecturas seguidas).
+"""
+from bisect import bisect_right
+from collections import namedtuple
+
+import numpy as np
+
+from config import SENSORS, STATUS_CONFIG
+
+# Resultado de una clasificación: posición de la banda, estado y color
+Band = namedtuple("Band", ["index", "state", "color"])
+
+# Bandas de nivel a partir de warning_threshold y critical_threshold
+LEVEL_STATES = ("Normal", "Aviso", "Crítico")
+LEVEL_COLORS = ("#2ecc71", "#f39c12", "#e74c3c")  # Verde, naranja, rojo
+
+# Banda de los sensores sin umbrales configurados
+DEFAULT_BAND = Band(0, "Normal", "#3498db")  # Azul
+
+
+class BandClassifier:
+    """Bandas compiladas de un sensor, con estado para histéresis y antirrebote."""
+
+    def __init__(self, bands, hysteresis=0.0, debounce=1):
+        """
+        Compila las bandas.
+
+        Args:
+            bands (list): (límite superior, estado, color[, incluido]) de
+                menor a mayor; la última banda con límite None
+            hysteresis (float, optional): Margen a superar para cambiar de banda
+            debounce (int, optional): Lecturas seguidas necesarias para confirmar un cambio
+
+        Raises:
+            ValueError: Si no hay bandas o los límites no son crecientes
+        """
+        if not bands or bands[-1][0] is not None:
+            raise ValueError("la última banda no debe tener límite superior")
+        self.limits = [float(band[0]) for band in bands[:-1]]
+        if any(a >= b for a, b in zip(self.limits, self.limits[1:])):
+            raise ValueError(f"límites de banda no crecientes: {self.limits}")
+
+        # Bordes de comparación: un límite incluido en su banda se sube al
+        # siguiente float, así bisect_right, searchsorted y classify_batch
+        # lo dejan en la banda inferior sin otra rama
+        self.edges = [
+            float(np.nextafter(limit, np.inf)) if len(band) > 3 and band[3] else limit
+            for limit, band in zip(self.limits, bands)
+        ]
+
+        self.bands = tuple(Band(i, band[1], band[2]) for i, band in enumerate(bands))
+        self._edges_array = np.array(self.edges, dtype=np.float64)
+        self.hysteresis = float(hysteresis)
+        self.debounce = max(1, int(debounce))
+
+        # Estado confirmado y candidato pendiente de confirmar
+        self.current = None
+        self._candidate = None
+        self._candidate_count = 0
+
+    def index(self, value):
+        """
+        Devuelve la posición de la banda de un valor (sin histéresis).
+
+        Args:
+            value (float): Valor a clasificar
+
+        Returns:
+            int: Posición de la banda
+        """
+        return bisect_right(self.edges, value)
+
+    def band(self, value):
+        """
+        Clasifica un valor suelto (sin histéresis).
+
+        Args:
+            value (float): Valor a clasificar
+
+        Returns:
+            Band: Banda del valor
+        """
+        return self.bands[bisect_right(self.edges, value)]
+
+    def classify_many(self, values):
+        """
+        Clasifica una serie de valores (sin histéresis).
+
+        Args:
+            values (array-like): Valores a clasificar
+
+        Returns:
+            ndarray: Posición de la banda de cada valor
+        """
+        return np.searchsorted(self._edges_array, values, side="right")
+
+    def update(self, value):
+        """
+        Clasifica la lectura nueva de un sensor con histéresis y antirrebote.
+
+        Args:
+            value (float): Lectura nueva
+
+        Returns:
+            tuple: (Band confirmada, True si ha cambiado con esta lectura)
+        """
+        if self.current is None:
+            self.current = self.band(value)
+            return self.current, True
+
+        # Solo se cambia de banda si el límite se supera en más que la histéresis
+        current = self.current.index
+        target = bisect_right(self.edges, value - self.hysteresis)
+        if target <= current:
+            target = bisect_right(self.edges, value + self.hysteresis)
+            if target >= current:
+                target = current
+
+        if target == current:
+            self._candidate = None
+            self._candidate_count = 0
+            return self.current, False
+
+        if target != self._candidate:
+            self._candidate = target
+            self._candidate_count = 0
+        self._candidate_count += 1
+        if self._candidate_count < self.debounce:
+            return self.current, False
+
+        self.current = self.bands[target]
+        self._candidate = None
+        self._candidate_count = 0
+        return self.current, True
+
+    def reset(self):
+        """Olvida el estado confirmado (la próxima lectura se clasifica directamente)."""
+        self.current = None
+        self._candidate = None
+        self._candidate_count = 0
+
+
+def level_bands(info):
+    """
+    Construye las bandas de nivel de un sensor a partir de sus umbrales.
+
+    Args:
+        info (dict): Configuración del sensor
+
+    Returns:
+        list | None: Bandas (límite, estado, color), o None sin umbrales
+    """
+    warning = info.get("warning_threshold")
+    critical = info.get("critical_threshold")
+    if warning is None or critical is None:
+        return None
+    limits = (warning, critical, None)
+    return list(zip(limits, LEVEL_STATES, LEVEL_COLORS))
+
+
+class Classifier:
+    """Clasificadores compilados de todos los sensores."""
+
+    def __init__(self, sensors=None, debounce=None):
+        """
+        Compila las bandas de estado y de nivel de cada sensor.
+
+        Args:
+            sensors (dict, optional): Configuración de los sensores (por defecto config.SENSORS)
+            debounce (int, optional): Lecturas para confirmar un cambio (por defecto STATUS_CONFIG["debounce_samples"])
+        """
+        sensors = sensors if sensors is not None else SENSORS
+        debounce = debounce or STATUS_CONFIG["debounce_samples"]
+
+        self.status = {}
+        self.levels = {}
+        for sensor_id, info in sensors.items():
+            if info.get("status_bands"):
+                self.status[sensor_id] = BandClassifier(
+                    info["status_bands"], info.get("hysteresis", 0.0), debounce
+                )
+            bands = level_bands(info)
+            if bands:
+                self.levels[sensor_id] = BandClassifier(bands)
+
+        # Tabla de límites para classify_batch: una fila por sensor, rellena con +inf
+        self._rows = {sensor_id: row for row, sensor_id in enumerate(self.status)}
+        width = max((len(c.edges) for c in self.status.values()), default=0)
+        self._table = np.full((len(self._rows), width), np.inf)
+        for sensor_id, row in self._rows.items():
+            edges = self.status[sensor_id].edges
+            self._table[row, :len(edges)] = edges
+
+    def __getitem__(self, sensor_id):
+        return self.status[sensor_id]
+
+    def __contains__(self, sensor_id):
+        return sensor_id in self.status
+
+    def band(self, sensor_id, value):
+        """
+        Clasifica un valor suelto de un sensor (sin histéresis).
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            value (float): Valor a clasificar
+
+        Returns:
+            Band: Banda del valor
+
+        Raises:
+            KeyError: Si el sensor no tiene bandas de estado
+        """
+        return self.status[sensor_id].band(value)
+
+    def current(self, sensor_id, value):
+        """
+        Devuelve el estado confirmado de un sensor, o el del valor si aún no hay.
+
+        Los widgets lo usan para pintar el mismo estado que muestran las
+        etiquetas (con histéresis) sin llevar la cuenta de las lecturas.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            value (float): Valor a clasificar si no hay estado confirmado
+
+        Returns:
+            Band: Banda confirmada o del valor
+        """
+        classifier = self.status[sensor_id]
+        return classifier.current or classifier.band(value)
+
+    def level(self, sensor_id, value):
+        """
+        Clasifica un valor según los umbrales de aviso y crítico del sensor.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            value (float): Valor a clasificar
+
+        Returns:
+            Band: Banda de nivel (DEFAULT_BAND si el sensor no tiene umbrales)
+        """
+        classifier = self.levels.get(sensor_id)
+        return classifier.band(value) if classifier is not None else DEFAULT_BAND
+
+    def update(self, sensor_id, value):
+        """
+        Clasifica la lectura nueva de un sensor con histéresis y antirrebote.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            value (float): Lectura nueva
+
+        Returns:
+            tuple: (Band confirmada, True si ha cambiado con esta lectura)
+
+        Raises:
+            KeyError: Si el sensor no tiene bandas de estado
+        """
+        return self.status[sensor_id].update(value)
+
+    def update_many(self, values):
+        """
+        Clasifica con histéresis las lecturas nuevas de varios sensores.
+
+        Args:
+            values (dict): Sensor -> lectura nueva (se ignoran los sensores sin bandas)
+
+        Returns:
+            dict: Sensor -> Band, solo de los sensores cuyo estado ha cambiado
+        """
+        changed = {}
+        status = self.status
+        for sensor_id, value in values.items():
+            classifier = status.get(sensor_id)
+            if classifier is None:
+                continue
+            band, is_new = classifier.update(value)
+            if is_new:
+                changed[sensor_id] = band
+        return changed
+
+    def classify_batch(self, sensor_ids, values):
+        """
+        Clasifica muchas lecturas de sensores distintos en una sola llamada (sin histéresis).
+
+        Args:
+            sensor_ids (sequence[str]): Sensor de cada lectura
+            values (array-like): Valor de cada lectura
+
+        Returns:
+            ndarray: Posición de la banda de cada lectura
+
+        Raises:
+            KeyError: Si algún sensor no tiene bandas de estado
+        """
+        rows = np.fromiter((self._rows[s] for s in sensor_ids), dtype=np.intp, count=len(sensor_ids))
+        values = np.asarray(values, dtype=np.float64)
+        # Número de límites superados = posición de la banda (los +inf nunca se superan)
+        return (values[:, None] >= self._table[rows]).sum(axis=1)
+
+
+_classifier = None
+
+
+def get_classifier():
+    """
+    Devuelve el clasificador compartido por MainWindow y los widgets.
+
+    Returns:
+        Classifier: Clasificador compilado desde config.SENSORS
+    """
+    global _classifier
+    if _classifier is None:
+        _classifier = Classifier()
+    return _classifier
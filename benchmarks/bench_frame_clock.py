@@ -0,0 +1,130 @@
+"""
+Benchmark de despertares y repintados: un timer por widget frente al reloj de frames.
+
+Monta los cuatro widgets animados (barómetro, humedad, ruido y calidad del
+aire) y los dos timers de MainWindow (buzón a 50 ms y simulación a 200 ms)
+y, durante unos segundos de bucle de eventos, cuenta los despertares de
+timers, los paintEvent y el tiempo de CPU del proceso:
+
+- antes: cada cliente con su propio timer a su intervalo (16, 50 y 200 ms)
+  y los widgets repintando en cada despertar, como hacía cada QTimer;
+- ahora: el reloj compartido (FRAME_CONFIG["tick_ms"]) con ticks alineados
+  y sin repintar los widgets que no están sucios.
+
+Ejecutar desde la raíz del repositorio:
+    python -m benchmarks.bench_frame_clock [--seconds S]
+"""
+import argparse
+import os
+import sys
+import time
+
+from PyQt6.QtCore import QEvent, QEventLoop, QObject, QTimer
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QWidget
+
+from ui.frame_clock import FrameClock, get_frame_clock
+from ui.widgets.air_quality_widget import AirQualityWidget
+from ui.widgets.humidity_widget import HumidityWidget
+from ui.widgets.noise_widget import NoiseWidget
+from ui.widgets.pressure_widget import PressureWidget
+
+# Clientes sin widget de MainWindow: (intervalo en ms)
+WINDOW_CLIENTS = (50, 200)
+
+
+class EventCounter(QObject):
+    """Cuenta los eventos de timer y de pintado de toda la aplicación."""
+
+    def __init__(self):
+        super().__init__()
+        self.timers = 0
+        self.paints = 0
+
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        if kind == QEvent.Type.Timer:
+            self.timers += 1
+        elif kind == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+
+def _window():
+    """Crea la ventana con los widgets animados y los deja con un valor fijo."""
+    window = QWidget()
+    layout = QHBoxLayout(window)
+    widgets = [PressureWidget(), HumidityWidget(), NoiseWidget(), AirQualityWidget()]
+    for widget in widgets:
+        layout.addWidget(widget)
+    widgets[0].set_value(1000.0)
+    window.resize(1000, 260)
+    window.show()
+    return window, widgets
+
+
+def _run(app, counter, seconds):
+    """Ejecuta el bucle de eventos `seconds` segundos; devuelve las medidas por segundo."""
+    loop = QEventLoop()
+    app.processEvents()
+    counter.timers = counter.paints = 0
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    # El singleShot de parada no cuenta como despertar
+    return (counter.timers - 1) / wall, counter.paints / wall, cpu / wall * 100
+
+
+def main():
+    """Ejecuta el benchmark e imprime despertares, repintados y CPU de cada variante."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duración de cada variante")
+    args = parser.parse_args()
+
+    # Sin pantalla (p. ej. por SSH) se usa el backend fuera de pantalla
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+    counter = EventCounter()
+    app.installEventFilter(counter)
+    shared = get_frame_clock()
+    results = []
+
+    # Antes: un timer por cliente, repintando en cada despertar
+    window, widgets = _window()
+    clocks = []
+    for widget in widgets:
+        callback = widget.frame_client.callback
+        shared.unregister(widget.frame_client)
+        clock = FrameClock(tick_ms=widget.FRAME_INTERVAL_MS, idle_mode=False)
+        if isinstance(widget, PressureWidget):
+            # El barómetro ya solo repintaba mientras se movía la aguja
+            client = clock.register(widget.FRAME_INTERVAL_MS, callback, widget)
+        else:
+            client = clock.register(widget.FRAME_INTERVAL_MS, lambda dt, cb=callback: cb(dt) or True, widget)
+        clocks.append((clock, client))
+    for interval in WINDOW_CLIENTS:
+        clock = FrameClock(tick_ms=interval)
+        clocks.append((clock, clock.register(interval, lambda dt: None)))
+    results.append(("antes (un timer por cliente)",) + _run(app, counter, args.seconds))
+    window.close()
+    for clock, client in clocks:
+        clock.unregister(client)
+
+    # Ahora: el reloj compartido
+    window, widgets = _window()
+    for interval in WINDOW_CLIENTS:
+        shared.register(interval, lambda dt: None)
+    results.append((f"ahora (reloj de {shared.tick_ms} ms)",) + _run(app, counter, args.seconds))
+    window.close()
+
+    print(f"{'variante':<32}{'despertares/s':>15}{'paints/s':>10}{'CPU %':>8}")
+    for name, wakeups, paints, cpu in results:
+        print(f"{name:<32}{wakeups:>15.1f}{paints:>10.1f}{cpu:>8.1f}")
+    print(f"reloj compartido: {shared.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
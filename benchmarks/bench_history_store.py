@@ -0,0 +1,100 @@
+"""
+Benchmark de los almacenes de historial: SQLite (WAL) frente a segmentos mmap.
+
+Simula el hilo despachador entregando lotes de lecturas de los sensores de
+config.SENSORS y mide las filas por segundo sostenidas hasta que todo está
+en disco y la latencia de cada lote de escritura (p50, p99 y máximo).
+
+Ejecutar desde la raíz del repositorio (en el hardware de destino, sobre la
+tarjeta SD):
+    python -m benchmarks.bench_history_store [--rows N] [--batch B] [--dir RUTA]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from config import SENSORS
+from history.mmap_store import MmapStore
+from history.sqlite_store import SqliteStore
+from ingestion.reading import Reading
+
+
+def _batches(rows, batch):
+    """Genera lotes de lecturas a 1 Hz por sensor terminando en el instante actual."""
+    sensor_ids = tuple(SENSORS)
+    start = time.time() - rows / len(sensor_ids)
+    readings = [
+        Reading(sensor_ids[i % len(sensor_ids)], float(i % 100), start + i // len(sensor_ids), 0.0)
+        for i in range(rows)
+    ]
+    return [readings[i:i + batch] for i in range(0, rows, batch)]
+
+
+def _summary(durations_ms):
+    """Resume las duraciones de los lotes."""
+    ordered = sorted(durations_ms)
+    return (
+        ordered[len(ordered) // 2],
+        ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        ordered[-1],
+    )
+
+
+def _bench_sqlite(directory, batches, rows):
+    """Mide el almacén SQLite; la latencia es la de cada executemany del hilo escritor."""
+    store = SqliteStore(os.path.join(directory, "history.db"))
+    start = time.perf_counter()
+    for batch in batches:
+        # Ritmo sostenido: no adelantarse más de media cola al hilo escritor
+        while len(store) > store.max_pending // 2:
+            time.sleep(0.001)
+        store.extend(batch)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    stats = store.get_stats()
+    store.close()
+    batch_ms = stats.get("batch_ms", {})
+    return rows / elapsed, (batch_ms.get("p50", 0.0), batch_ms.get("p99", 0.0), batch_ms.get("max", 0.0)), stats["rows_dropped"]
+
+
+def _bench_mmap(directory, batches, rows):
+    """Mide el almacén de segmentos; la latencia es la de cada extend() en el hilo despachador."""
+    store = MmapStore(os.path.join(directory, "segments"))
+    durations = []
+    start = time.perf_counter()
+    for batch in batches:
+        t0 = time.perf_counter()
+        store.extend(batch)
+        durations.append((time.perf_counter() - t0) * 1000.0)
+    store.close()
+    elapsed = time.perf_counter() - start
+    return rows / elapsed, _summary(durations), 0
+
+
+def main():
+    """Ejecuta el benchmark e imprime el rendimiento de cada almacén."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500000, help="Lecturas a escribir por almacén")
+    parser.add_argument("--batch", type=int, default=50, help="Lecturas por lote del despachador")
+    parser.add_argument("--dir", help="Directorio de trabajo (por defecto uno temporal)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_history_", dir=args.dir)
+    try:
+        batches = _batches(args.rows, args.batch)
+        results = [
+            ("SQLite (WAL)", *_bench_sqlite(directory, batches, args.rows)),
+            ("segmentos mmap", *_bench_mmap(directory, batches, args.rows)),
+        ]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{'almacén':<18}{'filas/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'máx ms':>10}{'descartes':>11}")
+    for name, rate, (p50, p99, worst), dropped in results:
+        print(f"{name:<18}{rate:>14,.0f}{p50:>10.3f}{p99:>10.3f}{worst:>10.3f}{dropped:>11}")
+
+
+if __name__ == "__main__":
+    main()
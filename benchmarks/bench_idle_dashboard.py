@@ -0,0 +1,153 @@
+"""
+Benchmark de CPU del panel en reposo, con y sin el modo reposo del reloj de frames.
+
+Monta los widgets animados (barómetro, humedad, ruido y calidad del aire),
+el termómetro y un frame de 50 ms que vacía un SensorMailbox como el de
+MainWindow, les da un valor y deja de enviar lecturas. Durante unos
+segundos de bucle de eventos mide el uso de CPU del proceso, los
+despertares de timers y los paintEvent:
+
+- antes: sin modo reposo, las animaciones siguen aunque no cambie nada;
+- modo reposo, buzón despierto: pasado idle_after_s sin cambios, las
+  animaciones duermen, pero el frame del buzón sigue vaciándolo 20 veces
+  por segundo;
+- modo reposo: el frame del buzón también se duerme con el buzón vacío y
+  on_post lo despierta con la siguiente lectura (como en MainWindow);
+- ventana oculta: IdleWatcher pausa el reloj y no queda ningún tick.
+
+Ejecutar desde la raíz del repositorio:
+    python -m benchmarks.bench_idle_dashboard [--seconds S] [--idle-after S]
+"""
+import argparse
+import os
+import sys
+import time
+
+from PyQt6.QtCore import QEvent, QEventLoop, QObject, QTimer
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QWidget
+
+from config import FRAME_CONFIG, INGESTION_CONFIG
+from ingestion.mailbox import SensorMailbox
+from ingestion.reading import Reading
+from ui.frame_clock import get_frame_clock
+from ui.idle_watcher import IdleWatcher
+from ui.widgets.air_quality_widget import AirQualityWidget
+from ui.widgets.humidity_widget import HumidityWidget
+from ui.widgets.noise_widget import NoiseWidget
+from ui.widgets.pressure_widget import PressureWidget
+from ui.widgets.thermometer_widget import ThermometerWidget
+
+
+class EventCounter(QObject):
+    """Cuenta los eventos de timer y de pintado de toda la aplicación."""
+
+    def __init__(self):
+        super().__init__()
+        self.timers = 0
+        self.paints = 0
+
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        if kind == QEvent.Type.Timer:
+            self.timers += 1
+        elif kind == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+
+def _wait(seconds):
+    """Procesa eventos durante `seconds` segundos."""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def _measure(counter, seconds):
+    """Mide CPU, despertares y pintados por segundo durante `seconds` segundos."""
+    counter.timers = counter.paints = 0
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    _wait(seconds)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    # El singleShot de parada no cuenta como despertar
+    return cpu / wall * 100, (counter.timers - 1) / wall, counter.paints / wall
+
+
+def main():
+    """Ejecuta el benchmark e imprime CPU, despertares y pintados de cada variante."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duración de cada medida")
+    parser.add_argument("--idle-after", type=float, default=2.0,
+                        help="Segundos de animación ambiental tras el último cambio (idle_after_s)")
+    args = parser.parse_args()
+
+    # Sin pantalla (p. ej. por SSH) se usa el backend fuera de pantalla
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Los widgets leen idle_after_s al registrarse en el reloj
+    FRAME_CONFIG["idle_after_s"] = args.idle_after
+    app = QApplication(sys.argv)
+    counter = EventCounter()
+    app.installEventFilter(counter)
+
+    clock = get_frame_clock()
+    window = QWidget()
+    layout = QHBoxLayout(window)
+    widgets = [PressureWidget(), HumidityWidget(), NoiseWidget(), AirQualityWidget(), ThermometerWidget()]
+    for widget in widgets:
+        layout.addWidget(widget)
+    # Frame del buzón de MainWindow: lo vacía y, si se pide, se duerme sin lecturas
+    mailbox = SensorMailbox()
+    mailbox_sleeps = [False]
+
+    def on_frame(dt):
+        mailbox.drain()
+        if mailbox_sleeps[0] and not mailbox.pending_count():
+            mailbox_client.sleep()
+
+    mailbox_client = clock.register(INGESTION_CONFIG["frame_interval_ms"], on_frame)
+    # Todo ocurre en el hilo de Qt: no hace falta la señal en cola de MainWindow
+    mailbox.on_post = mailbox_client.wake
+    IdleWatcher(window, clock, display_paths=[])
+    window.resize(1200, 260)
+    window.show()
+
+    def set_values():
+        now = time.time()
+        readings = []
+        for widget, value, sensor_id in zip(widgets, (1000.0, 65.0, 55.0, 120.0, 22.0),
+                                            ("Presión", "Humedad", "Ruido", "Calidad_Aire", "Temperatura")):
+            widget.set_value(value)
+            readings.append(Reading(sensor_id, value, now, now))
+        mailbox.post_many(readings)
+
+    results = []
+
+    clock.idle_mode = False
+    set_values()
+    _wait(args.idle_after + 0.5)
+    results.append(("antes (sin modo reposo)",) + _measure(counter, args.seconds))
+
+    clock.idle_mode = True
+    set_values()
+    _wait(args.idle_after + 0.5)
+    results.append(("modo reposo, buzón despierto",) + _measure(counter, args.seconds))
+
+    mailbox_sleeps[0] = True
+    set_values()
+    _wait(args.idle_after + 0.5)
+    results.append(("modo reposo",) + _measure(counter, args.seconds))
+
+    window.hide()
+    results.append(("ventana oculta",) + _measure(counter, args.seconds))
+    window.close()
+
+    print(f"{'variante':<30}{'CPU %':>8}{'despertares/s':>15}{'paints/s':>10}")
+    for name, cpu, wakeups, paints in results:
+        print(f"{name:<30}{cpu:>8.2f}{wakeups:>15.1f}{paints:>10.1f}")
+    print(f"reloj: {clock.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark de decodificación de payloads: binario (struct) frente a JSON.
+
+Ejecutar desde la raíz del repositorio:
+    python -m benchmarks.bench_payload [--messages N]
+"""
+import argparse
+import random
+import time
+
+from config import SENSORS
+from ingestion.payload import encode_binary, encode_json, decode_binary, decode_json, decode_payload
+
+
+def _sample_values():
+    """Genera un valor aleatorio dentro del rango de cada sensor."""
+    return {
+        sensor_id: random.uniform(info["min_value"], info["max_value"])
+        for sensor_id, info in SENSORS.items()
+    }
+
+
+def _measure(decoder, payloads):
+    """
+    Decodifica todos los payloads y devuelve los mensajes por segundo.
+
+    Args:
+        decoder (callable): Función de decodificación
+        payloads (list[bytes]): Mensajes a decodificar
+
+    Returns:
+        float: Mensajes decodificados por segundo
+    """
+    received = time.time()
+    start = time.perf_counter()
+    for payload in payloads:
+        decoder(payload, received)
+    elapsed = time.perf_counter() - start
+    return len(payloads) / elapsed
+
+
+def main():
+    """Ejecuta el benchmark e imprime el rendimiento de cada formato."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200000, help="Mensajes por formato")
+    args = parser.parse_args()
+
+    now = time.time()
+    samples = [_sample_values() for _ in range(args.messages)]
+    binary_payloads = [encode_binary(values, now) for values in samples]
+    json_payloads = [encode_json(values, now) for values in samples]
+
+    results = [
+        ("binario (struct)", _measure(decode_binary, binary_payloads), len(binary_payloads[0])),
+        ("JSON", _measure(decode_json, json_payloads), len(json_payloads[0])),
+        ("binario autodetectado", _measure(decode_payload, binary_payloads), len(binary_payloads[0])),
+        ("JSON autodetectado", _measure(decode_payload, json_payloads), len(json_payloads[0])),
+    ]
+
+    print(f"{'formato':<24}{'msg/s':>14}{'bytes/msg':>12}")
+    for name, rate, size in results:
+        print(f"{name:<24}{rate:>14,.0f}{size:>12}")
+
+    print(f"\nAceleración binario/JSON: {results[0][1] / results[1][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark del gobernador de calidad en una placa lenta simulada.
+
+Monta los widgets animados y el termómetro, los vigila con QualityGovernor
+y simula una placa lenta multiplicando por --slowdown el tiempo real de
+cada paintEvent (una espera activa proporcional a lo que ha tardado). Como
+la espera es proporcional, bajar la calidad reduce la carga de verdad.
+
+- placa lenta: el gobernador baja niveles hasta que la carga de pintado
+  cabe en el presupuesto;
+- placa rápida: se quita la ralentización y el gobernador recupera la
+  calidad completa.
+
+Por cada periodo imprime el nivel, la carga de pintado medida y los
+pintados por segundo.
+
+Ejecutar desde la raíz del repositorio:
+    python -m benchmarks.bench_quality_governor [--slowdown X] [--periods N]
+"""
+import argparse
+import os
+import sys
+import time
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QWidget
+
+from config import QUALITY_CONFIG
+from ui.frame_clock import get_frame_clock
+from ui.quality_governor import QualityGovernor
+from ui.widgets.air_quality_widget import AirQualityWidget
+from ui.widgets.humidity_widget import HumidityWidget
+from ui.widgets.noise_widget import NoiseWidget
+from ui.widgets.pressure_widget import PressureWidget
+from ui.widgets.thermometer_widget import ThermometerWidget
+
+
+def _wait(seconds):
+    """Procesa eventos durante `seconds` segundos."""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def _slow_down(widget, factor):
+    """Hace que el paintEvent del widget tarde `factor[0]` veces lo que tarda de verdad."""
+    paint = widget.paintEvent
+
+    def slow_paint(event):
+        start = time.perf_counter()
+        paint(event)
+        end = start + (time.perf_counter() - start) * factor[0]
+        while time.perf_counter() < end:
+            pass
+
+    widget.paintEvent = slow_paint
+
+
+def main():
+    """Ejecuta el benchmark e imprime el nivel y la carga de pintado de cada periodo."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slowdown", type=float, default=8.0, help="Factor de ralentización del pintado")
+    parser.add_argument("--periods", type=int, default=10, help="Periodos de medida por fase")
+    parser.add_argument("--period-ms", type=int, default=1000, help="Periodo de medida del gobernador")
+    args = parser.parse_args()
+
+    # Sin pantalla (p. ej. por SSH) se usa el backend fuera de pantalla
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+
+    clock = get_frame_clock()
+    # Las animaciones siguen aunque no lleguen lecturas nuevas
+    clock.idle_mode = False
+    window = QWidget()
+    layout = QHBoxLayout(window)
+    widgets = [PressureWidget(), HumidityWidget(), NoiseWidget(), AirQualityWidget(), ThermometerWidget()]
+    factor = [args.slowdown]
+    config = dict(QUALITY_CONFIG, period_ms=args.period_ms, restore_periods=2)
+    governor = QualityGovernor(clock, config)
+    for widget, value in zip(widgets, (1000.0, 80.0, 70.0, 200.0, 22.0)):
+        layout.addWidget(widget)
+        widget.set_value(value)
+        # La ralentización va por dentro de la medida del gobernador
+        _slow_down(widget, factor)
+        governor.watch(widget)
+    window.resize(1200, 260)
+    window.show()
+    app.processEvents()
+
+    print(f"{'fase':<14}{'periodo':>8}{'nivel':>7}  {'calidad':<22}{'carga %':>8}{'paints/s':>10}")
+    for phase, slowdown in (("placa lenta", args.slowdown), ("placa rápida", 1.0)):
+        factor[0] = slowdown
+        for period in range(args.periods):
+            _wait(args.period_ms / 1000)
+            stats = governor.get_stats()
+            paints = sum(w["paints"] for w in stats["widgets"].values()) / (args.period_ms / 1000)
+            print(f"{phase:<14}{period + 1:>8}{stats['level']:>7}  {stats['name']:<22}"
+                  f"{stats['load'] * 100:>8.1f}{paints:>10.1f}")
+    window.close()
+    print(f"gobernador: {governor.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark de las etiquetas de estado: setStyleSheet en cada tick frente a StatusLabel.
+
+Reproduce los contenedores de MainWindow (cinco etiquetas de estado dentro
+de widgets con hoja de estilo propia) y mide el coste por tick, incluidos
+los eventos pendientes de Qt, de:
+
+- antes: setText + setStyleSheet con la hoja formateada en cada tick;
+- StatusLabel con el estado estable (el caso normal a 200 ms por tick);
+- StatusLabel con un cambio de estado en cada tick (el peor caso).
+
+También compara SensorWidget.set_value con la versión que aplicaba la hoja
+del borde en cada llamada.
+
+Ejecutar desde la raíz del repositorio:
+    python -m benchmarks.bench_status_label [--ticks N]
+"""
+import argparse
+import os
+import sys
+import time
+
+from PyQt6.QtWidgets import QApplication, QGridLayout, QLabel, QVBoxLayout, QWidget
+
+from config import SENSORS
+from analysis.classifier import get_classifier
+from ui.widgets.sensor_widget import SensorWidget
+from ui.widgets.status_label import StatusLabel
+
+CONTAINER_STYLE = """
+    QWidget {
+        background-color: rgba(40, 40, 40, 0.7);
+        border: none;
+        border-radius: 8px;
+    }
+"""
+
+LEGACY_STATUS_STYLE = """
+    color: {color};
+    font-size: 16px;
+    font-weight: bold;
+    background-color: transparent;
+    padding: 2px;
+"""
+
+LEGACY_BORDER_STYLE = """
+    QWidget {{
+        background-color: transparent;
+        border: 2px solid {color};
+        border-radius: 10px;
+    }}
+"""
+
+
+def _window(label_class, count=5):
+    """Crea una ventana con `count` contenedores, cada uno con una etiqueta de estado."""
+    window = QWidget()
+    window.setStyleSheet("QWidget { background-color: #1a1a1a; }")
+    grid = QGridLayout(window)
+    labels = []
+    for i in range(count):
+        container = QWidget()
+        container.setStyleSheet(CONTAINER_STYLE)
+        layout = QVBoxLayout(container)
+        layout.addWidget(QLabel(f"Sensor {i}"))
+        label = label_class("Estado: Normal")
+        layout.addWidget(label)
+        labels.append(label)
+        grid.addWidget(container, i // 3, i % 3)
+    window.resize(800, 480)
+    window.show()
+    return window, labels
+
+
+def _run(app, ticks, step):
+    """Ejecuta `step(tick)` y procesa los eventos de Qt; devuelve µs por tick."""
+    app.processEvents()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        step(tick)
+        app.processEvents()
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def _bench_labels(app, ticks):
+    """Mide las tres variantes de las etiquetas de estado."""
+    bands = [band for classifier in get_classifier().status.values() for band in classifier.bands]
+    results = []
+
+    window, labels = _window(QLabel)
+
+    def legacy(tick):
+        band = bands[0]
+        for label in labels:
+            label.setText(f"Estado: {band.state}")
+            label.setStyleSheet(LEGACY_STATUS_STYLE.format(color=band.color))
+
+    results.append(("antes (setStyleSheet en cada tick)", _run(app, ticks, legacy)))
+    window.close()
+
+    window, labels = _window(StatusLabel)
+
+    def stable(tick):
+        band = bands[0]
+        for label in labels:
+            label.set_status(f"Estado: {band.state}", band.color)
+
+    results.append(("StatusLabel, estado estable", _run(app, ticks, stable)))
+
+    def transitions(tick):
+        band = bands[tick % len(bands)]
+        for label in labels:
+            label.set_status(f"Estado: {band.state}", band.color)
+
+    results.append(("StatusLabel, cambio en cada tick", _run(app, ticks, transitions)))
+    window.close()
+    return results
+
+
+def _bench_sensor_widget(app, ticks):
+    """Mide SensorWidget.set_value con valores del mismo nivel."""
+    sensor_id = "Ruido"
+    info = SENSORS[sensor_id]
+    widget = SensorWidget(sensor_id, sensor_id, info["name"], info["unit"], info["min_value"], info["max_value"])
+    widget.show()
+    value = info["min_value"] + 1
+
+    def legacy(tick):
+        widget.value = value + (tick % 2) * 0.01
+        widget.value_label.setText(f"{widget.value:.1f} {widget.unit}")
+        widget.setStyleSheet(LEGACY_BORDER_STYLE.format(color=widget.get_color_for_value(widget.value)))
+
+    def current(tick):
+        widget.set_value(value + (tick % 2) * 0.01)
+
+    results = [
+        ("SensorWidget antes (borde en cada valor)", _run(app, ticks, legacy)),
+        ("SensorWidget ahora", _run(app, ticks, current)),
+    ]
+    widget.close()
+    return results
+
+
+def main():
+    """Ejecuta el benchmark e imprime el coste por tick de cada variante."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=2000, help="Ticks por variante")
+    args = parser.parse_args()
+
+    # Sin pantalla (p. ej. por SSH) se usa el backend fuera de pantalla
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+
+    results = _bench_labels(app, args.ticks) + _bench_sensor_widget(app, args.ticks)
+    print(f"{'variante':<44}{'µs/tick':>10}")
+    for name, micros in results:
+        print(f"{name:<44}{micros:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
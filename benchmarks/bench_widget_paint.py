@@ -0,0 +1,80 @@
+"""
+Benchmark del paint de los widgets con y sin la caché de capas estáticas.
+
+Para cada widget (barómetro, humedad, ruido y termómetro) mide el coste de
+un paintEvent completo renderizando el widget en una imagen preasignada:
+
+- antes: la caché desactivada (LayerCache.enabled = False), de modo que el
+  fondo, los marcos y las escalas se dibujan en cada frame;
+- ahora: las capas estáticas se copian desde la caché y solo se dibuja la
+  parte dinámica (en la humedad el empañamiento también es una capa, que
+  entre cambios de valor o de zonas se copia entera).
+
+Ejecutar desde la raíz del repositorio:
+    python -m benchmarks.bench_widget_paint [--frames N] [--size ANCHOxALTO]
+"""
+import argparse
+import os
+import sys
+import time
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from ui.widgets.humidity_widget import HumidityWidget
+from ui.widgets.noise_widget import NoiseWidget
+from ui.widgets.pressure_widget import PressureWidget
+from ui.widgets.thermometer_widget import ThermometerWidget
+
+WIDGETS = (
+    ("PressureWidget", PressureWidget),
+    ("HumidityWidget", HumidityWidget),
+    ("NoiseWidget", NoiseWidget),
+    ("ThermometerWidget", ThermometerWidget),
+)
+
+
+def _measure(widget, image, frames):
+    """Renderiza el widget `frames` veces en `image`; devuelve µs por frame."""
+    # Un frame de calentamiento (rasteriza las capas si la caché está activa)
+    widget.render(image)
+    start = time.perf_counter()
+    for _ in range(frames):
+        image.fill(Qt.GlobalColor.transparent)
+        widget.render(image)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    """Ejecuta el benchmark e imprime el coste por frame de cada widget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=500, help="Frames por variante")
+    parser.add_argument("--size", default="300x260", help="Tamaño de los widgets (ANCHOxALTO)")
+    args = parser.parse_args()
+    width, height = (int(n) for n in args.size.lower().split("x"))
+
+    # Sin pantalla (p. ej. por SSH) se usa el backend fuera de pantalla
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+
+    print(f"{'widget':<20}{'antes µs':>12}{'ahora µs':>12}{'mejora':>10}")
+    for name, widget_class in WIDGETS:
+        widget = widget_class()
+        widget.resize(width, height)
+        widget.show()
+        app.processEvents()
+        image = QImage(widget.size(), QImage.Format.Format_ARGB32_Premultiplied)
+
+        widget.layers.enabled = False
+        before = _measure(widget, image, args.frames)
+        widget.layers.enabled = True
+        after = _measure(widget, image, args.frames)
+        widget.close()
+
+        print(f"{name:<20}{before:>12.1f}{after:>12.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
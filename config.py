@@ -7,9 +7,121 @@ MQTT_CONFIG = {
     "broker": "localhost",
     "port": 1883,
     "topic": "casa/sensores",
+    # Sensores de una habitación: el panel muestra una sola (sin comodín "+"),
+    # porque el historial, los agregados y las alertas se indexan solo por sensor
+    "device_topic": "casa/salon/sensores/#",
     "username": "Home_Assitan",
     "password": "1234",
-    "keepalive": 60
+    "keepalive": 60,
+    "client_id": "dashboard",     # Sesión persistente: el broker guarda lo publicado sin conexión
+    "qos": 1
+}
+
+# Configuración de la ingesta de datos MQTT
+INGESTION_CONFIG = {
+    "queue_size": 2048,           # Mensajes máximos pendientes entre MQTT y la UI
+    "frame_interval_ms": 50,      # Un lote de lecturas por frame de la UI (~20 fps)
+    "offline_buffer_bytes": 1048576,  # Memoria para lecturas recibidas tras una desconexión
+    "backlog_tolerance_s": 2.0,   # Lecturas más antiguas que la reconexión (menos esto) son atrasadas
+    "backlog_idle_ms": 500,       # Sin lecturas atrasadas durante este tiempo -> entregar el lote
+    "backlog_window_s": 10.0,     # Duración máxima de la puesta al día tras cada conexión
+    "reconnect_min_delay": 1,     # Espera inicial de reconexión (s), se duplica en cada intento
+    "reconnect_max_delay": 60,    # Espera máxima de reconexión (s)
+    "ui_policy": "coalesce",      # Contrapresión hacia la UI: drop_oldest, drop_newest o coalesce
+    "ui_buffer_bytes": 262144     # Memoria máxima de las lecturas pendientes de la UI
+}
+
+# Configuración del historial de sensores
+HISTORY_CONFIG = {
+    "ring_capacity": 4096,        # Muestras recientes en memoria por sensor
+    "backend": "mmap",            # Almacén en disco: "mmap" (segmentos) o "sqlite"
+    "data_dir": "data/history",   # Directorio de los segmentos diarios en disco
+    "retention_days": 400,        # Días de historial que se conservan en disco
+    "segment_growth_records": 8192,  # Registros que crece un segmento cada vez
+    "flush_interval_s": 5.0,      # Cada cuánto se escriben a disco los segmentos abiertos
+    "sqlite_path": "data/history.db",  # Base de datos del almacén SQLite
+    "sqlite_batch_size": 500,     # Filas por inserción (executemany)
+    "sqlite_flush_interval_s": 1.0,    # Inserción máxima cada este tiempo aunque el lote no esté lleno
+    "sqlite_max_pending": 100000, # Filas pendientes máximas antes de descartar
+    "sqlite_retention_chunk": 2000,    # Filas borradas por tanda de retención
+    "sqlite_retention_interval_s": 3600,  # Cada cuánto se buscan filas caducadas
+    # Agregados incrementales: nombre -> (resolución en s, cubetas guardadas)
+    "rollup_tiers": {
+        "1s": (1, 3600),          # Última hora
+        "1m": (60, 10080),        # Última semana
+        "1h": (3600, 8760)        # Último año
+    },
+    "rollup_path": "data/rollups.npz",  # Fichero de los agregados (None: sin persistencia)
+    "trend_windows_s": (86400, 3600),  # Ventanas de los gráficos de tendencia (cada toque pasa a la siguiente)
+    "trend_pending_max": 20000,   # Lecturas en espera de los gráficos; si se superan, se redibujan desde los agregados
+    "export_chunk_records": 65536  # Lecturas por bloque al exportar e importar
+}
+
+# Configuración de la clasificación de estados (analysis/classifier.py)
+STATUS_CONFIG = {
+    "debounce_samples": 2  # Lecturas seguidas necesarias para confirmar un cambio de estado
+}
+
+# Reglas de alerta (analysis/alerts.py), evaluadas con cada lectura:
+# type: "duration" (el valor cumple la condición toda la ventana), "change"
+# (lectura actual menos el máximo, con op "<", o el mínimo, con op ">", de la
+# ventana), "mean" (media de la ventana) o "leq" (nivel sonoro equivalente)
+ALERT_RULES = [
+    {
+        "name": "Calidad del aire mala durante 10 minutos",
+        "sensor": "Calidad_Aire",
+        "type": "duration",
+        "op": ">",
+        "threshold": 150,
+        "window_s": 600,
+        "hysteresis": 10
+    },
+    {
+        "name": "Caída de presión de más de 3 hPa en 3 horas",
+        "sensor": "Presión",
+        "type": "change",
+        "op": "<",
+        "threshold": -3.0,
+        "window_s": 10800,
+        "hysteresis": 0.5
+    },
+    {
+        "name": "Ruido Leq de 15 minutos por encima de 65 dB",
+        "sensor": "Ruido",
+        "type": "leq",
+        "op": ">",
+        "threshold": 65,
+        "window_s": 900,
+        "hysteresis": 1
+    }
+]
+
+# Detección de anomalías en streaming (analysis/anomaly.py)
+ANOMALY_CONFIG = {
+    "alpha": 0.05,                # Peso de cada lectura nueva en la media y varianza EWMA
+    "z_threshold": 6.0,           # Puntuación z a partir de la que una lectura es un pico
+    "warmup_samples": 30,         # Lecturas de un sensor antes de evaluar picos
+    "stuck_samples": 120,         # Lecturas idénticas seguidas para dar el valor por congelado
+    "min_std_fraction": 0.005     # Desviación típica mínima, en fracción del rango del sensor
+}
+
+# Reloj de frames de la interfaz (ui/frame_clock.py)
+FRAME_CONFIG = {
+    "tick_ms": 25,                # Periodo del único timer de la UI (40 despertares/s como máximo)
+    "idle_mode": True,            # Dormir las animaciones asentadas y pausar con la pantalla apagada
+    "idle_after_s": 30,           # Segundos de animación ambiental tras el último cambio de valor
+    "display_poll_ms": 2000,      # Cada cuánto se consulta si la pantalla está apagada (0: nunca)
+    "display_power_paths": None   # Ficheros de sysfs con el estado de la pantalla (None: buscarlos)
+}
+
+# Configuración del gobernador de calidad (ver ui/quality_governor.py)
+QUALITY_CONFIG = {
+    "enabled": True,              # Bajar la calidad del dibujo si pintar cuesta demasiado
+    "paint_budget": 0.3,          # Fracción máxima del tiempo de la UI dedicada a pintar
+    "period_ms": 2000,            # Periodo de medida de la carga de pintado
+    "restore_fraction": 0.5,      # Se sube de nivel con la carga por debajo de budget * restore_fraction
+    "restore_periods": 3,         # Periodos tranquilos seguidos antes de subir un nivel
+    "max_restore_periods": 48     # Espera máxima para subir tras subidas que no se sostienen
 }
 
 # Configuración de colores
@@ -90,6 +202,10 @@ UI_CONFIG = {
 }
 
 # Configuración de los sensores
+#   hysteresis: margen a superar para cambiar de estado (unidades del sensor)
+#   status_bands: estados (límite superior, estado, color[, incluido]) de
+#       menor a mayor; el último sin límite. El límite queda fuera de su banda
+#       salvo que el cuarto elemento sea True (25 °C todavía es "Normal")
 SENSORS = {
     "Temperatura": {
         "name": "Temperatura",
@@ -98,7 +214,14 @@ SENSORS = {
         "max_value": 35,
         "warning_threshold": 30,
         "critical_threshold": 35,
-        "color": "#e74c3c"  # Rojo
+        "color": "#e74c3c",  # Rojo
+        "hysteresis": 0.5,
+        "status_bands": [
+            (20, "Frío", "#3498db"),  # Azul
+            (25, "Normal", "#2ecc71", True),  # Verde
+            (28, "Cálido", "#f39c12", True),  # Naranja
+            (None, "Calor", "#e74c3c")  # Rojo
+        ]
     },
     "Humedad": {
         "name": "Humedad",
@@ -107,7 +230,14 @@ SENSORS = {
         "max_value": 70,
         "warning_threshold": 60,
         "critical_threshold": 70,
-        "color": "#3498db"  # Azul
+        "color": "#3498db",  # Azul
+        "hysteresis": 1.0,
+        "status_bands": [
+            (30, "Seco", "#e74c3c"),  # Rojo
+            (50, "Normal", "#2ecc71", True),  # Verde
+            (60, "Húmedo", "#3498db", True),  # Azul
+            (None, "Muy húmedo", "#9b59b6")  # Púrpura
+        ]
     },
     "Presión": {
         "name": "Presión",
@@ -116,7 +246,13 @@ SENSORS = {
         "max_value": 1020,
         "warning_threshold": 1010,
         "critical_threshold": 1020,
-        "color": "#2ecc71"  # Verde
+        "color": "#2ecc71",  # Verde
+        "hysteresis": 1.0,
+        "status_bands": [
+            (1000, "Baja", "#3498db"),  # Azul
+            (1015, "Normal", "#2ecc71", True),  # Verde
+            (None, "Alta", "#e74c3c")  # Rojo
+        ]
     },
     "Calidad_Aire": {
         "name": "Calidad de Aire",
@@ -125,7 +261,15 @@ SENSORS = {
         "max_value": 500,
         "warning_threshold": 150,
         "critical_threshold": 300,
-        "color": "#9b59b6"  # Púrpura
+        "color": "#9b59b6",  # Púrpura
+        "hysteresis": 5.0,
+        "status_bands": [
+            (50, "Excelente", "#2ecc71"),  # Verde
+            (100, "Buena", "#3498db"),  # Azul
+            (150, "Moderada", "#f39c12"),  # Naranja
+            (300, "Mala", "#e74c3c"),  # Rojo
+            (None, "Peligrosa", "#8e44ad")  # Morado
+        ]
     },
     "Ruido": {
         "name": "Nivel de Ruido",
@@ -134,6 +278,12 @@ SENSORS = {
         "max_value": 90,
         "warning_threshold": 60,
         "critical_threshold": 80,
-        "color": "#f1c40f"  # Amarillo
+        "color": "#f1c40f",  # Amarillo
+        "hysteresis": 2.0,
+        "status_bands": [
+            (60, "Bajo", "#f1c40f"),  # Amarillo
+            (80, "Moderado", "#f39c12"),  # Naranja
+            (None, "Alto", "#e74c3c")  # Rojo
+        ]
     }
 } 
\ No newline at end of file
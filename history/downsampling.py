@@ -0,0 +1,239 @@
+"""
+Reducción de series para dibujarlas en un ancho fijo de píxeles.
+
+Implementa Largest-Triangle-Three-Buckets (LTTB): la serie se reparte en
+cubetas y de cada una se conserva el punto que forma el triángulo de mayor
+área con el punto elegido en la cubeta anterior y la media de la siguiente.
+Así se mantienen los picos y la forma de la curva con un punto por píxel.
+
+lttb() reduce cualquier par de arrays. Downsampler aplica la misma idea al
+historial en memoria con cubetas alineadas al tiempo absoluto: la elección
+de una cubeta ya no cambia cuando la siguiente está completa, de modo que
+cada (sensor, ventana, ancho) guarda las cubetas cerradas en caché y con
+cada muestra nueva solo se recalculan las últimas. Los gráficos de
+tendencia lo usan para rellenar las ventanas que cubre el historial en
+memoria (ver MainWindow._trend_source).
+
+El historial se lee con SensorHistory.snapshot(), que copia las muestras
+dentro de su cerrojo: el hilo despachador sigue escribiendo mientras tanto.
+"""
+import math
+import threading
+
+import numpy as np
+
+# Entradas máximas de la caché de Downsampler
+CACHE_SIZE = 64
+
+
+def _pick(ax, ay, bx, by, cx, cy):
+    """
+    Índice del punto de la cubeta con el triángulo de mayor área.
+
+    Args:
+        ax, ay (float): Punto elegido en la cubeta anterior
+        bx, by (ndarray): Puntos de la cubeta actual
+        cx, cy (float): Media de la cubeta siguiente
+
+    Returns:
+        int: Índice dentro de la cubeta
+    """
+    # El doble del área basta para comparar
+    area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+    return int(area.argmax())
+
+
+def lttb(x, y, threshold):
+    """
+    Reduce una serie a como mucho `threshold` puntos representativos.
+
+    Args:
+        x (ndarray): Abscisas (timestamps) crecientes
+        y (ndarray): Valores
+        threshold (int): Número máximo de puntos (al menos 3 para reducir)
+
+    Returns:
+        tuple: (x, y) reducidos como arrays float64
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x.copy(), y.copy()
+
+    # Primer y último punto fijos; el resto en threshold - 2 cubetas
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out_x = np.empty(threshold)
+    out_y = np.empty(threshold)
+    out_x[0], out_y[0] = x[0], y[0]
+    out_x[-1], out_y[-1] = x[-1], y[-1]
+
+    # Medias de todas las cubetas de una vez (la "siguiente" de cada una)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    means_x = np.append(sums_x / sizes, x[-1])
+    means_y = np.append(sums_y / sizes, y[-1])
+
+    ax, ay = x[0], y[0]
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        j = lo + _pick(ax, ay, x[lo:hi], y[lo:hi], means_x[i + 1], means_y[i + 1])
+        ax, ay = x[j], y[j]
+        out_x[i + 1], out_y[i + 1] = ax, ay
+
+    return out_x, out_y
+
+
+class _CacheEntry:
+    """Selección guardada de un (sensor, ventana, ancho)."""
+
+    __slots__ = ("selected", "final_bucket", "version", "last_bucket", "result")
+
+    def __init__(self):
+        # Cubeta -> (x, y) del punto elegido
+        self.selected = {}
+        # Última cubeta cuya elección ya no puede cambiar
+        self.final_bucket = None
+        # Contador de muestras del sensor y cubeta actual del último cálculo
+        self.version = -1
+        self.last_bucket = None
+        self.result = None
+
+
+class Downsampler:
+    """Reducción LTTB del historial en memoria con caché incremental."""
+
+    def __init__(self, history):
+        """
+        Inicializa el servicio.
+
+        Args:
+            history (SensorHistory): Historial en memoria de los sensores
+        """
+        self.history = history
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.partial = 0
+        self.misses = 0
+
+    def get(self, sensor_id, window_s, width, now):
+        """
+        Devuelve como mucho `width` puntos que representan la ventana.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            window_s (float): Duración de la ventana en segundos
+            width (int): Ancho disponible en píxeles (puntos máximos, al menos 2)
+            now (float): Final de la ventana
+
+        Returns:
+            tuple: (timestamps, valores) como arrays float64
+        """
+        width = max(2, int(width))
+        # Con width - 1 cubetas por ventana, una ventana toca como mucho width cubetas
+        span = window_s / (width - 1)
+        first_bucket = math.floor((now - window_s) / span)
+        last_bucket = math.floor(now / span)
+        version = self.history.appended(sensor_id)
+
+        key = (sensor_id, window_s, width)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                if len(self._cache) >= CACHE_SIZE:
+                    self._cache.pop(next(iter(self._cache)))
+                entry = self._cache[key] = _CacheEntry()
+                self.misses += 1
+            elif entry.version == version and entry.last_bucket == last_bucket:
+                self.hits += 1
+                return entry.result
+            else:
+                self.partial += 1
+
+            # La versión es la de la copia: si entretanto llegan muestras, se recalculan en la próxima
+            entry.version = self._update(entry, sensor_id, span, first_bucket, last_bucket, now - window_s, now)
+            entry.last_bucket = last_bucket
+            return entry.result
+
+    def _update(self, entry, sensor_id, span, first_bucket, last_bucket, start, now):
+        """Recalcula las cubetas abiertas de una entrada, compone el resultado y devuelve la versión leída."""
+        selected = entry.selected
+
+        # Olvidar las cubetas que salieron de la ventana (se conserva el ancla anterior)
+        for bucket in [b for b in selected if b < first_bucket - 1]:
+            del selected[bucket]
+
+        start_bucket = first_bucket
+        if entry.final_bucket is not None and entry.final_bucket >= first_bucket:
+            start_bucket = entry.final_bucket + 1
+        for bucket in [b for b in selected if b >= start_bucket]:
+            del selected[bucket]
+
+        # Solo se copian las muestras de las cubetas por recalcular
+        x, y, version = self.history.snapshot(sensor_id, now - start_bucket * span, now)
+
+        if len(x):
+            buckets = np.floor(x / span).astype(np.int64)
+            present, starts = np.unique(buckets, return_index=True)
+            ends = np.append(starts[1:], len(x))
+            sums_x = np.add.reduceat(x, starts)
+            sums_y = np.add.reduceat(y, starts)
+            sizes = ends - starts
+
+            anchor = selected.get(max(selected)) if selected else None
+            for i, bucket in enumerate(present):
+                lo, hi = starts[i], ends[i]
+                if anchor is None:
+                    # Sin cubeta anterior: el primer punto ancla la serie
+                    j = lo
+                elif i + 1 < len(present):
+                    cx = sums_x[i + 1] / sizes[i + 1]
+                    cy = sums_y[i + 1] / sizes[i + 1]
+                    j = lo + _pick(anchor[0], anchor[1], x[lo:hi], y[lo:hi], cx, cy)
+                else:
+                    # Última cubeta: el punto más reciente cierra la serie
+                    j = hi - 1
+                anchor = (float(x[j]), float(y[j]))
+                selected[int(bucket)] = anchor
+
+                # Cerrada si la cubeta siguiente usada ya no recibe muestras
+                if i + 1 < len(present) and present[i + 1] < last_bucket:
+                    entry.final_bucket = int(bucket)
+
+        # La primera cubeta puede empezar antes de la ventana
+        points = sorted((b, p) for b, p in selected.items() if b >= first_bucket and p[0] >= start)
+        entry.result = (
+            np.array([p[0] for _, p in points], dtype=np.float64),
+            np.array([p[1] for _, p in points], dtype=np.float64),
+        )
+        return version
+
+    def invalidate(self, sensor_id=None):
+        """
+        Descarta la caché de un sensor o de todos.
+
+        Args:
+            sensor_id (str, optional): Sensor a descartar (por defecto todos)
+        """
+        with self._lock:
+            if sensor_id is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == sensor_id]:
+                    del self._cache[key]
+
+    def get_stats(self):
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            dict: Aciertos, recálculos parciales, fallos y entradas
+        """
+        return {
+            "hits": self.hits,
+            "partial": self.partial,
+            "misses": self.misses,
+            "entries": len(self._cache),
+        }
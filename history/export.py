@@ -0,0 +1,337 @@
+"""
+Exportación e importación masiva del historial en disco.
+
+Todo se encadena con generadores de bloques (sensor_id, timestamps, valores)
+de como mucho HISTORY_CONFIG["export_chunk_records"] lecturas, así que la
+memoria usada no depende del tamaño del rango:
+
+    almacén.iter_range() -> iter_history() -> write_csv() / write_binary()
+    read_csv() / read_binary() -> import_chunks() -> almacén.load()
+
+Formatos:
+
+- CSV: cabecera "sensor_id,timestamp,value" y una lectura por línea
+  (timestamp en segundos epoch). Cada número se escribe con la
+  representación más corta que lo recupera; los valores float32 de los
+  segmentos, con la de float32 (21.3 y no 21.299999237060547).
+- Binario columnar: cabecera de fichero (magic "HEXP", versión) seguida de
+  bloques; cada bloque lleva el sensor, el número de lecturas n, n
+  timestamps float64 y n valores float32 (12 bytes por lectura, como los
+  segmentos de history.mmap_store).
+
+Las lecturas salen agrupadas por sensor y, dentro de cada sensor, en orden
+cronológico. La importación escribe directamente en el almacén, sin objetos
+Reading ni cola del hilo escritor. Con el almacén de segmentos, importar
+con la aplicación parada (dos procesos no deben escribir el mismo segmento).
+
+Ejemplos (desde la raíz del repositorio):
+    python -m history.export export semana.csv --start 2024-05-01 --end 2024-05-08
+    python -m history.export export todo.hexp --sensor Temperatura --sensor Humedad
+    python -m history.export import semana.csv
+"""
+import argparse
+import csv
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import SENSORS, HISTORY_CONFIG
+from history.mmap_store import MmapStore
+from history.sqlite_store import SqliteStore
+from utils.logger import setup_logger
+
+# Configurar logger de la exportación
+logger = setup_logger(__name__)
+
+BINARY_MAGIC = b"HEXP"
+BINARY_VERSION = 1
+BINARY_SUFFIX = ".hexp"
+
+# Cabecera de fichero: magic, versión, reservado
+FILE_HEADER = struct.Struct("<4sHH")
+# Cabecera de bloque: longitud del sensor_id en bytes, número de lecturas
+BLOCK_HEADER = struct.Struct("<HI")
+
+CSV_HEADER = ("sensor_id", "timestamp", "value")
+
+
+def iter_history(store, sensor_ids=None, start=None, end=None, chunk_size=None):
+    """
+    Recorre el historial de un almacén por bloques.
+
+    Args:
+        store (MmapStore | SqliteStore): Almacén de origen
+        sensor_ids (iterable, optional): Sensores a exportar (por defecto todos los del almacén)
+        start (float, optional): Inicio del rango (por defecto desde el principio)
+        end (float, optional): Fin del rango (por defecto ahora)
+        chunk_size (int, optional): Lecturas máximas por bloque (por defecto HISTORY_CONFIG["export_chunk_records"])
+
+    Yields:
+        tuple: (sensor_id, timestamps, valores)
+    """
+    chunk_size = chunk_size or HISTORY_CONFIG["export_chunk_records"]
+    start = 0.0 if start is None else start
+    end = time.time() if end is None else end
+    for sensor_id in (sensor_ids or sorted(store.sensor_ids)):
+        for timestamps, values in store.iter_range(sensor_id, start, end, chunk_size):
+            yield sensor_id, timestamps, values
+
+
+def write_csv(chunks, path):
+    """
+    Escribe bloques de lecturas en un fichero CSV.
+
+    Args:
+        chunks (iterable): Bloques (sensor_id, timestamps, valores)
+        path (str): Fichero de destino
+
+    Returns:
+        int: Lecturas escritas
+    """
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for sensor_id, timestamps, values in chunks:
+            # repr() conserva el float exacto al volver a leerlo
+            writer.writerows(
+                (sensor_id, repr(t), v)
+                for t, v in zip(timestamps.tolist(), _format_values(values))
+            )
+            written += len(timestamps)
+    return written
+
+
+def _format_values(values):
+    """
+    Convierte valores en texto con la representación más corta que los recupera.
+
+    Los valores que son float32 ampliados (los de history.mmap_store) se
+    escriben como float32; los demás (p. ej. los de SQLite), como float64.
+
+    Args:
+        values (ndarray): Valores de un bloque
+
+    Returns:
+        list[str]: Valores como texto
+    """
+    values = np.asarray(values, dtype=np.float64)
+    narrow = values.astype(np.float32)
+    exact = narrow.astype(np.float64) == values
+    if exact.all():
+        return narrow.astype(str).tolist()
+    return np.where(exact, narrow.astype(str), values.astype(str)).tolist()
+
+
+def read_csv(path, chunk_size=None):
+    """
+    Lee un fichero CSV exportado por bloques.
+
+    Las filas consecutivas del mismo sensor se agrupan en un bloque.
+
+    Args:
+        path (str): Fichero de origen
+        chunk_size (int, optional): Lecturas máximas por bloque
+
+    Yields:
+        tuple: (sensor_id, timestamps, valores)
+
+    Raises:
+        ValueError: Si la cabecera o una fila no son válidas
+    """
+    chunk_size = chunk_size or HISTORY_CONFIG["export_chunk_records"]
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        if tuple(next(reader, ())) != CSV_HEADER:
+            raise ValueError(f"cabecera CSV no válida en {path}")
+
+        current, timestamps, values = None, [], []
+        for line, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            try:
+                sensor_id, timestamp, value = row[0], float(row[1]), float(row[2])
+            except (IndexError, ValueError):
+                raise ValueError(f"fila no válida en {path}:{line}") from None
+
+            if sensor_id != current or len(timestamps) >= chunk_size:
+                if timestamps:
+                    yield current, np.array(timestamps), np.array(values)
+                current, timestamps, values = sensor_id, [], []
+            timestamps.append(timestamp)
+            values.append(value)
+
+        if timestamps:
+            yield current, np.array(timestamps), np.array(values)
+
+
+def write_binary(chunks, path):
+    """
+    Escribe bloques de lecturas en el formato binario columnar.
+
+    Args:
+        chunks (iterable): Bloques (sensor_id, timestamps, valores)
+        path (str): Fichero de destino
+
+    Returns:
+        int: Lecturas escritas
+    """
+    written = 0
+    with open(path, "wb") as f:
+        f.write(FILE_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0))
+        for sensor_id, timestamps, values in chunks:
+            name = sensor_id.encode("utf-8")
+            f.write(BLOCK_HEADER.pack(len(name), len(timestamps)))
+            f.write(name)
+            f.write(np.asarray(timestamps, dtype="<f8").tobytes())
+            f.write(np.asarray(values, dtype="<f4").tobytes())
+            written += len(timestamps)
+    return written
+
+
+def read_binary(path):
+    """
+    Lee un fichero binario columnar bloque a bloque.
+
+    Args:
+        path (str): Fichero de origen
+
+    Yields:
+        tuple: (sensor_id, timestamps, valores) como arrays float64
+
+    Raises:
+        ValueError: Si el fichero no es válido o está truncado
+    """
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            raise ValueError(f"fichero binario no válido: {path}")
+        magic, version, _ = FILE_HEADER.unpack(header)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"fichero binario no válido: {path}")
+
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if not header:
+                break
+            if len(header) < BLOCK_HEADER.size:
+                raise ValueError(f"bloque truncado en {path}")
+            name_size, count = BLOCK_HEADER.unpack(header)
+            name = f.read(name_size)
+            timestamps = f.read(8 * count)
+            values = f.read(4 * count)
+            if len(name) < name_size or len(timestamps) < 8 * count or len(values) < 4 * count:
+                raise ValueError(f"bloque truncado en {path}")
+            yield (
+                name.decode("utf-8"),
+                np.frombuffer(timestamps, dtype="<f8").astype(np.float64),
+                np.frombuffer(values, dtype="<f4").astype(np.float64),
+            )
+
+
+def is_binary(path):
+    """
+    Indica si un fichero está en el formato binario columnar.
+
+    Args:
+        path (str): Fichero a comprobar
+
+    Returns:
+        bool: True si empieza por la marca del formato binario
+    """
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def import_chunks(store, chunks, sensor_ids=None, start=None, end=None):
+    """
+    Carga bloques de lecturas en un almacén.
+
+    Args:
+        store (MmapStore | SqliteStore): Almacén de destino
+        chunks (iterable): Bloques (sensor_id, timestamps, valores)
+        sensor_ids (iterable, optional): Solo importar estos sensores
+        start (float, optional): Descartar lecturas anteriores
+        end (float, optional): Descartar lecturas posteriores
+
+    Returns:
+        tuple: (lecturas importadas, lecturas omitidas)
+    """
+    wanted = frozenset(sensor_ids) if sensor_ids else None
+    loaded = skipped = 0
+    for sensor_id, timestamps, values in chunks:
+        if wanted is not None and sensor_id not in wanted:
+            skipped += len(timestamps)
+            continue
+        if start is not None or end is not None:
+            keep = np.ones(len(timestamps), dtype=bool)
+            if start is not None:
+                keep &= timestamps >= start
+            if end is not None:
+                keep &= timestamps <= end
+            timestamps, values = timestamps[keep], values[keep]
+            skipped += int(len(keep) - keep.sum())
+        written = store.load(sensor_id, timestamps, values)
+        loaded += written
+        skipped += len(timestamps) - written
+    return loaded, skipped
+
+
+def _parse_time(text):
+    """Convierte segundos epoch o una fecha ISO (hora local) en segundos epoch."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"instante no válido: {text}") from None
+
+
+def _open_store(backend, path):
+    """Abre el almacén del historial indicado."""
+    if backend == "sqlite":
+        return SqliteStore(path)
+    return MmapStore(path)
+
+
+def main():
+    """Exporta o importa el historial según los argumentos de la línea de órdenes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=("export", "import"), help="Operación")
+    parser.add_argument("file", help=f"Fichero CSV o binario ({BINARY_SUFFIX})")
+    parser.add_argument("--sensor", action="append", choices=tuple(SENSORS), help="Sensor a incluir (se puede repetir)")
+    parser.add_argument("--start", type=_parse_time, help="Inicio del rango (epoch o fecha ISO)")
+    parser.add_argument("--end", type=_parse_time, help="Fin del rango (epoch o fecha ISO)")
+    parser.add_argument("--format", choices=("csv", "binary"), help="Formato al exportar (por defecto según la extensión)")
+    parser.add_argument("--backend", choices=("mmap", "sqlite"), default=HISTORY_CONFIG["backend"], help="Almacén del historial")
+    parser.add_argument("--store", help="Directorio de segmentos o fichero SQLite (por defecto el de config)")
+    args = parser.parse_args()
+
+    store = _open_store(args.backend, args.store)
+    started = time.perf_counter()
+    try:
+        if args.command == "export":
+            binary = args.format == "binary" or (args.format is None and args.file.endswith(BINARY_SUFFIX))
+            chunks = iter_history(store, args.sensor, args.start, args.end)
+            count = write_binary(chunks, args.file) if binary else write_csv(chunks, args.file)
+            skipped = 0
+        else:
+            chunks = read_binary(args.file) if is_binary(args.file) else read_csv(args.file)
+            count, skipped = import_chunks(store, chunks, args.sensor, args.start, args.end)
+    finally:
+        store.close()
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    action = "exportadas" if args.command == "export" else "importadas"
+    print(f"{count} lecturas {action} en {elapsed:.2f} s ({rate:,.0f} lecturas/s)")
+    if skipped:
+        print(f"{skipped} lecturas omitidas (filtros o sensores desconocidos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""
+Historial persistente en ficheros mapeados en memoria.
+
+Cada sensor escribe un segmento por día (UTC) en
+<data_dir>/<sensor_id>/<AAAA-MM-DD>.seg. Un segmento es una cabecera fija
+seguida de registros de tamaño fijo (float64 timestamp + float32 valor,
+12 bytes), y solo se añade al final. El contador de registros de la
+cabecera solo se actualiza en flush() (cada HISTORY_CONFIG["flush_interval_s"]
+y al cerrar), después de forzar los datos a disco: el orden en que el
+sistema escribe las páginas de un mapa no está garantizado, así que un
+contador escrito junto a los datos podría llegar antes que ellos. Un corte
+de luz pierde como mucho los registros del último intervalo, nunca deja
+registros contados a medias. Las lecturas por rango ven lo contado.
+
+Un año a 1 Hz de los cinco sensores de config.SENSORS ocupa
+86400 * 365 * 5 * 12 bytes ≈ 1,9 GB. Los segmentos crecen por bloques y
+se recortan a su tamaño real al cerrarse, y los que superan
+HISTORY_CONFIG["retention_days"] se borran al abrir el almacén y al cambiar
+de día.
+
+Las escrituras se hacen desde el hilo despachador (extend() se registra con
+MQTTClient.add_sink()), un bloque por segmento y lote. Las lecturas por
+rango abren su propio mapa de solo lectura y copian solo el tramo pedido.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from config import SENSORS, HISTORY_CONFIG
+from utils.logger import setup_logger
+
+# Configurar logger para el almacén
+logger = setup_logger(__name__)
+
+SEGMENT_MAGIC = b"HSEG"
+SEGMENT_VERSION = 1
+SEGMENT_SUFFIX = ".seg"
+
+# Registro fijo: timestamp float64 + valor float32, sin relleno
+RECORD = np.dtype([("t", "<f8"), ("v", "<f4")])
+
+# Cabecera: magic, versión, tamaño de registro, indicadores, número de registros
+HEADER = struct.Struct("<4sHHIQ12x")
+COUNT_OFFSET = 12
+
+# Indicador: el segmento contiene registros fuera de orden (lecturas atrasadas)
+FLAG_UNSORTED = 0x1
+
+SECONDS_PER_DAY = 86400
+
+
+def segment_day(timestamp):
+    """
+    Devuelve el día (UTC) al que pertenece un instante.
+
+    Args:
+        timestamp (float): Instante en segundos epoch
+
+    Returns:
+        str: Día en formato AAAA-MM-DD
+    """
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class _Segment:
+    """Segmento abierto para escritura."""
+
+    def __init__(self, path, growth):
+        self.path = path
+        self.growth = growth
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        self._file = open(path, "r+b" if exists else "w+b")
+
+        if exists:
+            magic, version, record_size, self.flags, self.count = HEADER.unpack(
+                self._file.read(HEADER.size)
+            )
+            if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION or record_size != RECORD.itemsize:
+                self._file.close()
+                raise ValueError(f"segmento no válido: {path}")
+            # Registros escritos pero no contados antes de un corte: se
+            # descartan; un contador mayor que el fichero se recorta
+            self.capacity = (os.path.getsize(path) - HEADER.size) // RECORD.itemsize
+            self.count = min(self.count, self.capacity)
+            self.last_timestamp = self._read_last_timestamp()
+        else:
+            self.flags = 0
+            self.count = 0
+            self.capacity = 0
+            self.last_timestamp = float("-inf")
+            self._file.write(HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, RECORD.itemsize, 0, 0))
+            self._file.flush()
+
+        # Registros contados en la cabecera (ya en disco)
+        self.stored_count = self.count
+        self._map = None
+        self._resize(max(self.capacity, growth))
+
+    def _read_last_timestamp(self):
+        """Lee el timestamp del último registro contado."""
+        if not self.count:
+            return float("-inf")
+        self._file.seek(HEADER.size + (self.count - 1) * RECORD.itemsize)
+        return struct.unpack("<d", self._file.read(8))[0]
+
+    def _resize(self, capacity):
+        """Amplía el fichero y vuelve a mapearlo."""
+        if self._map is not None:
+            self._map.close()
+        self.capacity = capacity
+        self._file.truncate(HEADER.size + capacity * RECORD.itemsize)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def append(self, timestamps, values):
+        """
+        Añade un bloque de registros.
+
+        Args:
+            timestamps (list[float]): Instantes de las lecturas
+            values (list[float]): Valores de las lecturas
+        """
+        n = len(timestamps)
+        if self.count + n > self.capacity:
+            needed = self.count + n - self.capacity
+            self._resize(self.capacity + max(self.growth, needed))
+
+        records = np.empty(n, dtype=RECORD)
+        records["t"] = timestamps
+        records["v"] = values
+
+        start = HEADER.size + self.count * RECORD.itemsize
+        self._map[start:start + n * RECORD.itemsize] = records.tobytes()
+
+        first, last = records["t"][0], records["t"][-1]
+        if first < self.last_timestamp or (n > 1 and np.any(np.diff(records["t"]) < 0)):
+            if not self.flags & FLAG_UNSORTED:
+                self.flags |= FLAG_UNSORTED
+                self._map[8:12] = struct.pack("<I", self.flags)
+        if last > self.last_timestamp:
+            self.last_timestamp = float(last)
+
+        # El contador de la cabecera se actualiza en flush()
+        self.count += n
+
+    def flush(self):
+        """Fuerza los registros a disco y después cuenta los nuevos en la cabecera."""
+        self._map.flush()
+        if self.stored_count != self.count:
+            self._map[COUNT_OFFSET:COUNT_OFFSET + 8] = struct.pack("<Q", self.count)
+            self._map.flush(0, HEADER.size)
+            self.stored_count = self.count
+
+    def close(self):
+        """Escribe los datos, recorta el fichero a su tamaño real y lo cierra."""
+        self.flush()
+        self._map.close()
+        self._file.truncate(HEADER.size + self.count * RECORD.itemsize)
+        self._file.close()
+
+
+class MmapStore:
+    """Almacén de historial en segmentos diarios de solo añadir."""
+
+    def __init__(self, data_dir=None, sensor_ids=None, retention_days=None):
+        """
+        Inicializa el almacén.
+
+        Args:
+            data_dir (str, optional): Directorio de los segmentos (por defecto HISTORY_CONFIG["data_dir"])
+            sensor_ids (iterable, optional): Sensores (por defecto config.SENSORS)
+            retention_days (int, optional): Días que se conservan (por defecto HISTORY_CONFIG["retention_days"])
+        """
+        self.data_dir = data_dir or HISTORY_CONFIG["data_dir"]
+        self.sensor_ids = tuple(sensor_ids if sensor_ids is not None else SENSORS)
+        self.retention_days = retention_days or HISTORY_CONFIG["retention_days"]
+        self._growth = HISTORY_CONFIG["segment_growth_records"]
+        self._flush_interval = HISTORY_CONFIG["flush_interval_s"]
+
+        # Segmentos abiertos para escritura: (sensor_id, día) -> _Segment
+        self._segments = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.records_written = 0
+        self.batches_written = 0
+        self.segments_deleted = 0
+        self.write_errors = 0
+
+        for sensor_id in self.sensor_ids:
+            os.makedirs(self._sensor_dir(sensor_id), exist_ok=True)
+
+        # Retención también al abrir: un proceso que se reinicia cada día
+        # antes de medianoche nunca llega a cambiar de día
+        self._current_day = segment_day(time.time())
+        self._apply_retention()
+
+    def _sensor_dir(self, sensor_id):
+        return os.path.join(self.data_dir, sensor_id)
+
+    def _segment_path(self, sensor_id, day):
+        return os.path.join(self._sensor_dir(sensor_id), day + SEGMENT_SUFFIX)
+
+    def extend(self, readings):
+        """
+        Guarda un lote de lecturas, agrupadas en un bloque por segmento.
+
+        Args:
+            readings (iterable[Reading]): Lecturas a guardar
+        """
+        groups = {}
+        for reading in readings:
+            key = (reading.sensor_id, segment_day(reading.timestamp))
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = ([], [])
+            group[0].append(reading.timestamp)
+            group[1].append(reading.value)
+
+        if not groups:
+            return
+
+        with self._lock:
+            today = segment_day(time.time())
+            if today != self._current_day:
+                self._rotate(today)
+
+            for (sensor_id, day), (timestamps, values) in groups.items():
+                if sensor_id not in self.sensor_ids:
+                    continue
+                try:
+                    segment = self._segments.get((sensor_id, day))
+                    if segment is None:
+                        segment = _Segment(self._segment_path(sensor_id, day), self._growth)
+                        self._segments[(sensor_id, day)] = segment
+                    segment.append(timestamps, values)
+                except (OSError, ValueError) as e:
+                    self.write_errors += 1
+                    logger.error(f"No se pudo escribir el historial de {sensor_id} ({day}): {e}")
+                    continue
+                self.records_written += len(timestamps)
+            self.batches_written += 1
+
+            if time.monotonic() - self._last_flush >= self._flush_interval:
+                self.flush()
+
+    def load(self, sensor_id, timestamps, values):
+        """
+        Guarda un bloque de lecturas de un sensor (importación masiva).
+
+        A diferencia de extend(), recibe arrays y no objetos Reading, y
+        cierra los segmentos de días pasados que deja de usar, de modo que
+        importar meses de datos no acumula ficheros abiertos.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            timestamps (ndarray): Instantes de las lecturas
+            values (ndarray): Valores de las lecturas
+
+        Returns:
+            int: Registros guardados
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(timestamps) or sensor_id not in self.sensor_ids:
+            return 0
+
+        days = (timestamps // SECONDS_PER_DAY).astype(np.int64)
+        if np.any(np.diff(days) < 0):
+            order = np.argsort(days, kind="stable")
+            timestamps, values, days = timestamps[order], values[order], days[order]
+        # Un bloque por día: cortes donde cambia el día
+        bounds = [0, *(np.flatnonzero(np.diff(days)) + 1), len(days)]
+
+        written = 0
+        with self._lock:
+            today = segment_day(time.time())
+            if today != self._current_day:
+                self._rotate(today)
+
+            key = None
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                key = (sensor_id, segment_day(timestamps[lo]))
+                try:
+                    segment = self._segments.get(key)
+                    if segment is None:
+                        segment = _Segment(self._segment_path(*key), self._growth)
+                        self._segments[key] = segment
+                    segment.append(timestamps[lo:hi], values[lo:hi])
+                except (OSError, ValueError) as e:
+                    self.write_errors += 1
+                    logger.error(f"No se pudo importar el historial de {sensor_id} ({key[1]}): {e}")
+                    continue
+                written += int(hi - lo)
+            self.records_written += written
+            self.batches_written += 1
+
+            # Mantener abiertos solo los segmentos de hoy y el último usado
+            for old in [k for k in self._segments if k[1] != today and k != key]:
+                self._segments.pop(old).close()
+        return written
+
+    def _rotate(self, today):
+        """Cierra los segmentos de días anteriores y aplica la retención."""
+        for key in [key for key in self._segments if key[1] != today]:
+            self._segments.pop(key).close()
+        self._current_day = today
+        self._apply_retention()
+
+    def _apply_retention(self):
+        """Borra los segmentos más antiguos que retention_days."""
+        oldest = segment_day(time.time() - self.retention_days * SECONDS_PER_DAY)
+        for sensor_id in self.sensor_ids:
+            for name in os.listdir(self._sensor_dir(sensor_id)):
+                if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)] < oldest:
+                    try:
+                        os.remove(os.path.join(self._sensor_dir(sensor_id), name))
+                        self.segments_deleted += 1
+                    except OSError as e:
+                        logger.error(f"No se pudo borrar el segmento {name}: {e}")
+
+    def flush(self):
+        """Escribe a disco los segmentos abiertos."""
+        for segment in self._segments.values():
+            segment.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Cierra todos los segmentos abiertos."""
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+    def days(self, sensor_id):
+        """
+        Devuelve los días con datos de un sensor.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+
+        Returns:
+            list[str]: Días (AAAA-MM-DD) en orden cronológico
+        """
+        return sorted(
+            name[:-len(SEGMENT_SUFFIX)]
+            for name in os.listdir(self._sensor_dir(sensor_id))
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def read(self, sensor_id, start, end):
+        """
+        Lee las lecturas de un sensor en un rango de tiempo.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            start (float): Inicio del rango (incluido)
+            end (float): Fin del rango (incluido)
+
+        Returns:
+            tuple: (timestamps, valores) como arrays float64 ordenados por tiempo
+        """
+        first_day, last_day = segment_day(start), segment_day(end)
+        parts_t, parts_v = [], []
+        for day in self.days(sensor_id):
+            if first_day <= day <= last_day:
+                timestamps, values = self._read_segment(self._segment_path(sensor_id, day), start, end)
+                if len(timestamps):
+                    parts_t.append(timestamps)
+                    parts_v.append(values)
+
+        if not parts_t:
+            return np.empty(0), np.empty(0)
+        if len(parts_t) == 1:
+            return parts_t[0], parts_v[0]
+
+        timestamps, values = np.concatenate(parts_t), np.concatenate(parts_v)
+        order = np.argsort(timestamps, kind="stable")
+        return timestamps[order], values[order]
+
+    def iter_range(self, sensor_id, start, end, chunk_size=65536):
+        """
+        Recorre las lecturas de un sensor en un rango por bloques.
+
+        A diferencia de read(), nunca tiene en memoria más de un bloque (y,
+        en segmentos con lecturas atrasadas, el orden de un día), así que
+        sirve para exportar rangos de cualquier tamaño.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            start (float): Inicio del rango (incluido)
+            end (float): Fin del rango (incluido)
+            chunk_size (int, optional): Lecturas máximas por bloque
+
+        Yields:
+            tuple: (timestamps, valores) como arrays float64 ordenados por tiempo
+        """
+        first_day, last_day = segment_day(start), segment_day(end)
+        for day in self.days(sensor_id):
+            if not first_day <= day <= last_day:
+                continue
+            records, unsorted = self._map_segment(self._segment_path(sensor_id, day))
+            if records is None:
+                continue
+
+            order = None
+            if unsorted:
+                order = np.argsort(records["t"], kind="stable")
+                lo = np.searchsorted(records["t"][order], start, side="left")
+                hi = np.searchsorted(records["t"][order], end, side="right")
+            else:
+                lo = np.searchsorted(records["t"], start, side="left")
+                hi = np.searchsorted(records["t"], end, side="right")
+
+            for i in range(lo, hi, chunk_size):
+                j = min(hi, i + chunk_size)
+                block = records[order[i:j]] if order is not None else records[i:j]
+                yield block["t"].astype(np.float64), block["v"].astype(np.float64)
+            del records, order
+
+    def _map_segment(self, path):
+        """Mapea los registros contados de un segmento; (None, False) si está vacío o no es válido."""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None, False
+        magic, version, record_size, flags, count = HEADER.unpack(header)
+        count = min(count, (os.path.getsize(path) - HEADER.size) // RECORD.itemsize)
+        if magic != SEGMENT_MAGIC or record_size != RECORD.itemsize or count <= 0:
+            return None, False
+        # np.memmap se cierra al liberarse, así que puede seguir vivo entre yields
+        records = np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.size, shape=(count,))
+        return records, bool(flags & FLAG_UNSORTED)
+
+    def _read_segment(self, path, start, end):
+        """Lee un rango de un segmento con un mapa de solo lectura."""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return np.empty(0), np.empty(0)
+            magic, version, record_size, flags, count = HEADER.unpack(header)
+            if magic != SEGMENT_MAGIC or record_size != RECORD.itemsize or not count:
+                return np.empty(0), np.empty(0)
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                count = min(count, (len(mapped) - HEADER.size) // RECORD.itemsize)
+                records = np.frombuffer(mapped, dtype=RECORD, count=count, offset=HEADER.size)
+                if flags & FLAG_UNSORTED:
+                    records = records[np.argsort(records["t"], kind="stable")]
+                lo = np.searchsorted(records["t"], start, side="left")
+                hi = np.searchsorted(records["t"], end, side="right")
+                # Copiar solo el tramo pedido antes de cerrar el mapa
+                timestamps = records["t"][lo:hi].astype(np.float64)
+                values = records["v"][lo:hi].astype(np.float64)
+                del records
+        return timestamps, values
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del almacén.
+
+        Returns:
+            dict: Registros y lotes escritos, segmentos abiertos y borrados, errores
+        """
+        return {
+            "records_written": self.records_written,
+            "batches_written": self.batches_written,
+            "open_segments": len(self._segments),
+            "segments_deleted": self.segments_deleted,
+            "write_errors": self.write_errors,
+        }
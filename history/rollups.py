@@ -0,0 +1,305 @@
+"""
+Agregados incrementales del historial a varias resoluciones.
+
+Para cada sensor de config.SENSORS se mantienen niveles de agregación
+(por defecto 1 s, 1 min y 1 h) que se actualizan en O(1) con cada lectura.
+Cada cubeta guarda mínimo, máximo, suma, número de muestras, último valor y
+cuántas muestras quedaron fuera del rango [min_value, max_value] del sensor.
+
+Cada nivel es un buffer circular indexado por número de cubeta: la ranura
+de una lectura es (timestamp // resolución) % capacidad, así que las
+lecturas atrasadas caen en su cubeta sin reordenar nada mientras no sean
+más antiguas que el horizonte del nivel. Una vista de 24 horas o 30 días
+lee unos cientos de cubetas ya agregadas en lugar de millones de lecturas.
+
+Los datos se guardan en array('d') (escritura escalar barata) y las
+consultas los leen como arrays de NumPy sin copia. La persistencia es
+opcional: si HISTORY_CONFIG["rollup_path"] tiene valor, save() y load()
+guardan y recuperan todos los niveles en un fichero .npz.
+"""
+import os
+import threading
+from array import array
+
+import numpy as np
+
+from config import SENSORS, HISTORY_CONFIG
+from utils.logger import setup_logger
+
+# Configurar logger de los agregados
+logger = setup_logger(__name__)
+
+# Campos de cada cubeta, en el orden en que se guardan
+FIELDS = ("bucket", "min", "max", "sum", "count", "last", "last_ts", "out_of_range")
+
+
+class RollupTier:
+    """Un nivel de agregación de un sensor."""
+
+    def __init__(self, resolution, capacity, min_value, max_value):
+        """
+        Inicializa el nivel.
+
+        Args:
+            resolution (float): Duración de cada cubeta en segundos
+            capacity (int): Número de cubetas guardadas (horizonte = resolución * capacidad)
+            min_value (float): Límite inferior del rango del sensor
+            max_value (float): Límite superior del rango del sensor
+        """
+        self.resolution = resolution
+        self.capacity = capacity
+        self.min_value = min_value
+        self.max_value = max_value
+        zeros = bytes(array("d").itemsize * capacity)
+        self._data = {field: array("d", zeros) for field in FIELDS}
+        # Número de cubeta de cada ranura (-1: vacía)
+        self._data["bucket"] = array("d", [-1.0]) * capacity
+        self.newest_bucket = -1
+        self.too_old = 0
+
+    def add(self, timestamp, value):
+        """
+        Añade una lectura a su cubeta.
+
+        Args:
+            timestamp (float): Instante de la medida
+            value (float): Valor medido
+        """
+        bucket = int(timestamp // self.resolution)
+        if bucket <= self.newest_bucket - self.capacity:
+            # Más antigua que el horizonte del nivel
+            self.too_old += 1
+            return
+        if bucket > self.newest_bucket:
+            self.newest_bucket = bucket
+
+        data = self._data
+        slot = bucket % self.capacity
+        if data["bucket"][slot] != bucket:
+            # La ranura pertenecía a una cubeta antigua: reiniciarla
+            data["bucket"][slot] = bucket
+            data["min"][slot] = value
+            data["max"][slot] = value
+            data["sum"][slot] = value
+            data["count"][slot] = 1
+            data["last"][slot] = value
+            data["last_ts"][slot] = timestamp
+            data["out_of_range"][slot] = not (self.min_value <= value <= self.max_value)
+            return
+
+        if value < data["min"][slot]:
+            data["min"][slot] = value
+        if value > data["max"][slot]:
+            data["max"][slot] = value
+        data["sum"][slot] += value
+        data["count"][slot] += 1
+        if timestamp >= data["last_ts"][slot]:
+            data["last"][slot] = value
+            data["last_ts"][slot] = timestamp
+        if not (self.min_value <= value <= self.max_value):
+            data["out_of_range"][slot] += 1
+
+    def query(self, start, end):
+        """
+        Devuelve las cubetas que se solapan con [start, end].
+
+        Args:
+            start (float): Inicio del rango
+            end (float): Fin del rango
+
+        Returns:
+            dict: Arrays "start", "min", "max", "mean", "count", "last" y
+                "out_of_range", ordenados por tiempo
+        """
+        views = {field: np.frombuffer(self._data[field], dtype=np.float64) for field in FIELDS}
+        starts = views["bucket"] * self.resolution
+        mask = (views["bucket"] >= 0) & (starts + self.resolution > start) & (starts <= end)
+        order = np.argsort(starts[mask], kind="stable")
+
+        count = views["count"][mask][order]
+        return {
+            "start": starts[mask][order],
+            "min": views["min"][mask][order],
+            "max": views["max"][mask][order],
+            "mean": views["sum"][mask][order] / count,
+            "count": count,
+            "last": views["last"][mask][order],
+            "out_of_range": views["out_of_range"][mask][order],
+        }
+
+    def export(self):
+        """Devuelve una copia de los campos para guardarla."""
+        return {field: np.frombuffer(self._data[field], dtype=np.float64).copy() for field in FIELDS}
+
+    def restore(self, fields):
+        """
+        Recupera los campos guardados con export().
+
+        Args:
+            fields (dict): Array por campo, de la misma capacidad
+        """
+        for field in FIELDS:
+            self._data[field] = array("d", np.asarray(fields[field], dtype=np.float64).tobytes())
+        self.newest_bucket = int(max(self._data["bucket"]))
+
+
+class RollupStore:
+    """Niveles de agregación de todos los sensores."""
+
+    def __init__(self, path=None, tiers=None, sensors=None):
+        """
+        Inicializa los agregados.
+
+        Args:
+            path (str, optional): Fichero .npz para save()/load(); None desactiva la persistencia
+            tiers (dict, optional): Nombre -> (resolución s, cubetas) (por defecto HISTORY_CONFIG["rollup_tiers"])
+            sensors (dict, optional): Configuración de los sensores (por defecto config.SENSORS)
+        """
+        self.path = path
+        self.tiers = dict(tiers or HISTORY_CONFIG["rollup_tiers"])
+        sensors = sensors if sensors is not None else SENSORS
+        self._tiers = {
+            sensor_id: {
+                name: RollupTier(resolution, capacity, info["min_value"], info["max_value"])
+                for name, (resolution, capacity) in self.tiers.items()
+            }
+            for sensor_id, info in sensors.items()
+        }
+        self._lock = threading.Lock()
+        self.added = 0
+        self.unknown_sensor = 0
+
+    def extend(self, readings):
+        """
+        Añade un lote de lecturas a todos los niveles.
+
+        Args:
+            readings (iterable[Reading]): Lecturas, en cualquier orden
+        """
+        tiers_by_sensor = self._tiers
+        with self._lock:
+            for reading in readings:
+                tiers = tiers_by_sensor.get(reading.sensor_id)
+                if tiers is None:
+                    self.unknown_sensor += 1
+                    continue
+                for tier in tiers.values():
+                    tier.add(reading.timestamp, reading.value)
+                self.added += 1
+
+    def query(self, sensor_id, tier, start, end):
+        """
+        Devuelve las cubetas de un nivel en un rango de tiempo.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            tier (str): Nombre del nivel, p. ej. "1m"
+            start (float): Inicio del rango
+            end (float): Fin del rango
+
+        Returns:
+            dict: Arrays por campo (ver RollupTier.query)
+
+        Raises:
+            KeyError: Si el sensor o el nivel no existen
+        """
+        with self._lock:
+            return self._tiers[sensor_id][tier].query(start, end)
+
+    def best_tier(self, start, end, max_points):
+        """
+        Elige el nivel más fino que cubre el rango sin superar max_points cubetas.
+
+        Args:
+            start (float): Inicio del rango
+            end (float): Fin del rango
+            max_points (int): Número máximo de cubetas deseado
+
+        Returns:
+            str: Nombre del nivel (el más grueso si ninguno cumple)
+        """
+        span = max(0.0, end - start)
+        ordered = sorted(self.tiers.items(), key=lambda item: item[1][0])
+        for name, (resolution, capacity) in ordered:
+            # El nivel debe cubrir el rango y no dar más puntos de los pedidos
+            if span <= resolution * capacity and span / resolution <= max_points:
+                return name
+        return ordered[-1][0]
+
+    def query_range(self, sensor_id, start, end, max_points=300):
+        """
+        Consulta un rango con el nivel adecuado para dibujarlo.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            start (float): Inicio del rango
+            end (float): Fin del rango
+            max_points (int, optional): Número máximo de cubetas deseado
+
+        Returns:
+            tuple: (nombre del nivel, dict de arrays por campo)
+        """
+        tier = self.best_tier(start, end, max_points)
+        return tier, self.query(sensor_id, tier, start, end)
+
+    def save(self):
+        """Guarda todos los niveles en el fichero configurado (si lo hay)."""
+        if not self.path:
+            return
+
+        arrays = {}
+        with self._lock:
+            for sensor_id, tiers in self._tiers.items():
+                for name, tier in tiers.items():
+                    for field, values in tier.export().items():
+                        arrays[f"{sensor_id}/{name}/{field}"] = values
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Escribir aparte y renombrar: un corte no deja el fichero a medias
+        temporary = self.path + ".tmp.npz"
+        np.savez(temporary, **arrays)
+        os.replace(temporary, self.path)
+
+    def load(self):
+        """
+        Recupera los niveles guardados (si el fichero existe).
+
+        Los niveles cuya resolución o capacidad cambió se ignoran.
+
+        Returns:
+            bool: True si se cargó el fichero
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+
+        try:
+            with np.load(self.path) as saved:
+                with self._lock:
+                    for sensor_id, tiers in self._tiers.items():
+                        for name, tier in tiers.items():
+                            keys = [f"{sensor_id}/{name}/{field}" for field in FIELDS]
+                            if all(key in saved and len(saved[key]) == tier.capacity for key in keys):
+                                tier.restore({field: saved[key] for field, key in zip(FIELDS, keys)})
+        except (OSError, ValueError) as e:
+            logger.error(f"No se pudieron cargar los agregados de {self.path}: {e}")
+            return False
+        return True
+
+    def get_stats(self):
+        """
+        Devuelve los contadores de los agregados.
+
+        Returns:
+            dict: Lecturas añadidas, de sensores desconocidos y demasiado antiguas por nivel
+        """
+        too_old = {name: 0 for name in self.tiers}
+        for tiers in self._tiers.values():
+            for name, tier in tiers.items():
+                too_old[name] += tier.too_old
+        return {
+            "added": self.added,
+            "unknown_sensor": self.unknown_sensor,
+            "too_old": too_old,
+        }
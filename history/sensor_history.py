@@ -0,0 +1,302 @@
+"""
+Historial reciente de los sensores en memoria.
+
+Cada sensor guarda sus últimas lecturas en un buffer circular de capacidad
+fija respaldado por arrays de NumPy (float64). Cada muestra se escribe dos
+veces, en la posición i y en i + capacidad, de modo que las últimas N
+muestras siempre ocupan un tramo contiguo: las ventanas se devuelven como
+vistas sin copia y los mínimos, máximos y medias se calculan vectorizados.
+
+Las lecturas llegan ordenadas por tiempo; las que son más antiguas que la
+última guardada (p. ej. lecturas atrasadas tras una reconexión) no caben en
+el buffer circular y se cuentan como fuera de orden.
+"""
+import threading
+import time
+
+import numpy as np
+
+from config import SENSORS, HISTORY_CONFIG
+
+
+class SensorSeries:
+    """Buffer circular de (timestamp, valor) de un sensor."""
+
+    def __init__(self, capacity):
+        """
+        Inicializa la serie.
+
+        Args:
+            capacity (int): Número máximo de muestras guardadas
+        """
+        self.capacity = max(1, int(capacity))
+        self._timestamps = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._values = np.zeros(2 * self.capacity, dtype=np.float64)
+        # Posición de la siguiente escritura (0..capacity-1) y muestras guardadas
+        self._head = 0
+        self._count = 0
+        self.appended = 0
+        self.out_of_order = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, value):
+        """
+        Añade una muestra en O(1).
+
+        Args:
+            timestamp (float): Instante de la medida
+            value (float): Valor medido
+
+        Returns:
+            bool: False si la muestra es anterior a la última y se descarta
+        """
+        head = self._head
+        if self._count and timestamp < self._timestamps[head + self.capacity - 1]:
+            self.out_of_order += 1
+            return False
+
+        # Doble escritura: el tramo [head+1, head+1+capacity) contiene siempre la serie completa
+        self._timestamps[head] = timestamp
+        self._timestamps[head + self.capacity] = timestamp
+        self._values[head] = value
+        self._values[head + self.capacity] = value
+
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+        self.appended += 1
+        return True
+
+    def _span(self, n):
+        """Límites [inicio, fin) de las últimas n muestras en los arrays dobles."""
+        end = self._head + self.capacity
+        return end - n, end
+
+    def last(self):
+        """
+        Devuelve la muestra más reciente.
+
+        Returns:
+            tuple | None: (timestamp, valor) o None si la serie está vacía
+        """
+        if not self._count:
+            return None
+        i = self._head + self.capacity - 1
+        return float(self._timestamps[i]), float(self._values[i])
+
+    def last_n(self, n):
+        """
+        Devuelve las últimas n muestras sin copiarlas.
+
+        Args:
+            n (int): Número de muestras
+
+        Returns:
+            tuple: (timestamps, valores) como vistas de NumPy, de la más antigua a la más reciente
+        """
+        start, end = self._span(min(max(0, n), self._count))
+        return self._timestamps[start:end], self._values[start:end]
+
+    def window(self, seconds, now=None):
+        """
+        Devuelve las muestras de los últimos segundos sin copiarlas.
+
+        Args:
+            seconds (float): Duración de la ventana
+            now (float, optional): Final de la ventana (por defecto time.time())
+
+        Returns:
+            tuple: (timestamps, valores) como vistas de NumPy
+        """
+        if now is None:
+            now = time.time()
+        timestamps, values = self.last_n(self._count)
+        start = np.searchsorted(timestamps, now - seconds, side="left")
+        end = np.searchsorted(timestamps, now, side="right")
+        return timestamps[start:end], values[start:end]
+
+    def stats(self, seconds, now=None):
+        """
+        Calcula el mínimo, el máximo y la media de los últimos segundos.
+
+        Args:
+            seconds (float): Duración de la ventana
+            now (float, optional): Final de la ventana (por defecto time.time())
+
+        Returns:
+            dict | None: Mínimo, máximo, media y número de muestras, o None si no hay
+        """
+        _, values = self.window(seconds, now)
+        if not len(values):
+            return None
+        return {
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "count": int(len(values)),
+        }
+
+
+class SensorHistory:
+    """
+    Historial reciente de todos los sensores.
+
+    extend() se puede registrar como consumidor de MQTTClient.add_sink(): se
+    llama desde el hilo despachador mientras la interfaz lee desde el hilo
+    de Qt, por eso todas las operaciones se hacen bajo un cerrojo. Las vistas
+    devueltas siguen apuntando al buffer: si se van a conservar más allá del
+    frame actual, hay que copiarlas.
+    """
+
+    def __init__(self, sensor_ids=None, capacity=None):
+        """
+        Inicializa el historial.
+
+        Args:
+            sensor_ids (iterable, optional): Sensores (por defecto config.SENSORS)
+            capacity (int, optional): Muestras por sensor (por defecto HISTORY_CONFIG["ring_capacity"])
+        """
+        ids = sensor_ids if sensor_ids is not None else SENSORS
+        capacity = capacity or HISTORY_CONFIG["ring_capacity"]
+        self._series = {sensor_id: SensorSeries(capacity) for sensor_id in ids}
+        self._lock = threading.Lock()
+        self.unknown_sensor = 0
+
+    def append(self, reading):
+        """
+        Añade una lectura.
+
+        Args:
+            reading (Reading): Lectura de un sensor
+        """
+        self.extend((reading,))
+
+    def extend(self, readings):
+        """
+        Añade un lote de lecturas.
+
+        Args:
+            readings (iterable[Reading]): Lecturas, en orden de llegada
+        """
+        series = self._series
+        with self._lock:
+            for reading in readings:
+                target = series.get(reading.sensor_id)
+                if target is None:
+                    self.unknown_sensor += 1
+                    continue
+                target.append(reading.timestamp, reading.value)
+
+    def series(self, sensor_id):
+        """
+        Devuelve la serie de un sensor.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+
+        Returns:
+            SensorSeries: Serie del sensor
+
+        Raises:
+            KeyError: Si el sensor no existe
+        """
+        return self._series[sensor_id]
+
+    def last_value(self, sensor_id, default=None):
+        """
+        Devuelve el último valor de un sensor.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            default (float, optional): Valor si todavía no hay muestras
+
+        Returns:
+            float: Último valor o default
+        """
+        with self._lock:
+            last = self._series[sensor_id].last()
+        return default if last is None else last[1]
+
+    def window(self, sensor_id, seconds, now=None):
+        """
+        Devuelve las muestras de un sensor en los últimos segundos (sin copia).
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            seconds (float): Duración de la ventana
+            now (float, optional): Final de la ventana (por defecto time.time())
+
+        Returns:
+            tuple: (timestamps, valores) como vistas de NumPy
+        """
+        with self._lock:
+            return self._series[sensor_id].window(seconds, now)
+
+    def snapshot(self, sensor_id, seconds, now=None):
+        """
+        Copia las muestras de un sensor en los últimos segundos.
+
+        A diferencia de window(), la copia se hace dentro del cerrojo, así
+        que sirve a los hilos que la conservan mientras el despachador escribe.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            seconds (float): Duración de la ventana
+            now (float, optional): Final de la ventana (por defecto time.time())
+
+        Returns:
+            tuple: (timestamps, valores, muestras añadidas hasta la copia)
+        """
+        with self._lock:
+            series = self._series[sensor_id]
+            timestamps, values = series.window(seconds, now)
+            return timestamps.copy(), values.copy(), series.appended
+
+    def appended(self, sensor_id):
+        """
+        Devuelve cuántas muestras se han añadido a un sensor (cambia con cada muestra nueva).
+
+        Args:
+            sensor_id (str): Identificador del sensor
+
+        Returns:
+            int: Muestras añadidas desde el inicio
+        """
+        with self._lock:
+            return self._series[sensor_id].appended
+
+    def stats(self, sensor_id, seconds, now=None):
+        """
+        Calcula el mínimo, el máximo y la media de un sensor en los últimos segundos.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            seconds (float): Duración de la ventana
+            now (float, optional): Final de la ventana (por defecto time.time())
+
+        Returns:
+            dict | None: Mínimo, máximo, media y número de muestras, o None si no hay
+        """
+        with self._lock:
+            return self._series[sensor_id].stats(seconds, now)
+
+    def get_stats(self):
+        """
+        Devuelve la ocupación del historial.
+
+        Returns:
+            dict: Por sensor, muestras guardadas, añadidas y fuera de orden
+        """
+        result = {
+            sensor_id: {
+                "stored": len(series),
+                "capacity": series.capacity,
+                "appended": series.appended,
+                "out_of_order": series.out_of_order,
+            }
+            for sensor_id, series in self._series.items()
+        }
+        result["unknown_sensor"] = self.unknown_sensor
+        return result
@@ -0,0 +1,344 @@
+"""
+Historial persistente en SQLite.
+
+Alternativa a history.mmap_store cuando se prefiere una base de datos. La
+base trabaja en modo WAL (los lectores no bloquean al escritor) y solo la
+toca un hilo escritor propio:
+
+- extend() (registrado con MQTTClient.add_sink()) solo añade las lecturas a
+  una lista pendiente; no hace E/S en el hilo despachador.
+- El hilo escritor las inserta con executemany en lotes, cuando se alcanza
+  HISTORY_CONFIG["sqlite_batch_size"] filas o pasa
+  HISTORY_CONFIG["sqlite_flush_interval_s"] desde el último lote.
+- La retención borra las filas antiguas en tandas pequeñas entre lotes, de
+  modo que ningún borrado bloquea la base mucho tiempo.
+
+El hilo de Qt nunca abre la base: las consultas por rango se hacen desde
+otros hilos, cada uno con su propia conexión de lectura, que close() cierra
+junto con la del escritor.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from itertools import repeat
+
+import numpy as np
+
+from config import SENSORS, HISTORY_CONFIG
+from utils.logger import setup_logger
+
+# Configurar logger para el almacén
+logger = setup_logger(__name__)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS readings (sensor_id TEXT NOT NULL, ts REAL NOT NULL, value REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS readings_sensor_ts ON readings (sensor_id, ts)",
+    "CREATE INDEX IF NOT EXISTS readings_ts ON readings (ts)",
+)
+
+INSERT = "INSERT INTO readings (sensor_id, ts, value) VALUES (?, ?, ?)"
+
+DELETE_OLD = (
+    "DELETE FROM readings WHERE rowid IN "
+    "(SELECT rowid FROM readings WHERE ts < ? ORDER BY ts LIMIT ?)"
+)
+
+SELECT_RANGE = "SELECT ts, value FROM readings WHERE sensor_id = ? AND ts BETWEEN ? AND ? ORDER BY ts"
+
+# Duraciones de lote conservadas para los percentiles
+LATENCY_SAMPLES = 4096
+
+
+def _connect(path):
+    """Abre una conexión con los parámetros comunes."""
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # En WAL, NORMAL solo sincroniza en los checkpoints
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class SqliteStore:
+    """Almacén de historial en SQLite con escritura por lotes en segundo plano."""
+
+    def __init__(self, path=None, sensor_ids=None, retention_days=None):
+        """
+        Inicializa el almacén y arranca el hilo escritor.
+
+        Args:
+            path (str, optional): Fichero de la base (por defecto HISTORY_CONFIG["sqlite_path"])
+            sensor_ids (iterable, optional): Sensores (por defecto config.SENSORS)
+            retention_days (int, optional): Días que se conservan (por defecto HISTORY_CONFIG["retention_days"])
+        """
+        self.path = path or HISTORY_CONFIG["sqlite_path"]
+        self.sensor_ids = frozenset(sensor_ids if sensor_ids is not None else SENSORS)
+        self.retention_days = retention_days or HISTORY_CONFIG["retention_days"]
+        self.batch_size = HISTORY_CONFIG["sqlite_batch_size"]
+        self.flush_interval = HISTORY_CONFIG["sqlite_flush_interval_s"]
+        self.max_pending = HISTORY_CONFIG["sqlite_max_pending"]
+        self.retention_chunk = HISTORY_CONFIG["sqlite_retention_chunk"]
+        self.retention_interval = HISTORY_CONFIG["sqlite_retention_interval_s"]
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = _connect(self.path)
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+        # Lecturas pendientes de insertar, compartidas con el hilo despachador
+        self._pending = []
+        self._condition = threading.Condition()
+        self._stop = False
+        self._busy = False
+        self._readers = threading.local()
+        # Conexiones de los hilos lectores, para cerrarlas en close()
+        self._reader_connections = []
+        self._readers_lock = threading.Lock()
+
+        # Contadores
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.rows_deleted = 0
+        self.rows_loaded = 0
+        self.batches_written = 0
+        self.write_errors = 0
+        self._batch_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._next_retention = 0.0
+
+        self._thread = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def extend(self, readings):
+        """
+        Encola un lote de lecturas para el hilo escritor.
+
+        Si la cola supera sqlite_max_pending filas (la base no da abasto),
+        se descartan las nuevas y se cuentan.
+
+        Args:
+            readings (iterable[Reading]): Lecturas a guardar
+        """
+        sensor_ids = self.sensor_ids
+        rows = [
+            (reading.sensor_id, reading.timestamp, reading.value)
+            for reading in readings
+            if reading.sensor_id in sensor_ids
+        ]
+        if not rows:
+            return
+
+        with self._condition:
+            room = self.max_pending - len(self._pending)
+            if room < len(rows):
+                self.rows_dropped += len(rows) - max(0, room)
+                rows = rows[:max(0, room)]
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _writer_loop(self):
+        """Inserta los lotes pendientes y aplica la retención."""
+        while True:
+            with self._condition:
+                if not self._stop and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                rows = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                self._busy = bool(rows)
+                stop = self._stop and not self._pending
+
+            if rows:
+                self._write_batch(rows)
+            if time.monotonic() >= self._next_retention:
+                self._apply_retention()
+
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+            if stop:
+                break
+
+        self._connection.close()
+
+    def _write_batch(self, rows):
+        """Inserta un lote en una única transacción."""
+        start = time.perf_counter()
+        try:
+            with self._connection:
+                self._connection.executemany(INSERT, rows)
+        except sqlite3.Error as e:
+            self.write_errors += 1
+            logger.error(f"No se pudo escribir un lote de {len(rows)} lecturas: {e}")
+            return
+
+        self._batch_ms.append((time.perf_counter() - start) * 1000.0)
+        self.rows_written += len(rows)
+        self.batches_written += 1
+
+    def _apply_retention(self):
+        """Borra una tanda de filas antiguas; si quedan más, sigue en la siguiente vuelta."""
+        cutoff = time.time() - self.retention_days * 86400
+        try:
+            with self._connection:
+                deleted = self._connection.execute(DELETE_OLD, (cutoff, self.retention_chunk)).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error en la retención del historial: {e}")
+            deleted = 0
+
+        self.rows_deleted += deleted
+        if deleted < self.retention_chunk:
+            # No quedan filas antiguas: volver a mirar más tarde
+            self._next_retention = time.monotonic() + self.retention_interval
+
+    def flush(self, timeout=None):
+        """
+        Espera a que el hilo escritor inserte todo lo pendiente.
+
+        Args:
+            timeout (float, optional): Espera máxima en segundos
+
+        Returns:
+            bool: True si no quedan lecturas pendientes
+        """
+        with self._condition:
+            # Despertar al escritor aunque el lote no esté completo
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._busy, timeout
+            )
+
+    def close(self):
+        """Inserta lo pendiente, detiene el hilo escritor y cierra las conexiones de lectura."""
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        self._thread.join()
+
+        with self._readers_lock:
+            for connection in self._reader_connections:
+                connection.close()
+            self._reader_connections.clear()
+
+    def load(self, sensor_id, timestamps, values):
+        """
+        Inserta un bloque de lecturas de un sensor (importación masiva).
+
+        No pasa por la cola del hilo escritor (no hay límite de pendientes
+        ni descartes): el bloque entero se inserta en una transacción con la
+        conexión propia del hilo que llama. No debe llamarse desde el hilo de Qt.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            timestamps (ndarray): Instantes de las lecturas
+            values (ndarray): Valores de las lecturas
+
+        Returns:
+            int: Filas insertadas
+        """
+        if sensor_id not in self.sensor_ids or not len(timestamps):
+            return 0
+
+        rows = zip(repeat(sensor_id), np.asarray(timestamps).tolist(), np.asarray(values).tolist())
+        try:
+            connection = self._thread_connection()
+            with connection:
+                connection.executemany(INSERT, rows)
+        except sqlite3.Error as e:
+            self.write_errors += 1
+            logger.error(f"No se pudo importar un bloque de {len(timestamps)} lecturas de {sensor_id}: {e}")
+            return 0
+
+        self.rows_loaded += len(timestamps)
+        return len(timestamps)
+
+    def _thread_connection(self):
+        """Devuelve la conexión propia del hilo que llama (la crea la primera vez)."""
+        connection = getattr(self._readers, "connection", None)
+        if connection is None:
+            connection = self._readers.connection = _connect(self.path)
+            with self._readers_lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    def read(self, sensor_id, start, end):
+        """
+        Lee las lecturas de un sensor en un rango de tiempo.
+
+        No debe llamarse desde el hilo de Qt. Cada hilo usa su propia
+        conexión de lectura, que en modo WAL no bloquea al escritor.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            start (float): Inicio del rango (incluido)
+            end (float): Fin del rango (incluido)
+
+        Returns:
+            tuple: (timestamps, valores) como arrays float64 ordenados por tiempo
+        """
+        rows = self._thread_connection().execute(SELECT_RANGE, (sensor_id, start, end)).fetchall()
+        if not rows:
+            return np.empty(0), np.empty(0)
+        data = np.array(rows, dtype=np.float64)
+        return data[:, 0], data[:, 1]
+
+    def iter_range(self, sensor_id, start, end, chunk_size=65536):
+        """
+        Recorre las lecturas de un sensor en un rango por bloques.
+
+        A diferencia de read(), nunca tiene en memoria más de un bloque, así
+        que sirve para exportar rangos de cualquier tamaño. No debe llamarse
+        desde el hilo de Qt.
+
+        Args:
+            sensor_id (str): Identificador del sensor
+            start (float): Inicio del rango (incluido)
+            end (float): Fin del rango (incluido)
+            chunk_size (int, optional): Lecturas máximas por bloque
+
+        Yields:
+            tuple: (timestamps, valores) como arrays float64 ordenados por tiempo
+        """
+        cursor = self._thread_connection().execute(SELECT_RANGE, (sensor_id, start, end))
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                data = np.array(rows, dtype=np.float64)
+                yield data[:, 0], data[:, 1]
+        finally:
+            cursor.close()
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del almacén.
+
+        Returns:
+            dict: Filas escritas, descartadas, borradas e importadas, lotes y su duración (ms)
+        """
+        durations = sorted(self._batch_ms)
+        stats = {
+            "pending": len(self),
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "rows_deleted": self.rows_deleted,
+            "rows_loaded": self.rows_loaded,
+            "batches_written": self.batches_written,
+            "write_errors": self.write_errors,
+        }
+        if durations:
+            stats["batch_ms"] = {
+                "p50": round(durations[len(durations) // 2], 3),
+                "p99": round(durations[min(len(durations) - 1, int(len(durations) * 0.99))], 3),
+                "max": round(durations[-1], 3),
+            }
+        return stats
@@ -0,0 +1,145 @@
+"""
+Contrapresión entre la ingesta y la interfaz.
+
+Si el bucle de eventos de Qt se detiene (un diálogo modal, un repintado
+lento), las lecturas no deben acumularse sin límite en su cola de eventos.
+El despachador solo emite un lote cuando la interfaz ha consumido el
+anterior; mientras tanto las lecturas esperan en un UIBuffer, que aplica
+una de estas políticas con un límite de memoria fijo:
+
+- "drop_oldest": conserva las lecturas más recientes y descarta las antiguas.
+- "drop_newest": conserva las lecturas pendientes y rechaza las nuevas.
+- "coalesce": conserva solo la última lectura de cada sensor.
+
+Esto afecta solo a lo que ve la interfaz: el historial y las alertas
+reciben todas las lecturas antes de pasar por el buffer.
+"""
+import sys
+import threading
+from collections import deque
+
+from ingestion.reading import Reading
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+COALESCE = "coalesce"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+# Memoria estimada por lectura pendiente: la tupla, sus tres floats y la referencia
+READING_COST = sys.getsizeof(Reading("", 0.0, 0.0, 0.0)) + 3 * sys.getsizeof(0.0) + 8
+
+
+class UIBuffer:
+    """Lecturas pendientes de entregar a la interfaz, acotadas en memoria."""
+
+    def __init__(self, policy=COALESCE, capacity_bytes=262144):
+        """
+        Inicializa el buffer.
+
+        Args:
+            policy (str, optional): "drop_oldest", "drop_newest" o "coalesce"
+            capacity_bytes (int, optional): Memoria máxima de las lecturas pendientes
+
+        Raises:
+            ValueError: Si la política no existe
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"política de contrapresión desconocida: '{policy}'")
+
+        self.policy = policy
+        self.capacity = max(1, capacity_bytes // READING_COST)
+        self._lock = threading.Lock()
+
+        if policy == DROP_OLDEST:
+            self._pending = deque(maxlen=self.capacity)
+        elif policy == DROP_NEWEST:
+            self._pending = []
+        else:
+            self._pending = {}
+
+        # Contadores
+        self.accepted = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.max_pending = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, readings):
+        """
+        Añade lecturas aplicando la política.
+
+        Args:
+            readings (list[Reading]): Lecturas recibidas
+        """
+        with self._lock:
+            pending = self._pending
+            before = len(pending)
+
+            if self.policy == DROP_OLDEST:
+                # deque con maxlen: las más antiguas salen solas
+                pending.extend(readings)
+                self.dropped_oldest += max(0, before + len(readings) - self.capacity)
+                self.accepted += len(readings)
+            elif self.policy == DROP_NEWEST:
+                room = self.capacity - before
+                if room < len(readings):
+                    self.dropped_newest += len(readings) - max(0, room)
+                    readings = readings[:max(0, room)]
+                pending.extend(readings)
+                self.accepted += len(readings)
+            else:
+                for reading in readings:
+                    sensor_id = reading.sensor_id
+                    if sensor_id in pending:
+                        self.coalesced += 1
+                    elif len(pending) >= self.capacity:
+                        self.dropped_newest += 1
+                        continue
+                    pending[sensor_id] = reading
+                    self.accepted += 1
+
+            if len(pending) > self.max_pending:
+                self.max_pending = len(pending)
+
+    def take(self):
+        """
+        Extrae todas las lecturas pendientes.
+
+        Returns:
+            list[Reading]: Lecturas pendientes (vacía si no hay ninguna)
+        """
+        with self._lock:
+            if not self._pending:
+                return []
+
+            if self.policy == COALESCE:
+                readings = list(self._pending.values())
+            else:
+                readings = list(self._pending)
+            self._pending.clear()
+            self.delivered += len(readings)
+        return readings
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del buffer.
+
+        Returns:
+            dict: Política, ocupación, capacidad y lecturas descartadas o agrupadas
+        """
+        return {
+            "policy": self.policy,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "capacity": self.capacity,
+            "capacity_bytes": self.capacity * READING_COST,
+            "accepted": self.accepted,
+            "delivered": self.delivered,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,122 @@
+"""
+Buzón de último valor por sensor entre la ingesta y los widgets.
+
+Los sensores pueden publicar a 10-50 Hz, pero la interfaz solo necesita la
+lectura más reciente de cada uno por frame. El buzón guarda una única
+lectura por sensor ("la última escritura gana") y la interfaz lo vacía una
+vez por frame, de modo que el trabajo de la UI depende de la frecuencia de
+refresco y no de la frecuencia de mensajes. Con on_post, el buzón avisa
+cuando pasa de vacío a tener lecturas: el frame que lo vacía puede
+dormirse mientras no llegue nada.
+"""
+import threading
+
+from config import SENSORS
+
+
+class SensorMailbox:
+    """
+    Buzón seguro entre hilos con una ranura por sensor.
+
+    Cualquier hilo puede depositar lecturas; el hilo de Qt las recoge con
+    drain(). Cada lectura que sustituye a otra aún no recogida se cuenta
+    como descartada (superseded).
+    """
+
+    def __init__(self, sensor_ids=None, on_post=None):
+        """
+        Inicializa el buzón.
+
+        Args:
+            sensor_ids (iterable, optional): Sensores admitidos (por defecto
+                las claves de config.SENSORS)
+            on_post (callable, optional): Función on_post() que se llama, en el
+                hilo que deposita, cuando el buzón vacío recibe lecturas
+        """
+        self.sensor_ids = tuple(sensor_ids if sensor_ids is not None else SENSORS)
+        self.on_post = on_post
+        self._lock = threading.Lock()
+        self._slots = {}
+
+        # Contadores
+        self._posted = 0
+        self._unknown = 0
+        self._drains = 0
+        self._delivered = 0
+        self._superseded = dict.fromkeys(self.sensor_ids, 0)
+
+    def post(self, reading):
+        """
+        Deposita una lectura, sustituyendo a la pendiente del mismo sensor.
+
+        Args:
+            reading (Reading): Lectura a depositar
+        """
+        self.post_many((reading,))
+
+    def post_many(self, readings):
+        """
+        Deposita un lote de lecturas bajo un único bloqueo.
+
+        Las lecturas se asumen en orden de llegada, así que la última de
+        cada sensor es la que queda en el buzón.
+
+        Args:
+            readings (iterable[Reading]): Lecturas a depositar
+        """
+        with self._lock:
+            slots = self._slots
+            was_empty = not slots
+            superseded = self._superseded
+            for reading in readings:
+                sensor_id = reading.sensor_id
+                if sensor_id not in superseded:
+                    self._unknown += 1
+                    continue
+                if sensor_id in slots:
+                    superseded[sensor_id] += 1
+                slots[sensor_id] = reading
+                self._posted += 1
+            notify = was_empty and slots
+
+        # Fuera del cerrojo: on_post puede tardar (p. ej. emitir una señal de Qt)
+        if notify and self.on_post is not None:
+            self.on_post()
+
+    def drain(self):
+        """
+        Recoge las lecturas pendientes y deja el buzón vacío.
+
+        Returns:
+            dict: Última lectura pendiente por sensor (vacío si no hay nada)
+        """
+        with self._lock:
+            if not self._slots:
+                return {}
+            pending = self._slots
+            self._slots = {}
+            self._drains += 1
+            self._delivered += len(pending)
+        return pending
+
+    def pending_count(self):
+        """Número de sensores con una lectura pendiente."""
+        return len(self._slots)
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del buzón.
+
+        Returns:
+            dict: Lecturas depositadas, entregadas y sustituidas por sensor
+        """
+        with self._lock:
+            superseded = dict(self._superseded)
+            return {
+                "posted": self._posted,
+                "delivered": self._delivered,
+                "drains": self._drains,
+                "unknown_sensor": self._unknown,
+                "superseded": sum(superseded.values()),
+                "superseded_by_sensor": superseded,
+            }
@@ -0,0 +1,118 @@
+"""
+Buffer circular de lecturas para el modo "almacenar y reenviar".
+
+Guarda las lecturas publicadas mientras el dashboard estaba desconectado del
+broker (y que el broker entrega al reconectar) en arrays de tamaño fijo, sin
+crear un objeto por lectura. Al terminar la puesta al día se entregan todas
+de una vez como un único lote.
+"""
+import threading
+from array import array
+
+from ingestion.payload import SENSOR_ORDER
+from ingestion.reading import Reading
+
+# Bytes por lectura: índice de sensor (H) + timestamp (d) + recepción (d) + valor (d)
+RECORD_SIZE = array("H").itemsize + 3 * array("d").itemsize
+
+
+class OfflineBuffer:
+    """
+    Buffer circular acotado en memoria respaldado por arrays.
+
+    Cuando se llena, cada lectura nueva sobrescribe la más antigua y se
+    cuenta como perdida.
+    """
+
+    def __init__(self, capacity_bytes):
+        """
+        Inicializa el buffer.
+
+        Args:
+            capacity_bytes (int): Memoria máxima destinada a las lecturas
+        """
+        self.capacity = max(1, capacity_bytes // RECORD_SIZE)
+        self._sensors = array("H", bytes(array("H").itemsize * self.capacity))
+        self._timestamps = array("d", bytes(array("d").itemsize * self.capacity))
+        self._received = array("d", bytes(array("d").itemsize * self.capacity))
+        self._values = array("d", bytes(array("d").itemsize * self.capacity))
+        self._index = {sensor_id: i for i, sensor_id in enumerate(SENSOR_ORDER)}
+        self._lock = threading.Lock()
+
+        # Posición de la siguiente escritura y número de lecturas guardadas
+        self._head = 0
+        self._count = 0
+
+        # Contadores
+        self.stored = 0
+        self.overwritten = 0
+        self.drained = 0
+
+    def __len__(self):
+        return self._count
+
+    def extend(self, readings):
+        """
+        Guarda un conjunto de lecturas.
+
+        Args:
+            readings (iterable[Reading]): Lecturas a guardar
+        """
+        index = self._index
+        with self._lock:
+            capacity = self.capacity
+            for reading in readings:
+                head = self._head
+                self._sensors[head] = index[reading.sensor_id]
+                self._timestamps[head] = reading.timestamp
+                self._received[head] = reading.received
+                self._values[head] = reading.value
+                self._head = (head + 1) % capacity
+                if self._count < capacity:
+                    self._count += 1
+                else:
+                    self.overwritten += 1
+                self.stored += 1
+
+    def drain(self):
+        """
+        Extrae todas las lecturas guardadas, de la más antigua a la más reciente.
+
+        Returns:
+            list[Reading]: Lecturas guardadas (vacía si no hay ninguna)
+        """
+        with self._lock:
+            count = self._count
+            if count == 0:
+                return []
+
+            start = (self._head - count) % self.capacity
+            readings = []
+            for offset in range(count):
+                i = (start + offset) % self.capacity
+                readings.append(Reading(
+                    SENSOR_ORDER[self._sensors[i]],
+                    self._values[i],
+                    self._timestamps[i],
+                    self._received[i]
+                ))
+
+            self._count = 0
+            self.drained += count
+        return readings
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del buffer.
+
+        Returns:
+            dict: Ocupación, capacidad y lecturas perdidas
+        """
+        return {
+            "buffered": self._count,
+            "capacity": self.capacity,
+            "capacity_bytes": self.capacity * RECORD_SIZE,
+            "stored": self.stored,
+            "overwritten": self.overwritten,
+            "drained": self.drained,
+        }
@@ -0,0 +1,204 @@
+"""
+Formatos de payload del topic de sensores.
+
+El topic casa/sensores transporta las cinco lecturas en un único mensaje,
+en uno de dos formatos que se detectan automáticamente por mensaje:
+
+- Binario (preferido): cabecera fija seguida de un float32 por sensor en el
+  orden de config.SENSORS. Se decodifica con un struct.Struct precompilado.
+  Un sensor sin dato se envía como NaN.
+- JSON (alternativa): objeto con una clave por sensor y los campos
+  opcionales "timestamp" y "seq".
+
+En todos los formatos, los valores no finitos (NaN, infinito) se tratan
+como sensores sin dato y no generan lectura.
+
+Disposición binaria (little-endian, sin relleno):
+
+    magic   2s   b"HS"
+    version B    1 o 2
+    ts      d    instante de la medida (segundos epoch)
+    seq     I    solo en la versión 2: número de secuencia del emisor
+    valores f*N  un float32 por sensor de config.SENSORS
+
+Los topics de un único sensor (casa/<habitación>/sensores/<sensor_id>)
+transportan solo el valor como número en texto.
+"""
+import json
+import math
+import struct
+
+from config import SENSORS
+from ingestion.reading import Reading
+
+# Identificador de los mensajes binarios (un JSON nunca empieza así)
+BINARY_MAGIC = b"HS"
+BINARY_VERSION = 1
+BINARY_VERSION_SEQ = 2
+
+# Orden fijo de los sensores en el formato binario
+SENSOR_ORDER = tuple(SENSORS)
+
+# Estructuras precompiladas del formato binario
+BINARY_V1 = struct.Struct("<2sBd" + "f" * len(SENSOR_ORDER))
+BINARY_V2 = struct.Struct("<2sBdI" + "f" * len(SENSOR_ORDER))
+
+
+def is_binary(payload):
+    """
+    Indica si un payload usa el formato binario.
+
+    Args:
+        payload (bytes): Contenido del mensaje
+
+    Returns:
+        bool: True si empieza por la marca del formato binario
+    """
+    return payload[:2] == BINARY_MAGIC
+
+
+def encode_binary(values, timestamp, seq=None):
+    """
+    Empaqueta las lecturas de un instante en el formato binario.
+
+    Args:
+        values (dict): Valor por sensor; los sensores ausentes se envían como NaN
+        timestamp (float): Instante de la medida
+        seq (int, optional): Número de secuencia; si se indica se usa la versión 2
+
+    Returns:
+        bytes: Payload binario
+    """
+    sensor_values = (values.get(sensor_id, math.nan) for sensor_id in SENSOR_ORDER)
+    if seq is None:
+        return BINARY_V1.pack(BINARY_MAGIC, BINARY_VERSION, timestamp, *sensor_values)
+    return BINARY_V2.pack(BINARY_MAGIC, BINARY_VERSION_SEQ, timestamp, seq & 0xFFFFFFFF, *sensor_values)
+
+
+def encode_json(values, timestamp, seq=None):
+    """
+    Serializa las lecturas de un instante en JSON.
+
+    Args:
+        values (dict): Valor por sensor
+        timestamp (float): Instante de la medida
+        seq (int, optional): Número de secuencia
+
+    Returns:
+        bytes: Payload JSON en UTF-8
+    """
+    data = dict(values)
+    data["timestamp"] = timestamp
+    if seq is not None:
+        data["seq"] = seq
+    return json.dumps(data).encode("utf-8")
+
+
+def decode_binary(payload, received):
+    """
+    Decodifica un payload binario.
+
+    Args:
+        payload (bytes): Contenido del mensaje
+        received (float): Instante de recepción
+
+    Returns:
+        list[Reading]: Lecturas presentes en el mensaje
+
+    Raises:
+        ValueError: Si el tamaño o la versión no son válidos
+    """
+    version = payload[2] if len(payload) > 2 else None
+    if version == BINARY_VERSION:
+        layout, has_seq = BINARY_V1, False
+    elif version == BINARY_VERSION_SEQ:
+        layout, has_seq = BINARY_V2, True
+    else:
+        raise ValueError(f"versión de payload binario no soportada ({version})")
+
+    if len(payload) != layout.size:
+        raise ValueError(f"tamaño de payload binario inválido ({len(payload)} bytes)")
+
+    fields = layout.unpack(payload)
+    timestamp = fields[2]
+    seq = fields[3] if has_seq else None
+    values = fields[4:] if has_seq else fields[3:]
+
+    # NaN: sensor sin dato
+    return [
+        Reading(sensor_id, value, timestamp, received, seq)
+        for sensor_id, value in zip(SENSOR_ORDER, values)
+        if math.isfinite(value)
+    ]
+
+
+def decode_json(payload, received):
+    """
+    Decodifica un payload JSON.
+
+    Args:
+        payload (bytes): Contenido del mensaje
+        received (float): Instante de recepción
+
+    Returns:
+        list[Reading]: Lecturas presentes en el mensaje
+
+    Raises:
+        ValueError: Si el JSON no es válido o no es un objeto
+    """
+    data = json.loads(payload)
+    if not isinstance(data, dict):
+        raise ValueError("el payload no es un objeto JSON")
+
+    timestamp = float(data.get("timestamp", received))
+    seq = data.get("seq")
+    if seq is not None:
+        seq = int(seq)
+
+    values = ((sensor_id, float(data[sensor_id])) for sensor_id in SENSOR_ORDER if sensor_id in data)
+    # json.loads acepta NaN e Infinity: como en binario, sensor sin dato
+    return [
+        Reading(sensor_id, value, timestamp, received, seq)
+        for sensor_id, value in values
+        if math.isfinite(value)
+    ]
+
+
+def decode_scalar(sensor_id, payload, received):
+    """
+    Decodifica el payload de un topic de un único sensor (un número en texto).
+
+    Args:
+        sensor_id (str): Sensor al que pertenece el topic
+        payload (bytes): Contenido del mensaje, p. ej. b"21.5"
+        received (float): Instante de recepción
+
+    Returns:
+        list[Reading]: La lectura del sensor (vacía si el valor no es finito, p. ej. "nan")
+
+    Raises:
+        ValueError: Si el payload no es un número
+    """
+    value = float(payload)
+    if not math.isfinite(value):
+        return []
+    return [Reading(sensor_id, value, received, received)]
+
+
+def decode_payload(payload, received):
+    """
+    Decodifica un payload detectando su formato.
+
+    Args:
+        payload (bytes): Contenido del mensaje
+        received (float): Instante de recepción
+
+    Returns:
+        list[Reading]: Lecturas presentes en el mensaje
+
+    Raises:
+        ValueError: Si el payload no es válido en ningún formato
+    """
+    if payload[:2] == BINARY_MAGIC:
+        return decode_binary(payload, received)
+    return decode_json(payload, received)
@@ -0,0 +1,12 @@
+"""
+Estructura de datos común para las lecturas de sensores.
+"""
+from collections import namedtuple
+
+# Una lectura individual de un sensor:
+#   sensor_id: identificador del sensor (clave de config.SENSORS)
+#   value: valor medido
+#   timestamp: instante de la medida en el origen (segundos epoch)
+#   received: instante de recepción en el dashboard (segundos epoch)
+#   seq: número de secuencia del mensaje en el origen (None si no lo envía)
+Reading = namedtuple("Reading", ["sensor_id", "value", "timestamp", "received", "seq"], defaults=(None,))
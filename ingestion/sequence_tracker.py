@@ -0,0 +1,225 @@
+"""
+Seguimiento de secuencias y latencias de la ingesta.
+
+Para cada flujo (topic + sensor) se guarda el último número de secuencia y
+una ventana de bits con las secuencias recientes, lo que permite descartar
+duplicados y contar huecos y llegadas tardías con coste constante. Para cada
+sensor se mantiene además un histograma de latencia (recepción menos
+instante de origen) con cubetas de potencias de dos en milisegundos, que
+también se actualiza en O(1).
+
+Los métodos observe() se llaman solo desde el hilo de red; get_stats() puede
+llamarse desde cualquier hilo (los contadores se copian sin bloqueo).
+"""
+from array import array
+
+from config import SENSORS
+
+# Tamaño de la ventana de secuencias recientes (bits)
+WINDOW_BITS = 64
+WINDOW_MASK = (1 << WINDOW_BITS) - 1
+
+# Los números de secuencia son uint32 y pueden dar la vuelta
+SEQ_MODULO = 1 << 32
+SEQ_HALF = 1 << 31
+
+# Cubeta 0: < 1 ms; cubeta k: [2^(k-1), 2^k) ms; la última acumula el resto (~33 s o más)
+LATENCY_BUCKETS = 17
+
+
+class _StreamState:
+    """Estado de secuencia de un flujo (topic + sensor)."""
+
+    __slots__ = ("last_seq", "window")
+
+    def __init__(self, seq):
+        self.last_seq = seq
+        self.window = 1
+
+
+class _SensorStats:
+    """Contadores y histograma de latencia de un sensor."""
+
+    __slots__ = ("received", "duplicates", "gaps", "late", "resets",
+                 "latency_count", "latency_sum", "latency_max", "negative", "buckets")
+
+    def __init__(self):
+        self.received = 0
+        self.duplicates = 0
+        self.gaps = 0
+        self.late = 0
+        self.resets = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.negative = 0
+        self.buckets = array("Q", bytes(8 * LATENCY_BUCKETS))
+
+
+def bucket_upper_ms(index):
+    """
+    Límite superior (exclusivo) de una cubeta de latencia en milisegundos.
+
+    Args:
+        index (int): Índice de la cubeta
+
+    Returns:
+        float: Límite superior; infinito para la última cubeta
+    """
+    if index >= LATENCY_BUCKETS - 1:
+        return float("inf")
+    return float(1 << index)
+
+
+class SequenceTracker:
+    """Detecta duplicados, huecos y retrasos de las lecturas recibidas."""
+
+    def __init__(self, sensor_ids=None):
+        """
+        Inicializa el seguimiento.
+
+        Args:
+            sensor_ids (iterable, optional): Sensores a seguir (por defecto config.SENSORS)
+        """
+        ids = sensor_ids if sensor_ids is not None else SENSORS
+        self._sensors = {sensor_id: _SensorStats() for sensor_id in ids}
+        self._streams = {}
+
+    def observe(self, topic, readings):
+        """
+        Registra las lecturas de un mensaje y descarta las duplicadas.
+
+        Args:
+            topic (str): Topic del mensaje (identifica al emisor)
+            readings (list[Reading]): Lecturas decodificadas del mensaje
+
+        Returns:
+            list[Reading]: Lecturas que no son duplicados
+        """
+        accepted = None
+        for i, reading in enumerate(readings):
+            stats = self._sensors.get(reading.sensor_id)
+            if stats is None:
+                continue
+
+            stats.received += 1
+            self._record_latency(stats, reading.received - reading.timestamp)
+
+            if reading.seq is not None and not self._check_sequence(topic, reading, stats):
+                # Primer duplicado: copiar las lecturas aceptadas hasta aquí
+                if accepted is None:
+                    accepted = list(readings[:i])
+                continue
+
+            if accepted is not None:
+                accepted.append(reading)
+
+        return readings if accepted is None else accepted
+
+    def _check_sequence(self, topic, reading, stats):
+        """
+        Actualiza el estado de secuencia de un flujo.
+
+        Returns:
+            bool: False si la lectura es un duplicado
+        """
+        key = (topic, reading.sensor_id)
+        seq = reading.seq
+        state = self._streams.get(key)
+        if state is None:
+            self._streams[key] = _StreamState(seq)
+            return True
+
+        delta = (seq - state.last_seq) % SEQ_MODULO
+        if delta == 0:
+            stats.duplicates += 1
+            return False
+
+        if delta < SEQ_HALF:
+            # Avance: los números saltados cuentan como hueco
+            stats.gaps += delta - 1
+            state.window = ((state.window << delta) | 1) & WINDOW_MASK if delta < WINDOW_BITS else 1
+            state.last_seq = seq
+            return True
+
+        behind = SEQ_MODULO - delta
+        if behind >= WINDOW_BITS:
+            # Demasiado atrás: el emisor se ha reiniciado
+            stats.resets += 1
+            state.last_seq = seq
+            state.window = 1
+            return True
+
+        bit = 1 << behind
+        if state.window & bit:
+            stats.duplicates += 1
+            return False
+
+        # Llegada tardía de un número que se había contado como hueco
+        state.window |= bit
+        stats.late += 1
+        stats.gaps -= 1
+        return True
+
+    def _record_latency(self, stats, latency):
+        """Añade una latencia (segundos) al histograma del sensor."""
+        if latency < 0:
+            # Relojes desincronizados entre el emisor y el dashboard
+            stats.negative += 1
+            return
+
+        latency_ms = latency * 1000.0
+        index = int(latency_ms).bit_length()
+        if index >= LATENCY_BUCKETS:
+            index = LATENCY_BUCKETS - 1
+
+        stats.buckets[index] += 1
+        stats.latency_count += 1
+        stats.latency_sum += latency_ms
+        if latency_ms > stats.latency_max:
+            stats.latency_max = latency_ms
+
+    def _percentile(self, buckets, count, point):
+        """Estima un percentil como el límite superior de su cubeta."""
+        target = count * point / 100.0
+        cumulative = 0
+        for index, bucket_count in enumerate(buckets):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bucket_upper_ms(index)
+        return bucket_upper_ms(LATENCY_BUCKETS - 1)
+
+    def get_stats(self):
+        """
+        Devuelve los contadores por sensor.
+
+        Returns:
+            dict: Por sensor, lecturas, duplicados, huecos, retrasos, reinicios
+                y resumen de latencia (ms) con el histograma
+        """
+        result = {}
+        for sensor_id, stats in self._sensors.items():
+            buckets = list(stats.buckets)
+            count = stats.latency_count
+            latency = {"count": count, "negative": stats.negative}
+            if count:
+                latency.update({
+                    "mean": round(stats.latency_sum / count, 3),
+                    "max": round(stats.latency_max, 3),
+                    "p50_upper": self._percentile(buckets, count, 50),
+                    "p90_upper": self._percentile(buckets, count, 90),
+                    "p99_upper": self._percentile(buckets, count, 99),
+                })
+            latency["buckets"] = {
+                f"<{bucket_upper_ms(i):g}": c for i, c in enumerate(buckets) if c
+            }
+
+            result[sensor_id] = {
+                "received": stats.received,
+                "duplicates": stats.duplicates,
+                "gaps": stats.gaps,
+                "late": stats.late,
+                "resets": stats.resets,
+                "latency_ms": latency,
+            }
+        return result
@@ -0,0 +1,188 @@
+"""
+Enrutador de topics MQTT basado en un trie.
+
+Las suscripciones (con comodines "+" y "#") se compilan en un árbol por
+niveles del topic. Resolver un topic recorre el árbol nivel a nivel, así que
+el coste depende de la profundidad del topic y no del número de sensores
+registrados. Las resoluciones de topics exactos se guardan en caché.
+"""
+
+
+class _TrieNode:
+    """Nodo del trie: un nivel del topic."""
+
+    __slots__ = ("children", "handlers", "multi_handlers")
+
+    def __init__(self):
+        self.children = {}
+        # Manejadores de suscripciones que terminan exactamente aquí
+        self.handlers = []
+        # Manejadores de suscripciones "<prefijo>/#" (este nivel y todos los inferiores)
+        self.multi_handlers = []
+
+
+class TopicRouter:
+    """
+    Resuelve topics MQTT a sus manejadores registrados.
+
+    Sigue la semántica de MQTT: "+" sustituye exactamente un nivel y "#"
+    (solo al final) sustituye cero o más niveles. Los topics que empiezan
+    por "$" no coinciden con comodines en el primer nivel.
+    """
+
+    def __init__(self, cache_size=1024):
+        """
+        Inicializa el enrutador.
+
+        Args:
+            cache_size (int, optional): Número máximo de topics exactos en caché
+        """
+        self._root = _TrieNode()
+        self._cache = {}
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def subscribe(self, pattern, handler):
+        """
+        Registra un manejador para un patrón de topic.
+
+        Args:
+            pattern (str): Patrón MQTT, p. ej. "casa/+/sensores/#"
+            handler (callable): Manejador asociado
+
+        Raises:
+            ValueError: Si el patrón no es un filtro MQTT válido
+        """
+        levels = self._validate(pattern)
+        node = self._root
+
+        for level in levels:
+            if level == "#":
+                node.multi_handlers.append(handler)
+                break
+            node = node.children.setdefault(level, _TrieNode())
+        else:
+            node.handlers.append(handler)
+
+        self._cache.clear()
+
+    def unsubscribe(self, pattern, handler):
+        """
+        Elimina un manejador previamente registrado.
+
+        Args:
+            pattern (str): Patrón usado en subscribe()
+            handler (callable): Manejador a eliminar
+        """
+        node = self._root
+        for level in self._validate(pattern):
+            if level == "#":
+                handlers = node.multi_handlers
+                break
+            node = node.children.get(level)
+            if node is None:
+                return
+        else:
+            handlers = node.handlers
+
+        if handler in handlers:
+            handlers.remove(handler)
+        self._cache.clear()
+
+    def resolve(self, topic):
+        """
+        Devuelve los manejadores que coinciden con un topic.
+
+        Args:
+            topic (str): Topic exacto de un mensaje
+
+        Returns:
+            tuple: Manejadores coincidentes, en orden de profundidad
+        """
+        handlers = self._cache.get(topic)
+        if handlers is not None:
+            self.cache_hits += 1
+            return handlers
+
+        self.cache_misses += 1
+        handlers = tuple(self._match(topic.split("/"), topic.startswith("$")))
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[topic] = handlers
+        return handlers
+
+    def _match(self, levels, system_topic):
+        """
+        Recorre el trie acumulando los manejadores coincidentes.
+
+        Args:
+            levels (list[str]): Niveles del topic
+            system_topic (bool): Si el topic empieza por "$"
+
+        Returns:
+            list: Manejadores coincidentes
+        """
+        matched = []
+        nodes = [self._root]
+
+        for depth, level in enumerate(levels):
+            wildcards = not (system_topic and depth == 0)
+            next_nodes = []
+            for node in nodes:
+                if wildcards:
+                    matched.extend(node.multi_handlers)
+                child = node.children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+                if wildcards:
+                    child = node.children.get("+")
+                    if child is not None:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return matched
+
+        # Topic consumido: coinciden los patrones exactos y los "<topic>/#"
+        for node in nodes:
+            matched.extend(node.handlers)
+            matched.extend(node.multi_handlers)
+        return matched
+
+    def _validate(self, pattern):
+        """
+        Comprueba un patrón y lo separa en niveles.
+
+        Args:
+            pattern (str): Patrón MQTT
+
+        Returns:
+            list[str]: Niveles del patrón
+
+        Raises:
+            ValueError: Si los comodines no ocupan un nivel completo o "#" no va al final
+        """
+        if not pattern:
+            raise ValueError("el patrón de topic está vacío")
+
+        levels = pattern.split("/")
+        for index, level in enumerate(levels):
+            if ("+" in level or "#" in level) and len(level) > 1:
+                raise ValueError(f"comodín mal formado en '{pattern}'")
+            if level == "#" and index != len(levels) - 1:
+                raise ValueError(f"'#' debe ser el último nivel en '{pattern}'")
+        return levels
+
+    def get_stats(self):
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            dict: Aciertos, fallos y tamaño de la caché
+        """
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_entries": len(self._cache),
+        }
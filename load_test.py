@@ -0,0 +1,333 @@
+"""
+Generador de carga MQTT sintética y benchmark de latencia extremo a extremo.
+
+Publica N sensores virtuales a M Hz contra un broker local o contra un
+sustituto en proceso, y mide sobre la misma tubería que main.py (MQTTClient ->
+buzón -> MainWindow) la latencia de publicación a pintado, los frames por
+segundo y el uso de CPU. El resultado es un informe JSON que se puede
+comparar entre versiones.
+
+Ejemplos:
+    python load_test.py --sensors 50 --rate 20 --duration 10
+    python load_test.py --broker --format json --burst 10 --output informe.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QEvent, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from config import MQTT_CONFIG, SENSORS
+from ingestion.payload import encode_binary, encode_json
+from utils.logger import setup_logger
+
+# Configurar logger para el generador de carga
+logger = setup_logger(__name__)
+
+SENSOR_IDS = tuple(SENSORS)
+
+
+class LoadGenerator(threading.Thread):
+    """
+    Hilo que publica las lecturas de los sensores virtuales.
+
+    El sensor virtual i mide SENSOR_IDS[i % 5] en la habitación de
+    MQTT_CONFIG["device_topic"] (la única que enruta el panel); los sensores
+    virtuales que miden lo mismo comparten el número de secuencia, como si
+    fueran un único emisor más rápido. Cada sensor publica `burst` mensajes seguidos cada burst / rate segundos,
+    de modo que la frecuencia media es siempre `rate` Hz.
+    """
+
+    def __init__(self, publish, sensors, rate, payload_format, burst, duration):
+        """
+        Args:
+            publish (callable): Función publish(topic, payload)
+            sensors (int): Número de sensores virtuales
+            rate (float): Mensajes por segundo de cada sensor
+            payload_format (str): "binary", "json" o "scalar"
+            burst (int): Mensajes por ráfaga
+            duration (float): Duración de la publicación en segundos
+        """
+        super().__init__(name="load-generator", daemon=True)
+        self.publish = publish
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.duration = duration
+        self.published = 0
+        self.cpu_time = 0.0
+        self.topics = self._build_topics(sensors, payload_format)
+        self.encoder = self._build_encoder(payload_format)
+        self._stop_event = threading.Event()
+
+    def _build_topics(self, sensors, payload_format):
+        """Calcula el topic y el sensor de cada sensor virtual."""
+        base = MQTT_CONFIG["device_topic"].rsplit("/", 1)[0]
+        topics = []
+        for i in range(sensors):
+            sensor_id = SENSOR_IDS[i % len(SENSOR_IDS)]
+            topic = f"{base}/{sensor_id}" if payload_format == "scalar" else base
+            topics.append((topic, sensor_id, SENSORS[sensor_id]))
+        return topics
+
+    def _build_encoder(self, payload_format):
+        """Devuelve la función que codifica un valor según el formato."""
+        if payload_format == "binary":
+            return lambda sensor_id, value, ts, seq: encode_binary({sensor_id: value}, ts, seq)
+        if payload_format == "json":
+            return lambda sensor_id, value, ts, seq: encode_json({sensor_id: value}, ts, seq)
+        return lambda sensor_id, value, ts, seq: f"{value:.2f}".encode("ascii")
+
+    def stop(self):
+        """Detiene la publicación antes de agotar la duración."""
+        self._stop_event.set()
+
+    def run(self):
+        """Publica ráfagas hasta agotar la duración."""
+        cpu_start = time.thread_time()
+        interval = self.burst / self.rate
+        start = time.monotonic()
+        next_tick = start
+        tick = 0
+        # Número de secuencia de cada flujo (topic + sensor)
+        seqs = {(topic, sensor_id): 0 for topic, sensor_id, _ in self.topics}
+
+        while not self._stop_event.is_set() and next_tick - start < self.duration:
+            for topic, sensor_id, info in self.topics:
+                # Onda lenta dentro del rango del sensor
+                span = info["max_value"] - info["min_value"]
+                for _ in range(self.burst):
+                    value = info["min_value"] + span * ((tick % 100) / 100.0)
+                    self.publish(topic, self.encoder(sensor_id, value, time.time(), seqs[topic, sensor_id]))
+                    seqs[topic, sensor_id] += 1
+                    self.published += 1
+            tick += 1
+
+            next_tick += interval
+            wait = next_tick - time.monotonic()
+            if wait > 0:
+                self._stop_event.wait(wait)
+
+        self.cpu_time = time.thread_time() - cpu_start
+
+
+class PaintProbe(QObject):
+    """
+    Mide la latencia de publicación a pintado de cada widget de sensor.
+
+    Al aplicar una lectura se anota su instante de origen; en el siguiente
+    evento de pintado del widget correspondiente se calcula la latencia.
+    """
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.widgets = dict(window.sensor_widgets)
+        self.widgets["Temperatura"] = window.thermometer
+        self.sensor_by_widget = {widget: sensor_id for sensor_id, widget in self.widgets.items()}
+        self.pending = {sensor_id: [] for sensor_id in self.widgets}
+        self.paints = dict.fromkeys(self.widgets, 0)
+        self.latencies = []
+        self.frames = 0
+        self.recording = False
+
+        for widget in self.widgets.values():
+            widget.installEventFilter(self)
+
+        # Envolver la aplicación de lecturas para anotar los instantes de origen
+        apply_readings = window._apply_readings
+
+        def probed_apply(latest):
+            self.frames += 1
+            if self.recording:
+                for sensor_id, reading in latest.items():
+                    if sensor_id in self.pending:
+                        self.pending[sensor_id].append(reading.timestamp)
+            apply_readings(latest)
+
+        window._apply_readings = probed_apply
+
+    def eventFilter(self, obj, event):
+        """Registra los pintados de los widgets observados."""
+        if event.type() == QEvent.Type.Paint:
+            sensor_id = self.sensor_by_widget.get(obj)
+            if sensor_id is not None and self.recording:
+                now = time.time()
+                self.paints[sensor_id] += 1
+                pending = self.pending[sensor_id]
+                if pending:
+                    self.latencies.extend(now - ts for ts in pending)
+                    pending.clear()
+        return False
+
+    def reset(self):
+        """Empieza una nueva ventana de medida."""
+        self.latencies = []
+        self.frames = 0
+        self.paints = dict.fromkeys(self.widgets, 0)
+        for pending in self.pending.values():
+            pending.clear()
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Calcula percentiles (método del rango más cercano) en milisegundos.
+
+    Args:
+        values (list[float]): Latencias en segundos
+        points (tuple): Percentiles a calcular
+
+    Returns:
+        dict: Resumen de las latencias
+    """
+    if not values:
+        return {"count": 0}
+
+    ordered = sorted(values)
+    count = len(ordered)
+    summary = {"count": count, "mean": round(sum(ordered) / count * 1000.0, 3)}
+    for point in points:
+        index = min(count - 1, max(0, int(round(point / 100.0 * count)) - 1))
+        summary[f"p{point}"] = round(ordered[index] * 1000.0, 3)
+    summary["max"] = round(ordered[-1] * 1000.0, 3)
+    return summary
+
+
+def parse_args():
+    """Lee los parámetros de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Generador de carga MQTT y benchmark de latencia")
+    parser.add_argument("--sensors", type=int, default=5, help="Número de sensores virtuales (N)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Mensajes por segundo por sensor (M)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duración de la medida en segundos")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Segundos iniciales que no se miden")
+    parser.add_argument("--format", dest="payload_format", choices=("binary", "json", "scalar"),
+                        default="binary", help="Formato del payload")
+    parser.add_argument("--burst", type=int, default=1, help="Mensajes por ráfaga (misma frecuencia media)")
+    parser.add_argument("--broker", action="store_true",
+                        help="Publicar a través del broker de MQTT_CONFIG en lugar del sustituto en proceso")
+    parser.add_argument("--offscreen", action="store_true", help="Usar la plataforma Qt offscreen")
+    parser.add_argument("--output", help="Fichero donde guardar el informe JSON")
+    return parser.parse_args()
+
+
+def main():
+    """
+    Ejecuta la prueba de carga y escribe el informe.
+
+    Returns:
+        int: Código de salida
+    """
+    args = parse_args()
+    os.environ["QT_QPA_PLATFORM"] = "offscreen" if args.offscreen else "xcb"
+
+    app = QApplication(sys.argv)
+
+    # Importar después de crear la aplicación Qt
+    from mqtt_client import MQTTClient
+    from ui.main_window import MainWindow
+
+    window = MainWindow(simulate=False)
+    probe = PaintProbe(window)
+    client = MQTTClient(on_data_received=window.update_sensor_values)
+    client.add_sink(window.record_readings)
+
+    publisher = None
+    if args.broker:
+        import paho.mqtt.client as mqtt
+
+        logger.info(f"Conectando al broker {MQTT_CONFIG['broker']}:{MQTT_CONFIG['port']}...")
+        client.connect()
+        publisher = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        if MQTT_CONFIG.get("username"):
+            publisher.username_pw_set(MQTT_CONFIG["username"], MQTT_CONFIG.get("password"))
+        publisher.connect(MQTT_CONFIG["broker"], MQTT_CONFIG["port"])
+        publisher.loop_start()
+        publish = lambda topic, payload: publisher.publish(topic, payload)
+    else:
+        client.start_dispatcher()
+        publish = client.handle_message
+
+    generator = LoadGenerator(
+        publish,
+        sensors=args.sensors,
+        rate=args.rate,
+        payload_format=args.payload_format,
+        burst=args.burst,
+        duration=args.warmup + args.duration
+    )
+
+    measurement = {}
+
+    def start_measure():
+        probe.reset()
+        probe.recording = True
+        measurement["wall"] = time.monotonic()
+        measurement["cpu"] = time.process_time()
+        measurement["published"] = generator.published
+
+    def stop_measure():
+        probe.recording = False
+        measurement["wall"] = time.monotonic() - measurement["wall"]
+        measurement["cpu"] = time.process_time() - measurement["cpu"]
+        measurement["published"] = generator.published - measurement["published"]
+        generator.stop()
+        app.quit()
+
+    window.show()
+    logger.info(f"Publicando {args.sensors} sensores a {args.rate} Hz ({args.payload_format}, ráfaga {args.burst})")
+    generator.start()
+    QTimer.singleShot(int(args.warmup * 1000), start_measure)
+    QTimer.singleShot(int((args.warmup + args.duration) * 1000), stop_measure)
+    app.exec()
+
+    generator.join(timeout=2.0)
+    if publisher is not None:
+        publisher.loop_stop()
+        publisher.disconnect()
+    client.disconnect()
+
+    wall = measurement["wall"]
+    # Descontar la CPU del propio generador cuando corre en el mismo proceso
+    pipeline_cpu = measurement["cpu"] - generator.cpu_time * (args.duration / (args.warmup + args.duration))
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": {"python": platform.python_version(), "machine": platform.machine()},
+        "config": {
+            "sensors": args.sensors,
+            "rate_hz": args.rate,
+            "duration_s": args.duration,
+            "payload_format": args.payload_format,
+            "burst": args.burst,
+            "transport": "broker" if args.broker else "in-process",
+        },
+        "published": measurement["published"],
+        "publish_rate": round(measurement["published"] / wall, 1),
+        "latency_ms": percentiles(probe.latencies),
+        "fps": {
+            "ui_frames": round(probe.frames / wall, 2),
+            "paints_per_widget": {sensor_id: round(count / wall, 2) for sensor_id, count in probe.paints.items()},
+        },
+        "cpu_percent": {
+            "process": round(measurement["cpu"] / wall * 100.0, 1),
+            "pipeline": round(max(0.0, pipeline_cpu) / wall * 100.0, 1),
+        },
+        "ingestion": client.get_stats(),
+        "mailbox": window.mailbox.get_stats(),
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        logger.info(f"Informe guardado en {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,11 @@ import sys
 from PyQt6.QtWidgets import QApplication
 from ui.main_window import MainWindow
 from mqtt_client import MQTTClient
+from config import HISTORY_CONFIG
+from analysis.alerts import AlertEngine
+from analysis.anomaly import AnomalyDetector
+from history.mmap_store import MmapStore
+from history.sqlite_store import SqliteStore
 from utils.logger import setup_logger
 import os
 
@@ -26,16 +31,37 @@ def main():
     app = QApplication(sys.argv)
     
     try:
-        # Crear la ventana principal
+        # Crear la ventana principal (sin datos simulados: llegan por MQTT)
         logger.info("Iniciando la interfaz gráfica...")
-        window = MainWindow()
+        window = MainWindow(simulate=False)
         
         # Crear el cliente MQTT
         logger.info("Creando cliente MQTT...")
         mqtt_client = MQTTClient(on_data_received=window.update_sensor_values)
         
+        # El historial recibe todas las lecturas, aunque la UI solo vea las últimas
+        mqtt_client.add_sink(window.record_readings)
+        
+        # Las lecturas atrasadas tras una reconexión se ven al redibujar los gráficos
+        mqtt_client.backlog_ready.connect(window.reload_trends)
+        
+        # Historial persistente en disco (segmentos diarios por sensor o SQLite)
+        if HISTORY_CONFIG["backend"] == "sqlite":
+            history_store = SqliteStore()
+        else:
+            history_store = MmapStore()
+        mqtt_client.add_sink(history_store.extend)
+        
+        # Reglas de alerta sobre ventanas de tiempo y detección de anomalías
+        # (evaluadas con todas las lecturas)
+        alert_engine = AlertEngine(detector=AnomalyDetector())
+        mqtt_client.add_sink(alert_engine.extend)
+        
+        # Los cambios de estado se muestran en el aviso superior de la ventana
+        alert_engine.add_listener(window.alert_changed.emit)
+        
         try:
-            # Conectar al broker MQTT
+            # Conectar al broker MQTT (no bloquea: reintenta en segundo plano)
             logger.info("Conectando al broker MQTT...")
             mqtt_client.connect()
             
@@ -48,6 +74,8 @@ def main():
             # Desconectar el cliente MQTT antes de salir
             logger.info("Desconectando cliente MQTT...")
             mqtt_client.disconnect()
+            history_store.close()
+            window.rollups.save()
             
             # Salir con el código de salida
             sys.exit(exit_code)
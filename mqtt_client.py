@@ -0,0 +1,494 @@
+"""
+Cliente MQTT de la aplicación de domótica.
+
+Recibe los mensajes del broker en el hilo de red de paho, los decodifica
+fuera del hilo de Qt y los entrega a la interfaz agrupados en un único
+lote por frame mediante una señal encolada.
+
+La sesión es persistente (QoS 1, clean_session=False), así que el broker
+guarda lo publicado mientras el dashboard está desconectado. Esas lecturas
+atrasadas no pasan por la interfaz: se acumulan en un buffer circular y se
+entregan de una vez (backlog_ready) a las capas de historial y alertas.
+
+Tras cada conexión hay una fase de puesta al día que termina cuando dejan
+de llegar lecturas atrasadas (backlog_idle_ms) o, como mucho, a los
+backlog_window_s segundos. Solo en esa fase se clasifica una lectura como
+atrasada por su timestamp, de modo que un dispositivo con el reloj atrasado
+no desvía sus lecturas en vivo fuera de la interfaz más que esos segundos.
+Mientras dura, las lecturas en vivo llegan a la interfaz pero se retienen
+para los consumidores de add_sink(): al terminar reciben primero las
+atrasadas, ordenadas por tiempo, y después las retenidas. Así el historial
+y las reglas de alerta, que descartan lo anterior a su última lectura,
+reciben también las atrasadas.
+
+Si la interfaz se queda atrás, solo se le envía un lote cuando ha consumido
+el anterior; entretanto las lecturas esperan en un buffer acotado con la
+política de INGESTION_CONFIG["ui_policy"] (ver ingestion.backpressure). Los
+consumidores registrados con add_sink() reciben siempre todas las lecturas.
+"""
+import queue
+import threading
+import time
+from functools import partial
+
+import paho.mqtt.client as mqtt
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from config import MQTT_CONFIG, INGESTION_CONFIG, SENSORS
+from ingestion.backpressure import UIBuffer
+from ingestion.offline_buffer import OfflineBuffer
+from ingestion.payload import decode_payload, decode_scalar, is_binary
+from ingestion.sequence_tracker import SequenceTracker
+from ingestion.topic_router import TopicRouter
+from utils.logger import setup_logger
+
+# Configurar logger para el cliente MQTT
+logger = setup_logger(__name__)
+
+
+class MQTTClient(QObject):
+    """
+    Cliente MQTT con ingesta segura entre hilos.
+
+    El hilo de red de paho decodifica cada mensaje (binario o JSON, ver
+    ingestion.payload) y lo deposita en una cola acotada. Un hilo despachador
+    vacía la cola como máximo una vez por frame y emite todas las lecturas
+    pendientes en una sola señal, de modo que una ráfaga de cientos de
+    mensajes cuesta un único despertar del hilo de Qt.
+    """
+
+    # Lote de lecturas (list[Reading]) listo para la interfaz
+    batch_ready = pyqtSignal(list)
+
+    # Lecturas atrasadas tras una reconexión (list[Reading]), en un único lote
+    backlog_ready = pyqtSignal(list)
+
+    def __init__(self, on_data_received=None, config=None, queue_size=None,
+                 frame_interval_ms=None, on_backlog=None, ui_policy=None, parent=None):
+        """
+        Inicializa el cliente MQTT.
+
+        Args:
+            on_data_received (callable, optional): Función que recibe cada lote
+                de lecturas en el hilo de Qt
+            config (dict, optional): Configuración del broker (por defecto MQTT_CONFIG)
+            queue_size (int, optional): Capacidad de la cola de mensajes pendientes
+            frame_interval_ms (int, optional): Intervalo mínimo entre lotes
+            on_backlog (callable, optional): Función que recibe, en el hilo de Qt,
+                el lote de lecturas atrasadas tras cada reconexión
+            ui_policy (str, optional): Política de contrapresión hacia la interfaz
+                (por defecto INGESTION_CONFIG["ui_policy"])
+            parent (QObject, optional): Objeto padre
+        """
+        super().__init__(parent)
+        self.config = config or MQTT_CONFIG
+        self.queue_size = queue_size or INGESTION_CONFIG["queue_size"]
+        self.frame_interval = (frame_interval_ms or INGESTION_CONFIG["frame_interval_ms"]) / 1000.0
+
+        # Cola acotada entre el hilo de red y el despachador
+        self._queue = queue.Queue(maxsize=self.queue_size)
+
+        # Contadores (solo los modifica un hilo cada uno)
+        self._stats_lock = threading.Lock()
+        self._messages_received = 0
+        self._binary_messages = 0
+        self._unrouted_messages = 0
+        self._readings_decoded = 0
+        self._decode_errors = 0
+        self._messages_dropped = 0
+        self._readings_dropped = 0
+        self._batches_emitted = 0
+        self._readings_emitted = 0
+        self._max_batch_size = 0
+        self._max_queue_depth = 0
+
+        # Hilo despachador
+        self._stop_event = threading.Event()
+        self._dispatch_thread = None
+        self._last_emit = 0.0
+
+        # Almacenar y reenviar: lecturas publicadas antes de la última conexión
+        self.offline_buffer = OfflineBuffer(INGESTION_CONFIG["offline_buffer_bytes"])
+        self._backlog_tolerance = INGESTION_CONFIG["backlog_tolerance_s"]
+        self._backlog_idle = INGESTION_CONFIG["backlog_idle_ms"] / 1000.0
+        self._backlog_window = INGESTION_CONFIG["backlog_window_s"]
+        self._connected_at = 0.0
+        self._last_backlog = 0.0
+
+        # Puesta al día tras la última conexión: lecturas en vivo retenidas para
+        # los consumidores hasta entregar las atrasadas (solo las toca el despachador)
+        self._catchup_lock = threading.Lock()
+        self._catching_up = False
+        self._catchup_deadline = 0.0
+        self._held = []
+        self._connects = 0
+        self._disconnects = 0
+        self._backlog_batches = 0
+
+        # Duplicados, huecos de secuencia y latencia de ingesta por sensor
+        self.sequence_tracker = SequenceTracker()
+
+        # Contrapresión: un único lote en vuelo hacia la interfaz
+        self.ui_buffer = UIBuffer(
+            ui_policy or INGESTION_CONFIG["ui_policy"],
+            INGESTION_CONFIG["ui_buffer_bytes"]
+        )
+        self._ui_busy = threading.Event()
+        self._ui_waits = 0
+        self._sinks = []
+
+        # Entregar los lotes siempre en el hilo del receptor (hilo de Qt)
+        if on_data_received is not None:
+            self.batch_ready.connect(on_data_received, Qt.ConnectionType.QueuedConnection)
+        if on_backlog is not None:
+            self.backlog_ready.connect(on_backlog, Qt.ConnectionType.QueuedConnection)
+
+        # Se ejecuta en el hilo de Qt después del receptor: el lote ya se consumió
+        self.batch_ready.connect(self._on_batch_consumed, Qt.ConnectionType.QueuedConnection)
+
+        self.router = self._create_router()
+        self._client = self._create_client()
+
+    def add_sink(self, sink):
+        """
+        Registra un consumidor que recibe todas las lecturas sin descartes.
+
+        El consumidor se llama desde el hilo despachador con cada lote en
+        vivo y con cada lote de lecturas atrasadas, así que debe ser rápido y
+        seguro entre hilos. A diferencia de batch_ready, no se ve afectado
+        por la contrapresión de la interfaz. Las lecturas de cada sensor le
+        llegan en orden: durante la puesta al día tras una conexión, las en
+        vivo esperan a que se le entreguen las atrasadas.
+
+        Args:
+            sink (callable): Función sink(readings) con una lista de Reading
+        """
+        self._sinks.append(sink)
+
+    def _create_router(self):
+        """
+        Compila las suscripciones en un enrutador de topics.
+
+        - <topic>: mensaje agregado con todos los sensores
+        - casa/<habitación>/sensores: mensaje agregado de la habitación
+        - casa/<habitación>/sensores/<sensor_id>: valor de un único sensor
+
+        Solo se enruta la habitación de device_topic: las lecturas se indexan
+        por sensor, así que dos habitaciones con "Temperatura" se mezclarían
+        en una sola serie del historial, los agregados y las alertas.
+
+        Raises:
+            ValueError: Si device_topic tiene comodines antes de "/#"
+        """
+        router = TopicRouter()
+        router.subscribe(self.config["topic"], decode_payload)
+
+        device_topic = self.config.get("device_topic")
+        if device_topic:
+            # "casa/salon/sensores/#" -> prefijo "casa/salon/sensores"
+            prefix = device_topic[:-2] if device_topic.endswith("/#") else device_topic
+            if "+" in prefix or "#" in prefix:
+                raise ValueError(f"device_topic debe indicar una sola habitación: '{device_topic}'")
+            router.subscribe(prefix, decode_payload)
+            for sensor_id in SENSORS:
+                router.subscribe(f"{prefix}/{sensor_id}", partial(decode_scalar, sensor_id))
+
+        return router
+
+    def _create_client(self):
+        """Crea el cliente paho (API de callbacks versión 2)."""
+        client_id = self.config.get("client_id", "")
+        # Sin identificador no hay sesión persistente que recuperar
+        options = {"client_id": client_id, "clean_session": not client_id}
+
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, **options)
+
+        if self.config.get("username"):
+            client.username_pw_set(self.config["username"], self.config.get("password"))
+
+        # Reconexión automática con espera exponencial (la gestiona el hilo de paho)
+        client.reconnect_delay_set(
+            min_delay=INGESTION_CONFIG["reconnect_min_delay"],
+            max_delay=INGESTION_CONFIG["reconnect_max_delay"]
+        )
+
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        return client
+
+    def connect(self):
+        """
+        Inicia la conexión con el broker sin bloquear.
+
+        La conexión y las reconexiones posteriores (con espera exponencial
+        entre reconnect_min_delay y reconnect_max_delay) se hacen en el hilo
+        de red de paho, de modo que un broker caído no bloquea la interfaz.
+        """
+        self._client.connect_async(
+            self.config["broker"],
+            self.config["port"],
+            self.config.get("keepalive", 60)
+        )
+        self.start_dispatcher()
+        self._client.loop_start()
+
+    def disconnect(self):
+        """Detiene los hilos y cierra la conexión con el broker."""
+        self._stop_event.set()
+        self._client.loop_stop()
+        self._client.disconnect()
+
+        if self._dispatch_thread is not None:
+            self._dispatch_thread.join(timeout=1.0)
+            self._dispatch_thread = None
+
+    def start_dispatcher(self):
+        """
+        Arranca el hilo que agrupa las lecturas por frame.
+
+        connect() lo llama automáticamente; llamarlo directamente permite
+        alimentar el cliente con handle_message() sin broker.
+        """
+        if self._dispatch_thread is not None and self._dispatch_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._dispatch_thread = threading.Thread(
+            target=self._dispatch_loop,
+            name="mqtt-dispatch",
+            daemon=True
+        )
+        self._dispatch_thread.start()
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        """Suscribe al topic configurado una vez establecida la conexión."""
+        if not reason_code.is_failure:
+            with self._catchup_lock:
+                self._connected_at = time.time()
+                self._last_backlog = time.monotonic()
+                self._catchup_deadline = self._last_backlog + self._backlog_window
+                self._catching_up = True
+            self._connects += 1
+
+            topics = [self.config["topic"]]
+            if self.config.get("device_topic"):
+                topics.append(self.config["device_topic"])
+            logger.info(f"Conectado al broker MQTT, suscribiendo a {', '.join(topics)}")
+            qos = self.config.get("qos", 0)
+            client.subscribe([(topic, qos) for topic in topics])
+        else:
+            logger.error(f"Conexión MQTT rechazada ({reason_code})")
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties):
+        """Registra la desconexión del broker (paho reintenta por su cuenta)."""
+        self._disconnects += 1
+        if reason_code != 0:
+            logger.warning(f"Desconexión inesperada del broker MQTT ({reason_code})")
+
+    def _on_message(self, client, userdata, message):
+        """
+        Decodifica un mensaje en el hilo de red y lo encola.
+
+        Args:
+            client: Cliente paho
+            userdata: Datos de usuario de paho
+            message (MQTTMessage): Mensaje recibido
+        """
+        self.handle_message(message.topic, message.payload)
+
+    def handle_message(self, topic, payload):
+        """
+        Decodifica un mensaje y lo encola, como si llegara del broker.
+
+        Args:
+            topic (str): Topic del mensaje
+            payload (bytes): Contenido del mensaje
+        """
+        received = time.time()
+        self._messages_received += 1
+
+        decoders = self.router.resolve(topic)
+        if not decoders:
+            self._unrouted_messages += 1
+            return
+
+        if is_binary(payload):
+            self._binary_messages += 1
+
+        try:
+            if len(decoders) == 1:
+                readings = decoders[0](payload, received)
+            else:
+                readings = []
+                for decoder in decoders:
+                    readings.extend(decoder(payload, received))
+        except (ValueError, TypeError) as e:
+            self._decode_errors += 1
+            logger.debug(f"Mensaje descartado en {topic}: {e}")
+            return
+
+        if not readings:
+            return
+
+        self._readings_decoded += len(readings)
+
+        # Las entregas repetidas de QoS 1 no deben llegar al historial ni a la UI
+        readings = self.sequence_tracker.observe(topic, readings)
+        if not readings:
+            return
+
+        # Durante la puesta al día, lo publicado antes de la conexión es una
+        # lectura atrasada y no va a la UI
+        if self._catching_up and readings[0].timestamp < self._connected_at - self._backlog_tolerance:
+            self.offline_buffer.extend(readings)
+            self._last_backlog = time.monotonic()
+            return
+
+        self.enqueue(readings)
+
+    def enqueue(self, readings):
+        """
+        Encola las lecturas de un mensaje; si la cola está llena se descartan.
+
+        Args:
+            readings (list[Reading]): Lecturas decodificadas de un mensaje
+        """
+        try:
+            self._queue.put_nowait(readings)
+        except queue.Full:
+            with self._stats_lock:
+                self._messages_dropped += 1
+                self._readings_dropped += len(readings)
+            return
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+
+    def _dispatch_loop(self):
+        """Vacía la cola como máximo una vez por frame y emite un lote."""
+        while not self._stop_event.is_set():
+            # Con lecturas atrasadas pendientes, revisar en cada frame si ya terminó la puesta al día
+            # Lo mismo con lecturas esperando a que la interfaz consuma el lote anterior
+            pending = self._catching_up or len(self.ui_buffer)
+            timeout = self.frame_interval if pending else 0.5
+            try:
+                first = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._emit_pending()
+                self._flush_backlog()
+                continue
+
+            # Esperar al siguiente frame para acumular el resto de la ráfaga
+            wait = self._last_emit + self.frame_interval - time.monotonic()
+            if wait > 0:
+                self._stop_event.wait(wait)
+
+            batch = list(first)
+            while True:
+                try:
+                    batch.extend(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self._catching_up:
+                self._held.extend(batch)
+            else:
+                self._deliver_to_sinks(batch)
+            self.ui_buffer.put(batch)
+            self._emit_pending()
+            self._flush_backlog()
+
+    def _emit_pending(self):
+        """Emite las lecturas pendientes si la interfaz consumió el lote anterior."""
+        if not len(self.ui_buffer):
+            return
+        if self._ui_busy.is_set():
+            self._ui_waits += 1
+            return
+
+        batch = self.ui_buffer.take()
+        self._last_emit = time.monotonic()
+        self._batches_emitted += 1
+        self._readings_emitted += len(batch)
+        if len(batch) > self._max_batch_size:
+            self._max_batch_size = len(batch)
+
+        self._ui_busy.set()
+        self.batch_ready.emit(batch)
+
+    def _on_batch_consumed(self, batch):
+        """Marca el lote como consumido (hilo de Qt) para permitir el siguiente."""
+        self._ui_busy.clear()
+
+    def _deliver_to_sinks(self, readings):
+        """Entrega un lote completo a los consumidores registrados con add_sink()."""
+        for sink in self._sinks:
+            try:
+                sink(readings)
+            except Exception as e:
+                logger.error(f"Error en el consumidor de lecturas {sink!r}: {e}")
+
+    def _flush_backlog(self):
+        """
+        Termina la puesta al día cuando dejan de llegar lecturas atrasadas.
+
+        Entrega a los consumidores las atrasadas en un único lote ordenado
+        por tiempo y después las lecturas en vivo retenidas mientras tanto.
+        """
+        with self._catchup_lock:
+            if not self._catching_up:
+                return
+            now = time.monotonic()
+            if now - self._last_backlog < self._backlog_idle and now < self._catchup_deadline:
+                return
+            self._catching_up = False
+
+        backlog = self.offline_buffer.drain()
+        if backlog:
+            backlog.sort(key=lambda reading: reading.timestamp)
+            self._backlog_batches += 1
+            logger.info(f"Entregando {len(backlog)} lecturas atrasadas tras la reconexión")
+            self._deliver_to_sinks(backlog)
+            self.backlog_ready.emit(backlog)
+
+        held, self._held = self._held, []
+        if held:
+            self._deliver_to_sinks(held)
+
+    def get_stats(self):
+        """
+        Devuelve los contadores de la ingesta para dimensionar la cola.
+
+        Returns:
+            dict: Profundidad de la cola, descartes y tamaño de los lotes
+        """
+        with self._stats_lock:
+            messages_dropped = self._messages_dropped
+            readings_dropped = self._readings_dropped
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.queue_size,
+            "max_queue_depth": self._max_queue_depth,
+            "messages_received": self._messages_received,
+            "binary_messages": self._binary_messages,
+            "unrouted_messages": self._unrouted_messages,
+            "readings_decoded": self._readings_decoded,
+            "decode_errors": self._decode_errors,
+            "messages_dropped": messages_dropped,
+            "readings_dropped": readings_dropped,
+            "batches_emitted": self._batches_emitted,
+            "readings_emitted": self._readings_emitted,
+            "max_batch_size": self._max_batch_size,
+            "connects": self._connects,
+            "disconnects": self._disconnects,
+            "backlog_batches": self._backlog_batches,
+            "catching_up": self._catching_up,
+            "held_readings": len(self._held),
+            "ui_waits": self._ui_waits,
+            "ui_buffer": self.ui_buffer.get_stats(),
+            "offline_buffer": self.offline_buffer.get_stats(),
+            "sequence": self.sequence_tracker.get_stats(),
+        }
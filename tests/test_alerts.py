@@ -0,0 +1,117 @@
+"""
+Pruebas del motor de reglas de alerta.
+"""
+import math
+
+import pytest
+
+from analysis.alerts import AlertEngine, ChangeRule, DurationRule, LeqRule, MeanRule, Rule, build_rule
+from ingestion.reading import Reading
+
+
+def _feed(rule, samples):
+    """Evalúa (timestamp, valor) en orden y devuelve (activa, timestamp) de cada alerta."""
+    alerts = [rule.update(timestamp, value) for timestamp, value in samples]
+    return [(alert.active, alert.timestamp) for alert in alerts if alert is not None]
+
+
+def test_duration_rule_needs_the_whole_window():
+    rule = DurationRule("IAQ alta", "Calidad_Aire", ">", 150, 600, hysteresis=10)
+    assert _feed(rule, [(0, 200), (300, 200), (599, 200)]) == []
+    assert _feed(rule, [(600, 200)]) == [(True, 600)]
+    # Activa: solo se resuelve al bajar del umbral menos la histéresis
+    assert _feed(rule, [(700, 145), (800, 140)]) == [(False, 800)]
+
+
+def test_duration_rule_restarts_after_an_interruption():
+    rule = DurationRule("IAQ alta", "Calidad_Aire", ">", 150, 600)
+    assert _feed(rule, [(0, 200), (300, 100), (600, 200), (900, 200)]) == []
+    assert _feed(rule, [(1200, 200)]) == [(True, 1200)]
+
+
+def test_change_rule_falling():
+    rule = ChangeRule("Caída de presión", "Presión", "<", -3.0, 100, hysteresis=1.0)
+    samples = [(0, 1013.0), (50, 1012.0), (90, 1009.5)]
+    assert _feed(rule, samples) == [(True, 90)]
+    # En t=110 el máximo de 1013 ya salió de la ventana (-2.2): sigue activa por la histéresis
+    assert _feed(rule, [(110, 1009.8)]) == []
+    assert _feed(rule, [(120, 1010.0)]) == [(False, 120)]
+
+
+def test_change_rule_rising_evicts_old_minimum():
+    rule = ChangeRule("Subida de temperatura", "Temperatura", ">", 5.0, 60)
+    # Sin expulsar el mínimo de t=0 la subida sería de 6
+    assert _feed(rule, [(0, 20.0), (30, 24.0), (61, 26.0)]) == []
+    assert _feed(rule, [(70, 30.0)]) == [(True, 70)]
+
+
+def test_mean_rule_window_and_hysteresis():
+    rule = MeanRule("Humedad media", "Humedad", ">", 50, 100, hysteresis=2)
+    # Hasta cubrir el 90 % de la ventana no se evalúa
+    assert _feed(rule, [(t, 60.0) for t in range(0, 90, 10)]) == []
+    assert _feed(rule, [(90, 60.0)]) == [(True, 90)]
+
+    # Las lecturas de 60 salen de la ventana al entrar las de 40: en t=150 la
+    # media es 49.1 (por debajo del umbral pero no del de resolución, 48)
+    assert _feed(rule, [(t, 40.0) for t in range(100, 160, 10)]) == []
+    alert = rule.update(160, 40.0)
+    assert not alert.active
+    assert alert.value == pytest.approx((4 * 60 + 7 * 40) / 11)
+
+
+def test_late_readings_are_ignored():
+    rule = MeanRule("Humedad media", "Humedad", ">", 50, 100)
+    _feed(rule, [(100, 40.0), (200, 40.0)])
+    assert rule.update(150, 99.0) is None
+    assert rule.late == 1
+
+
+def test_leq_rule_averages_energy():
+    rule = LeqRule("Ruido continuo", "Ruido", ">", 65, 100)
+    alerts = [rule.update(t, 60.0 if t % 20 else 70.0) for t in range(0, 100, 10)]
+    # La media aritmética sería 65; la energética es 10·log10((10^6 + 10^7) / 2)
+    assert alerts[-1].active
+    assert alerts[-1].value == pytest.approx(10 * math.log10(5.5e6))
+    assert alerts[:-1] == [None] * 9
+
+
+def test_engine_routes_by_sensor_and_notifies():
+    engine = AlertEngine(rules=[
+        {"name": "IAQ alta", "sensor": "Calidad_Aire", "type": "duration", "op": ">", "threshold": 150, "window_s": 0},
+        {"name": "Ruido alto", "sensor": "Ruido", "type": "duration", "op": ">", "threshold": 80, "window_s": 0},
+    ])
+    received = []
+    engine.add_listener(received.append)
+
+    alerts = engine.extend([
+        Reading("Calidad_Aire", 200.0, 1.0, 1.0),
+        Reading("Ruido", 50.0, 1.0, 1.0),
+        Reading("Humedad", 99.0, 1.0, 1.0),
+    ])
+    assert [(a.rule, a.active) for a in alerts] == [("IAQ alta", True)]
+    assert received == alerts
+    assert engine.active() == ["IAQ alta"]
+
+    stats = engine.get_stats()
+    assert stats["evaluations"] == 2
+    assert stats["raised"] == 1
+
+
+@pytest.mark.parametrize("spec", [
+    {"name": "x", "sensor": "Ruido", "type": "media", "op": ">", "threshold": 1, "window_s": 1},
+    {"name": "x", "sensor": "Ruido", "type": "mean", "op": "!=", "threshold": 1, "window_s": 1},
+])
+def test_invalid_rules(spec):
+    with pytest.raises(ValueError):
+        build_rule(spec)
+
+
+def test_base_rule_needs_a_metric():
+    with pytest.raises(TypeError):
+        Rule("x", "Ruido", ">", 1, 1)
+
+    class Incomplete(Rule):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("x", "Ruido", ">", 1, 1)
@@ -0,0 +1,119 @@
+"""
+Pruebas del detector de anomalías EWMA.
+"""
+import numpy as np
+import pytest
+
+from analysis.anomaly import INITIAL_CAPACITY, SPIKE_RULE, STUCK_RULE, AnomalyDetector
+from ingestion.reading import Reading
+
+
+def _detector(**kwargs):
+    options = dict(alpha=0.1, z_threshold=4.0, warmup=5, stuck_samples=4)
+    options.update(kwargs)
+    return AnomalyDetector(**options)
+
+
+def _readings(sensor_id, values, start=0):
+    return [Reading(sensor_id, float(v), float(start + t), float(start + t)) for t, v in enumerate(values)]
+
+
+def _ewma(values, alpha):
+    """EWMA de referencia, lectura a lectura."""
+    mean, var = values[0], 0.0
+    for value in values[1:]:
+        diff = value - mean
+        mean += alpha * diff
+        var = (1 - alpha) * (var + alpha * diff * diff)
+    return mean, var
+
+
+def test_ewma_matches_the_reference():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 2, 40)
+    detector = _detector()
+    detector.extend(_readings("Humedad", values))
+
+    mean, var = _ewma(values, 0.1)
+    state = detector.state("Humedad")
+    assert state["count"] == 40
+    assert state["mean"] == pytest.approx(mean)
+    assert state["std"] == pytest.approx(np.sqrt(var))
+
+
+def test_batch_rounds_match_reading_by_reading():
+    rng = np.random.default_rng(1)
+    readings = []
+    for t in range(60):
+        # Cada lote mezcla sensores con distinto número de lecturas
+        for sensor_id, n in (("Humedad", 3), ("Ruido", 1), ("Presión", 2)):
+            readings += _readings(sensor_id, rng.normal(50, 3, n), start=t)
+    readings += _readings("Ruido", [500.0], start=61)
+
+    batched, single = _detector(), _detector()
+    batched_alerts = []
+    for i in range(0, len(readings), 25):
+        batched_alerts += batched.extend(readings[i:i + 25])
+    single_alerts = []
+    for reading in readings:
+        single_alerts += single.extend([reading])
+
+    for sensor_id in ("Humedad", "Ruido", "Presión"):
+        assert batched.state(sensor_id) == pytest.approx(single.state(sensor_id))
+    key = lambda a: (a.timestamp, a.sensor_id, a.rule, a.active)
+    assert sorted(batched_alerts, key=key) == sorted(single_alerts, key=key)
+    last = batched_alerts[-1]
+    assert (last.rule, last.sensor_id, last.active, last.timestamp) == (SPIKE_RULE, "Ruido", True, 61.0)
+
+
+def test_non_finite_readings_are_skipped():
+    detector = _detector()
+    detector.extend(_readings("Ruido", [50.0, 51.0, 49.0]))
+    assert detector.extend(_readings("Ruido", [np.nan, np.inf], start=3)) == []
+
+    # La EWMA sigue siendo válida y detecta el pico siguiente
+    detector.extend(_readings("Ruido", [50.0, 50.5], start=5))
+    alerts = detector.extend(_readings("Ruido", [500.0], start=7))
+    assert [(alert.rule, alert.active) for alert in alerts] == [(SPIKE_RULE, True)]
+    assert np.isfinite(detector.state("Ruido")["mean"])
+    assert detector.state("Ruido")["count"] == 6
+    assert detector.get_stats()["invalid"] == 2
+
+
+def test_spike_starts_and_ends():
+    detector = _detector()
+    assert detector.extend(_readings("Ruido", [50, 51, 49, 50, 51, 50])) == []
+
+    alerts = detector.extend(_readings("Ruido", [80], start=6))
+    assert [(a.rule, a.active, a.timestamp) for a in alerts] == [(SPIKE_RULE, True, 6.0)]
+    assert alerts[0].value > 4.0
+
+    alerts = detector.extend(_readings("Ruido", [50], start=7))
+    assert [(a.rule, a.active) for a in alerts] == [(SPIKE_RULE, False)]
+
+
+def test_no_spikes_during_warmup():
+    detector = _detector(warmup=10)
+    assert detector.extend(_readings("Ruido", [50, 50, 50, 90, 50])) == []
+
+
+def test_stuck_value():
+    detector = _detector()
+    alerts = detector.extend(_readings("Humedad", [45, 45, 45, 45]))
+    assert [(a.rule, a.active, a.timestamp) for a in alerts] == [(STUCK_RULE, True, 3.0)]
+
+    alerts = detector.extend(_readings("Humedad", [45.5], start=4))
+    assert [(a.rule, a.active) for a in alerts] == [(STUCK_RULE, False)]
+    assert detector.get_stats()["stuck"] == 1
+
+
+def test_arrays_grow_and_keep_state():
+    detector = _detector()
+    detector.extend(_readings("Humedad", [40, 42]))
+    detector.extend([Reading(f"s{i}", 1.0, 0.0, 0.0) for i in range(INITIAL_CAPACITY + 10)])
+
+    assert detector.get_stats()["sensors"] == INITIAL_CAPACITY + 11
+    assert detector.state("Humedad")["mean"] == pytest.approx(40.2)
+    assert detector.state("Humedad")["count"] == 2
+    assert detector.state("otro") is None
+    assert detector.extend([]) == []
@@ -0,0 +1,87 @@
+"""
+Pruebas del buffer de contrapresión hacia la interfaz.
+"""
+import pytest
+
+from ingestion.backpressure import READING_COST, UIBuffer
+from ingestion.reading import Reading
+
+SENSOR_IDS = ("Temperatura", "Humedad", "Presión", "Calidad_Aire", "Ruido")
+
+
+def _readings(count, start=0):
+    """Lecturas numeradas: el valor y el instante son su posición."""
+    return [Reading(SENSOR_IDS[i % len(SENSOR_IDS)], float(i), float(i), float(i)) for i in range(start, start + count)]
+
+
+def _buffer(policy, capacity):
+    return UIBuffer(policy, capacity_bytes=capacity * READING_COST)
+
+
+def test_byte_budget_sets_the_capacity():
+    assert UIBuffer("drop_oldest", capacity_bytes=10 * READING_COST + READING_COST - 1).capacity == 10
+    # Un presupuesto menor que una lectura deja sitio para una
+    assert UIBuffer("drop_oldest", capacity_bytes=1).capacity == 1
+    assert _buffer("coalesce", 4).get_stats()["capacity_bytes"] == 4 * READING_COST
+
+
+def test_drop_oldest_keeps_the_latest():
+    buffer = _buffer("drop_oldest", 4)
+    buffer.put(_readings(3))
+    buffer.put(_readings(4, start=3))
+
+    assert [r.value for r in buffer.take()] == [3.0, 4.0, 5.0, 6.0]
+    stats = buffer.get_stats()
+    assert (stats["accepted"], stats["dropped_oldest"], stats["delivered"], stats["max_pending"]) == (7, 3, 4, 4)
+    assert stats["pending"] == 0
+
+
+def test_drop_newest_keeps_the_pending():
+    buffer = _buffer("drop_newest", 4)
+    buffer.put(_readings(3))
+    buffer.put(_readings(4, start=3))
+    buffer.put(_readings(2, start=7))
+
+    assert [r.value for r in buffer.take()] == [0.0, 1.0, 2.0, 3.0]
+    stats = buffer.get_stats()
+    assert (stats["accepted"], stats["dropped_newest"], stats["delivered"]) == (4, 5, 4)
+
+    # Tras entregar vuelve a haber sitio
+    buffer.put(_readings(1, start=9))
+    assert [r.value for r in buffer.take()] == [9.0]
+
+
+def test_coalesce_keeps_the_last_reading_per_sensor():
+    buffer = _buffer("coalesce", 10)
+    buffer.put(_readings(12))
+
+    taken = {r.sensor_id: r.value for r in buffer.take()}
+    assert taken == {"Temperatura": 10.0, "Humedad": 11.0, "Presión": 7.0, "Calidad_Aire": 8.0, "Ruido": 9.0}
+    stats = buffer.get_stats()
+    assert (stats["accepted"], stats["coalesced"], stats["dropped_newest"], stats["max_pending"]) == (12, 7, 0, 5)
+
+
+def test_coalesce_capacity_rejects_new_sensors_only():
+    buffer = _buffer("coalesce", 2)
+    buffer.put(_readings(3))
+    # Los sensores ya pendientes se siguen actualizando
+    buffer.put([Reading("Temperatura", 99.0, 5.0, 5.0)])
+
+    assert {r.sensor_id: r.value for r in buffer.take()} == {"Temperatura": 99.0, "Humedad": 1.0}
+    assert buffer.get_stats()["dropped_newest"] == 1
+    assert buffer.get_stats()["coalesced"] == 1
+
+
+@pytest.mark.parametrize("policy", ["drop_oldest", "drop_newest", "coalesce"])
+def test_take_empties_the_buffer(policy):
+    buffer = _buffer(policy, 8)
+    assert buffer.take() == []
+    buffer.put(_readings(2))
+    assert len(buffer) == 2
+    assert len(buffer.take()) == 2
+    assert len(buffer) == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        UIBuffer("drop_random")
@@ -0,0 +1,116 @@
+"""
+Pruebas del clasificador de estados (bordes, histéresis y antirrebote).
+"""
+import numpy as np
+import pytest
+
+from analysis.classifier import DEFAULT_BAND, BandClassifier, Classifier
+
+BANDS = [(10, "A", "#a"), (20, "B", "#b", True), (None, "C", "#c")]
+
+
+def _states(classifier, values):
+    """Estado confirmado y si ha cambiado tras cada lectura."""
+    return [(band.state, changed) for band, changed in map(classifier.update, values)]
+
+
+@pytest.mark.parametrize("sensor_id, value, state", [
+    ("Temperatura", 19.9, "Frío"),
+    ("Temperatura", 20, "Normal"),
+    ("Temperatura", 25, "Normal"),
+    ("Temperatura", 25.1, "Cálido"),
+    ("Temperatura", 28, "Cálido"),
+    ("Temperatura", 28.1, "Calor"),
+    ("Humedad", 30, "Normal"),
+    ("Humedad", 50, "Normal"),
+    ("Humedad", 60, "Húmedo"),
+    ("Humedad", 60.1, "Muy húmedo"),
+    ("Presión", 1000, "Normal"),
+    ("Presión", 1015, "Normal"),
+    ("Presión", 1015.1, "Alta"),
+    ("Calidad_Aire", 50, "Buena"),
+    ("Calidad_Aire", 300, "Peligrosa"),
+    ("Ruido", 60, "Moderado"),
+])
+def test_baseline_band_edges(sensor_id, value, state):
+    classifier = Classifier(debounce=1)
+    assert classifier.band(sensor_id, value).state == state
+
+
+def test_single_series_and_batch_agree():
+    classifier = Classifier(debounce=1)
+    rng = np.random.default_rng(0)
+    sensor_ids = list(classifier.status) * 200
+    values = [rng.choice([20, 25, 28, 30, 50, 60, 1000, 1015, 50, 100, 60, 80]) + rng.normal() * 3
+              for _ in sensor_ids]
+
+    expected = [classifier.band(s, v).index for s, v in zip(sensor_ids, values)]
+    assert classifier.classify_batch(sensor_ids, values).tolist() == expected
+    for sensor_id in classifier.status:
+        own = [v for s, v in zip(sensor_ids, values) if s == sensor_id]
+        assert classifier[sensor_id].classify_many(own).tolist() == [classifier.band(sensor_id, v).index for v in own]
+
+
+def test_hysteresis():
+    classifier = BandClassifier(BANDS, hysteresis=1.0)
+    assert _states(classifier, [5, 10.5, 10.9, 11]) == [
+        ("A", True), ("A", False), ("A", False), ("B", True),
+    ]
+    # Para volver hay que bajar del límite más que la histéresis
+    assert _states(classifier, [9.5, 9, 8.9]) == [("B", False), ("B", False), ("A", True)]
+
+
+def test_hysteresis_on_included_limit():
+    classifier = BandClassifier(BANDS, hysteresis=1.0)
+    classifier.update(15)
+    # 20 pertenece a B: 21 todavía no supera el límite en más de la histéresis
+    assert _states(classifier, [21, 21.1]) == [("B", False), ("C", True)]
+
+
+def test_debounce():
+    classifier = BandClassifier(BANDS, debounce=3)
+    classifier.update(5)
+    # Una lectura dentro de la banda actual reinicia la cuenta
+    assert _states(classifier, [15, 15, 5, 15, 15]) == [("A", False)] * 5
+    assert _states(classifier, [15]) == [("B", True)]
+
+
+def test_debounce_counts_the_same_candidate():
+    classifier = BandClassifier(BANDS, debounce=2)
+    classifier.update(5)
+    # Cambiar de candidato (C -> B) empieza la cuenta de nuevo
+    assert _states(classifier, [25, 15, 15]) == [("A", False), ("A", False), ("B", True)]
+
+
+def test_reset():
+    classifier = BandClassifier(BANDS, hysteresis=5.0, debounce=3)
+    classifier.update(5)
+    classifier.reset()
+    assert _states(classifier, [25]) == [("C", True)]
+
+
+def test_update_many_reports_changes_only():
+    classifier = Classifier(debounce=1)
+    assert set(classifier.update_many({"Temperatura": 22, "Humedad": 45, "Otro": 1})) == {"Temperatura", "Humedad"}
+    changed = classifier.update_many({"Temperatura": 22.2, "Humedad": 70})
+    assert {s: b.state for s, b in changed.items()} == {"Humedad": "Muy húmedo"}
+
+
+def test_levels():
+    classifier = Classifier(sensors={
+        "Ruido": {"warning_threshold": 60, "critical_threshold": 80},
+        "Otro": {},
+    })
+    assert [classifier.level("Ruido", v).state for v in (59, 60, 80)] == ["Normal", "Aviso", "Crítico"]
+    assert classifier.level("Otro", 1) is DEFAULT_BAND
+    assert "Ruido" not in classifier
+
+
+@pytest.mark.parametrize("bands", [
+    [],
+    [(10, "A", "#a")],
+    [(20, "A", "#a"), (10, "B", "#b"), (None, "C", "#c")],
+])
+def test_invalid_bands(bands):
+    with pytest.raises(ValueError):
+        BandClassifier(bands)
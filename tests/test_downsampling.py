@@ -0,0 +1,86 @@
+"""
+Pruebas de la reducción LTTB y de su caché incremental.
+"""
+import numpy as np
+
+from history.downsampling import Downsampler, lttb
+from history.sensor_history import SensorHistory
+from ingestion.reading import Reading
+
+
+def _history(values, start=0):
+    history = SensorHistory(sensor_ids=["Ruido"], capacity=5000)
+    _append(history, values, start)
+    return history
+
+
+def _append(history, values, start):
+    history.extend([Reading("Ruido", float(v), float(start + t), float(start + t)) for t, v in enumerate(values)])
+
+
+def test_lttb_short_series_are_copied():
+    x = np.arange(5.0)
+    rx, ry = lttb(x, x * 2, 5)
+    assert rx.tolist() == x.tolist()
+    assert ry.tolist() == (x * 2).tolist()
+    assert rx is not x
+    # Con menos de 3 puntos no se reduce
+    assert len(lttb(x, x, 2)[0]) == 5
+
+
+def test_lttb_keeps_ends_and_peaks():
+    y = np.zeros(10)
+    y[3] = 10.0
+    rx, ry = lttb(np.arange(10.0), y, 4)
+    # Cubetas [1, 5) y [5, 9): el pico gana la primera, el punto más alejado
+    # de la recta hacia el último punto gana la segunda
+    assert rx.tolist() == [0.0, 3.0, 5.0, 9.0]
+    assert ry.tolist() == [0.0, 10.0, 0.0, 0.0]
+
+
+def test_lttb_output_size():
+    rng = np.random.default_rng(0)
+    x = np.arange(10000.0)
+    rx, ry = lttb(x, rng.normal(size=10000), 300)
+    assert len(rx) == len(ry) == 300
+    assert np.all(np.diff(rx) > 0)
+
+
+def test_downsampler_window_and_width():
+    rng = np.random.default_rng(1)
+    downsampler = Downsampler(_history(rng.normal(50, 5, 1000)))
+    x, _ = downsampler.get("Ruido", 600, 50, now=999.0)
+    assert len(x) <= 50
+    assert x[0] >= 399.0
+    assert x[-1] == 999.0
+    assert np.all(np.diff(x) > 0)
+
+
+def test_downsampler_cache_hits_and_partial_updates():
+    rng = np.random.default_rng(1)
+    history = _history(rng.normal(50, 5, 1000))
+    downsampler = Downsampler(history)
+
+    first = downsampler.get("Ruido", 600, 50, now=999.0)
+    assert downsampler.get("Ruido", 600, 50, now=999.0) is first
+    assert downsampler.get_stats() == {"hits": 1, "partial": 0, "misses": 1, "entries": 1}
+
+    _append(history, rng.normal(50, 5, 30), 1000)
+    incremental = downsampler.get("Ruido", 600, 50, now=1029.0)
+    fresh = Downsampler(history).get("Ruido", 600, 50, now=1029.0)
+    assert downsampler.get_stats()["partial"] == 1
+
+    # Las cubetas cerradas no cambian: el resultado coincide con un cálculo
+    # completo salvo el primer punto, que en la caché se elige con el ancla
+    # de la cubeta anterior a la ventana
+    assert len(incremental[0]) == len(fresh[0])
+    assert incremental[0][1:].tolist() == fresh[0][1:].tolist()
+    assert incremental[1][1:].tolist() == fresh[1][1:].tolist()
+
+
+def test_downsampler_invalidate():
+    downsampler = Downsampler(_history(range(100)))
+    downsampler.get("Ruido", 60, 10, now=99.0)
+    downsampler.get("Ruido", 30, 10, now=99.0)
+    downsampler.invalidate("Ruido")
+    assert downsampler.get_stats()["entries"] == 0
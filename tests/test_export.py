@@ -0,0 +1,108 @@
+"""
+Pruebas de la exportación e importación masiva del historial.
+"""
+import time
+
+import numpy as np
+import pytest
+
+from history import export
+from history.export import (
+    import_chunks, is_binary, iter_history, read_binary, read_csv, write_binary, write_csv,
+)
+from history.mmap_store import MmapStore
+
+SENSORS = ["Humedad", "Ruido"]
+
+
+@pytest.fixture
+def chunk_size(monkeypatch):
+    """Bloques de 4 lecturas para cruzar sus límites con pocos datos."""
+    monkeypatch.setitem(export.HISTORY_CONFIG, "export_chunk_records", 4)
+    return 4
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Almacén con 10 lecturas de humedad y 5 de ruido, una por segundo (ayer a mediodía UTC)."""
+    base = (time.time() // 86400 - 1) * 86400 + 43200
+    store = MmapStore(str(tmp_path / "source"), sensor_ids=SENSORS)
+    store.load("Humedad", base + np.arange(10.0), 21.3 + np.arange(10.0))
+    store.load("Ruido", base + np.arange(5.0), np.full(5, 55.5))
+    # Los lectores solo ven los registros ya contados en disco
+    store.flush()
+    yield store, base
+    store.close()
+
+
+def _target(tmp_path):
+    return MmapStore(str(tmp_path / "target"), sensor_ids=SENSORS)
+
+
+def test_csv_round_trip_with_sensor_and_time_filters(tmp_path, chunk_size, source):
+    store, base = source
+    path = str(tmp_path / "humedad.csv")
+
+    chunks = list(iter_history(store, ["Humedad"], base + 2, base + 8))
+    assert [len(timestamps) for _, timestamps, _ in chunks] == [4, 3]
+    assert write_csv(iter(chunks), path) == 7
+
+    # Valores float32 con su representación corta
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "sensor_id,timestamp,value"
+    assert lines[1] == f"Humedad,{base + 2!r},23.3"
+
+    assert [len(timestamps) for _, timestamps, _ in read_csv(path)] == [4, 3]
+    target = _target(tmp_path)
+    assert import_chunks(target, read_csv(path)) == (7, 0)
+    target.flush()
+    timestamps, values = target.read("Humedad", base, base + 10)
+    target.close()
+    assert timestamps.tolist() == (base + np.arange(2.0, 9.0)).tolist()
+    assert values.tolist() == np.float32(21.3 + np.arange(2.0, 9.0)).tolist()
+
+
+def test_binary_round_trip_with_import_filters(tmp_path, chunk_size, source):
+    store, base = source
+    path = str(tmp_path / "todo.hexp")
+
+    assert write_binary(iter_history(store), path) == 15
+    assert is_binary(path)
+    blocks = [(sensor_id, len(timestamps)) for sensor_id, timestamps, _ in read_binary(path)]
+    assert blocks == [("Humedad", 4), ("Humedad", 4), ("Humedad", 2), ("Ruido", 4), ("Ruido", 1)]
+
+    # Solo el ruido, sin su primera lectura: se omiten 10 de humedad y 1 de ruido
+    target = _target(tmp_path)
+    assert import_chunks(target, read_binary(path), ["Ruido"], start=base + 1) == (4, 11)
+    target.flush()
+    timestamps, values = target.read("Ruido", base, base + 10)
+    assert timestamps.tolist() == (base + np.arange(1.0, 5.0)).tolist()
+    assert values.tolist() == [55.5] * 4
+    assert target.read("Humedad", base, base + 10)[0].tolist() == []
+    target.close()
+
+
+def test_csv_keeps_float64_values_exact(tmp_path):
+    path = str(tmp_path / "valores.csv")
+    chunks = [("Presión", np.array([1.0, 2.0]), np.array([1013.25, 1 / 3]))]
+    write_csv(chunks, path)
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read().splitlines()[1:] == ["Presión,1.0,1013.25", "Presión,2.0,0.3333333333333333"]
+    assert next(read_csv(path))[2].tolist() == [1013.25, 1 / 3]
+
+
+def test_invalid_files_are_rejected(tmp_path):
+    csv_path = tmp_path / "malo.csv"
+    csv_path.write_text("sensor_id,timestamp,value\nRuido,uno,2\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(read_csv(str(csv_path)))
+
+    binary_path = str(tmp_path / "truncado.hexp")
+    write_binary([("Ruido", np.array([1.0, 2.0]), np.array([3.0, 4.0]))], binary_path)
+    with open(binary_path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 1)
+    with pytest.raises(ValueError):
+        list(read_binary(binary_path))
+    assert not is_binary(str(csv_path))
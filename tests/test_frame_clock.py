@@ -0,0 +1,171 @@
+"""
+Pruebas del reloj de frames (sin bucle de eventos: los ticks se llaman a mano).
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from ui import frame_clock
+from ui.frame_clock import FrameClock
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    """QTimer necesita una aplicación de Qt (sin pantalla)."""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def now(monkeypatch):
+    """Reloj monótono falso del módulo: now[0] en segundos."""
+    now = [100.0]
+    monkeypatch.setattr(frame_clock, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _clock(idle_mode=True):
+    return FrameClock(tick_ms=10, idle_mode=idle_mode)
+
+
+def _recorder(calls, name, dirty=False):
+    """Función de frame que anota (nombre, dt) y devuelve si está sucia."""
+    def callback(dt):
+        calls.append((name, round(dt, 6)))
+        return dirty
+    return callback
+
+
+def _widget(updates):
+    """Widget falso: solo cuenta las llamadas a update()."""
+    return SimpleNamespace(
+        destroyed=SimpleNamespace(connect=lambda slot: None),
+        update=lambda: updates.append(1),
+    )
+
+
+def _interval(clock):
+    return clock._timer.interval() if clock._timer.isActive() else None
+
+
+def test_step_is_the_gcd_of_the_awake_intervals(now):
+    clock = _clock()
+    twenty = clock.register(20, lambda dt: False)
+    assert _interval(clock) == 20
+
+    thirty = clock.register(30, lambda dt: False)
+    assert _interval(clock) == 10
+
+    clock.unregister(thirty)
+    assert _interval(clock) == 20
+    clock.register(40, lambda dt: False)
+    assert _interval(clock) == 20
+
+    clock.unregister(twenty)
+    assert _interval(clock) == 40
+
+
+def test_clients_run_on_multiples_of_their_interval(now):
+    clock = _clock()
+    calls = []
+    clock.register(20, _recorder(calls, "20"))
+    clock.register(30, _recorder(calls, "30"))
+
+    for _ in range(7):
+        now[0] += 0.01
+        clock._tick()
+    ticks = [name for name, _ in calls]
+    assert ticks == ["20", "30", "20", "30", "20", "20", "30"]
+    # dt desde el frame anterior de cada cliente
+    assert calls[2] == ("20", 0.02) and calls[3] == ("30", 0.03)
+
+
+def test_only_dirty_widgets_are_updated(now):
+    clock = _clock()
+    updates = []
+    clock.register(10, lambda dt: True, _widget(updates))
+    clock.register(10, lambda dt: False, _widget(updates))
+    clock._tick()
+    assert len(updates) == 1
+    assert clock.get_stats()["updates"] == 1
+    assert clock.get_stats()["skipped"] == 1
+
+
+def test_sleep_stops_the_timer_and_wake_skips_the_slept_time(now):
+    clock = _clock()
+    calls = []
+    client = clock.register(20, _recorder(calls, "a"))
+
+    client.sleep()
+    assert _interval(clock) is None
+    clock._tick()
+    assert calls == []
+
+    now[0] += 5.0
+    client.wake()
+    assert _interval(clock) == 20
+    now[0] += 0.02
+    clock._tick()
+    assert calls == [("a", 0.02)]
+    assert clock.get_stats()["sleeps"] == 1
+    # register() cuenta como el primer despertar
+    assert clock.get_stats()["wakes"] == 2
+
+
+def test_sleep_has_no_effect_without_idle_mode(now):
+    clock = _clock(idle_mode=False)
+    client = clock.register(20, lambda dt: False)
+    client.sleep()
+    assert client.awake
+    assert _interval(clock) == 20
+
+
+def test_linger_sleeps_after_the_last_wake(now):
+    clock = _clock()
+    calls = []
+    client = clock.register(10, _recorder(calls, "a"), linger_s=1.0)
+
+    now[0] += 0.5
+    clock._tick()
+    assert client.awake
+
+    # Un wake() alarga el plazo desde ese momento
+    client.wake()
+    now[0] += 0.8
+    clock._tick()
+    assert client.awake
+
+    now[0] += 0.3
+    clock._tick()
+    assert not client.awake
+    assert len(calls) == 3
+    assert _interval(clock) is None
+
+
+def test_pause_needs_every_reason_resumed(now):
+    clock = _clock()
+    calls = []
+    clock.register(10, _recorder(calls, "a"))
+
+    clock.pause("hidden")
+    clock.pause("display")
+    assert _interval(clock) is None
+    assert clock.paused == {"hidden", "display"}
+
+    clock.resume("hidden")
+    clock.resume("unknown")
+    assert _interval(clock) is None
+
+    now[0] += 60.0
+    clock.resume("display")
+    assert _interval(clock) == 10
+    assert clock.get_stats()["paused"] == []
+
+    # El tiempo en pausa no cuenta como dt
+    now[0] += 0.01
+    clock._tick()
+    assert calls == [("a", 0.01)]
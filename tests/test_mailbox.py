@@ -0,0 +1,41 @@
+"""
+Pruebas del buzón de último valor por sensor.
+"""
+from ingestion.mailbox import SensorMailbox
+from ingestion.reading import Reading
+
+
+def _reading(sensor_id, value):
+    return Reading(sensor_id, value, 1.0, 1.0)
+
+
+def test_last_write_wins():
+    mailbox = SensorMailbox(sensor_ids=["Humedad", "Ruido"])
+    mailbox.post_many([_reading("Humedad", 40.0), _reading("Humedad", 41.0), _reading("Presión", 1.0)])
+    mailbox.post(_reading("Ruido", 50.0))
+
+    pending = mailbox.drain()
+    assert {sensor_id: reading.value for sensor_id, reading in pending.items()} == {"Humedad": 41.0, "Ruido": 50.0}
+    assert mailbox.drain() == {}
+
+    stats = mailbox.get_stats()
+    assert stats["superseded_by_sensor"] == {"Humedad": 1, "Ruido": 0}
+    assert stats["unknown_sensor"] == 1
+    assert stats["delivered"] == 2
+
+
+def test_on_post_fires_only_when_the_empty_mailbox_fills():
+    calls = []
+    mailbox = SensorMailbox(sensor_ids=["Humedad", "Ruido"], on_post=lambda: calls.append(1))
+
+    mailbox.post(_reading("Humedad", 40.0))
+    mailbox.post(_reading("Ruido", 50.0))
+    assert len(calls) == 1
+
+    # Solo sensores desconocidos: el buzón sigue vacío tras vaciarlo
+    mailbox.drain()
+    mailbox.post(_reading("Presión", 1.0))
+    assert len(calls) == 1
+
+    mailbox.post_many([_reading("Ruido", 51.0)])
+    assert len(calls) == 2
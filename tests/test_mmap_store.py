@@ -0,0 +1,168 @@
+"""
+Pruebas del historial en segmentos diarios mapeados en memoria.
+"""
+import os
+import struct
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from history import mmap_store
+from history.mmap_store import COUNT_OFFSET, HEADER, RECORD, MmapStore
+from ingestion.reading import Reading
+
+# Medianoche UTC de un día cualquiera
+DAY0 = 19675 * 86400
+GROWTH = 4
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj de pared falso del módulo (el día actual lo decide now[0])."""
+    now = [DAY0 + 3600.0]
+    monkeypatch.setattr(mmap_store, "time", SimpleNamespace(
+        time=lambda: now[0], monotonic=time.monotonic, strftime=time.strftime, gmtime=time.gmtime,
+    ))
+    monkeypatch.setitem(mmap_store.HISTORY_CONFIG, "segment_growth_records", GROWTH)
+    return now
+
+
+def _store(path, **kwargs):
+    return MmapStore(str(path), sensor_ids=["Humedad", "Ruido"], **kwargs)
+
+
+def _readings(timestamps, sensor_id="Humedad"):
+    return [Reading(sensor_id, 40.0 + i, float(t), float(t)) for i, t in enumerate(timestamps)]
+
+
+def _segment(path, day):
+    return os.path.join(str(path), "Humedad", day + ".seg")
+
+
+def _header_count(path):
+    with open(path, "rb") as f:
+        return HEADER.unpack(f.read(HEADER.size))[4]
+
+
+def test_append_close_and_reopen(tmp_path, clock):
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 + 1, DAY0 + 2, DAY0 + 3]))
+    store.close()
+
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 + 4, DAY0 + 5]))
+    store.close()
+
+    timestamps, values = _store(tmp_path).read("Humedad", DAY0, DAY0 + 10)
+    assert timestamps.tolist() == [DAY0 + t for t in (1, 2, 3, 4, 5)]
+    assert values.tolist() == [40.0, 41.0, 42.0, 40.0, 41.0]
+    assert _store(tmp_path).read("Ruido", DAY0, DAY0 + 10)[0].tolist() == []
+
+
+def test_segment_grows_in_blocks_and_is_trimmed_on_close(tmp_path, clock):
+    store = _store(tmp_path)
+    path = _segment(tmp_path, "2023-11-14")
+    for batch in range(3):
+        store.extend(_readings([DAY0 + batch * 10 + i for i in range(3)]))
+        store.flush()
+    # 9 registros con bloques de 4: el fichero ya ocupa 12
+    assert os.path.getsize(path) == HEADER.size + 12 * RECORD.itemsize
+    # Un lote mayor que el bloque crece lo necesario de una vez
+    store.extend(_readings([DAY0 + 100 + i for i in range(10)]))
+    store.close()
+
+    assert os.path.getsize(path) == HEADER.size + 19 * RECORD.itemsize
+    assert len(_store(tmp_path).read("Humedad", DAY0, DAY0 + 200)[0]) == 19
+
+
+def test_count_is_written_only_after_flush(tmp_path, clock):
+    store = _store(tmp_path)
+    path = _segment(tmp_path, "2023-11-14")
+    store.extend(_readings([DAY0 + 1, DAY0 + 2]))
+    store.flush()
+    store.extend(_readings([DAY0 + 3, DAY0 + 4]))
+
+    # Los registros nuevos todavía no están contados: un corte aquí los pierde enteros
+    assert _header_count(path) == 2
+    assert len(_store(tmp_path).read("Humedad", DAY0, DAY0 + 10)[0]) == 2
+    store.flush()
+    assert _header_count(path) == 4
+
+
+def test_uncounted_records_are_overwritten_after_a_crash(tmp_path, clock):
+    crashed = _store(tmp_path)
+    crashed.extend(_readings([DAY0 + 1, DAY0 + 2]))
+    crashed.flush()
+    # Corte de luz: se escribieron registros pero el contador no llegó a disco
+    crashed.extend(_readings([DAY0 + 3, DAY0 + 4]))
+
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 + 10]))
+    store.close()
+    assert _store(tmp_path).read("Humedad", DAY0, DAY0 + 20)[0].tolist() == [DAY0 + 1, DAY0 + 2, DAY0 + 10]
+
+
+def test_count_beyond_the_file_is_clamped(tmp_path, clock):
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 + 1, DAY0 + 2]))
+    store.close()
+    path = _segment(tmp_path, "2023-11-14")
+    with open(path, "r+b") as f:
+        f.seek(COUNT_OFFSET)
+        f.write(struct.pack("<Q", 1000))
+
+    assert len(_store(tmp_path).read("Humedad", DAY0, DAY0 + 10)[0]) == 2
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 + 3]))
+    store.close()
+    assert _store(tmp_path).read("Humedad", DAY0, DAY0 + 10)[0].tolist() == [DAY0 + 1, DAY0 + 2, DAY0 + 3]
+
+
+def test_day_rotation_closes_the_previous_day(tmp_path, clock):
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 + 86399]))
+    assert store.get_stats()["open_segments"] == 1
+
+    clock[0] = DAY0 + 86400 + 10
+    store.extend(_readings([DAY0 + 86400 + 5]))
+    assert store.get_stats()["open_segments"] == 1
+    assert store.days("Humedad") == ["2023-11-14", "2023-11-15"]
+    # El segmento de ayer quedó cerrado y recortado
+    assert os.path.getsize(_segment(tmp_path, "2023-11-14")) == HEADER.size + RECORD.itemsize
+    store.close()
+
+
+def test_retention_runs_on_open_and_on_day_change(tmp_path, clock):
+    store = _store(tmp_path)
+    store.extend(_readings([DAY0 - 5 * 86400, DAY0 - 2 * 86400, DAY0 + 1]))
+    store.close()
+    assert store.days("Humedad") == ["2023-11-09", "2023-11-12", "2023-11-14"]
+
+    # Al abrir se borra lo que supera la retención aunque no cambie el día
+    store = _store(tmp_path, retention_days=2)
+    assert store.days("Humedad") == ["2023-11-12", "2023-11-14"]
+    assert store.get_stats()["segments_deleted"] == 1
+
+    clock[0] = DAY0 + 86400 + 10
+    store.extend(_readings([DAY0 + 86400 + 5]))
+    assert store.days("Humedad") == ["2023-11-14", "2023-11-15"]
+    store.close()
+
+
+def test_read_range_across_segments(tmp_path, clock):
+    store = _store(tmp_path)
+    timestamps = [DAY0 - 20, DAY0 - 10, DAY0 + 10, DAY0 + 86400 + 10]
+    store.extend(_readings(timestamps))
+    # Lectura atrasada: el segmento queda marcado como desordenado
+    store.extend(_readings([DAY0 + 5], sensor_id="Humedad"))
+    store.close()
+
+    store = _store(tmp_path)
+    result, _ = store.read("Humedad", DAY0 - 15, DAY0 + 86400 + 10)
+    assert result.tolist() == [DAY0 - 10, DAY0 + 5, DAY0 + 10, DAY0 + 86400 + 10]
+
+    chunks = list(store.iter_range("Humedad", DAY0 - 100, DAY0 + 2 * 86400, chunk_size=2))
+    assert [len(t) for t, _ in chunks] == [2, 2, 1]
+    assert np.concatenate([t for t, _ in chunks]).tolist() == sorted(timestamps + [DAY0 + 5])
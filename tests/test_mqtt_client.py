@@ -0,0 +1,132 @@
+"""
+Pruebas de MQTTClient: enrutado por habitación y puesta al día tras una reconexión.
+"""
+import time
+
+import pytest
+
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.reasoncodes import ReasonCode
+
+from analysis.alerts import AlertEngine
+from history.sensor_history import SensorHistory
+from ingestion.payload import encode_json
+from config import MQTT_CONFIG
+from mqtt_client import MQTTClient
+
+TOPIC = "casa/sensores"
+CONNECTED = ReasonCode(PacketTypes.CONNACK, identifier=0)
+
+PRESSURE_DROP = {
+    "name": "Caída de presión",
+    "sensor": "Presión",
+    "type": "change",
+    "op": "<",
+    "threshold": -3.0,
+    "window_s": 3600,
+}
+
+
+def _wait_until(condition, timeout=3.0):
+    """Espera a que se cumpla una condición (False si vence el plazo)."""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _client():
+    """Cliente sin broker con la puesta al día acortada para las pruebas."""
+    client = MQTTClient()
+    client._backlog_idle = 0.1
+    return client
+
+
+def test_backlog_behind_live_readings_reaches_history_and_alerts():
+    client = _client()
+    history = SensorHistory()
+    engine = AlertEngine(rules=[PRESSURE_DROP])
+    client.add_sink(history.extend)
+    client.add_sink(engine.extend)
+    client.start_dispatcher()
+    try:
+        client._on_connect(client._client, None, None, CONNECTED, None)
+        now = time.time()
+
+        # La lectura en vivo llega antes que lo que el broker guardó sin conexión
+        client.handle_message(TOPIC, encode_json({"Presión": 1008.0}, now))
+        for i in range(10):
+            client.handle_message(TOPIC, encode_json({"Presión": 1015.0 - i * 0.1}, now - 600 + i * 30))
+
+        assert _wait_until(lambda: not client.get_stats()["catching_up"])
+    finally:
+        client.disconnect()
+
+    timestamps, values = history.series("Presión").last_n(11)
+    assert len(timestamps) == 11
+    assert list(timestamps) == sorted(timestamps)
+    assert values[-1] == 1008.0
+    assert history.get_stats()["Presión"]["out_of_order"] == 0
+
+    # La caída de 7 hPa solo se ve con las lecturas atrasadas
+    assert engine.get_stats()["late"] == 0
+    assert engine.active() == ["Caída de presión"]
+    assert client.get_stats()["backlog_batches"] == 1
+
+
+def test_live_readings_are_not_held_without_reconnect():
+    client = _client()
+    history = SensorHistory()
+    client.add_sink(history.extend)
+    client.start_dispatcher()
+    try:
+        client.handle_message(TOPIC, encode_json({"Presión": 1010.0}, time.time()))
+        assert _wait_until(lambda: len(history.series("Presión")) == 1)
+    finally:
+        client.disconnect()
+
+
+def test_lagging_device_clock_is_backlog_only_during_catch_up():
+    client = _client()
+    client._backlog_window = 0.3
+    client.start_dispatcher()
+    try:
+        client._on_connect(client._client, None, None, CONNECTED, None)
+        # Reloj del dispositivo 60 s atrasado: atrasada solo durante la puesta al día
+        client.handle_message(TOPIC, encode_json({"Ruido": 40.0}, time.time() - 60))
+        assert len(client.offline_buffer) == 1
+
+        assert _wait_until(lambda: not client.get_stats()["catching_up"])
+        client.handle_message(TOPIC, encode_json({"Ruido": 41.0}, time.time() - 60))
+        assert len(client.offline_buffer) == 0
+        assert client.get_stats()["readings_decoded"] == 2
+    finally:
+        client.disconnect()
+
+
+def test_only_the_configured_room_reaches_the_sinks():
+    client = _client()
+    history = SensorHistory()
+    client.add_sink(history.extend)
+    client.start_dispatcher()
+    try:
+        now = time.time()
+        client.handle_message("casa/salon/sensores/Temperatura", b"21.5")
+        client.handle_message("casa/salon/sensores", encode_json({"Humedad": 45.0}, now))
+        # Otra habitación con los mismos sensores no se mezcla en sus series
+        client.handle_message("casa/cocina/sensores/Temperatura", b"30.0")
+        client.handle_message("casa/cocina/sensores", encode_json({"Humedad": 80.0}, now))
+        assert _wait_until(lambda: len(history.series("Humedad")) == 1)
+    finally:
+        client.disconnect()
+
+    assert history.last_value("Temperatura") == 21.5
+    assert history.last_value("Humedad") == 45.0
+    assert client.get_stats()["unrouted_messages"] == 2
+
+
+def test_device_topic_with_room_wildcard_is_rejected():
+    with pytest.raises(ValueError):
+        MQTTClient(config=dict(MQTT_CONFIG, device_topic="casa/+/sensores/#"))
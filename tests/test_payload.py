@@ -0,0 +1,82 @@
+"""
+Pruebas de los formatos de payload del topic de sensores.
+"""
+import math
+
+import pytest
+
+from ingestion.payload import (
+    BINARY_V1, BINARY_V2, decode_payload, decode_scalar, encode_binary, encode_json,
+)
+
+VALUES = {"Temperatura": 21.5, "Humedad": 48.0, "Presión": 1013.25, "Calidad_Aire": 120.0, "Ruido": 42.5}
+TIMESTAMP = 1700000000.5
+
+
+def _as_dict(readings):
+    return {reading.sensor_id: reading.value for reading in readings}
+
+
+def test_binary_v1_round_trip():
+    payload = encode_binary(VALUES, TIMESTAMP)
+    assert len(payload) == BINARY_V1.size
+    assert payload[2] == 1
+
+    readings = decode_payload(payload, TIMESTAMP + 0.2)
+    assert _as_dict(readings) == pytest.approx(VALUES)
+    assert {(r.timestamp, r.received, r.seq) for r in readings} == {(TIMESTAMP, TIMESTAMP + 0.2, None)}
+
+
+def test_binary_v2_carries_sequence():
+    payload = encode_binary(VALUES, TIMESTAMP, seq=7)
+    assert len(payload) == BINARY_V2.size
+    assert payload[2] == 2
+    assert {r.seq for r in decode_payload(payload, TIMESTAMP)} == {7}
+
+
+def test_binary_sequence_is_uint32():
+    payload = encode_binary(VALUES, TIMESTAMP, seq=(1 << 32) + 3)
+    assert {r.seq for r in decode_payload(payload, TIMESTAMP)} == {3}
+
+
+def test_binary_missing_sensors_are_skipped():
+    payload = encode_binary({"Humedad": 55.0, "Ruido": math.nan}, TIMESTAMP)
+    assert _as_dict(decode_payload(payload, TIMESTAMP)) == {"Humedad": 55.0}
+
+
+@pytest.mark.parametrize("payload", [
+    encode_binary(VALUES, TIMESTAMP)[:-1],
+    encode_binary(VALUES, TIMESTAMP, seq=1) + b"\x00",
+    b"HS\x03" + bytes(30),
+    b"HS",
+])
+def test_binary_invalid_size_or_version(payload):
+    with pytest.raises(ValueError):
+        decode_payload(payload, TIMESTAMP)
+
+
+def test_json_round_trip_with_and_without_sequence():
+    readings = decode_payload(encode_json({"Humedad": 48.0}, TIMESTAMP, seq=9), TIMESTAMP + 1)
+    assert readings[0][:] == ("Humedad", 48.0, TIMESTAMP, TIMESTAMP + 1, 9)
+
+    # Sin timestamp se usa el instante de recepción
+    readings = decode_payload(b'{"Ruido": 40}', TIMESTAMP)
+    assert readings[0][:] == ("Ruido", 40.0, TIMESTAMP, TIMESTAMP, None)
+
+
+def test_json_non_finite_values_are_skipped():
+    readings = decode_payload(b'{"Humedad": 48, "Ruido": NaN, "Presi\\u00f3n": Infinity}', TIMESTAMP)
+    assert _as_dict(readings) == {"Humedad": 48.0}
+
+
+def test_json_must_be_an_object():
+    with pytest.raises(ValueError):
+        decode_payload(b"[1, 2]", TIMESTAMP)
+
+
+def test_scalar_topic():
+    assert decode_scalar("Humedad", b"21.5", TIMESTAMP)[0][:] == ("Humedad", 21.5, TIMESTAMP, TIMESTAMP, None)
+    with pytest.raises(ValueError):
+        decode_scalar("Humedad", b"n/a", TIMESTAMP)
+    assert decode_scalar("Humedad", b"nan", TIMESTAMP) == []
+    assert decode_scalar("Humedad", b"-inf", TIMESTAMP) == []
@@ -0,0 +1,107 @@
+"""
+Pruebas de los agregados incrementales del historial.
+"""
+from history.rollups import RollupStore, RollupTier
+from ingestion.reading import Reading
+
+SENSORS = {"Humedad": {"min_value": 0, "max_value": 100}}
+TIERS = {"1s": (1, 4), "1m": (60, 3), "1h": (3600, 24)}
+
+
+def _store(path=None):
+    return RollupStore(path=path, tiers=TIERS, sensors=SENSORS)
+
+
+def _reading(timestamp, value):
+    return Reading("Humedad", value, timestamp, timestamp)
+
+
+def test_bucket_aggregates():
+    tier = RollupTier(10, 4, 0, 100)
+    for timestamp, value in ((0.0, 50.0), (3.0, 70.0), (9.5, 60.0), (12.0, 120.0)):
+        tier.add(timestamp, value)
+
+    result = tier.query(0, 20)
+    assert result["start"].tolist() == [0.0, 10.0]
+    assert result["min"].tolist() == [50.0, 120.0]
+    assert result["max"].tolist() == [70.0, 120.0]
+    assert result["mean"].tolist() == [60.0, 120.0]
+    assert result["count"].tolist() == [3.0, 1.0]
+    assert result["last"].tolist() == [60.0, 120.0]
+    assert result["out_of_range"].tolist() == [0.0, 1.0]
+
+
+def test_late_reading_lands_in_its_bucket():
+    tier = RollupTier(10, 4, 0, 100)
+    tier.add(25.0, 40.0)
+    tier.add(5.0, 10.0)
+    tier.add(4.0, 20.0)
+
+    result = tier.query(0, 30)
+    assert result["start"].tolist() == [0.0, 20.0]
+    assert result["count"].tolist() == [2.0, 1.0]
+    # "last" es la muestra más reciente por tiempo, no por llegada
+    assert result["last"].tolist() == [10.0, 40.0]
+
+
+def test_bucket_rotation_and_horizon():
+    tier = RollupTier(10, 4, 0, 100)
+    for bucket in range(6):
+        tier.add(bucket * 10.0, float(bucket))
+
+    # Solo quedan las 4 cubetas más recientes: las ranuras de 0 y 1 se reutilizaron
+    result = tier.query(0, 100)
+    assert result["start"].tolist() == [20.0, 30.0, 40.0, 50.0]
+    assert result["count"].tolist() == [1.0, 1.0, 1.0, 1.0]
+
+    # Una lectura fuera del horizonte se cuenta y no pisa la ranura
+    tier.add(15.0, 99.0)
+    assert tier.too_old == 1
+    assert tier.query(0, 100)["min"].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_store_feeds_every_tier():
+    store = _store()
+    store.extend([_reading(t, 50.0 + t % 2) for t in range(120)])
+    store.extend([Reading("Ruido", 40.0, 0.0, 0.0)])
+
+    assert store.query("Humedad", "1s", 0, 200)["count"].tolist() == [1.0] * 4
+    assert store.query("Humedad", "1m", 0, 200)["count"].tolist() == [60.0, 60.0]
+    assert store.query("Humedad", "1h", 0, 200)["mean"].tolist() == [50.5]
+    assert store.get_stats()["added"] == 120
+    assert store.get_stats()["unknown_sensor"] == 1
+
+
+def test_best_tier():
+    store = _store()
+    # 3 s: el nivel de 1 s lo cubre (4 s de horizonte) con 3 puntos
+    assert store.best_tier(0, 3, 300) == "1s"
+    # Pocos puntos permitidos: sube al siguiente nivel que cubre el rango
+    assert store.best_tier(0, 3, 2) == "1m"
+    # 2 min no caben en el nivel de 1 s ni 4 h en el de 1 min
+    assert store.best_tier(0, 120, 300) == "1m"
+    assert store.best_tier(0, 4 * 3600, 300) == "1h"
+    # Ningún nivel cumple: el más grueso
+    assert store.best_tier(0, 30 * 86400, 10) == "1h"
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "rollups.npz")
+    store = _store(path)
+    store.extend([_reading(t, float(t)) for t in range(0, 180, 10)])
+    store.save()
+
+    restored = _store(path)
+    assert restored.load() is True
+    expected = store.query("Humedad", "1m", 0, 200)
+    result = restored.query("Humedad", "1m", 0, 200)
+    assert result["mean"].tolist() == expected["mean"].tolist() == [25.0, 85.0, 145.0]
+
+    # La cubeta más reciente se conserva: una lectura antigua sigue siendo demasiado antigua
+    restored.extend([_reading(0.0, 1.0)])
+    assert restored.get_stats()["too_old"]["1s"] == 1
+
+
+def test_load_without_file(tmp_path):
+    assert _store(str(tmp_path / "missing.npz")).load() is False
+    assert _store().load() is False
@@ -0,0 +1,94 @@
+"""
+Pruebas del buffer circular del historial reciente.
+"""
+import numpy as np
+
+from history.sensor_history import SensorHistory, SensorSeries
+from ingestion.reading import Reading
+
+
+def _filled(capacity, count):
+    """Serie con las muestras (t, 10 * t) para t = 0..count-1."""
+    series = SensorSeries(capacity)
+    for t in range(count):
+        series.append(float(t), 10.0 * t)
+    return series
+
+
+def test_partial_fill():
+    series = _filled(5, 3)
+    timestamps, values = series.last_n(10)
+    assert len(series) == 3
+    assert timestamps.tolist() == [0.0, 1.0, 2.0]
+    assert values.tolist() == [0.0, 10.0, 20.0]
+    assert series.last() == (2.0, 20.0)
+
+
+def test_wrap_keeps_the_latest_samples_contiguous():
+    series = _filled(4, 10)
+    timestamps, values = series.last_n(4)
+    assert len(series) == 4
+    assert series.appended == 10
+    assert timestamps.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert values.tolist() == [60.0, 70.0, 80.0, 90.0]
+    assert series.last_n(2)[0].tolist() == [8.0, 9.0]
+
+
+def test_windows_are_views_of_the_buffer():
+    series = _filled(4, 6)
+    timestamps, _ = series.last_n(4)
+    assert np.shares_memory(timestamps, series._timestamps)
+    # La doble escritura deja la misma muestra en i y en i + capacidad
+    assert series._timestamps[1] == series._timestamps[5] == 5.0
+
+
+def test_out_of_order_samples_are_rejected():
+    series = _filled(4, 3)
+    assert series.append(1.5, -1.0) is False
+    assert series.out_of_order == 1
+    # Un timestamp igual al último sí se acepta
+    assert series.append(2.0, 21.0) is True
+    assert series.last_n(4)[1].tolist() == [0.0, 10.0, 20.0, 21.0]
+
+
+def test_window_and_stats():
+    series = _filled(10, 10)
+    timestamps, values = series.window(3, now=8.0)
+    assert timestamps.tolist() == [5.0, 6.0, 7.0, 8.0]
+    assert series.stats(3, now=8.0) == {"min": 50.0, "max": 80.0, "mean": 65.0, "count": 4}
+    assert series.stats(3, now=100.0) is None
+
+
+def test_history_routes_readings_by_sensor():
+    history = SensorHistory(sensor_ids=["Humedad", "Ruido"], capacity=8)
+    history.extend([
+        Reading("Humedad", 40.0, 1.0, 1.0),
+        Reading("Ruido", 55.0, 1.0, 1.0),
+        Reading("Humedad", 42.0, 2.0, 2.0),
+        Reading("Presión", 1013.0, 2.0, 2.0),
+        Reading("Humedad", 39.0, 1.5, 2.0),
+    ])
+
+    assert history.last_value("Humedad") == 42.0
+    assert history.last_value("Ruido") == 55.0
+    assert history.window("Humedad", 10, now=2.0)[1].tolist() == [40.0, 42.0]
+
+    stats = history.get_stats()
+    assert stats["Humedad"]["stored"] == 2
+    assert stats["Humedad"]["out_of_order"] == 1
+    assert stats["unknown_sensor"] == 1
+
+
+def test_snapshot_copies_the_window_with_its_version():
+    history = SensorHistory(sensor_ids=["Ruido"], capacity=4)
+    history.extend([Reading("Ruido", float(t), float(t), float(t)) for t in range(4)])
+
+    timestamps, values, appended = history.snapshot("Ruido", 2, now=3.0)
+    assert timestamps.tolist() == [1.0, 2.0, 3.0]
+    assert appended == history.appended("Ruido") == 4
+
+    # El buffer circular sobrescribe las muestras, pero la copia no cambia
+    history.extend([Reading("Ruido", 99.0, float(t), float(t)) for t in range(4, 8)])
+    assert values.tolist() == [1.0, 2.0, 3.0]
+    assert not np.shares_memory(timestamps, history.series("Ruido")._timestamps)
+    assert history.appended("Ruido") == 8
@@ -0,0 +1,99 @@
+"""
+Pruebas del seguimiento de secuencias y latencias de la ingesta.
+"""
+from ingestion.reading import Reading
+from ingestion.sequence_tracker import SequenceTracker
+
+TOPIC = "casa/sensores"
+
+
+def _observe(tracker, *seqs, sensor_id="Humedad", latency=0.0):
+    """Observa un mensaje por número de secuencia y devuelve las secuencias aceptadas."""
+    accepted = []
+    for seq in seqs:
+        readings = [Reading(sensor_id, 50.0, 100.0, 100.0 + latency, seq)]
+        accepted.extend(reading.seq for reading in tracker.observe(TOPIC, readings))
+    return accepted
+
+
+def _stats(tracker, sensor_id="Humedad"):
+    stats = tracker.get_stats()[sensor_id]
+    return stats["received"], stats["duplicates"], stats["gaps"], stats["late"], stats["resets"]
+
+
+def test_in_order_sequence():
+    tracker = SequenceTracker()
+    assert _observe(tracker, 1, 2, 3) == [1, 2, 3]
+    assert _stats(tracker) == (3, 0, 0, 0, 0)
+
+
+def test_duplicates_are_dropped():
+    tracker = SequenceTracker()
+    assert _observe(tracker, 1, 2, 2, 1) == [1, 2]
+    assert _stats(tracker) == (4, 2, 0, 0, 0)
+
+
+def test_gap_and_late_arrival():
+    tracker = SequenceTracker()
+    assert _observe(tracker, 1, 5) == [1, 5]
+    assert _stats(tracker) == (2, 0, 3, 0, 0)
+
+    # El 3 llega tarde: cubre parte del hueco; repetido ya es un duplicado
+    assert _observe(tracker, 3, 3) == [3]
+    assert _stats(tracker) == (4, 1, 2, 1, 0)
+
+
+def test_window_edge():
+    tracker = SequenceTracker()
+    _observe(tracker, 0, 64)
+    # 63 posiciones atrás todavía está en la ventana de 64 bits
+    assert _observe(tracker, 1) == [1]
+    assert _stats(tracker)[3] == 1
+    # 64 atrás ya no: se trata como un reinicio del emisor
+    assert _observe(tracker, 0) == [0]
+    assert _stats(tracker)[4] == 1
+
+
+def test_reset_restarts_the_stream():
+    tracker = SequenceTracker()
+    assert _observe(tracker, 1000, 1, 2) == [1000, 1, 2]
+    assert _stats(tracker) == (3, 0, 0, 0, 1)
+
+
+def test_wrap_around_is_not_a_gap():
+    tracker = SequenceTracker()
+    assert _observe(tracker, 0xFFFFFFFE, 0xFFFFFFFF, 0, 1) == [0xFFFFFFFE, 0xFFFFFFFF, 0, 1]
+    assert _stats(tracker) == (4, 0, 0, 0, 0)
+
+
+def test_streams_are_independent_per_sensor():
+    tracker = SequenceTracker()
+    _observe(tracker, 1, sensor_id="Humedad")
+    assert _observe(tracker, 1, sensor_id="Ruido") == [1]
+    assert _stats(tracker, "Ruido")[1] == 0
+
+
+def test_duplicate_in_the_middle_of_a_message():
+    tracker = SequenceTracker()
+    _observe(tracker, 1, sensor_id="Ruido")
+    readings = [
+        Reading("Humedad", 50.0, 100.0, 100.0, 1),
+        Reading("Ruido", 40.0, 100.0, 100.0, 1),
+        Reading("Presión", 1013.0, 100.0, 100.0, 1),
+    ]
+    assert [r.sensor_id for r in tracker.observe(TOPIC, readings)] == ["Humedad", "Presión"]
+
+
+def test_latency_histogram():
+    tracker = SequenceTracker()
+    _observe(tracker, 1, 2, 3, latency=0.003)
+    _observe(tracker, 4, latency=0.5)
+    _observe(tracker, 5, latency=-1.0)
+
+    latency = tracker.get_stats()["Humedad"]["latency_ms"]
+    assert latency["count"] == 4
+    assert latency["negative"] == 1
+    assert latency["buckets"] == {"<4": 3, "<512": 1}
+    assert latency["p50_upper"] == 4.0
+    assert latency["p99_upper"] == 512.0
+    assert round(latency["max"]) == 500
@@ -0,0 +1,118 @@
+"""
+Pruebas del historial en SQLite con escritura por lotes.
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from history import sqlite_store
+from history.sqlite_store import SqliteStore
+from ingestion.reading import Reading
+
+
+def _wait_until(condition, timeout=3.0):
+    """Espera a que se cumpla una condición (False si vence el plazo)."""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """Crea almacenes con la configuración indicada y los cierra al terminar."""
+    stores = []
+
+    def make(**config):
+        for key, value in config.items():
+            monkeypatch.setitem(sqlite_store.HISTORY_CONFIG, key, value)
+        store = SqliteStore(str(tmp_path / "history.db"), sensor_ids=["Humedad"], retention_days=1)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def _readings(count, start=None):
+    start = time.time() if start is None else start
+    return [Reading("Humedad", float(i), start + i, start + i) for i in range(count)]
+
+
+def test_full_batches_are_written_without_waiting(make_store):
+    store = make_store(sqlite_batch_size=10, sqlite_flush_interval_s=60)
+    store.extend(_readings(25) + [Reading("Ruido", 1.0, 0.0, 0.0)])
+
+    # Dos lotes completos de 10; los 5 restantes esperan al intervalo
+    assert _wait_until(lambda: store.get_stats()["batches_written"] == 2)
+    assert store.get_stats()["pending"] == 5
+
+    assert store.flush(timeout=3)
+    stats = store.get_stats()
+    assert (stats["rows_written"], stats["batches_written"]) == (25, 3)
+    assert "batch_ms" in stats
+
+
+def test_partial_batch_is_written_after_the_interval(make_store):
+    store = make_store(sqlite_batch_size=1000, sqlite_flush_interval_s=0.05)
+    store.extend(_readings(3))
+    assert _wait_until(lambda: store.get_stats()["rows_written"] == 3)
+    assert store.get_stats()["batches_written"] == 1
+
+
+def test_rows_beyond_max_pending_are_dropped(make_store):
+    store = make_store(sqlite_batch_size=1000, sqlite_flush_interval_s=60, sqlite_max_pending=5)
+    now = time.time()
+    store.extend(_readings(4, start=now))
+    store.extend(_readings(4, start=now + 100))
+    stats = store.get_stats()
+    assert (stats["pending"], stats["rows_dropped"]) == (5, 3)
+
+    # Se conservan las pendientes y se descartan las nuevas
+    store.flush(timeout=3)
+    timestamps, _ = store.read("Humedad", 0, now + 1000)
+    assert (timestamps - now).tolist() == pytest.approx([0.0, 1.0, 2.0, 3.0, 100.0])
+
+
+def test_retention_deletes_in_chunks(make_store):
+    store = make_store(sqlite_batch_size=1000, sqlite_flush_interval_s=60, sqlite_retention_chunk=3)
+    old = time.time() - 3 * 86400
+    store.load("Humedad", [old + i for i in range(7)], [1.0] * 7)
+    store.load("Humedad", [time.time()], [2.0])
+
+    # Cada tanda borra como mucho 3 filas; tras la última vuelve a esperar al intervalo
+    deleted = []
+    for _ in range(3):
+        before = store.rows_deleted
+        store._apply_retention()
+        deleted.append(store.rows_deleted - before)
+    assert deleted == [3, 3, 1]
+    assert store._next_retention > time.monotonic()
+    assert store.read("Humedad", 0, time.time() + 10)[1].tolist() == [2.0]
+
+
+def test_close_drains_the_writer_and_reader_connections(make_store, tmp_path):
+    store = make_store(sqlite_batch_size=1000, sqlite_flush_interval_s=60)
+    store.extend(_readings(50))
+
+    # Conexión de lectura abierta desde otro hilo
+    connections = []
+    reader = threading.Thread(target=lambda: connections.append(store._thread_connection()))
+    reader.start()
+    reader.join()
+    store.read("Humedad", 0, 1)
+
+    store.close()
+    assert not store._thread.is_alive()
+    assert store.get_stats()["rows_written"] == 50
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+    with sqlite3.connect(str(tmp_path / "history.db")) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM readings").fetchone()[0] == 50
@@ -0,0 +1,71 @@
+"""
+Pruebas del enrutador de topics MQTT.
+"""
+import pytest
+
+from ingestion.topic_router import TopicRouter
+
+
+def _router(*patterns):
+    """Enrutador con un manejador por patrón (el propio patrón)."""
+    router = TopicRouter()
+    for pattern in patterns:
+        router.subscribe(pattern, pattern)
+    return router
+
+
+def test_exact_topic():
+    router = _router("casa/sensores", "casa/otros")
+    assert router.resolve("casa/sensores") == ("casa/sensores",)
+    assert router.resolve("casa/sensores/Humedad") == ()
+    assert router.resolve("casa") == ()
+
+
+def test_single_level_wildcard():
+    router = _router("casa/+/Humedad")
+    assert router.resolve("casa/salon/Humedad") == ("casa/+/Humedad",)
+    assert router.resolve("casa/Humedad") == ()
+    assert router.resolve("casa/salon/cocina/Humedad") == ()
+
+
+def test_multi_level_wildcard_matches_parent_and_descendants():
+    router = _router("casa/sensores/#")
+    assert router.resolve("casa/sensores") == ("casa/sensores/#",)
+    assert router.resolve("casa/sensores/Humedad") == ("casa/sensores/#",)
+    assert router.resolve("casa/sensores/a/b/c") == ("casa/sensores/#",)
+    assert router.resolve("casa/otros") == ()
+
+
+def test_handlers_in_depth_order():
+    router = _router("#", "casa/sensores/Ruido", "casa/+/Ruido", "casa/#")
+    assert router.resolve("casa/sensores/Ruido") == ("#", "casa/#", "casa/sensores/Ruido", "casa/+/Ruido")
+
+
+def test_system_topics_skip_first_level_wildcards():
+    router = _router("#", "+/broker/uptime", "$SYS/#")
+    assert router.resolve("$SYS/broker/uptime") == ("$SYS/#",)
+    assert router.resolve("casa/broker/uptime") == ("#", "+/broker/uptime")
+
+
+def test_unsubscribe_and_cache_invalidation():
+    router = _router("casa/+")
+    assert router.resolve("casa/Humedad") == ("casa/+",)
+    assert router.resolve("casa/Humedad") == ("casa/+",)
+    assert router.get_stats()["cache_hits"] == 1
+
+    router.unsubscribe("casa/+", "casa/+")
+    assert router.resolve("casa/Humedad") == ()
+
+
+def test_cache_is_bounded():
+    router = _router("#")
+    router.cache_size = 4
+    for index in range(10):
+        router.resolve(f"casa/{index}")
+    assert router.get_stats()["cache_entries"] <= 4
+
+
+@pytest.mark.parametrize("pattern", ["", "casa/sens+", "casa/#/Humedad", "casa/a#"])
+def test_invalid_patterns(pattern):
+    with pytest.raises(ValueError):
+        TopicRouter().subscribe(pattern, None)
@@ -0,0 +1,130 @@
+"""
+Pruebas del gráfico de tendencia con desplazamiento incremental.
+"""
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QPainter, QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from ui.widgets import trend_chart
+from ui.widgets.trend_chart import TrendChart
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    """QPixmap necesita una aplicación de Qt (sin pantalla)."""
+    return QApplication.instance() or QApplication([])
+
+
+def _chart(source=None):
+    """Gráfico de 10 columnas de 1 s y 101 filas (el valor v, en la fila 100 - v), ya rellenado."""
+    chart = TrendChart(0, 100, "#ff0000", window_s=10)
+    chart.source = source
+    chart.resize(10, 101)
+    return chart
+
+
+def _rows(chart, x):
+    """Filas pintadas de una columna del pixmap."""
+    image = chart.pixmap().toImage()
+    return [y for y in range(image.height()) if image.pixelColor(x, y).alpha()]
+
+
+def _source(starts, lows, highs, lasts, calls):
+    def source(start, end, width):
+        calls.append((start, end, width))
+        return {
+            "start": np.array(starts, dtype=float),
+            "min": np.array(lows, dtype=float),
+            "max": np.array(highs, dtype=float),
+            "last": np.array(lasts, dtype=float),
+        }
+    return source
+
+
+def test_new_column_scrolls_by_one_and_joins_the_previous_value():
+    chart = _chart()
+    chart.add_sample(1000.2, 50)
+    assert _rows(chart, 9) == [50]
+
+    chart.add_sample(1001.5, 60)
+    assert _rows(chart, 8) == [50]
+    assert _rows(chart, 9) == list(range(40, 51))
+
+    # En la misma columna solo se amplía su mínimo y máximo
+    chart.add_sample(1001.7, 30)
+    assert _rows(chart, 9) == list(range(40, 71))
+
+
+def test_gap_of_several_columns_is_not_joined():
+    chart = _chart()
+    chart.add_sample(1000.0, 50)
+    chart.add_sample(1003.0, 20)
+    assert _rows(chart, 6) == [50]
+    assert _rows(chart, 7) == [] and _rows(chart, 8) == []
+    assert _rows(chart, 9) == [80]
+
+
+def test_backfill_places_one_point_per_column(monkeypatch):
+    monkeypatch.setattr(trend_chart, "time", SimpleNamespace(time=lambda: 1009.5))
+    calls = []
+    chart = _chart(_source([1000, 1001, 1009], [50, 60, 30], [50, 60, 40], [50, 60, 35], calls))
+
+    assert calls == [(999.5, 1009.5, 10)]
+    assert _rows(chart, 0) == [50]
+    assert _rows(chart, 1) == list(range(40, 51))
+    # Hueco entre 1001 y 1009: la columna actual no se une con la anterior
+    assert _rows(chart, 9) == list(range(60, 71))
+
+    # Las muestras en vivo continúan la columna actual rellenada
+    chart.add_sample(1009.8, 20)
+    assert _rows(chart, 9) == list(range(60, 81))
+
+
+def test_backfill_discards_the_live_column(monkeypatch):
+    monkeypatch.setattr(trend_chart, "time", SimpleNamespace(time=lambda: 1009.5))
+    chart = _chart(_source([1008], [50], [50], [50], []))
+    chart.add_sample(1009.1, 90)
+
+    # Tras recargar, la columna actual no tiene datos: no debe quedar el 90 anterior
+    chart.backfill()
+    chart.add_sample(1009.6, 40)
+    assert _rows(chart, 8) == [50]
+    assert _rows(chart, 9) == list(range(50, 61))
+
+
+def test_set_range_redraws_with_the_new_scale(monkeypatch):
+    monkeypatch.setattr(trend_chart, "time", SimpleNamespace(time=lambda: 1009.5))
+    calls = []
+    chart = _chart(_source([1009], [50], [50], [50], calls))
+    assert _rows(chart, 9) == [50]
+
+    chart.set_range(0, 200)
+    assert len(calls) == 2
+    assert _rows(chart, 9) == [75]
+
+    # Sin cambios no se vuelve a consultar la fuente
+    chart.set_range(0, 200)
+    assert len(calls) == 2
+
+
+def test_draw_panel_does_not_resize_or_backfill():
+    calls = []
+    chart = TrendChart(0, 100, "#ff0000", window_s=10)
+    chart.set_source(_source([], [], [], [], calls))
+    chart.fit(300, 200)
+    size = (chart.pixmap().width(), chart.pixmap().height())
+    assert len(calls) == 1
+
+    target = QPixmap(400, 400)
+    painter = QPainter(target)
+    chart.draw_panel(painter, 400, 400, "50")
+    painter.end()
+    assert (chart.pixmap().width(), chart.pixmap().height()) == size
+    assert len(calls) == 1
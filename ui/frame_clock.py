@@ -0,0 +1,327 @@
+"""
+Reloj de frames único para las animaciones y el refresco de la interfaz.
+
+Antes cada widget tenía su propio QTimer (el barómetro a 16 ms; humedad,
+ruido y calidad del aire a 50 ms; el círculo de IA a 100 ms; MainWindow a
+50 y 200 ms). Sus despertares se intercalaban y cada uno provocaba su
+propio repintado.
+
+FrameClock tiene un solo QTimer a FRAME_CONFIG["tick_ms"]. Los clientes se
+registran con el intervalo que desean, que se redondea a un múltiplo del
+tick. Un cliente de cada k ticks se llama en los ticks múltiplos de k, de
+modo que los de 50, 100 y 200 ms coinciden en el mismo tick y Qt agrupa
+sus repintados.
+
+Cada cliente declara si está sucio: su función de frame avanza la
+animación y devuelve True si hay algo que repintar. El reloj llama a
+update() solo de los widgets sucios y salta los demás. Los despertares por
+segundo (medidos en ventanas de un segundo), las llamadas a update() y los
+clientes saltados se consultan con get_stats().
+
+Modo reposo (FRAME_CONFIG["idle_mode"]):
+
+- Un cliente se duerme con sleep() cuando su animación se asienta (la aguja
+  del barómetro llega a su destino) o, si se registró con linger_s, cuando
+  pasan linger_s segundos desde su último wake() (las animaciones
+  ambientales: empañamiento, partículas, barras). Los widgets llaman a
+  wake() cuando reciben un valor distinto.
+- El timer late al máximo común divisor de los intervalos de los clientes
+  despiertos y se para si no queda ninguno.
+- pause(motivo) detiene todos los ticks (ventana oculta o minimizada,
+  pantalla apagada; ver ui.idle_watcher) hasta que se llama a resume() con
+  todos los motivos.
+"""
+import math
+import time
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer
+
+from config import FRAME_CONFIG
+
+
+class FrameClient:
+    """Registro de un cliente del reloj de frames."""
+
+    __slots__ = ("clock", "callback", "widget", "interval_ms", "every", "linger_s",
+                 "last", "awake", "awake_until")
+
+    def __init__(self, clock, callback, widget, interval_ms, every, linger_s):
+        self.clock = clock
+        self.callback = callback
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.every = every
+        self.linger_s = linger_s
+        self.last = time.monotonic()
+        self.awake = False
+        self.awake_until = None
+
+    def wake(self):
+        """Despierta el cliente (ver FrameClock.wake)."""
+        self.clock.wake(self)
+
+    def sleep(self):
+        """Duerme el cliente (ver FrameClock.sleep)."""
+        self.clock.sleep(self)
+
+
+class FrameClock(QObject):
+    """Un QTimer que reparte ticks alineados a todos los clientes despiertos."""
+
+    def __init__(self, tick_ms=None, idle_mode=None, parent=None):
+        """
+        Inicializa el reloj (el timer arranca con el primer cliente).
+
+        Args:
+            tick_ms (int, optional): Periodo del tick (por defecto FRAME_CONFIG["tick_ms"])
+            idle_mode (bool, optional): Permitir que los clientes se duerman
+                (por defecto FRAME_CONFIG["idle_mode"])
+            parent (QObject, optional): Objeto padre
+        """
+        super().__init__(parent)
+        self.tick_ms = tick_ms or FRAME_CONFIG["tick_ms"]
+        self.idle_mode = FRAME_CONFIG["idle_mode"] if idle_mode is None else idle_mode
+        self._clients = []
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+
+        # Ticks por despertar del timer (mcd de los intervalos despiertos) y tick actual
+        self._step = 1
+        self._tick_index = 0
+
+        # Motivos de pausa activos (p. ej. "hidden", "display")
+        self._paused = set()
+
+        self.ticks = 0
+        self.updates = 0
+        self.skipped = 0
+        self.sleeps = 0
+        self.wakes = 0
+
+        # Despertares por segundo medidos en la última ventana de un segundo
+        self.wakeups_per_second = 0.0
+        self._window_start = time.monotonic()
+        self._window_ticks = 0
+
+    def register(self, interval_ms, callback, widget=None, linger_s=None):
+        """
+        Registra un cliente (despierto).
+
+        Args:
+            interval_ms (int): Intervalo deseado entre frames (se redondea a un múltiplo del tick)
+            callback (callable): Función callback(dt) llamada en cada frame del
+                cliente, con dt en segundos desde su frame anterior; devuelve
+                True si el widget tiene algo que repintar
+            widget (QWidget, optional): Widget que se repinta cuando callback
+                devuelve True (se da de baja solo al destruirse)
+            linger_s (float, optional): Segundos que sigue despierto tras cada
+                wake() antes de dormirse solo (None: hasta que llame a sleep())
+
+        Returns:
+            FrameClient: Registro del cliente
+        """
+        every = max(1, round(interval_ms / self.tick_ms))
+        client = FrameClient(self, callback, widget, interval_ms, every, linger_s)
+        self._clients.append(client)
+        if widget is not None:
+            widget.destroyed.connect(lambda: self._drop(client))
+        self.wake(client)
+        return client
+
+    def unregister(self, client):
+        """
+        Da de baja un cliente.
+
+        Args:
+            client (FrameClient): Registro devuelto por register()
+        """
+        if client in self._clients:
+            self._clients.remove(client)
+            client.awake = False
+            self._reschedule()
+
+    def _drop(self, client):
+        """Da de baja el cliente de un widget destruido (el próximo tick ajusta el timer)."""
+        if client in self._clients:
+            self._clients.remove(client)
+        client.awake = False
+
+    def wake(self, client):
+        """
+        Despierta un cliente (p. ej. al recibir un valor nuevo).
+
+        Si se registró con linger_s, sigue despierto linger_s segundos más.
+
+        Args:
+            client (FrameClient): Cliente a despertar
+        """
+        now = time.monotonic()
+        if client.linger_s is not None:
+            client.awake_until = now + client.linger_s
+        if client.awake:
+            return
+        client.awake = True
+        # El tiempo dormido no cuenta como dt del primer frame
+        client.last = now
+        self.wakes += 1
+        self._reschedule()
+
+    def sleep(self, client):
+        """
+        Duerme un cliente hasta su próximo wake() (sin efecto sin modo reposo).
+
+        Args:
+            client (FrameClient): Cliente a dormir
+        """
+        if not self.idle_mode or not client.awake:
+            return
+        client.awake = False
+        client.awake_until = None
+        self.sleeps += 1
+        self._reschedule()
+
+    def pause(self, reason):
+        """
+        Detiene todos los ticks hasta que se reanude con el mismo motivo.
+
+        Args:
+            reason (str): Motivo de la pausa ("hidden", "minimized", "display"...)
+        """
+        if reason not in self._paused:
+            self._paused.add(reason)
+            self._reschedule()
+
+    def resume(self, reason):
+        """
+        Retira un motivo de pausa; los ticks vuelven cuando no queda ninguno.
+
+        Args:
+            reason (str): Motivo pasado a pause()
+        """
+        if reason not in self._paused:
+            return
+        self._paused.discard(reason)
+        if not self._paused:
+            now = time.monotonic()
+            for client in self._clients:
+                client.last = now
+        self._reschedule()
+
+    def set_tick_ms(self, tick_ms):
+        """
+        Cambia el periodo del tick (p. ej. el gobernador de calidad lo alarga).
+
+        Los intervalos de los clientes se vuelven a redondear al tick nuevo.
+
+        Args:
+            tick_ms (int): Periodo nuevo del tick
+        """
+        if tick_ms == self.tick_ms:
+            return
+        self.tick_ms = tick_ms
+        for client in self._clients:
+            client.every = max(1, round(client.interval_ms / tick_ms))
+        # Fuerza el reinicio del timer con el periodo nuevo
+        self._step = 0
+        self._reschedule()
+
+    @property
+    def paused(self):
+        """Motivos de pausa activos (conjunto vacío si el reloj no está en pausa)."""
+        return frozenset(self._paused)
+
+    def _reschedule(self):
+        """Ajusta el timer a los clientes despiertos (o lo para si no hay ninguno)."""
+        # Al salir de la aplicación el timer puede destruirse antes que los widgets
+        if sip.isdeleted(self._timer):
+            return
+        intervals = [client.every for client in self._clients if client.awake]
+        if self._paused or not intervals:
+            self._timer.stop()
+            return
+
+        step = math.gcd(*intervals)
+        if step == self._step and self._timer.isActive():
+            return
+        # El índice de tick sigue siendo múltiplo del paso: se conserva la alineación
+        self._step = step
+        self._tick_index = -(-self._tick_index // step) * step
+        self._timer.start(self.tick_ms * step)
+
+    def _tick(self):
+        """Llama a los clientes que tocan en este tick y repinta los sucios."""
+        now = time.monotonic()
+        tick = self._tick_index
+        self._tick_index += self._step
+        self.ticks += 1
+
+        self._window_ticks += 1
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.wakeups_per_second = self._window_ticks / elapsed
+            self._window_start = now
+            self._window_ticks = 0
+
+        # Copia: un cliente puede darse de baja o dormirse durante el tick
+        any_awake = False
+        for client in list(self._clients):
+            if not client.awake:
+                continue
+            any_awake = True
+            if tick % client.every:
+                continue
+            dt = now - client.last
+            client.last = now
+            dirty = client.callback(dt)
+            if client.awake_until is not None and now >= client.awake_until:
+                self.sleep(client)
+            if client.widget is None:
+                continue
+            if dirty:
+                client.widget.update()
+                self.updates += 1
+            else:
+                self.skipped += 1
+
+        if not any_awake:
+            self._reschedule()
+
+    def get_stats(self):
+        """
+        Devuelve los contadores del reloj.
+
+        Returns:
+            dict: Periodo del tick, clientes (y despiertos), motivos de pausa,
+                ticks, despertares por segundo medidos, repintados pedidos,
+                widgets saltados por no estar sucios y veces que los clientes
+                se han dormido y despertado
+        """
+        return {
+            "tick_ms": self.tick_ms,
+            "clients": len(self._clients),
+            "awake": sum(1 for client in self._clients if client.awake),
+            "paused": sorted(self._paused),
+            "ticks": self.ticks,
+            "wakeups_per_second": round(self.wakeups_per_second, 1) if self._timer.isActive() else 0.0,
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "sleeps": self.sleeps,
+            "wakes": self.wakes,
+        }
+
+
+_clock = None
+
+
+def get_frame_clock():
+    """
+    Devuelve el reloj de frames compartido por MainWindow y los widgets.
+
+    Returns:
+        FrameClock: Reloj con el tick de FRAME_CONFIG
+    """
+    global _clock
+    if _clock is None:
+        _clock = FrameClock()
+    return _clock
@@ -0,0 +1,131 @@
+"""
+Pausa del reloj de frames cuando nadie puede ver el panel.
+
+IdleWatcher observa la ventana principal y la pantalla y pausa el reloj de
+frames (ui.frame_clock) con un motivo por cada situación:
+
+- "hidden": la ventana está oculta (eventos Hide/Show);
+- "minimized": la ventana está minimizada (WindowStateChange);
+- "suspended": la plataforma suspende u oculta la aplicación
+  (QGuiApplication.applicationStateChanged);
+- "display": la pantalla está apagada. Qt no avisa del apagado de la
+  pantalla (DPMS, salvapantallas o la retroiluminación de la pantalla
+  táctil de la Raspberry Pi), así que se consulta sysfs cada
+  FRAME_CONFIG["display_poll_ms"]: bl_power de /sys/class/backlight
+  ("0" = encendida) y dpms de /sys/class/drm ("On" = encendida). La
+  pantalla se da por apagada si lo están todas las salidas encontradas.
+
+Con el reloj en pausa no hay animaciones ni se vacía el buzón de lecturas;
+como el buzón solo guarda la última lectura de cada sensor, al reanudar se
+aplica el estado más reciente.
+"""
+import glob
+
+from PyQt6.QtCore import QEvent, QObject, Qt, QTimer
+from PyQt6.QtGui import QGuiApplication
+
+from config import FRAME_CONFIG
+from utils.logger import setup_logger
+
+# Configurar logger del vigilante
+logger = setup_logger(__name__)
+
+# Ficheros de sysfs con el estado de encendido de las pantallas
+DISPLAY_POWER_GLOBS = ("/sys/class/backlight/*/bl_power", "/sys/class/drm/*/dpms")
+
+# Contenido de esos ficheros cuando la salida está encendida
+DISPLAY_ON_VALUES = ("0", "On")
+
+
+def find_display_power_files():
+    """
+    Busca los ficheros de sysfs con el estado de encendido de las pantallas.
+
+    Returns:
+        list[str]: Rutas encontradas (vacía si el sistema no las expone)
+    """
+    paths = []
+    for pattern in DISPLAY_POWER_GLOBS:
+        paths.extend(sorted(glob.glob(pattern)))
+    return paths
+
+
+class IdleWatcher(QObject):
+    """Pausa el reloj de frames con la ventana oculta o la pantalla apagada."""
+
+    def __init__(self, window, clock, display_paths=None):
+        """
+        Empieza a vigilar la ventana y la pantalla.
+
+        Args:
+            window (QWidget): Ventana principal
+            clock (FrameClock): Reloj de frames a pausar
+            display_paths (list[str], optional): Ficheros de estado de las pantallas
+                (por defecto FRAME_CONFIG["display_power_paths"] o los que se encuentren)
+        """
+        super().__init__(window)
+        self.window = window
+        self.clock = clock
+
+        window.installEventFilter(self)
+        QGuiApplication.instance().applicationStateChanged.connect(self._on_application_state)
+
+        if display_paths is None:
+            display_paths = FRAME_CONFIG["display_power_paths"] or find_display_power_files()
+        self.display_paths = list(display_paths)
+        self._display_timer = None
+        if self.display_paths and FRAME_CONFIG["display_poll_ms"]:
+            self._display_timer = QTimer(self)
+            self._display_timer.timeout.connect(self.check_display)
+            self._display_timer.start(FRAME_CONFIG["display_poll_ms"])
+            logger.info(f"Vigilando el encendido de la pantalla en {', '.join(self.display_paths)}")
+
+    def _set(self, reason, active):
+        """Pausa o reanuda el reloj por un motivo."""
+        if active:
+            self.clock.pause(reason)
+        else:
+            self.clock.resume(reason)
+
+    def eventFilter(self, obj, event):
+        """Sigue la visibilidad y la minimización de la ventana."""
+        kind = event.type()
+        if kind == QEvent.Type.Hide:
+            self._set("hidden", True)
+        elif kind == QEvent.Type.Show:
+            self._set("hidden", False)
+        elif kind == QEvent.Type.WindowStateChange:
+            self._set("minimized", bool(self.window.windowState() & Qt.WindowState.WindowMinimized))
+        return False
+
+    def _on_application_state(self, state):
+        """Pausa mientras la plataforma suspende u oculta la aplicación."""
+        suspended = state in (Qt.ApplicationState.ApplicationSuspended, Qt.ApplicationState.ApplicationHidden)
+        self._set("suspended", suspended)
+
+    def display_on(self):
+        """
+        Lee el estado de encendido de las pantallas.
+
+        Returns:
+            bool: False si todas las salidas legibles están apagadas
+        """
+        readable = False
+        for path in self.display_paths:
+            try:
+                with open(path) as f:
+                    value = f.read().strip()
+            except OSError:
+                continue
+            readable = True
+            if value in DISPLAY_ON_VALUES:
+                return True
+        # Sin ficheros legibles no se puede saber: se supone encendida
+        return not readable
+
+    def check_display(self):
+        """Pausa el reloj mientras la pantalla está apagada."""
+        blanked = not self.display_on()
+        if blanked != ("display" in self.clock.paused):
+            logger.info("Pantalla apagada: animaciones en pausa" if blanked else "Pantalla encendida: animaciones reanudadas")
+        self._set("display", blanked)
@@ -2,21 +2,48 @@
 Ventana principal de la aplicación.
 """
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QGridLayout, QMessageBox, QDialog, QTextEdit, QLineEdit
-from PyQt6.QtCore import Qt, QTimer, QPointF
+from PyQt6.QtCore import Qt, QTimer, QPointF, pyqtSignal
 from PyQt6.QtGui import QFont, QPainter, QBrush, QPen, QColor, QRadialGradient
-from config import UI_CONFIG, SENSORS
+from config import COLORS, UI_CONFIG, SENSORS, INGESTION_CONFIG, HISTORY_CONFIG, FRAME_CONFIG, QUALITY_CONFIG
+from analysis.classifier import get_classifier
+from history.downsampling import Downsampler
+from history.rollups import RollupStore
+from history.sensor_history import SensorHistory
+from ingestion.mailbox import SensorMailbox
+from ingestion.reading import Reading
+from ui.frame_clock import get_frame_clock
+from ui.idle_watcher import IdleWatcher
+from ui.quality_governor import QualityGovernor
 from ui.widgets.thermometer_widget import ThermometerWidget
 from ui.widgets.sensor_widget import SensorWidget
 from ui.widgets.humidity_widget import HumidityWidget
 from ui.widgets.pressure_widget import PressureWidget
 from ui.widgets.air_quality_widget import AirQualityWidget
 from ui.widgets.noise_widget import NoiseWidget
+from ui.widgets.status_label import StatusLabel
+from functools import partial
 import random
 import math
+import threading
+import time
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Cambio de estado de una alerta; AlertEngine lo emite desde el hilo despachador
+    alert_changed = pyqtSignal(object)
+    
+    # Lecturas nuevas para el frame del buzón (desde cualquier hilo; se atiende en cola)
+    frame_wake = pyqtSignal()
+    
+    def __init__(self, simulate=True):
+        """
+        Inicializa la ventana principal.
+        
+        Args:
+            simulate (bool, optional): Si es True, genera datos simulados
+                periódicamente; si es False, solo muestra los datos recibidos
+        """
         super().__init__()
+        self.simulate = simulate
         
         # Configuración de la ventana
         self.setWindowTitle("Monitor de Temperatura")
@@ -46,10 +73,74 @@ class MainWindow(QMainWindow):
         # Configurar UI
         self._setup_ui()
         
-        # Timer para actualizar sensores
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_sensor_values)
-        self.timer.start(200)  # Ralentizar a 200ms para movimientos más suaves
+        # Alertas activas (regla, sensor) en el orden en que se activaron; la
+        # conexión en cola trae las del hilo despachador al hilo de la UI
+        self._active_alerts = {}
+        self.alert_changed.connect(self.show_alert, Qt.ConnectionType.QueuedConnection)
+        
+        # Manejador de actualización de cada sensor (despacho por diccionario)
+        self._sensor_handlers = {
+            "Temperatura": self._apply_temperature,
+            "Humedad": self._apply_humidity,
+            "Presión": self._apply_pressure,
+            "Calidad_Aire": self._apply_air_quality,
+            "Ruido": self._apply_noise
+        }
+        
+        # Clasificador de estados compartido con los widgets (histéresis y antirrebote)
+        self.classifier = get_classifier()
+        
+        # Historial reciente de cada sensor (buffer circular en memoria)
+        self.history = SensorHistory()
+        
+        # Reducción LTTB del historial para las ventanas cortas de los gráficos
+        self.downsampler = Downsampler(self.history)
+        
+        # Agregados de 1 s / 1 min / 1 h para las vistas de tendencia
+        self.rollups = RollupStore(HISTORY_CONFIG["rollup_path"])
+        self.rollups.load()
+        
+        # Widgets con modo gráfico (se alterna tocándolos): sus gráficos de
+        # tendencia se rellenan desde el historial o desde los agregados
+        self.trend_widgets = {
+            sensor_id: widget for sensor_id, widget in self.sensor_widgets.items() if hasattr(widget, "trend")
+        }
+        self.trend_widgets["Temperatura"] = self.thermometer
+        for sensor_id, widget in self.trend_widgets.items():
+            widget.trend.set_source(partial(self._trend_source, sensor_id))
+        
+        # Lecturas pendientes de dibujar en los gráficos de tendencia: las añade
+        # record_readings (desde el hilo despachador) y se dibujan en el frame
+        self._trend_lock = threading.Lock()
+        self._trend_pending = []
+        self._trend_overflow = False
+        
+        # Buzón con la última lectura de cada sensor, vaciado una vez por frame
+        # (en el mismo reloj que las animaciones de los widgets). El frame se
+        # duerme sin lecturas pendientes; post_many y record_readings lo
+        # despiertan con frame_wake, en cola hacia el hilo de la UI
+        self.mailbox = SensorMailbox(on_post=self.frame_wake.emit)
+        self.frame_clock = get_frame_clock()
+        self.frame_client = self.frame_clock.register(INGESTION_CONFIG["frame_interval_ms"], self._on_frame)
+        self.frame_wake.connect(self._wake_frame, Qt.ConnectionType.QueuedConnection)
+        
+        # Datos simulados (solo en modo de prueba)
+        self.simulation_client = None
+        if self.simulate:
+            # Ralentizar a 200ms para movimientos más suaves
+            self.simulation_client = self.frame_clock.register(200, lambda dt: self.update_sensor_values())
+        
+        # Sin ticks con la ventana oculta o minimizada o con la pantalla apagada
+        self.idle_watcher = IdleWatcher(self, self.frame_clock)
+        
+        # Bajar la calidad del dibujo en placas que no llegan a tiempo a los frames
+        self.quality_governor = None
+        if QUALITY_CONFIG["enabled"]:
+            self.quality_governor = QualityGovernor(self.frame_clock)
+            for sensor_id, widget in self.sensor_widgets.items():
+                self.quality_governor.watch(widget, sensor_id)
+            self.quality_governor.watch(self.thermometer, "Temperatura")
+            self.quality_governor.watch(self.ai_circle, "IA")
         
         # Mostrar en pantalla completa después de configurar todo
         self.showFullScreen()
@@ -68,9 +159,9 @@ class MainWindow(QMainWindow):
         # Layout para el botón de salir
         top_layout = QHBoxLayout()
         
-        # Espacio vacío a la izquierda
-        spacer = QWidget()
-        spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
+        # Aviso de las alertas activas a la izquierda (vacío si no hay ninguna)
+        self.alert_label = StatusLabel()
+        self.alert_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         
         # Botón de salida
         exit_button = QPushButton("X")
@@ -91,7 +182,7 @@ class MainWindow(QMainWindow):
         exit_button.setFixedSize(25, 25)  # Reducir aún más el tamaño del botón
         exit_button.clicked.connect(self.close)
         
-        top_layout.addWidget(spacer)
+        top_layout.addWidget(self.alert_label)
         top_layout.addWidget(exit_button, alignment=Qt.AlignmentFlag.AlignRight)
         
         main_layout.addLayout(top_layout)
@@ -122,14 +213,6 @@ class MainWindow(QMainWindow):
             padding: 1px;
         """
         
-        status_style = """
-            color: white;
-            font-size: 14px;
-            font-weight: bold;
-            background-color: transparent;
-            padding: 1px;
-        """
-        
         # Definir estilos y configuraciones comunes para contenedores
         container_style = """
             QWidget {
@@ -163,9 +246,7 @@ class MainWindow(QMainWindow):
         self.thermometer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
         # Estado en la parte inferior
-        self.temperature_status = QLabel("Estado: Normal")
-        self.temperature_status.setStyleSheet(status_style)
-        self.temperature_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.temperature_status = StatusLabel("Estado: Normal")
         
         # Añadir los elementos al layout en el orden correcto
         thermometer_layout.addWidget(temperature_title)
@@ -223,9 +304,7 @@ class MainWindow(QMainWindow):
                 self.sensor_widgets[sensor_id] = widget
                 
                 # Estado en la parte inferior
-                self.humidity_status = QLabel("Estado: Normal")
-                self.humidity_status.setStyleSheet(status_style)
-                self.humidity_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.humidity_status = StatusLabel("Estado: Normal")
                 
                 # Añadir los elementos al layout en el orden correcto
                 sensor_container_layout.addWidget(humidity_title)
@@ -270,9 +349,7 @@ class MainWindow(QMainWindow):
                 self.sensor_widgets[sensor_id] = widget
                 
                 # Estado en la parte inferior
-                self.pressure_status = QLabel("Estado: Normal")
-                self.pressure_status.setStyleSheet(status_style)
-                self.pressure_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.pressure_status = StatusLabel("Estado: Normal")
                 
                 # Añadir los elementos al layout en el orden correcto
                 sensor_container_layout.addWidget(pressure_title)
@@ -313,9 +390,7 @@ class MainWindow(QMainWindow):
                 self.sensor_widgets[sensor_id] = widget
                 
                 # Estado en la parte inferior
-                self.air_quality_status = QLabel("Estado: Buena")
-                self.air_quality_status.setStyleSheet(status_style)
-                self.air_quality_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.air_quality_status = StatusLabel("Estado: Buena")
                 
                 # Añadir los elementos al layout en el orden correcto
                 sensor_container_layout.addWidget(air_quality_title)
@@ -360,9 +435,7 @@ class MainWindow(QMainWindow):
                 self.sensor_widgets[sensor_id] = widget
                 
                 # Estado en la parte inferior
-                self.noise_status = QLabel("Estado: Normal")
-                self.noise_status.setStyleSheet(status_style)
-                self.noise_status.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.noise_status = StatusLabel("Estado: Normal")
                 
                 # Añadir los elementos al layout en el orden correcto
                 sensor_container_layout.addWidget(noise_title)
@@ -452,15 +525,15 @@ class MainWindow(QMainWindow):
                 self.setMinimumSize(140, 140)  # Aumentar aún más el tamaño del círculo
                 self.active = False
                 self.animation_counter = 0
-                self.timer = QTimer(self)
-                self.timer.timeout.connect(self.update_animation)
-                self.timer.start(100)
+                self.frame_client = get_frame_clock().register(
+                    100, self.update_animation, self, linger_s=FRAME_CONFIG["idle_after_s"]
+                )
                 
-            def update_animation(self):
+            def update_animation(self, dt):
                 self.animation_counter += 1
                 if self.animation_counter > 30:
                     self.animation_counter = 0
-                self.update()
+                return True
                 
             def paintEvent(self, event):
                 painter = QPainter(self)
@@ -510,6 +583,7 @@ class MainWindow(QMainWindow):
         
         # Crear el widget del círculo de IA
         ai_circle = AiCircleWidget()
+        self.ai_circle = ai_circle
         
         # Texto descriptivo
         ia_description = QLabel("Pregúntame\nlo que necesites")  # Agregar salto de línea para mejor legibilidad
@@ -542,23 +616,147 @@ class MainWindow(QMainWindow):
     
     def update_sensor_values(self, data=None):
         """
-        Actualiza los valores de los sensores.
+        Recibe nuevos valores de los sensores y los deja en el buzón.
         Si data es None, genera valores aleatorios para pruebas.
         
+        Los widgets no se tocan aquí: el timer de frame vacía el buzón y
+        aplica solo la lectura más reciente de cada sensor.
+        
         Args:
-            data (dict, optional): Diccionario con los datos de los sensores
-        """
-        # Inicializar valores si no existen
-        if not hasattr(self, 'prev_temp_value'):
-            self.prev_temp_value = 24.0  # Valor inicial razonable
-        if not hasattr(self, 'prev_humidity_value'):
-            self.prev_humidity_value = 45.0  # Valor inicial razonable
-        if not hasattr(self, 'prev_pressure_value'):
-            self.prev_pressure_value = 1010.0  # Valor inicial razonable
-        if not hasattr(self, 'prev_air_quality_value'):
-            self.prev_air_quality_value = 50.0  # Valor inicial razonable
-        if not hasattr(self, 'prev_noise_value'):
-            self.prev_noise_value = 45.0  # Valor inicial razonable
+            data (list | dict, optional): Lote de lecturas (list[Reading]) entregado
+                por MQTTClient o diccionario {sensor_id: valor}
+        """
+        if data is None:
+            data = self._generate_test_values()
+        
+        if isinstance(data, dict):
+            now = time.time()
+            data = [Reading(sensor_id, float(value), now, now) for sensor_id, value in data.items()]
+            # Las lecturas de MQTTClient ya llegan al historial por add_sink()
+            self.record_readings(data)
+        
+        self.mailbox.post_many(data)
+    
+    def _trend_source(self, sensor_id, start, end, width):
+        """
+        Devuelve los datos con los que se rellena un gráfico de tendencia.
+        
+        Si el historial en memoria cubre la ventana (las ventanas cortas), se
+        reduce con LTTB a un punto por columna; si no, se leen los agregados
+        del nivel más fino que la cubra (como mucho una cubeta por segundo).
+        
+        Args:
+            sensor_id (str): Identificador del sensor
+            start (float): Inicio del rango
+            end (float): Fin del rango
+            width (int): Columnas del gráfico
+        
+        Returns:
+            dict: Arrays por campo (ver RollupStore.query y TrendChart.set_source)
+        """
+        window_s = end - start
+        timestamps, values = self.downsampler.get(sensor_id, window_s, width, end)
+        resolution = window_s / max(1, width - 1)
+        if len(timestamps) and timestamps[0] < start + resolution:
+            return {"start": timestamps, "min": values, "max": values, "last": values, "resolution": resolution}
+        return self.rollups.query_range(sensor_id, start, end, max(width, int(window_s)))[1]
+    
+    def record_readings(self, readings):
+        """
+        Guarda lecturas en el historial en memoria y en los agregados.
+        
+        Se puede registrar con MQTTClient.add_sink(): se llama desde el hilo
+        despachador con todas las lecturas, aunque la UI solo vea las últimas.
+        Las lecturas quedan también pendientes para los gráficos de tendencia,
+        que las dibujan en el siguiente frame con su timestamp de origen.
+        
+        Args:
+            readings (list[Reading]): Lecturas recibidas
+        """
+        self.history.extend(readings)
+        self.rollups.extend(readings)
+        
+        with self._trend_lock:
+            was_idle = not self._trend_pending and not self._trend_overflow
+            if len(self._trend_pending) + len(readings) > HISTORY_CONFIG["trend_pending_max"]:
+                # Demasiadas (p. ej. con el reloj en pausa): ya están en los agregados
+                self._trend_pending = []
+                self._trend_overflow = True
+            elif not self._trend_overflow:
+                self._trend_pending.extend(readings)
+        
+        if was_idle and readings:
+            self.frame_wake.emit()
+    
+    def reload_trends(self, readings=None):
+        """
+        Vuelve a rellenar los gráficos de tendencia desde los agregados.
+        
+        Se conecta a MQTTClient.backlog_ready: las lecturas atrasadas tras una
+        reconexión son anteriores a la columna actual de los gráficos. Las
+        muestras en orden ya actualizan la caché del Downsampler por sí solas;
+        aquí se descarta entera porque las cubetas cerradas pueden cambiar.
+        
+        Args:
+            readings (list[Reading], optional): Lecturas atrasadas (ya en los agregados)
+        """
+        self.downsampler.invalidate()
+        for widget in self.trend_widgets.values():
+            widget.trend.backfill()
+            widget.update()
+    
+    def _draw_trends(self):
+        """Dibuja en los gráficos de tendencia las lecturas recibidas desde el frame anterior."""
+        with self._trend_lock:
+            pending, self._trend_pending = self._trend_pending, []
+            overflow, self._trend_overflow = self._trend_overflow, False
+        
+        if overflow:
+            self.reload_trends()
+            return
+        
+        widgets = self.trend_widgets
+        for reading in pending:
+            widget = widgets.get(reading.sensor_id)
+            if widget is not None:
+                widget.add_trend_sample(reading.timestamp, reading.value)
+    
+    def _on_frame(self, dt=None):
+        """
+        Vacía el buzón una vez por frame y actualiza los widgets afectados.
+        
+        Args:
+            dt (float, optional): Segundos desde el frame anterior (reloj de frames)
+        """
+        pending = self.mailbox.drain()
+        if pending:
+            self._apply_readings(pending)
+        self._draw_trends()
+        
+        # Sin nada pendiente se duerme: una lectura que llegue después de
+        # comprobarlo encuentra el buzón vacío y emite frame_wake, que se
+        # atiende después de este frame
+        if not self.mailbox.pending_count() and not self._trend_pending and not self._trend_overflow:
+            self.frame_client.sleep()
+    
+    def _wake_frame(self):
+        """Despierta el frame del buzón (conectado en cola a frame_wake)."""
+        self.frame_client.wake()
+    
+    def _generate_test_values(self):
+        """
+        Genera valores simulados que recorren los distintos estados.
+        
+        Returns:
+            dict: Valor simulado por sensor
+        """
+        # Partir del último valor del historial (o de un valor inicial razonable)
+        history = self.history
+        prev_temp_value = history.last_value("Temperatura", 24.0)
+        prev_humidity_value = history.last_value("Humedad", 45.0)
+        prev_pressure_value = history.last_value("Presión", 1010.0)
+        prev_air_quality_value = history.last_value("Calidad_Aire", 50.0)
+        prev_noise_value = history.last_value("Ruido", 45.0)
         
         # Modo de prueba - crear oscilaciones para ver los cambios de estado
         # Para presión atmosférica: crear ciclos que crucen los umbrales (1000 y 1015)
@@ -589,7 +787,7 @@ class MainWindow(QMainWindow):
                 pressure_value = 995 + (reverse_position * 0.75)
         else:
             # Mantener el valor anterior si no toca actualizar
-            pressure_value = self.prev_pressure_value
+            pressure_value = prev_pressure_value
             
         # Ciclo para temperatura (solo actualizar cada 10 ciclos)
         if self.cycle_counter % 10 == 0:
@@ -614,12 +812,12 @@ class MainWindow(QMainWindow):
             temp_value = round(temp_value, 1)
         else:
             # Mantener el valor anterior si no toca actualizar
-            temp_value = self.prev_temp_value
+            temp_value = prev_temp_value
             
         # Generar nuevos valores para los demás sensores (con pequeños cambios aleatorios)
-        humidity_value = round(self.prev_humidity_value + random.uniform(-0.1, 0.1), 1)
-        air_quality_value = round(self.prev_air_quality_value + random.uniform(-0.1, 0.1), 1)
-        noise_value = round(self.prev_noise_value + random.uniform(-0.1, 0.1), 1)
+        humidity_value = round(prev_humidity_value + random.uniform(-0.1, 0.1), 1)
+        air_quality_value = round(prev_air_quality_value + random.uniform(-0.1, 0.1), 1)
+        noise_value = round(prev_noise_value + random.uniform(-0.1, 0.1), 1)
         
         # Mantener dentro de rangos razonables
         temp_value = max(18.0, min(32.0, temp_value))
@@ -628,149 +826,121 @@ class MainWindow(QMainWindow):
         air_quality_value = max(0.0, min(100.0, air_quality_value))
         noise_value = max(30.0, min(90.0, noise_value))
         
-        # Guardar los valores actuales como previos para la próxima actualización
-        self.prev_temp_value = temp_value
-        self.prev_humidity_value = humidity_value
-        self.prev_pressure_value = pressure_value
-        self.prev_air_quality_value = air_quality_value
-        self.prev_noise_value = noise_value
+        return {
+            "Temperatura": temp_value,
+            "Humedad": humidity_value,
+            "Presión": pressure_value,
+            "Calidad_Aire": air_quality_value,
+            "Ruido": noise_value
+        }
+    
+    def _apply_readings(self, latest):
+        """
+        Muestra las lecturas en los widgets y actualiza las etiquetas de estado.
+        Solo se actualizan los sensores que tienen una lectura nueva.
         
-        # Actualizar valores en los widgets
+        Args:
+            latest (dict): Última lectura (Reading) por sensor
+        """
+        handlers = self._sensor_handlers
+        for sensor_id, reading in latest.items():
+            handler = handlers.get(sensor_id)
+            if handler is not None:
+                handler(reading.value)
+    
+    def _apply_humidity(self, humidity_value):
+        """
+        Actualiza el widget de humedad y su etiqueta de estado.
+        
+        Args:
+            humidity_value (float): Valor actual
+        """
+        self.sensor_widgets["Humedad"].set_value(humidity_value)
+        band, _ = self.classifier.update("Humedad", humidity_value)
+        self._set_status(self.humidity_status, band)
+    
+    def _apply_pressure(self, pressure_value):
+        """
+        Actualiza el widget de presión y su etiqueta de estado.
+        
+        Args:
+            pressure_value (float): Valor actual
+        """
+        self.sensor_widgets["Presión"].set_value(pressure_value)
+        band, _ = self.classifier.update("Presión", pressure_value)
+        
+        # Si existe el campo de estado para presión, actualizarlo
+        if hasattr(self, 'pressure_status'):
+            self._set_status(self.pressure_status, band)
+    
+    def _apply_air_quality(self, air_quality_value):
+        """
+        Actualiza el widget de calidad del aire y su etiqueta de estado.
+        
+        Args:
+            air_quality_value (float): Valor actual
+        """
+        self.sensor_widgets["Calidad_Aire"].set_value(air_quality_value)
+        band, _ = self.classifier.update("Calidad_Aire", air_quality_value)
+        self._set_status(self.air_quality_status, band)
+    
+    def _apply_noise(self, noise_value):
+        """
+        Actualiza el widget de ruido y su etiqueta de estado.
+        
+        Args:
+            noise_value (float): Valor actual
+        """
+        self.sensor_widgets["Ruido"].set_value(noise_value)
+        band, _ = self.classifier.update("Ruido", noise_value)
+        self._set_status(self.noise_status, band)
+    
+    def _apply_temperature(self, temp_value):
+        """
+        Actualiza el termómetro y su etiqueta de estado.
+        
+        Args:
+            temp_value (float): Temperatura actual
+        """
         self.thermometer.set_value(temp_value)
+        band, _ = self.classifier.update("Temperatura", temp_value)
+        self._set_status(self.temperature_status, band)
+    
+    def _set_status(self, label, band):
+        """
+        Muestra un estado (texto y color) en una etiqueta de estado.
         
-        # Actualizar el estado de temperatura
-        if temp_value < 20:
-            status = "Frío"
-            status_color = "#3498db"  # Azul
-        elif temp_value <= 25:
-            status = "Normal"
-            status_color = "#2ecc71"  # Verde
-        elif temp_value <= 28:
-            status = "Cálido"
-            status_color = "#f39c12"  # Naranja
-        else:
-            status = "Calor"
-            status_color = "#e74c3c"  # Rojo
+        La etiqueta no toca Qt si el estado ya es el que muestra.
         
-        # Actualizar el texto de estado
-        self.temperature_status.setText(f"Estado: {status}")
-        self.temperature_status.setStyleSheet(f"""
-            color: {status_color};
-            font-size: 16px;
-            font-weight: bold;
-            background-color: transparent;
-            padding: 2px;
-        """)
+        Args:
+            label (StatusLabel): Etiqueta de estado del sensor
+            band (Band): Estado del clasificador
+        """
+        label.set_status(f"Estado: {band.state}", band.color)
+    
+    def show_alert(self, alert):
+        """
+        Muestra en el aviso superior la última alerta activa.
         
-        # Actualizar todos los sensores
-        for sensor_id, widget in self.sensor_widgets.items():
-            if sensor_id == "Temperatura":
-                widget.set_value(temp_value)
-            elif sensor_id == "Humedad":
-                widget.set_value(humidity_value)
-                
-                # Actualizar el estado de humedad
-                if humidity_value < 30:
-                    status = "Seco"
-                    status_color = "#e74c3c"  # Rojo
-                elif humidity_value <= 50:
-                    status = "Normal"
-                    status_color = "#2ecc71"  # Verde
-                elif humidity_value <= 60:
-                    status = "Húmedo"
-                    status_color = "#3498db"  # Azul
-                else:
-                    status = "Muy húmedo"
-                    status_color = "#9b59b6"  # Púrpura
-                
-                # Actualizar el texto de estado
-                self.humidity_status.setText(f"Estado: {status}")
-                self.humidity_status.setStyleSheet(f"""
-                    color: {status_color};
-                    font-size: 16px;
-                    font-weight: bold;
-                    background-color: transparent;
-                    padding: 2px;
-                """)
-            
-            elif sensor_id == "Presión":
-                widget.set_value(pressure_value)
-                
-                # Actualizar el estado de presión
-                if pressure_value < 1000:
-                    status = "Baja"
-                    status_color = "#3498db"  # Azul para presión baja
-                elif pressure_value <= 1015:
-                    status = "Normal"
-                    status_color = "#2ecc71"  # Verde para presión normal
-                else:
-                    status = "Alta"
-                    status_color = "#e74c3c"  # Rojo para presión alta
-                
-                # Si existe el campo de estado para presión, actualizarlo
-                if hasattr(self, 'pressure_status'):
-                    self.pressure_status.setText(f"Estado: {status}")
-                    self.pressure_status.setStyleSheet(f"""
-                        color: {status_color};
-                        font-size: 16px;
-                        font-weight: bold;
-                        background-color: transparent;
-                        padding: 2px;
-                    """)
-            
-            elif sensor_id == "Calidad_Aire":
-                widget.set_value(air_quality_value)
-                
-                # Actualizar el estado de calidad del aire
-                if air_quality_value < 50:
-                    status = "Excelente"
-                    status_color = "#2ecc71"  # Verde
-                elif air_quality_value < 100:
-                    status = "Buena"
-                    status_color = "#3498db"  # Azul
-                elif air_quality_value < 150:
-                    status = "Moderada"
-                    status_color = "#f39c12"  # Naranja
-                elif air_quality_value < 300:
-                    status = "Mala"
-                    status_color = "#e74c3c"  # Rojo
-                else:
-                    status = "Peligrosa"
-                    status_color = "#8e44ad"  # Morado
-                
-                # Actualizar el texto de estado
-                self.air_quality_status.setText(f"Estado: {status}")
-                self.air_quality_status.setStyleSheet(f"""
-                    color: {status_color};
-                    font-size: 16px;
-                    font-weight: bold;
-                    background-color: transparent;
-                    padding: 2px;
-                """)
-            
-            elif sensor_id == "Ruido":
-                widget.set_value(noise_value)
-                
-                # Actualizar el estado de ruido
-                if noise_value < 60:
-                    status = "Bajo"
-                    status_color = "#f1c40f"  # Amarillo
-                elif noise_value < 80:
-                    status = "Moderado"
-                    status_color = "#f39c12"  # Naranja
-                else:
-                    status = "Alto"
-                    status_color = "#e74c3c"  # Rojo
-                
-                # Actualizar el texto de estado
-                self.noise_status.setText(f"Estado: {status}")
-                self.noise_status.setStyleSheet(f"""
-                    color: {status_color};
-                    font-size: 16px;
-                    font-weight: bold;
-                    background-color: transparent;
-                    padding: 2px;
-                """)
+        Se conecta a alert_changed (ver main.py), así que se ejecuta en el
+        hilo de la UI aunque AlertEngine la emita desde el despachador.
+        
+        Args:
+            alert (Alert): Cambio de estado de una regla o de una anomalía
+        """
+        key = (alert.rule, alert.sensor_id)
+        self._active_alerts.pop(key, None)
+        if alert.active:
+            self._active_alerts[key] = alert
+        
+        if not self._active_alerts:
+            self.alert_label.set_status("", COLORS["error"])
+            return
+        rule, sensor_id = next(reversed(self._active_alerts))
+        text = f"Alerta: {rule} ({sensor_id})"
+        if len(self._active_alerts) > 1:
+            text += f" y {len(self._active_alerts) - 1} más"
+        self.alert_label.set_status(text, COLORS["error"])
     
     def show_error_message(self, title, message):
         """
@@ -794,6 +964,9 @@ class MainWindow(QMainWindow):
         Args:
             button_widget: El widget del botón que fue presionado
         """
+        # Reanudar la animación del círculo si estaba en reposo
+        self.ai_circle.frame_client.wake()
+        
         # Efecto visual de presionar el botón
         button_widget.setStyleSheet("""
             background-color: rgba(155, 89, 182, 0.4);
@@ -0,0 +1,227 @@
+"""
+Gobernador de calidad: degrada el dibujo cuando pintar cuesta demasiado.
+
+En placas lentas el dibujo completo con antialiasing (hasta 140 zonas de
+empañamiento, 50 partículas, 15 barras con degradado y la aguja a 40 fps)
+no llega a tiempo a todos los frames. QualityGovernor mide lo que tarda de
+verdad cada paintEvent de los widgets vigilados (envolviendo su
+paintEvent) y, en cada periodo de QUALITY_CONFIG["period_ms"], calcula la
+carga de pintado: la fracción del tiempo que el hilo de la UI pasa
+pintando.
+
+- Si la carga supera QUALITY_CONFIG["paint_budget"], baja un nivel de
+  QUALITY_LEVELS: menos zonas de empañamiento (HumidityWidget), menos
+  partículas (AirQualityWidget), sin antialiasing y, por último, el reloj
+  de frames a la mitad de ticks.
+- Si la carga queda por debajo de paint_budget * restore_fraction durante
+  restore_periods periodos seguidos, sube un nivel. Si al subir hay que
+  volver a bajar enseguida, la espera para subir se duplica (hasta
+  max_restore_periods) para no oscilar entre dos niveles.
+
+Los widgets con un método set_quality(quality) reciben el nivel nuevo. El
+nivel actual y los tiempos de pintado por widget se consultan con
+get_stats().
+"""
+import time
+from collections import namedtuple
+
+from config import QUALITY_CONFIG
+from utils.logger import setup_logger
+
+# Configurar logger del gobernador
+logger = setup_logger(__name__)
+
+# Ajustes de un nivel de calidad
+Quality = namedtuple("Quality", ["level", "name", "fog_fraction", "particle_fraction", "antialiasing", "tick_scale"])
+
+# Niveles de mejor a peor calidad; cada uno mantiene las rebajas del anterior
+QUALITY_LEVELS = (
+    Quality(0, "completa", 1.0, 1.0, True, 1),
+    Quality(1, "menos empañamiento", 0.5, 1.0, True, 1),
+    Quality(2, "menos partículas", 0.5, 0.5, True, 1),
+    Quality(3, "sin antialiasing", 0.5, 0.5, False, 1),
+    Quality(4, "menos frames", 0.25, 0.3, False, 2),
+)
+
+
+class PaintStats:
+    """Tiempo de pintado de un widget en el periodo actual."""
+
+    __slots__ = ("name", "paints", "total", "worst", "last_paints", "last_mean_ms", "last_worst_ms")
+
+    def __init__(self, name):
+        self.name = name
+        self.paints = 0
+        self.total = 0.0
+        self.worst = 0.0
+        # Resumen del último periodo cerrado (para diagnóstico)
+        self.last_paints = 0
+        self.last_mean_ms = 0.0
+        self.last_worst_ms = 0.0
+
+    def close_period(self):
+        """Guarda el resumen del periodo y empieza otro; devuelve el tiempo pintando."""
+        total = self.total
+        self.last_paints = self.paints
+        self.last_mean_ms = total / self.paints * 1000 if self.paints else 0.0
+        self.last_worst_ms = self.worst * 1000
+        self.paints = 0
+        self.total = 0.0
+        self.worst = 0.0
+        return total
+
+
+class QualityGovernor:
+    """Ajusta el nivel de calidad según el tiempo de pintado medido."""
+
+    def __init__(self, clock, config=None):
+        """
+        Inicializa el gobernador y lo registra en el reloj de frames.
+
+        Args:
+            clock (FrameClock): Reloj de frames (evalúa la carga y aplica la bajada de ticks)
+            config (dict, optional): Ajustes (por defecto config.QUALITY_CONFIG)
+        """
+        config = config or QUALITY_CONFIG
+        self.clock = clock
+        self.budget = config["paint_budget"]
+        self.restore_fraction = config["restore_fraction"]
+        self.min_restore_periods = config["restore_periods"]
+        self.max_restore_periods = config["max_restore_periods"]
+        self.period_s = config["period_ms"] / 1000
+
+        self.quality = QUALITY_LEVELS[0]
+        self.load = 0.0
+        self._widgets = []
+        self._stats = {}
+        self._base_tick_ms = clock.tick_ms
+
+        # Periodos tranquilos seguidos, periodos necesarios para subir y
+        # periodos desde la última subida (None si no ha habido)
+        self._calm = 0
+        self._restore_periods = self.min_restore_periods
+        self._since_restore = None
+        self.degrades = 0
+        self.restores = 0
+
+        self._period_start = time.perf_counter()
+        self.client = clock.register(config["period_ms"], self._evaluate)
+
+    @property
+    def level(self):
+        """Nivel de calidad actual (0 = completa)."""
+        return self.quality.level
+
+    def watch(self, widget, name=None):
+        """
+        Mide el paintEvent de un widget y le aplica el nivel de calidad.
+
+        Args:
+            widget (QWidget): Widget a vigilar
+            name (str, optional): Nombre en las estadísticas (por defecto la clase)
+        """
+        stats = PaintStats(name or type(widget).__name__)
+        self._stats[widget] = stats
+        self._widgets.append(widget)
+        widget.destroyed.connect(lambda: self._forget(widget))
+        paint = widget.paintEvent
+
+        def timed_paint(event):
+            start = time.perf_counter()
+            paint(event)
+            elapsed = time.perf_counter() - start
+            stats.paints += 1
+            stats.total += elapsed
+            if elapsed > stats.worst:
+                stats.worst = elapsed
+
+        widget.paintEvent = timed_paint
+        if hasattr(widget, "set_quality"):
+            widget.set_quality(self.quality)
+
+    def _forget(self, widget):
+        """Deja de vigilar un widget destruido."""
+        self._stats.pop(widget, None)
+        if widget in self._widgets:
+            self._widgets.remove(widget)
+
+    def _evaluate(self, dt):
+        """Calcula la carga del periodo y cambia de nivel si hace falta."""
+        now = time.perf_counter()
+        elapsed = now - self._period_start
+        self._period_start = now
+        painting = sum(stats.close_period() for stats in self._stats.values())
+        # El primer tick del reloj llega enseguida: un periodo tan corto (con
+        # los primeros pintados de la ventana) no es representativo
+        if elapsed < self.period_s / 2:
+            return
+        self.load = painting / elapsed
+
+        if self._since_restore is not None:
+            self._since_restore += 1
+
+        level = self.quality.level
+        if self.load > self.budget and level < len(QUALITY_LEVELS) - 1:
+            if self._since_restore is not None and self._since_restore <= self.min_restore_periods:
+                # La subida anterior no se sostuvo: esperar más antes de la próxima
+                self._restore_periods = min(self._restore_periods * 2, self.max_restore_periods)
+            self._calm = 0
+            self._since_restore = None
+            self.degrades += 1
+            self.set_level(level + 1)
+        elif level > 0 and self.load < self.budget * self.restore_fraction:
+            self._calm += 1
+            if self._calm >= self._restore_periods:
+                self._calm = 0
+                self._since_restore = 0
+                self.restores += 1
+                self.set_level(level - 1)
+        else:
+            self._calm = 0
+
+    def set_level(self, level):
+        """
+        Aplica un nivel de calidad a los widgets y al reloj de frames.
+
+        Args:
+            level (int): Posición en QUALITY_LEVELS
+        """
+        quality = QUALITY_LEVELS[level]
+        if quality == self.quality:
+            return
+        logger.info(
+            f"Calidad {self.quality.level} -> {quality.level} ({quality.name}), "
+            f"carga de pintado {self.load:.0%}"
+        )
+        self.quality = quality
+        self.clock.set_tick_ms(self._base_tick_ms * quality.tick_scale)
+        for widget in self._widgets:
+            if hasattr(widget, "set_quality"):
+                widget.set_quality(quality)
+
+    def get_stats(self):
+        """
+        Devuelve el nivel actual y los tiempos de pintado del último periodo.
+
+        Returns:
+            dict: Nivel y nombre, carga de pintado, presupuesto, bajadas y
+                subidas, y por widget los pintados del periodo y el tiempo
+                medio y el peor en ms
+        """
+        return {
+            "level": self.quality.level,
+            "name": self.quality.name,
+            "load": round(self.load, 3),
+            "budget": self.budget,
+            "degrades": self.degrades,
+            "restores": self.restores,
+            "restore_periods": self._restore_periods,
+            "widgets": {
+                stats.name: {
+                    "paints": stats.last_paints,
+                    "mean_ms": round(stats.last_mean_ms, 2),
+                    "worst_ms": round(stats.last_worst_ms, 2),
+                }
+                for stats in self._stats.values()
+            },
+        }
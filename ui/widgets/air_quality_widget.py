@@ -1,11 +1,28 @@
 """
 Widget personalizado para mostrar la calidad del aire.
+
+Las partículas de la animación viven en arrays de NumPy preasignados con
+capacidad para MAX_PARTICLES (posición, tamaño, velocidad y opacidad) y un
+número de partículas activas; cada frame del reloj las mueve con un paso
+vectorizado. paintEvent solo las dibuja, sin modificar el estado.
 """
 from PyQt6.QtWidgets import QWidget, QSizePolicy
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QFont, QLinearGradient
-from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer
+from PyQt6.QtCore import Qt, QRectF, QPointF
+import numpy as np
+from analysis.classifier import get_classifier
+from config import FRAME_CONFIG
+from ui.frame_clock import get_frame_clock
+from ui.quality_governor import QUALITY_LEVELS
+from ui.widgets.trend_chart import TrendChart
 
 class AirQualityWidget(QWidget):
+    # Intervalo de frame deseado de la animación de las partículas
+    FRAME_INTERVAL_MS = 50
+    
+    # Capacidad de los arrays de partículas (máximo de partículas activas)
+    MAX_PARTICLES = 50
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -22,77 +39,171 @@ class AirQualityWidget(QWidget):
         self.max_value = 500
         self.title = "Calidad del Aire"
         
-        # Colores para diferentes estados
+        # Estados y colores (bandas de config.SENSORS["Calidad_Aire"])
+        self.classifier = get_classifier()
         self.colors = {
-            "excelente": QColor("#2ecc71"),  # Verde
-            "buena": QColor("#3498db"),      # Azul
-            "moderada": QColor("#f39c12"),   # Naranja
-            "mala": QColor("#e74c3c"),       # Rojo
-            "peligrosa": QColor("#8e44ad")   # Morado
+            band.state.lower(): QColor(band.color)
+            for band in self.classifier["Calidad_Aire"].bands
         }
         
-        # Efecto de animación
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update)
-        self.animation_timer.start(50)  # Aumentar la velocidad de actualización
+        # Nivel de calidad (el gobernador reduce las partículas en placas lentas)
+        self.quality = QUALITY_LEVELS[0]
+        
+        # Gráfico de tendencia (se alterna con las partículas tocando el widget)
+        self.chart_mode = False
+        self.trend = TrendChart(self.min_value, self.max_value, self.colors["buena"])
         
         # Partículas para la animación
-        self.particles = []
+        self.rng = np.random.default_rng()
         self.init_particles()
         
+        # Efecto de animación: las partículas se mueven en cada frame del reloj compartido
+        # mientras haya cambios de valor recientes
+        self.frame_client = get_frame_clock().register(
+            self.FRAME_INTERVAL_MS, self.update_particles, self, linger_s=FRAME_CONFIG["idle_after_s"]
+        )
+        
     def init_particles(self):
-        """Inicializa las partículas para la animación."""
-        import random
-        for _ in range(30):  # Aumentar el número inicial de partículas
-            self.particles.append({
-                'x': random.uniform(0, 1),
-                'y': random.uniform(0, 1),
-                'size': random.uniform(2, 6),  # Reducir tamaño máximo
-                'speed': random.uniform(0.002, 0.006),  # Aumentar velocidad
-                'opacity': random.uniform(0.3, 0.7)  # Ajustar opacidad
-            })
+        """Inicializa los arrays de partículas con toda su capacidad."""
+        capacity = self.MAX_PARTICLES
+        self.particle_x = self.rng.uniform(0, 1, capacity)
+        self.particle_y = self.rng.uniform(0, 1, capacity)
+        self.particle_size = self.rng.uniform(2, 6, capacity)  # Reducir tamaño máximo
+        self.particle_speed = self.rng.uniform(0.002, 0.006, capacity)  # Aumentar velocidad
+        self.particle_opacity = self.rng.uniform(0.3, 0.7, capacity)  # Ajustar opacidad
+        # Partiendo del array lleno, las primeras partículas conservan su altura aleatoria
+        self.active_particles = capacity
+        self._update_particle_count()
+        
+    def _update_particle_count(self):
+        """Ajusta el número de partículas activas al valor y al nivel de calidad."""
+        # Niveles de densidad de partículas basado en el valor
+        particle_count = int(max(15, min(50, (self.value / self.max_value) * 50)))
+        particle_count = int(particle_count * self.quality.particle_fraction)
+        particle_count = min(particle_count, self.MAX_PARTICLES)
+        
+        # Las partículas que se activan comienzan desde abajo
+        start = self.active_particles
+        if particle_count > start:
+            new = slice(start, particle_count)
+            count = particle_count - start
+            self.particle_x[new] = self.rng.uniform(0, 1, count)
+            self.particle_y[new] = 1.0
+            self.particle_size[new] = self.rng.uniform(2, 6, count)  # Tamaños más pequeños para mayor fluidez
+            self.particle_speed[new] = self.rng.uniform(0.002, 0.006, count)  # Mayor velocidad
+            self.particle_opacity[new] = self.rng.uniform(0.3, 0.7, count)  # Opacidad más consistente
+        self.active_particles = particle_count
+        
+    def update_particles(self, dt):
+        """
+        Mueve las partículas activas un frame (paso vectorizado).
+        
+        Args:
+            dt (float): Segundos desde el frame anterior
+        
+        Returns:
+            bool: True (las partículas se mueven en cada frame)
+        """
+        # En modo gráfico no hay partículas que animar
+        if self.chart_mode:
+            return False
+        
+        count = self.active_particles
+        x = self.particle_x[:count]
+        y = self.particle_y[:count]
+        
+        # Mover partículas hacia arriba con delta más pequeño
+        y -= self.particle_speed[:count]
+        
+        # Añadir movimiento horizontal suave (dentro de los límites)
+        x += self.rng.uniform(-0.002, 0.002, count)
+        np.clip(x, 0, 1, out=x)
+        
+        # Las partículas que salen por arriba se reinician abajo
+        out = np.flatnonzero(y < 0)
+        if out.size:
+            y[out] = 1.0
+            x[out] = self.rng.uniform(0, 1, out.size)
+            self.particle_size[out] = self.rng.uniform(2, 6, out.size)
+        
+        return True
         
     def set_value(self, value):
         """Establece el valor actual."""
+        prev_value = self.value
         self.value = max(self.min_value, min(self.max_value, value))
+        
+        # Un valor distinto cambia la densidad de partículas y reanuda su animación
+        if self.value != prev_value:
+            self._update_particle_count()
+            self.frame_client.wake()
         self.update()
         
     def set_range(self, min_value, max_value):
         """Establece el rango de valores."""
         self.min_value = min_value
         self.max_value = max_value
+        self.trend.set_range(min_value, max_value)
+        self._update_particle_count()
         self.update()
         
+    def set_quality(self, quality):
+        """
+        Aplica un nivel de calidad del gobernador (ui.quality_governor).
+        
+        Args:
+            quality (Quality): Nivel de calidad
+        """
+        self.quality = quality
+        self._update_particle_count()
+        self.update()
+    
+    def add_trend_sample(self, timestamp, value):
+        """
+        Añade una lectura al gráfico de tendencia (solo se dibuja su columna).
+        
+        Args:
+            timestamp (float): Instante de la medida en el origen
+            value (float): Valor medido
+        """
+        self.trend.add_sample(timestamp, value)
+        if self.chart_mode:
+            self.update()
+    
+    def set_chart_mode(self, enabled):
+        """Alterna entre las partículas y el gráfico de tendencia."""
+        self.chart_mode = enabled
+        if enabled:
+            self.trend.fit(self.width(), self.height())
+        if not enabled:
+            self.frame_client.wake()
+        self.update()
+    
+    def resizeEvent(self, event):
+        """Ajusta el gráfico de tendencia al nuevo tamaño (fuera de paintEvent)."""
+        super().resizeEvent(event)
+        if self.chart_mode:
+            self.trend.fit(self.width(), self.height())
+    
+    def mousePressEvent(self, event):
+        """Cada toque pasa al siguiente gráfico de tendencia (24 h, 1 h) y después vuelve al widget."""
+        if not self.chart_mode:
+            self.set_chart_mode(True)
+        elif not self.trend.next_window():
+            self.set_chart_mode(False)
+    
     def get_color(self):
         """Obtiene el color basado en el valor actual."""
-        if self.value < 50:
-            return self.colors["excelente"]
-        elif self.value < 100:
-            return self.colors["buena"]
-        elif self.value < 150:
-            return self.colors["moderada"]
-        elif self.value < 300:
-            return self.colors["mala"]
-        else:
-            return self.colors["peligrosa"]
+        return self.colors[self.get_state().lower()]
         
     def get_state(self):
         """Obtiene el estado actual basado en el valor."""
-        if self.value < 50:
-            return "Excelente"
-        elif self.value < 100:
-            return "Buena"
-        elif self.value < 150:
-            return "Moderada"
-        elif self.value < 300:
-            return "Mala"
-        else:
-            return "Peligrosa"
+        return self.classifier.current("Calidad_Aire", self.value).state
         
     def paintEvent(self, event):
         """Dibuja el widget."""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.quality.antialiasing)
         
         # Obtener dimensiones
         width = self.width()
@@ -101,8 +212,12 @@ class AirQualityWidget(QWidget):
         # Dibujar fondo
         self._draw_background(painter, width, height)
         
+        if self.chart_mode:
+            self.trend.draw_panel(painter, width, height, f"{int(self.value)} IAQ")
+            return
+        
         # Dibujar partículas
-        self._update_and_draw_particles(painter, width, height)
+        self._draw_particles(painter, width, height)
         
         # Dibujar barra de progreso
         self._draw_progress_bar(painter, width, height)
@@ -117,59 +232,29 @@ class AirQualityWidget(QWidget):
         # Fondo completamente transparente
         painter.fillRect(0, 0, width, height, QColor(0, 0, 0, 0))
         
-    def _update_and_draw_particles(self, painter, width, height):
-        """Actualiza y dibuja las partículas animadas."""
-        import random
-        
+    def _draw_particles(self, painter, width, height):
+        """Dibuja las partículas activas (las mueve update_particles)."""
         current_color = self.get_color()
         alpha = int(min(255, 120 + (self.value / self.max_value) * 135))
         
-        # Niveles de densidad de partículas basado en el valor
-        particle_count = int(max(15, min(50, (self.value / self.max_value) * 50)))
-        
         # Definir área de partículas (centrada horizontalmente, 65% de altura en el centro)
         particle_area_width = width * 0.8
         particle_area_height = height * 0.65
         particle_area_x = (width - particle_area_width) / 2
         particle_area_y = height * 0.175  # Centrado verticalmente
         
-        # Añadir más partículas si es necesario
-        while len(self.particles) < particle_count:
-            self.particles.append({
-                'x': random.uniform(0, 1),
-                'y': 1.0,  # Comienza desde abajo
-                'size': random.uniform(2, 6),  # Tamaños más pequeños para mayor fluidez
-                'speed': random.uniform(0.002, 0.006),  # Mayor velocidad
-                'opacity': random.uniform(0.3, 0.7)  # Opacidad más consistente
-            })
-            
-        # Limitar el número de partículas
-        self.particles = self.particles[:particle_count]
-            
-        for p in self.particles:
-            # Mover partículas hacia arriba con delta más pequeño
-            p['y'] -= p['speed']
-            
-            # Añadir movimiento horizontal suave
-            p['x'] += random.uniform(-0.002, 0.002)
-            p['x'] = max(0, min(1, p['x']))  # Mantener dentro de los límites
-            
-            # Si la partícula sale de la pantalla, reiniciarla
-            if p['y'] < 0:
-                p['y'] = 1.0
-                p['x'] = random.uniform(0, 1)
-                p['size'] = random.uniform(2, 6)
-                
-            # Dibujar partícula (aplicar el área definida)
-            x = int(particle_area_x + (p['x'] * particle_area_width))
-            y = int(particle_area_y + (p['y'] * particle_area_height))
-            size = int(p['size'])
-            
-            particle_color = QColor(current_color)
-            particle_color.setAlpha(int(p['opacity'] * alpha))
-            
-            painter.setBrush(QBrush(particle_color))
-            painter.setPen(Qt.PenStyle.NoPen)
+        # Coordenadas, tamaños y transparencias de todas las partículas de una vez
+        count = self.active_particles
+        xs = (particle_area_x + self.particle_x[:count] * particle_area_width).astype(int).tolist()
+        ys = (particle_area_y + self.particle_y[:count] * particle_area_height).astype(int).tolist()
+        sizes = self.particle_size[:count].astype(int).tolist()
+        alphas = (self.particle_opacity[:count] * alpha).astype(int).tolist()
+        
+        particle_color = QColor(current_color)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for x, y, size, particle_alpha in zip(xs, ys, sizes, alphas):
+            particle_color.setAlpha(particle_alpha)
+            painter.setBrush(particle_color)
             painter.drawEllipse(x, y, size, size)
             
     def _draw_progress_bar(self, painter, width, height):
@@ -210,7 +295,7 @@ class AirQualityWidget(QWidget):
         pen.setWidth(1)
         painter.setPen(pen)
         
-        levels = [50, 100, 150, 300]  # Umbrales de calidad
+        levels = self.classifier["Calidad_Aire"].limits  # Umbrales de calidad
         for level in levels:
             level_x = bar_x + (level / self.max_value) * bar_width
             painter.drawLine(
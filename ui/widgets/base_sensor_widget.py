@@ -4,6 +4,24 @@ Clase base para todos los widgets de sensores.
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
 from PyQt6.QtCore import Qt
 from config import SENSORS
+from analysis.classifier import get_classifier
+
+# Hojas de estilo del borde ya construidas, por color
+_border_styles = {}
+
+
+def _border_style(color):
+    """Devuelve la hoja de estilo del borde de un color (se construye una vez)."""
+    style = _border_styles.get(color)
+    if style is None:
+        style = _border_styles[color] = f"""
+            QWidget {{
+                background-color: transparent;
+                border: 2px solid {color};
+                border-radius: 10px;
+            }}
+        """
+    return style
 
 class BaseSensorWidget(QWidget):
     def __init__(self, sensor_id, sensor_type, title, unit, min_value, max_value, parent=None):
@@ -30,6 +48,14 @@ class BaseSensorWidget(QWidget):
         
         # Obtener información del sensor de la configuración
         self.sensor_info = SENSORS.get(self.sensor_type, SENSORS["Temperatura"])
+        self._levels_id = self.sensor_type if self.sensor_type in SENSORS else "Temperatura"
+        
+        # Niveles normal/aviso/crítico compilados desde los umbrales de config.SENSORS
+        self.classifier = get_classifier()
+        
+        # Texto y color de borde mostrados (solo se toca Qt cuando cambian)
+        self._value_text = None
+        self._border_color = None
         
         # Habilitar transparencia
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -115,27 +141,17 @@ class BaseSensorWidget(QWidget):
         """
         # Formatear el valor con la unidad
         value_text = f"{self.value:.1f} {self.unit}"
-        self.value_label.setText(value_text)
-        
-        # Actualizar color según umbrales
-        if "warning_threshold" in self.sensor_info and "critical_threshold" in self.sensor_info:
-            warning = self.sensor_info["warning_threshold"]
-            critical = self.sensor_info["critical_threshold"]
-            
-            if self.value >= critical:
-                color = "#e74c3c"  # Rojo
-            elif self.value >= warning:
-                color = "#f39c12"  # Naranja
-            else:
-                color = "#2ecc71"  # Verde
-                
-            self.setStyleSheet(f"""
-                QWidget {{
-                    background-color: transparent;
-                    border: 2px solid {color};
-                    border-radius: 10px;
-                }}
-            """)
+        if value_text != self._value_text:
+            self._value_text = value_text
+            self.value_label.setText(value_text)
+        
+        # Actualizar color según umbrales (setStyleSheet repule todo el widget:
+        # solo cuando cambia el nivel)
+        if self._levels_id in self.classifier.levels:
+            color = self.get_color_for_value(self.value)
+            if color != self._border_color:
+                self._border_color = color
+                self.setStyleSheet(_border_style(color))
     
     def apply_rotation(self, angle: int):
         """
@@ -144,6 +160,8 @@ class BaseSensorWidget(QWidget):
         Args:
             angle (int): Ángulo de rotación en grados
         """
+        # La hoja de estilo se sustituye: el borde se volverá a aplicar
+        self._border_color = None
         if angle == 90:
             # Rotar todo el contenido 90 grados desde el centro
             self.setStyleSheet("""
@@ -179,16 +197,5 @@ class BaseSensorWidget(QWidget):
         Returns:
             str: Código de color hexadecimal
         """
-        warning = self.sensor_info.get("warning_threshold")
-        critical = self.sensor_info.get("critical_threshold")
-        
-        if warning is not None and critical is not None:
-            if value >= critical:
-                return "#e74c3c"  # Rojo
-            elif value >= warning:
-                return "#f39c12"  # Naranja
-            else:
-                return "#2ecc71"  # Verde
-        
-        # Valor por defecto si no hay umbrales
-        return "#3498db"  # Azul 
\ No newline at end of file
+        # Azul por defecto si el sensor no tiene umbrales
+        return self.classifier.level(self._levels_id, value).color 
\ No newline at end of file
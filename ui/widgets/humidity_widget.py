@@ -1,15 +1,30 @@
 """
 Widget personalizado para mostrar la humedad con un diseño moderno
 que incluye una ventana que se empaña según el nivel de humedad y una barra lateral de porcentaje.
+Al tocarlo alterna con un gráfico de tendencia de las últimas horas.
+
+Cada zona de empañamiento guarda su QPainterPath en coordenadas
+normalizadas de la ventana (0-1), construido una sola vez al generarla, y
+todas se colocan con una única QTransform. El empañamiento completo es una
+capa de LayerCache que solo se rasteriza de nuevo cuando cambian las zonas
+o el valor; el resto de frames es una copia del pixmap.
 """
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QFont, QLinearGradient, QRadialGradient
-from PyQt6.QtCore import Qt, QRect, QRectF, QTimer, QPointF
+from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QFont, QLinearGradient, QRadialGradient, QTransform
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF
+from ui.frame_clock import get_frame_clock
+from ui.quality_governor import QUALITY_LEVELS
+from ui.widgets.layer_cache import LayerCache
+from ui.widgets.trend_chart import TrendChart
+from config import FRAME_CONFIG
 import random
 import math
 
 class HumidityWidget(QWidget):
-    def __init__(self, min_value=0, max_value=100, parent=None):
+    # Intervalo de frame deseado de la animación del empañamiento
+    FRAME_INTERVAL_MS = 50
+    
+    def __init__(self, min_value=0, max_value=100, trend_window_s=None, parent=None):
         super().__init__(parent)
         
         # Valores por defecto
@@ -26,94 +41,126 @@ class HumidityWidget(QWidget):
         self.bg_color = QColor(26, 26, 26, 0)    # Fondo transparente
         self.accent_color = QColor("#3498db")    # Azul como color de acento
         
+        # Nivel de calidad (el gobernador reduce las zonas de empañamiento en placas lentas)
+        self.quality = QUALITY_LEVELS[0]
+        
+        # Capas (marco de la ventana, escala de porcentajes y el empañamiento,
+        # que se descarta cuando cambian sus zonas)
+        self.layers = LayerCache(self)
+        
         # Puntos de empañamiento
         self.fog_points = []
         self._generate_fog_points()
         
-        # Timer para la animación
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_animation)
-        self.animation_timer.start(50)  # Actualizar cada 50ms
+        # Gráfico de tendencia (se alterna con la ventana tocando el widget)
+        self.chart_mode = False
+        self.trend = TrendChart(min_value, max_value, self.blue_color, window_s=trend_window_s)
+        
+        # Animación en el reloj de frames compartido (se duerme sin cambios de valor)
+        self.frame_client = get_frame_clock().register(
+            self.FRAME_INTERVAL_MS, self.update_animation, self, linger_s=FRAME_CONFIG["idle_after_s"]
+        )
         
         # Tamaño mínimo
         self.setMinimumSize(180, 180)
     
     def _generate_fog_points(self):
         """Genera las zonas de empañamiento orgánicas según el valor de humedad."""
-        # Limpiar puntos existentes
-        self.fog_points = []
-        
         # Calcular número de zonas basado en el valor de humedad normalizado
         normalized_value = (self.value - self.min_value) / (self.max_value - self.min_value)
         zone_count = int(40 + normalized_value * 100)  # Entre 40 y 140 zonas según humedad
+        zone_count = int(zone_count * self.quality.fog_fraction)
         
         # Generar zonas con formas orgánicas aleatorias
-        for _ in range(zone_count):
-            # Posición aleatoria (evitando los bordes y la barra de porcentaje)
-            x = random.uniform(0.05, 0.75)
-            y = random.uniform(0.05, 0.95)
-            
-            # Tamaño base para la forma orgánica
-            base_size = random.uniform(0.02, 0.05 + normalized_value * 0.05)
-            
-            # Crear puntos para forma orgánica (de 4 a 8 puntos)
-            vertices = random.randint(4, 8)
-            points = []
-            
-            # Generar puntos alrededor de un círculo con variaciones aleatorias
-            for i in range(vertices):
-                angle = 2 * math.pi * i / vertices
-                # Variar el radio para crear forma orgánica
-                radius_var = random.uniform(0.7, 1.3) * base_size
-                px = x + radius_var * math.cos(angle)
-                py = y + radius_var * math.sin(angle)
-                points.append((px, py))
-            
-            # Opacidad basada en la humedad
-            opacity = random.uniform(0.2, 0.6) * normalized_value
-            
-            # Añadir zona orgánica
-            self.fog_points.append({
-                'x': x,
-                'y': y,
-                'points': points,
-                'opacity': opacity,
-            })
+        self.fog_points = [self._make_fog_zone(normalized_value) for _ in range(zone_count)]
+        self.layers.invalidate("fog")
     
-    def update_animation(self):
-        """Actualiza la animación del empañamiento."""
+    def _make_fog_zone(self, normalized_value):
+        """
+        Crea una zona de empañamiento con forma orgánica aleatoria.
+        
+        El camino se construye aquí, una vez, en coordenadas normalizadas de
+        la ventana; al dibujarlo se coloca con la transformación de la ventana.
+        
+        Args:
+            normalized_value (float): Humedad normalizada (0-1)
+        
+        Returns:
+            dict: Zona con su centro, vértices, opacidad, color y camino
+        """
+        # Posición aleatoria (evitando los bordes y la barra de porcentaje)
+        x = random.uniform(0.05, 0.75)
+        y = random.uniform(0.05, 0.95)
+        
+        # Tamaño base para la forma orgánica
+        base_size = random.uniform(0.02, 0.05 + normalized_value * 0.05)
+        
+        # Crear puntos para forma orgánica (de 4 a 8 puntos)
+        vertices = random.randint(4, 8)
+        points = []
+        
+        # Generar puntos alrededor de un círculo con variaciones aleatorias
+        for i in range(vertices):
+            angle = 2 * math.pi * i / vertices
+            # Variar el radio para crear forma orgánica
+            radius_var = random.uniform(0.7, 1.3) * base_size
+            px = x + radius_var * math.cos(angle)
+            py = y + radius_var * math.sin(angle)
+            points.append((px, py))
+        
+        # Unir los puntos con curvas bezier para suavizar (la última cierra la forma)
+        path = QPainterPath()
+        path.moveTo(points[0][0], points[0][1])
+        for i in range(1, vertices + 1):
+            prev = points[i - 1]
+            curr = points[i % vertices]
+            path.cubicTo(
+                prev[0] + (curr[0] - prev[0]) * 0.5, prev[1],  # Control cerca del punto anterior
+                curr[0] - (curr[0] - prev[0]) * 0.5, curr[1],  # Control cerca del punto actual
+                curr[0], curr[1]
+            )
+        
+        # Opacidad basada en la humedad
+        opacity = random.uniform(0.2, 0.6) * normalized_value
+        
+        return {
+            'x': x,
+            'y': y,
+            'points': points,
+            'opacity': opacity,
+            'color': QColor(255, 255, 255, int(255 * opacity)),  # Blanco puro para gotas
+            'path': path,
+        }
+    
+    def update_animation(self, dt):
+        """
+        Actualiza la animación del empañamiento.
+        
+        Args:
+            dt (float): Segundos desde el frame anterior
+        
+        Returns:
+            bool: True si ha cambiado alguna zona (hay que repintar)
+        """
+        # En modo gráfico no hay empañamiento que animar
+        if self.chart_mode:
+            return False
+        
+        changed = False
+        
         # Regenerar algunas zonas para dar efecto dinámico
-        if random.random() < 0.1:  # 10% de probabilidad de actualizar algunas zonas
+        if random.random() < 0.1 and self.fog_points:  # 10% de probabilidad de actualizar algunas zonas
             normalized_value = (self.value - self.min_value) / (self.max_value - self.min_value)
             for i in range(int(len(self.fog_points) * 0.05)):  # Actualizar 5% de las zonas
-                if len(self.fog_points) > 0:
-                    idx = random.randint(0, len(self.fog_points) - 1)
-                    x = random.uniform(0.05, 0.75)
-                    y = random.uniform(0.05, 0.95)
-                    
-                    # Tamaño base para la forma orgánica
-                    base_size = random.uniform(0.02, 0.05 + normalized_value * 0.05)
-                    
-                    # Crear puntos para forma orgánica (de 4 a 8 puntos)
-                    vertices = random.randint(4, 8)
-                    points = []
-                    
-                    # Generar puntos alrededor de un círculo con variaciones aleatorias
-                    for j in range(vertices):
-                        angle = 2 * math.pi * j / vertices
-                        # Variar el radio para crear forma orgánica
-                        radius_var = random.uniform(0.7, 1.3) * base_size
-                        px = x + radius_var * math.cos(angle)
-                        py = y + radius_var * math.sin(angle)
-                        points.append((px, py))
-                    
-                    self.fog_points[idx]['x'] = x
-                    self.fog_points[idx]['y'] = y
-                    self.fog_points[idx]['points'] = points
-                    self.fog_points[idx]['opacity'] = random.uniform(0.2, 0.6) * normalized_value
-        
-        # Actualizar el widget
-        self.update()
+                idx = random.randint(0, len(self.fog_points) - 1)
+                self.fog_points[idx] = self._make_fog_zone(normalized_value)
+                changed = True
+        
+        # Solo entonces hay que volver a rasterizar la capa del empañamiento
+        if changed:
+            self.layers.invalidate("fog")
+        
+        return changed
     
     def set_value(self, value):
         """Establece el valor de humedad."""
@@ -124,12 +171,68 @@ class HumidityWidget(QWidget):
         if abs(prev_value - self.value) > 5:
             self._generate_fog_points()
         
+        # Un valor distinto cambia la capa general de empañamiento y reanuda su animación
+        if self.value != prev_value:
+            self.layers.invalidate("fog")
+            self.frame_client.wake()
+        
         self.update()
     
+    def add_trend_sample(self, timestamp, value):
+        """
+        Añade una lectura al gráfico de tendencia (solo se dibuja su columna).
+        
+        MainWindow le pasa todas las lecturas del sensor con su timestamp de
+        origen, no solo la última de cada frame.
+        
+        Args:
+            timestamp (float): Instante de la medida en el origen
+            value (float): Valor medido
+        """
+        self.trend.add_sample(timestamp, value)
+        if self.chart_mode:
+            self.update()
+    
+    def set_quality(self, quality):
+        """
+        Aplica un nivel de calidad del gobernador (ui.quality_governor).
+        
+        Args:
+            quality (Quality): Nivel de calidad
+        """
+        # Las zonas se regeneran solo si cambia su número
+        regenerate = quality.fog_fraction != self.quality.fog_fraction
+        self.quality = quality
+        if regenerate:
+            self._generate_fog_points()
+        self.update()
+    
+    def set_chart_mode(self, enabled):
+        """Alterna entre la ventana empañada y el gráfico de tendencia."""
+        self.chart_mode = enabled
+        if enabled:
+            self.trend.fit(self.width(), self.height())
+        if not enabled:
+            self.frame_client.wake()
+        self.update()
+    
+    def resizeEvent(self, event):
+        """Ajusta el gráfico de tendencia al nuevo tamaño (fuera de paintEvent)."""
+        super().resizeEvent(event)
+        if self.chart_mode:
+            self.trend.fit(self.width(), self.height())
+    
+    def mousePressEvent(self, event):
+        """Cada toque pasa al siguiente gráfico de tendencia (24 h, 1 h) y después vuelve al widget."""
+        if not self.chart_mode:
+            self.set_chart_mode(True)
+        elif not self.trend.next_window():
+            self.set_chart_mode(False)
+    
     def paintEvent(self, event):
         """Dibuja el widget de humedad."""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.quality.antialiasing)
         
         # Dimensiones
         width = self.width()
@@ -138,14 +241,19 @@ class HumidityWidget(QWidget):
         # Limpiar el fondo
         painter.fillRect(0, 0, width, height, self.bg_color)
         
-        # Dibujar la ventana
-        self._draw_window(painter, width, height)
+        if self.chart_mode:
+            self._draw_graph(painter, width, height)
+            return
+        
+        # Dibujar la ventana (capa estática)
+        self.layers.draw(painter, "window", self._draw_window)
         
-        # Dibujar el empañamiento
-        self._draw_fogging(painter, width, height)
+        # Dibujar el empañamiento (capa rasterizada solo cuando cambian las zonas)
+        self.layers.draw(painter, "fog", self._draw_fogging)
         
-        # Dibujar la barra de porcentajes
-        self._draw_percentage_bar(painter, width, height)
+        # Dibujar la barra de porcentajes (capa estática) y el nivel actual
+        self.layers.draw(painter, "scale", self._draw_percentage_bar)
+        self._draw_level_indicator(painter, width, height)
         
         # Dibujar valor central
         self._draw_central_value(painter, width, height)
@@ -204,73 +312,15 @@ class HumidityWidget(QWidget):
         fog_rect = QRectF(window_x + 2, window_y + 2, window_width - 4, window_height - 4)
         painter.drawRoundedRect(fog_rect, 3, 3)
         
-        # Dibujar zonas de empañamiento orgánicas
+        # Dibujar zonas de empañamiento orgánicas: sus caminos están en
+        # coordenadas normalizadas y una sola transformación los lleva a la ventana
+        painter.setTransform(QTransform(window_width, 0, 0, window_height, window_x, window_y), True)
         for point in self.fog_points:
-            # Determinar opacidad según nivel de humedad
-            fog_color = QColor(255, 255, 255, int(255 * point['opacity']))  # Blanco puro para gotas
-            
-            # Dibujar forma orgánica de empañamiento
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(fog_color)
-            
-            # Crear camino para forma orgánica
-            path = QPainterPath()
-            points = point['points']
-            
-            if len(points) > 0:
-                # Calcular coordenadas reales para los puntos
-                real_points = []
-                for px, py in points:
-                    real_x = window_x + px * window_width
-                    real_y = window_y + py * window_height
-                    real_points.append((real_x, real_y))
-                
-                # Iniciar el camino
-                path.moveTo(QPointF(real_points[0][0], real_points[0][1]))
-                
-                # Añadir puntos usando curvas bezier para suavizar
-                for i in range(1, len(real_points)):
-                    # Punto actual
-                    curr = real_points[i]
-                    # Punto anterior
-                    prev = real_points[i-1]
-                    
-                    # Punto control 1 (cerca del punto anterior)
-                    cp1_x = prev[0] + (curr[0] - prev[0]) * 0.5
-                    cp1_y = prev[1]
-                    
-                    # Punto control 2 (cerca del punto actual)
-                    cp2_x = curr[0] - (curr[0] - prev[0]) * 0.5
-                    cp2_y = curr[1]
-                    
-                    # Añadir curva
-                    path.cubicTo(
-                        QPointF(cp1_x, cp1_y),
-                        QPointF(cp2_x, cp2_y),
-                        QPointF(curr[0], curr[1])
-                    )
-                
-                # Cerrar la forma
-                last = real_points[-1]
-                first = real_points[0]
-                
-                cp1_x = last[0] + (first[0] - last[0]) * 0.5
-                cp1_y = last[1]
-                
-                cp2_x = first[0] - (first[0] - last[0]) * 0.5
-                cp2_y = first[1]
-                
-                path.cubicTo(
-                    QPointF(cp1_x, cp1_y),
-                    QPointF(cp2_x, cp2_y),
-                    QPointF(first[0], first[1])
-                )
-                
-                # Dibujar la forma
-                painter.drawPath(path)
+            painter.setBrush(point['color'])
+            painter.drawPath(point['path'])
     
     def _draw_percentage_bar(self, painter, width, height):
-        """Dibuja la barra de porcentaje a la derecha."""
+        """Dibuja la barra de porcentaje a la derecha (sin el indicador)."""
         # Definir dimensiones de la barra
         margin = width * 0.07
         bar_width = width * 0.06
@@ -352,6 +402,14 @@ class HumidityWidget(QWidget):
             Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter, 
             "100%"
         )
+    
+    def _draw_level_indicator(self, painter, width, height):
+        """Dibuja el indicador del nivel actual sobre la barra de porcentaje."""
+        margin = width * 0.07
+        bar_width = width * 0.06
+        bar_height = height - 2 * margin
+        bar_x = width - margin - bar_width
+        bar_y = margin
         
         # Indicador de nivel actual
         normalized_value = (self.value - self.min_value) / (self.max_value - self.min_value)
@@ -432,73 +490,5 @@ class HumidityWidget(QWidget):
         painter.drawText(bg_rect, Qt.AlignmentFlag.AlignCenter, value_text)
     
     def _draw_graph(self, painter, width, height):
-        """Dibuja la gráfica de humedad."""
-        # Configurar el panel de la gráfica
-        margin = width * 0.07  # Aumentar el margen para dar más espacio a los números
-        panel_width = width - (margin * 2)
-        panel_height = height - (margin * 2)
-        panel_x = margin
-        panel_y = margin
-        
-        # Dibujar fondo del panel
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(QBrush(QColor(45, 45, 45)))
-        painter.drawRoundedRect(panel_x, panel_y, panel_width, panel_height, 5, 5)
-        
-        # Dibujar líneas de la cuadrícula
-        painter.setPen(QPen(QColor(60, 60, 60), 1))
-        
-        # Líneas horizontales
-        for i in range(4):
-            y = panel_y + (panel_height * (i + 1) / 5)
-            painter.drawLine(panel_x, y, panel_x + panel_width, y)
-        
-        # Dibujar puntos y líneas de la gráfica
-        if len(self.values) > 1:
-            # Calcular puntos
-            points = []
-            for i, value in enumerate(self.values):
-                x = panel_x + (i * panel_width / (len(self.values) - 1))
-                y = panel_y + panel_height - ((value - self.min_value) / (self.max_value - self.min_value) * panel_height)
-                points.append(QPointF(x, y))
-            
-            # Dibujar líneas
-            painter.setPen(QPen(QColor(52, 152, 219), 2))
-            for i in range(len(points) - 1):
-                painter.drawLine(points[i], points[i + 1])
-            
-            # Dibujar puntos
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(QBrush(QColor(52, 152, 219)))
-            for point in points:
-                painter.drawEllipse(point, 3, 3)
-        
-        # Dibujar números del eje Y
-        painter.setPen(QPen(QColor(200, 200, 200)))
-        font = QFont()
-        font.setPointSize(10)
-        font.setBold(True)
-        painter.setFont(font)
-        
-        # Ajustar la posición de los números para que no se corten
-        text_x = panel_x - 60  # Aumentar el espacio a la izquierda
-        text_width = 50  # Aumentar el ancho del área de texto
-        
-        for i in range(5):
-            value = self.max_value - (i * (self.max_value - self.min_value) / 4)
-            y = panel_y + (i * panel_height / 4)
-            
-            # Dibujar fondo negro para los números
-            text = f"{int(value)}%"
-            text_rect = painter.fontMetrics().boundingRect(text)
-            text_x_pos = text_x - (text_width / 2)  # Centrar el texto en el área asignada
-            text_y_pos = y + (text_rect.height() / 4)  # Ajustar la posición vertical
-            
-            # Dibujar el fondo negro
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(QBrush(QColor(0, 0, 0)))
-            painter.drawRect(text_x_pos - 5, text_y_pos - text_rect.height(), text_width, text_rect.height() + 5)
-            
-            # Dibujar el texto
-            painter.setPen(QPen(QColor(200, 200, 200)))
-            painter.drawText(text_x_pos, text_y_pos, text) 
\ No newline at end of file
+        """Dibuja el gráfico de tendencia de humedad."""
+        self.trend.draw_panel(painter, width, height, f"{self.value:.1f}{self.unit}", "%", self.text_color)
@@ -0,0 +1,121 @@
+"""
+Caché de las capas estáticas de los widgets (fondos, marcos, escalas, etiquetas).
+
+Los widgets del panel repintaban en cada frame partes que no cambian nunca
+(el fondo con degradado radial y las marcas del barómetro, el marco de la
+ventana y la barra de porcentajes de la humedad...). LayerCache las
+rasteriza una vez en un QPixmap con el tamaño y la escala (devicePixelRatio)
+del widget, y paintEvent solo copia el pixmap y dibuja la parte dinámica.
+
+Cada widget tiene su caché, con una o varias capas con nombre (p. ej. una
+debajo de la parte dinámica y otra encima). Las capas se descartan:
+
+- al redimensionar el widget o cambiar su escala (p. ej. al moverlo a otra
+  pantalla) o al activar o quitar el antialiasing: la clave de la caché
+  incluye el tamaño, la escala y el antialiasing;
+- al cambiar el tema (paleta, estilo o fuente), con un filtro de eventos
+  instalado en el widget;
+- explícitamente con invalidate(), si cambia algo de lo que dependen, o
+  con invalidate(nombre) para una sola capa: así una capa que cambia de vez
+  en cuando (el empañamiento de la humedad, que depende del valor) se
+  rasteriza solo cuando cambia y el resto de frames es una copia.
+
+Con enabled = False las capas se dibujan directamente en cada frame, como
+antes de la caché (lo usa benchmarks.bench_widget_paint para comparar).
+"""
+from PyQt6.QtCore import QEvent, QObject, Qt
+from PyQt6.QtGui import QPainter, QPixmap
+
+# Eventos del widget que obligan a volver a rasterizar las capas
+INVALIDATING_EVENTS = (
+    QEvent.Type.Resize,
+    QEvent.Type.PaletteChange,
+    QEvent.Type.StyleChange,
+    QEvent.Type.FontChange,
+)
+
+
+class LayerCache(QObject):
+    """Capas estáticas de un widget rasterizadas por tamaño y escala."""
+
+    def __init__(self, widget):
+        """
+        Crea la caché de un widget y se suscribe a sus eventos.
+
+        Args:
+            widget (QWidget): Widget dueño de las capas
+        """
+        super().__init__(widget)
+        self._widget = widget
+        self._layers = {}
+        self._key = None
+        self.enabled = True
+
+        # Contadores: capas rasterizadas y copias servidas desde la caché
+        self.renders = 0
+        self.hits = 0
+
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        """Descarta las capas al redimensionar o al cambiar el tema."""
+        if event.type() in INVALIDATING_EVENTS:
+            self._layers.clear()
+        return False
+
+    def invalidate(self, name=None):
+        """
+        Descarta capas (se rasterizan de nuevo en el próximo paint).
+
+        Args:
+            name (str, optional): Capa a descartar (por defecto todas)
+        """
+        if name is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(name, None)
+
+    def draw(self, painter, name, render):
+        """
+        Dibuja una capa estática en el widget.
+
+        Args:
+            painter (QPainter): Pintor del paintEvent del widget
+            name (str): Nombre de la capa dentro del widget
+            render (callable): Función render(painter, width, height) que
+                dibuja la capa; solo se llama cuando la capa no está en caché
+        """
+        width = self._widget.width()
+        height = self._widget.height()
+        if width <= 0 or height <= 0:
+            return
+
+        if not self.enabled:
+            painter.save()
+            render(painter, width, height)
+            painter.restore()
+            return
+
+        ratio = self._widget.devicePixelRatioF()
+        # El gobernador de calidad puede quitar el antialiasing: forma parte de la clave
+        antialiasing = painter.testRenderHint(QPainter.RenderHint.Antialiasing)
+        key = (width, height, ratio, antialiasing)
+        if key != self._key:
+            self._layers.clear()
+            self._key = key
+
+        pixmap = self._layers.get(name)
+        if pixmap is None:
+            pixmap = QPixmap(round(width * ratio), round(height * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            layer_painter = QPainter(pixmap)
+            layer_painter.setRenderHints(painter.renderHints())
+            render(layer_painter, width, height)
+            layer_painter.end()
+            self._layers[name] = pixmap
+            self.renders += 1
+        else:
+            self.hits += 1
+
+        painter.drawPixmap(0, 0, pixmap)
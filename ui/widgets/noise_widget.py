@@ -1,14 +1,27 @@
 """
 Widget personalizado para mostrar el nivel de ruido con un diseño de ecualizador
 que visualiza el nivel de ruido a través de barras verticales y una barra lateral de intensidad.
+
+Las barras guardan su altura, altura objetivo y velocidad en arrays de NumPy
+preasignados; cada frame del reloj las anima con un paso vectorizado y
+paintEvent solo las dibuja.
 """
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QFont, QLinearGradient
-from PyQt6.QtCore import Qt, QRect, QRectF, QTimer, QPointF
-import random
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF
 import math
+import numpy as np
+from analysis.classifier import get_classifier
+from config import FRAME_CONFIG
+from ui.frame_clock import get_frame_clock
+from ui.quality_governor import QUALITY_LEVELS
+from ui.widgets.layer_cache import LayerCache
+from ui.widgets.trend_chart import TrendChart
 
 class NoiseWidget(QWidget):
+    # Intervalo de frame deseado de la animación de las barras
+    FRAME_INTERVAL_MS = 50
+    
     def __init__(self, min_value=30, max_value=90, parent=None):
         super().__init__(parent)
         
@@ -21,93 +34,89 @@ class NoiseWidget(QWidget):
         # Colores con paleta moderna y coherente
         self.yellow_color = QColor("#f1c40f")    # Amarillo principal
         self.light_yellow = QColor("#f7dc6f")    # Amarillo claro para gradientes
-        self.orange_color = QColor("#f39c12")    # Naranja para niveles medios
-        self.red_color = QColor("#e74c3c")       # Rojo para niveles altos
         self.text_color = QColor("#FFFFFF")      # Blanco para texto
         self.bg_color = QColor(26, 26, 26, 0)    # Fondo transparente
         self.accent_color = QColor("#f1c40f")    # Amarillo como color de acento
         
-        # Barras del ecualizador
-        self.bars = []
+        # Estados del ruido (bandas de config.SENSORS["Ruido"]): bajo, moderado, alto
+        self.classifier = get_classifier()
+        
+        # Barras del ecualizador (altura, altura objetivo y velocidad, normalizadas)
         self.num_bars = 15  # Número de barras en el ecualizador
+        self.rng = np.random.default_rng()
+        self.bar_heights = np.zeros(self.num_bars)
+        self.bar_targets = np.zeros(self.num_bars)
+        self.bar_speeds = np.zeros(self.num_bars)
+        
+        # Barras de los extremos más bajas y centrales más altas
+        index = np.arange(self.num_bars)
+        self.bar_bias = np.zeros(self.num_bars)
+        self.bar_bias[(index < 2) | (index > self.num_bars - 3)] = -0.2
+        self.bar_bias[(index > 4) & (index < self.num_bars - 5)] = 0.1
+        
         self._generate_bars()
         
-        # Timer para la animación
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_animation)
-        self.animation_timer.start(50)  # Actualizar cada 50ms
+        # Capas estáticas (panel con líneas de referencia y escala de intensidad)
+        self.layers = LayerCache(self)
+        
+        # Nivel de calidad (lo baja el gobernador en placas lentas)
+        self.quality = QUALITY_LEVELS[0]
+        
+        # Gráfico de tendencia (se alterna con el ecualizador tocando el widget)
+        self.chart_mode = False
+        self.trend = TrendChart(min_value, max_value, self.yellow_color)
+        
+        # Animación en el reloj de frames compartido (se duerme sin cambios de valor)
+        self.frame_client = get_frame_clock().register(
+            self.FRAME_INTERVAL_MS, self.update_animation, self, linger_s=FRAME_CONFIG["idle_after_s"]
+        )
         
         # Tamaño mínimo
         self.setMinimumSize(180, 180)
     
+    def _level_color(self):
+        """Devuelve el color del estado de ruido actual."""
+        return QColor(self.classifier.current("Ruido", self.value).color)
+    
     def _generate_bars(self):
         """Genera las barras del ecualizador según el nivel de ruido."""
-        # Limpiar barras existentes
-        self.bars = []
-        
         # Calcular altura base para las barras basada en el valor de ruido normalizado
         normalized_value = (self.value - self.min_value) / (self.max_value - self.min_value)
         base_height = 0.2 + normalized_value * 0.6  # Entre 0.2 y 0.8 de altura máxima
         
-        # Generar barras con diferentes alturas
-        for i in range(self.num_bars):
-            # Variación aleatoria sobre la altura base
-            height_var = random.uniform(-0.15, 0.15)
-            if i < 2 or i > self.num_bars - 3:  # Barras de los extremos más bajas
-                height_var -= 0.2
-            elif i > 4 and i < self.num_bars - 5:  # Barras centrales más altas
-                height_var += 0.1
-                
-            # Altura final con restricciones
-            height = max(0.05, min(0.95, base_height + height_var))
-            
-            # Ancho de la barra (fijo)
-            width = 1.0 / (self.num_bars * 2)
-            
-            # Calcular color según nivel de ruido
-            if self.value < 60:  # Nivel bajo
-                bar_color = self.yellow_color
-            elif self.value < 80:  # Nivel medio
-                bar_color = self.orange_color
-            else:  # Nivel alto
-                bar_color = self.red_color
-            
-            # Añadir efecto de brillo según posición
-            brightness = 100 + int(abs(i - self.num_bars/2) * 5)
-            adjusted_color = bar_color.lighter(brightness)
-            
-            # Velocidad de cambio en la animación
-            animation_speed = random.uniform(0.01, 0.05)
-            
-            # Añadir barra
-            self.bars.append({
-                'height': height,
-                'width': width,
-                'color': adjusted_color,
-                'target_height': height,
-                'animation_speed': animation_speed
-            })
+        # Variación aleatoria sobre la altura base, con restricciones
+        height_var = self.rng.uniform(-0.15, 0.15, self.num_bars) + self.bar_bias
+        np.clip(base_height + height_var, 0.05, 0.95, out=self.bar_heights)
+        self.bar_targets[:] = self.bar_heights
+        
+        # Velocidad de cambio en la animación
+        self.bar_speeds[:] = self.rng.uniform(0.01, 0.05, self.num_bars)
     
-    def update_animation(self):
-        """Actualiza la animación de las barras del ecualizador."""
+    def update_animation(self, dt):
+        """
+        Actualiza la animación de las barras del ecualizador (paso vectorizado).
+        
+        Args:
+            dt (float): Segundos desde el frame anterior
+        
+        Returns:
+            bool: True (las barras se mueven en cada frame)
+        """
+        # En modo gráfico no hay barras que animar
+        if self.chart_mode:
+            return False
+        
         normalized_value = (self.value - self.min_value) / (self.max_value - self.min_value)
+        base_height = 0.2 + normalized_value * 0.6
         
-        # Actualizar cada barra
-        for bar in self.bars:
-            # Calcular nueva altura objetivo con variación aleatoria
-            height_var = random.uniform(-0.15, 0.15)
-            base_height = 0.2 + normalized_value * 0.6
-            new_target = max(0.05, min(0.95, base_height + height_var))
-            
-            # Actualizar altura objetivo
-            bar['target_height'] = new_target
-            
-            # Mover suavemente hacia la altura objetivo
-            diff = bar['target_height'] - bar['height']
-            bar['height'] += diff * bar['animation_speed']
+        # Nueva altura objetivo con variación aleatoria
+        height_var = self.rng.uniform(-0.15, 0.15, self.num_bars)
+        np.clip(base_height + height_var, 0.05, 0.95, out=self.bar_targets)
         
-        # Actualizar el widget
-        self.update()
+        # Mover suavemente hacia la altura objetivo
+        self.bar_heights += (self.bar_targets - self.bar_heights) * self.bar_speeds
+        
+        return True
     
     def set_value(self, value):
         """Establece el valor de nivel de ruido."""
@@ -118,12 +127,60 @@ class NoiseWidget(QWidget):
         if abs(prev_value - self.value) > 5:
             self._generate_bars()
         
+        # Un valor distinto reanuda la animación de las barras
+        if self.value != prev_value:
+            self.frame_client.wake()
+        
         self.update()
     
+    def set_quality(self, quality):
+        """
+        Aplica un nivel de calidad del gobernador (ui.quality_governor).
+        
+        Args:
+            quality (Quality): Nivel de calidad
+        """
+        self.quality = quality
+        self.update()
+    
+    def add_trend_sample(self, timestamp, value):
+        """
+        Añade una lectura al gráfico de tendencia (solo se dibuja su columna).
+        
+        Args:
+            timestamp (float): Instante de la medida en el origen
+            value (float): Valor medido
+        """
+        self.trend.add_sample(timestamp, value)
+        if self.chart_mode:
+            self.update()
+    
+    def set_chart_mode(self, enabled):
+        """Alterna entre el ecualizador y el gráfico de tendencia."""
+        self.chart_mode = enabled
+        if enabled:
+            self.trend.fit(self.width(), self.height())
+        if not enabled:
+            self.frame_client.wake()
+        self.update()
+    
+    def resizeEvent(self, event):
+        """Ajusta el gráfico de tendencia al nuevo tamaño (fuera de paintEvent)."""
+        super().resizeEvent(event)
+        if self.chart_mode:
+            self.trend.fit(self.width(), self.height())
+    
+    def mousePressEvent(self, event):
+        """Cada toque pasa al siguiente gráfico de tendencia (24 h, 1 h) y después vuelve al widget."""
+        if not self.chart_mode:
+            self.set_chart_mode(True)
+        elif not self.trend.next_window():
+            self.set_chart_mode(False)
+    
     def paintEvent(self, event):
         """Dibuja el widget de nivel de ruido."""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.quality.antialiasing)
         
         # Dimensiones
         width = self.width()
@@ -132,14 +189,19 @@ class NoiseWidget(QWidget):
         # Limpiar el fondo
         painter.fillRect(0, 0, width, height, self.bg_color)
         
-        # Dibujar el panel oscuro para el ecualizador
-        self._draw_panel(painter, width, height)
+        if self.chart_mode:
+            self.trend.draw_panel(painter, width, height, f"{self.value:.1f} {self.unit}", text_color=self.text_color)
+            return
+        
+        # Dibujar el panel oscuro para el ecualizador (capa estática)
+        self.layers.draw(painter, "panel", self._draw_panel)
         
         # Dibujar barras del ecualizador
         self._draw_bars(painter, width, height)
         
-        # Dibujar la barra de intensidad
-        self._draw_intensity_bar(painter, width, height)
+        # Dibujar la barra de intensidad (capa estática) y el nivel actual
+        self.layers.draw(painter, "scale", self._draw_intensity_bar)
+        self._draw_level_indicator(painter, width, height)
         
         # Dibujar valor central
         self._draw_central_value(painter, width, height)
@@ -212,13 +274,18 @@ class NoiseWidget(QWidget):
         total_width_per_bar = bars_area_width / self.num_bars
         bar_width = total_width_per_bar * (1 - spacing)
         
+        # Color del estado de ruido actual (igual para todas las barras)
+        level_color = self._level_color()
+        
+        # Alturas en píxeles de todas las barras
+        bar_heights = (self.bar_heights * bars_area_height).tolist()
+        
         # Dibujar cada barra
-        for i, bar in enumerate(self.bars):
+        for i, bar_height in enumerate(bar_heights):
             # Calcular posición X
             x = bars_area_x + i * total_width_per_bar
             
-            # Calcular altura y posición Y
-            bar_height = bar['height'] * bars_area_height
+            # Calcular posición Y
             y = bars_area_y + bars_area_height - bar_height
             
             # Crear degradado vertical para la barra
@@ -228,15 +295,8 @@ class NoiseWidget(QWidget):
             )
             
             # Determinar color según nivel de ruido
-            if self.value < 60:  # Nivel bajo
-                top_color = self.yellow_color.lighter(130)
-                bottom_color = self.yellow_color.darker(110)
-            elif self.value < 80:  # Nivel medio
-                top_color = self.orange_color.lighter(130)
-                bottom_color = self.orange_color.darker(110)
-            else:  # Nivel alto
-                top_color = self.red_color.lighter(130)
-                bottom_color = self.red_color.darker(110)
+            top_color = level_color.lighter(130)
+            bottom_color = level_color.darker(110)
             
             # Configurar degradado
             gradient.setColorAt(0, top_color)
@@ -265,7 +325,7 @@ class NoiseWidget(QWidget):
                 painter.drawRoundedRect(highlight_rect, 2, 2)
     
     def _draw_intensity_bar(self, painter, width, height):
-        """Dibuja la barra de intensidad a la derecha."""
+        """Dibuja la barra de intensidad a la derecha (sin el indicador)."""
         # Definir dimensiones de la barra
         margin = width * 0.07
         bar_width = width * 0.06
@@ -347,18 +407,21 @@ class NoiseWidget(QWidget):
             Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter, 
             f"{self.max_value}dB"
         )
+    
+    def _draw_level_indicator(self, painter, width, height):
+        """Dibuja el indicador del nivel actual sobre la barra de intensidad."""
+        margin = width * 0.07
+        bar_width = width * 0.06
+        bar_height = height - 2 * margin
+        bar_x = width - margin - bar_width
+        bar_y = margin
         
         # Indicador de nivel actual
         normalized_value = 1 - (self.value - self.min_value) / (self.max_value - self.min_value)
         current_y = bar_y + bar_height * normalized_value
         
         # Determinar color según nivel
-        if self.value < 60:
-            indicator_color = self.yellow_color
-        elif self.value < 80:
-            indicator_color = self.orange_color
-        else:
-            indicator_color = self.red_color
+        indicator_color = self._level_color()
             
         # Usar el color adecuado para el indicador
         painter.setPen(QPen(indicator_color, 2))
@@ -387,12 +450,7 @@ class NoiseWidget(QWidget):
         panel_y = margin
         
         # Determinar color según nivel de ruido
-        if self.value < 60:
-            main_color = self.yellow_color  # Amarillo para nivel bajo
-        elif self.value < 80:
-            main_color = self.orange_color  # Naranja para nivel medio
-        else:
-            main_color = self.red_color     # Rojo para nivel alto
+        main_color = self._level_color()
         
         # Dibujar texto del valor
         value_text = f"{self.value:.1f}{self.unit}"
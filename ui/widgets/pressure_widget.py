@@ -3,10 +3,21 @@ Widget personalizado para mostrar la presión atmosférica con un barómetro vis
 """
 from PyQt6.QtWidgets import QWidget, QSizePolicy
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QFont, QLinearGradient, QRadialGradient
-from PyQt6.QtCore import Qt, QRect, QRectF, QPointF, QTimer, QSize, pyqtProperty
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF, QSize, pyqtProperty
 import math
+from analysis.classifier import get_classifier
+from ui.frame_clock import get_frame_clock
+from ui.quality_governor import QUALITY_LEVELS
+from ui.widgets.layer_cache import LayerCache
+from ui.widgets.trend_chart import TrendChart
 
 class PressureWidget(QWidget):
+    # Intervalo de frame deseado (~60 fps; el reloj lo redondea a su tick)
+    FRAME_INTERVAL_MS = 16
+    
+    # Fracción de la distancia al objetivo que recorre la aguja cada 16 ms
+    NEEDLE_EASING = 0.1
+    
     def __init__(self, min_value=980, max_value=1020, parent=None):
         super().__init__(parent)
         
@@ -20,26 +31,35 @@ class PressureWidget(QWidget):
         # Transiciones y animación
         self.needle_angle = self._calculate_angle()
         self.target_angle = self.needle_angle
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self._update_animation)
-        self.animation_timer.start(16)  # ~60fps
+        self.frame_client = get_frame_clock().register(self.FRAME_INTERVAL_MS, self._update_animation, self)
+        
+        # Estados de la presión (bandas de config.SENSORS["Presión"]): baja, normal, alta
+        self.classifier = get_classifier()
+        bands = self.classifier["Presión"].bands
         
         # Colores - Volver a configuración original
-        self.low_color = QColor("#3498db")    # Azul para presión baja
-        self.normal_color = QColor("#2ecc71") # Verde para presión normal
-        self.high_color = QColor("#e74c3c")   # Rojo para presión alta
+        self.low_color, self.normal_color, self.high_color = (QColor(band.color) for band in bands)
         self.background_color = QColor("#2d2d2d")
         self.text_color = QColor("#FFFFFF")
         
         # Categorías de presión (hPa)
-        self.low_threshold = 1000.0
-        self.high_threshold = 1015.0
+        self.low_threshold, self.high_threshold = self.classifier["Presión"].limits
         
         # Configurar el widget
         self.setMinimumSize(180, 180)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
+        # Capas estáticas (fondo, dial, marcas y cabina) rasterizadas una vez por tamaño
+        self.layers = LayerCache(self)
+        
+        # Nivel de calidad (lo baja el gobernador en placas lentas)
+        self.quality = QUALITY_LEVELS[0]
+        
+        # Gráfico de tendencia (se alterna con el barómetro tocando el widget)
+        self.chart_mode = False
+        self.trend = TrendChart(min_value, max_value, self.normal_color)
+        
     def set_value(self, value):
         """Establece el valor de presión y actualiza la UI."""
         if value == self.value:
@@ -47,8 +67,51 @@ class PressureWidget(QWidget):
             
         self.value = value
         self.target_angle = self._calculate_angle()
+        self.frame_client.wake()
         self.update()
         
+    def set_quality(self, quality):
+        """
+        Aplica un nivel de calidad del gobernador (ui.quality_governor).
+        
+        Args:
+            quality (Quality): Nivel de calidad
+        """
+        self.quality = quality
+        self.update()
+    
+    def add_trend_sample(self, timestamp, value):
+        """
+        Añade una lectura al gráfico de tendencia (solo se dibuja su columna).
+        
+        Args:
+            timestamp (float): Instante de la medida en el origen
+            value (float): Valor medido
+        """
+        self.trend.add_sample(timestamp, value)
+        if self.chart_mode:
+            self.update()
+    
+    def set_chart_mode(self, enabled):
+        """Alterna entre el barómetro y el gráfico de tendencia."""
+        self.chart_mode = enabled
+        if enabled:
+            self.trend.fit(self.width(), self.height())
+        self.update()
+    
+    def resizeEvent(self, event):
+        """Ajusta el gráfico de tendencia al nuevo tamaño (fuera de paintEvent)."""
+        super().resizeEvent(event)
+        if self.chart_mode:
+            self.trend.fit(self.width(), self.height())
+    
+    def mousePressEvent(self, event):
+        """Cada toque pasa al siguiente gráfico de tendencia (24 h, 1 h) y después vuelve al widget."""
+        if not self.chart_mode:
+            self.set_chart_mode(True)
+        elif not self.trend.next_window():
+            self.set_chart_mode(False)
+    
     def _calculate_angle(self):
         """Calcula el ángulo de la aguja según el valor de presión."""
         # Mapear el rango de presión (min_value-max_value) a un ángulo (240 grados, de -120 a 120)
@@ -62,40 +125,66 @@ class PressureWidget(QWidget):
         angle = 120 - (norm_value * 240)
         return angle
         
-    def _update_animation(self):
-        """Actualiza la animación de la aguja."""
+    def _update_animation(self, dt):
+        """
+        Actualiza la animación de la aguja.
+        
+        Args:
+            dt (float): Segundos desde el frame anterior
+        
+        Returns:
+            bool: True si la aguja se ha movido (al llegar al destino se duerme)
+        """
+        if self.chart_mode:
+            # En modo gráfico la aguja no se ve: salta al destino y se duerme
+            self.needle_angle = self.target_angle
+            self.frame_client.sleep()
+            return False
+        if self.needle_angle == self.target_angle:
+            # Aguja asentada: se duerme hasta el próximo valor
+            self.frame_client.sleep()
+            return False
         if abs(self.needle_angle - self.target_angle) < 0.1:
             self.needle_angle = self.target_angle
+            self.frame_client.sleep()
         else:
-            # Animación suave con easing
-            self.needle_angle += (self.target_angle - self.needle_angle) * 0.1
-            self.update()
+            # Animación suave con easing, a la misma velocidad sea cual sea el tick
+            easing = 1 - (1 - self.NEEDLE_EASING) ** (dt / 0.016)
+            self.needle_angle += (self.target_angle - self.needle_angle) * easing
+        return True
     
     def paintEvent(self, event):
         """Dibuja el barómetro."""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.quality.antialiasing)
         
         width = self.width()
         height = self.height()
         
-        # Dibujar el fondo
-        self._draw_background(painter, width, height)
+        if self.chart_mode:
+            self.trend.draw_panel(painter, width, height, f"{self.value:.1f} {self.unit}", text_color=self.text_color)
+            return
         
-        # Dibujar el dial del barómetro
-        self._draw_dial(painter, width, height)
+        # Fondo, zonas del dial y marcas de valor (capa estática)
+        self.layers.draw(painter, "dial", self._draw_static_dial)
         
         # Dibujar la aguja
         self._draw_needle(painter, width, height)
         
-        # Dibujar marcas de valor
-        self._draw_markers(painter, width, height)
+        # Cabina central, que tapa el eje de la aguja (capa estática)
+        self.layers.draw(painter, "cabin", self._draw_cabin)
         
         # Dibujar el texto del valor
         self._draw_text(painter, width, height)
         
         painter.end()
         
+    def _draw_static_dial(self, painter, width, height):
+        """Dibuja las partes fijas bajo la aguja: fondo, zonas y marcas."""
+        self._draw_background(painter, width, height)
+        self._draw_dial(painter, width, height)
+        self._draw_markers(painter, width, height)
+        
     def _draw_background(self, painter, width, height):
         """Dibuja el fondo del barómetro."""
         # Fondo circular con degradado para efecto 3D
@@ -173,6 +262,11 @@ class PressureWidget(QWidget):
         painter.setBrush(QBrush(QColor(40, 40, 40)))
         painter.drawEllipse(QPointF(center_x, center_y), inner_radius, inner_radius)
         
+    def _state_color(self):
+        """Devuelve el color del estado de presión actual (baja, normal o alta)."""
+        index = self.classifier.current("Presión", self.value).index
+        return (self.low_color, self.normal_color, self.high_color)[index]
+    
     def _draw_needle(self, painter, width, height):
         """Dibuja la aguja del barómetro."""
         center_x = width / 2
@@ -181,12 +275,7 @@ class PressureWidget(QWidget):
         
         # SOLUCIÓN: Usar directamente el valor real para determinar el color
         # Esto asegura que el color de la aguja coincida con las zonas del dial
-        if self.value < self.low_threshold:
-            needle_color = self.low_color
-        elif self.value < self.high_threshold:
-            needle_color = self.normal_color
-        else:
-            needle_color = self.high_color
+        needle_color = self._state_color()
             
         # Calcular punto final de la aguja basado en el ángulo
         angle_rad = self.needle_angle * 3.14159 / 180
@@ -257,8 +346,8 @@ class PressureWidget(QWidget):
             painter.setPen(QPen(QColor(180, 180, 180), 1.5))
             painter.drawLine(int(inner_x), int(inner_y), int(outer_x), int(outer_y))
             
-    def _draw_text(self, painter, width, height):
-        """Dibuja el valor de presión en una cabina central."""
+    def _draw_cabin(self, painter, width, height):
+        """Dibuja la cabina central con la unidad (sin el valor)."""
         center_x = width / 2
         center_y = height / 2
         radius = min(width, height) * 0.18  # Reducir el tamaño de la cabina central
@@ -280,31 +369,6 @@ class PressureWidget(QWidget):
         painter.setBrush(Qt.BrushStyle.NoBrush)
         painter.drawEllipse(QPointF(center_x, center_y), radius-2, radius-2)
         
-        # Valor numérico grande en el centro
-        value_font = QFont()
-        value_font.setPointSize(14)  # Reducir tamaño para la cabina más pequeña
-        value_font.setBold(True)
-        painter.setFont(value_font)
-        
-        # Determinar color según el valor real de presión (no según el ángulo)
-        if self.value < self.low_threshold:
-            value_color = self.low_color
-        elif self.value < self.high_threshold:
-            value_color = self.normal_color
-        else:
-            value_color = self.high_color
-            
-        # Dibujar sombra sutil para dar profundidad
-        shadow_color = QColor(0, 0, 0, 100)
-        painter.setPen(shadow_color)
-        value_shadow_rect = QRectF(center_x - radius + 2, center_y - 10 + 2, radius * 2, 20)
-        painter.drawText(value_shadow_rect, Qt.AlignmentFlag.AlignCenter, f"{self.value:.1f}")
-        
-        # Dibujar el valor
-        painter.setPen(value_color)
-        value_rect = QRectF(center_x - radius, center_y - 10, radius * 2, 20)
-        painter.drawText(value_rect, Qt.AlignmentFlag.AlignCenter, f"{self.value:.1f}")
-        
         # Unidad en la parte inferior de la cabina
         unit_font = QFont()
         unit_font.setPointSize(8)  # Fuente más pequeña para la unidad
@@ -327,6 +391,32 @@ class PressureWidget(QWidget):
             180 * 16
         )
         
+    def _draw_text(self, painter, width, height):
+        """Dibuja el valor de presión sobre la cabina central."""
+        center_x = width / 2
+        center_y = height / 2
+        radius = min(width, height) * 0.18
+        
+        # Valor numérico grande en el centro
+        value_font = QFont()
+        value_font.setPointSize(14)  # Reducir tamaño para la cabina más pequeña
+        value_font.setBold(True)
+        painter.setFont(value_font)
+        
+        # Determinar color según el valor real de presión (no según el ángulo)
+        value_color = self._state_color()
+            
+        # Dibujar sombra sutil para dar profundidad
+        shadow_color = QColor(0, 0, 0, 100)
+        painter.setPen(shadow_color)
+        value_shadow_rect = QRectF(center_x - radius + 2, center_y - 10 + 2, radius * 2, 20)
+        painter.drawText(value_shadow_rect, Qt.AlignmentFlag.AlignCenter, f"{self.value:.1f}")
+        
+        # Dibujar el valor
+        painter.setPen(value_color)
+        value_rect = QRectF(center_x - radius, center_y - 10, radius * 2, 20)
+        painter.drawText(value_rect, Qt.AlignmentFlag.AlignCenter, f"{self.value:.1f}")
+        
     def sizeHint(self):
         """Tamaño preferido para el widget."""
         return QSize(200, 200) 
\ No newline at end of file
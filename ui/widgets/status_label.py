@@ -0,0 +1,120 @@
+"""
+Etiqueta de estado de un sensor ("Estado: Normal" en el color del estado).
+
+Cambiar el color de un QLabel con setStyleSheet() obliga a Qt a volver a
+analizar el CSS y a repulir el widget en cada llamada, y cambiar su texto
+recalcula el layout del contenedor, aunque el estado no haya cambiado.
+StatusLabel dibuja el texto por sí misma con una fuente y un QPen por color
+preparados de antemano:
+
+- Si el estado y el texto son los que ya se muestran, no llama a Qt.
+- Un cambio de estado solo repinta la etiqueta (update()), sin analizar
+  CSS ni repulir; el layout solo se recalcula si el texto nuevo no cabe en
+  el ancho reservado.
+
+El color tampoco se pone con la paleta: Qt la sustituye al repulir los
+contenedores que tienen hoja de estilo propia.
+"""
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+# Estilo de las etiquetas de estado
+FONT_PIXEL_SIZE = 16
+PADDING = 2
+DEFAULT_COLOR = "white"
+
+# Plumas ya construidas, por color (compartidas por todas las etiquetas)
+_pens = {}
+
+
+def _pen(color):
+    """Devuelve la pluma de un color (se construye una vez)."""
+    pen = _pens.get(color)
+    if pen is None:
+        pen = _pens[color] = QPen(QColor(color))
+    return pen
+
+
+class StatusLabel(QWidget):
+    """Etiqueta que solo toca Qt cuando cambia el estado o el texto."""
+
+    def __init__(self, text="", parent=None):
+        """
+        Inicializa la etiqueta.
+
+        Args:
+            text (str, optional): Texto inicial (en blanco hasta el primer estado)
+            parent (QWidget, optional): Widget padre
+        """
+        super().__init__(parent)
+        self._text = text
+        self._color = None
+        self._current_pen = _pen(DEFAULT_COLOR)
+
+        font = QFont(self.font())
+        font.setPixelSize(FONT_PIXEL_SIZE)
+        font.setBold(True)
+        self.setFont(font)
+        self.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed)
+
+        # Ancho reservado: solo crece (un texto más corto no mueve el layout)
+        self._text_width = self.fontMetrics().horizontalAdvance(text)
+
+        # Contadores: llamadas que cambiaron algo y llamadas sin cambios
+        self.applied = 0
+        self.skipped = 0
+
+    def text(self):
+        """
+        Devuelve el texto mostrado.
+
+        Returns:
+            str: Texto actual
+        """
+        return self._text
+
+    def set_status(self, text, color):
+        """
+        Muestra un texto en el color de un estado.
+
+        Args:
+            text (str): Texto a mostrar
+            color (str): Color del estado ("#rrggbb")
+
+        Returns:
+            bool: True si se ha cambiado algo en pantalla
+        """
+        if text == self._text and color == self._color:
+            self.skipped += 1
+            return False
+
+        if text != self._text:
+            self._text = text
+            width = self.fontMetrics().horizontalAdvance(text)
+            if width > self._text_width:
+                self._text_width = width
+                self.updateGeometry()
+
+        if color != self._color:
+            self._color = color
+            self._current_pen = _pen(color)
+
+        self.applied += 1
+        self.update()
+        return True
+
+    def sizeHint(self):
+        """Tamaño del texto más ancho mostrado más el relleno."""
+        return QSize(self._text_width + 2 * PADDING, self.fontMetrics().height() + 2 * PADDING)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def paintEvent(self, event):
+        """Dibuja el texto centrado con la pluma del estado."""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setPen(self._current_pen)
+        painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._text)
+        painter.end()
@@ -5,6 +5,10 @@ que se rellena según la temperatura.
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QPainterPath, QFont
 from PyQt6.QtCore import Qt, QRect, QRectF
+from analysis.classifier import get_classifier
+from ui.quality_governor import QUALITY_LEVELS
+from ui.widgets.layer_cache import LayerCache
+from ui.widgets.trend_chart import TrendChart
 
 class ThermometerWidget(QWidget):
     def __init__(self, parent=None):
@@ -22,6 +26,9 @@ class ThermometerWidget(QWidget):
         self.min_value = 0.0
         self.max_value = 40.0
         
+        # Estados y colores de la temperatura (bandas de config.SENSORS)
+        self.classifier = get_classifier()
+        
         # Definir los colores del termómetro
         self._setup_colors()
         
@@ -30,15 +37,19 @@ class ThermometerWidget(QWidget):
         
         # Hacer que el widget sea transparente
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        
+        # Capa estática (círculo de fondo, tubo y bulbo) rasterizada una vez por tamaño
+        self.layers = LayerCache(self)
+        
+        # Nivel de calidad (lo baja el gobernador en placas lentas)
+        self.quality = QUALITY_LEVELS[0]
+        
+        # Gráfico de tendencia (se alterna con el termómetro tocando el widget)
+        self.chart_mode = False
+        self.trend = TrendChart(self.min_value, self.max_value, QColor("#e67e22"))
     
     def _setup_colors(self):
         """Configura los colores del termómetro."""
-        # Colores para la temperatura
-        self.cold_color = QColor("#3498db")    # Azul para frío
-        self.normal_color = QColor("#2ecc71")  # Verde para normal
-        self.warm_color = QColor("#f39c12")    # Naranja para cálido
-        self.hot_color = QColor("#e74c3c")     # Rojo para calor
-        
         # Color del texto y fondo
         self.text_color = QColor("#FFFFFF")    # Blanco
         self.bg_color = QColor(0, 0, 0, 0)     # Transparente
@@ -63,8 +74,51 @@ class ThermometerWidget(QWidget):
         """
         self.min_value = min_value
         self.max_value = max_value
+        self.trend.set_range(min_value, max_value)
+        self.update()
+        
+    def set_quality(self, quality):
+        """
+        Aplica un nivel de calidad del gobernador (ui.quality_governor).
+        
+        Args:
+            quality (Quality): Nivel de calidad
+        """
+        self.quality = quality
         self.update()
+    
+    def add_trend_sample(self, timestamp, value):
+        """
+        Añade una lectura al gráfico de tendencia (solo se dibuja su columna).
         
+        Args:
+            timestamp (float): Instante de la medida en el origen
+            value (float): Valor medido
+        """
+        self.trend.add_sample(timestamp, value)
+        if self.chart_mode:
+            self.update()
+    
+    def set_chart_mode(self, enabled):
+        """Alterna entre el termómetro y el gráfico de tendencia."""
+        self.chart_mode = enabled
+        if enabled:
+            self.trend.fit(self.width(), self.height())
+        self.update()
+    
+    def resizeEvent(self, event):
+        """Ajusta el gráfico de tendencia al nuevo tamaño (fuera de paintEvent)."""
+        super().resizeEvent(event)
+        if self.chart_mode:
+            self.trend.fit(self.width(), self.height())
+    
+    def mousePressEvent(self, event):
+        """Cada toque pasa al siguiente gráfico de tendencia (24 h, 1 h) y después vuelve al widget."""
+        if not self.chart_mode:
+            self.set_chart_mode(True)
+        elif not self.trend.next_window():
+            self.set_chart_mode(False)
+    
     def paintEvent(self, event):
         """
         Dibuja el widget del termómetro.
@@ -73,25 +127,47 @@ class ThermometerWidget(QWidget):
             event: Evento de pintura
         """
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, self.quality.antialiasing)
         
         # Calcular dimensiones
         width = self.width()
         height = self.height()
+        
+        if self.chart_mode:
+            self.trend.draw_panel(painter, width, height, f"{self.value:.1f} °C", text_color=self.text_color)
+            return
+        
         size = min(width, height - 40)  # Reducir un poco la altura para dejar espacio al valor
         
+        # Círculo de fondo, tubo y bulbo (capa estática)
+        self.layers.draw(painter, "thermometer", self._draw_static)
+        
         # Centrar el dibujo (un poco más arriba para dejar espacio abajo)
         painter.translate(width/2, (height/2) - 10)
         
-        # Dibujar el círculo exterior
+        # Dibujar el arco de progreso
         self._draw_circle_progress(painter, size * 0.8)
         
-        # Dibujar el termómetro interior
+        # Dibujar el mercurio del termómetro interior
         self._draw_thermometer(painter, size * 0.55)
         
         # Dibujar el valor de temperatura (abajo)
         self._draw_temperature_value(painter, size)
     
+    def _draw_static(self, painter, width, height):
+        """
+        Dibuja las partes fijas: el círculo de fondo y el tubo con el bulbo.
+        
+        Args:
+            painter (QPainter): Objeto pintor
+            width (int): Ancho del widget
+            height (int): Alto del widget
+        """
+        size = min(width, height - 40)
+        painter.translate(width/2, (height/2) - 10)
+        self._draw_track(painter, size * 0.8)
+        self._draw_tube(painter, size * 0.55)
+    
     def _draw_title(self, painter, width, height):
         """Función vacía ya que el título ahora está en el contenedor."""
         pass  # No dibujar nada
@@ -103,29 +179,16 @@ class ThermometerWidget(QWidget):
         Returns:
             QColor: Color correspondiente a la temperatura
         """
-        if self.value < 20:
-            return self.cold_color  # Azul para frío
-        elif self.value <= 25:
-            return self.normal_color  # Verde para normal
-        elif self.value <= 28:
-            return self.warm_color  # Naranja para cálido
-        else:
-            return self.hot_color  # Rojo para calor
+        return QColor(self.classifier.current("Temperatura", self.value).color)
     
-    def _draw_circle_progress(self, painter, size):
+    def _draw_track(self, painter, size):
         """
-        Dibuja el círculo exterior que muestra el progreso de temperatura.
+        Dibuja el círculo de fondo sobre el que avanza el arco de progreso.
         
         Args:
             painter (QPainter): Objeto pintor
             size (float): Tamaño del círculo
         """
-        # Calcular el porcentaje de la temperatura en el rango
-        percentage = (self.value - self.min_value) / (self.max_value - self.min_value)
-        
-        # Calcular el color en función de la temperatura (usando los mismos umbrales que en main_window.py)
-        color = self._get_temperature_color()
-            
         # Establecer el grosor del círculo
         penWidth = size * 0.08  # Aumentamos el grosor para que sea más visible
         
@@ -134,6 +197,23 @@ class ThermometerWidget(QWidget):
         painter.setBrush(Qt.BrushStyle.NoBrush)  # Sin relleno
         painter.drawEllipse(QRectF(-size/2 + penWidth/2, -size/2 + penWidth/2,
                              size - penWidth, size - penWidth))
+    
+    def _draw_circle_progress(self, painter, size):
+        """
+        Dibuja el arco exterior que muestra el progreso de temperatura.
+        
+        Args:
+            painter (QPainter): Objeto pintor
+            size (float): Tamaño del círculo
+        """
+        # Calcular el porcentaje de la temperatura en el rango
+        percentage = (self.value - self.min_value) / (self.max_value - self.min_value)
+        
+        # Calcular el color en función de la temperatura (el mismo estado que en main_window.py)
+        color = self._get_temperature_color()
+            
+        # Establecer el grosor del círculo
+        penWidth = size * 0.08  # Aumentamos el grosor para que sea más visible
         
         # Dibujar el arco de progreso (solo contorno)
         painter.setPen(QPen(color, penWidth, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap))
@@ -158,17 +238,14 @@ class ThermometerWidget(QWidget):
         painter.setPen(QPen(color, 1))  # Borde fino del color de la temperatura
         painter.drawEllipse(QRectF(-size * 0.4, -size * 0.4, size * 0.8, size * 0.8))
     
-    def _draw_thermometer(self, painter, size):
+    def _draw_tube(self, painter, size):
         """
-        Dibuja el termómetro interior.
+        Dibuja el tubo y el bulbo vacíos del termómetro interior.
         
         Args:
             painter (QPainter): Objeto pintor
             size (float): Tamaño del termómetro
         """
-        # Calcular el porcentaje de temperatura
-        percentage = (self.value - self.min_value) / (self.max_value - self.min_value)
-        
         # Definir dimensiones del termómetro
         thermWidth = size * 0.2
         thermHeight = size * 0.6
@@ -186,6 +263,22 @@ class ThermometerWidget(QWidget):
         bulbRect = QRectF(-bulbRadius, thermHeight/2 - bulbRadius*2, 
                            bulbRadius*2, bulbRadius*2)
         painter.drawEllipse(bulbRect)
+    
+    def _draw_thermometer(self, painter, size):
+        """
+        Dibuja el mercurio del termómetro interior.
+        
+        Args:
+            painter (QPainter): Objeto pintor
+            size (float): Tamaño del termómetro
+        """
+        # Calcular el porcentaje de temperatura
+        percentage = (self.value - self.min_value) / (self.max_value - self.min_value)
+        
+        # Definir dimensiones del termómetro
+        thermWidth = size * 0.2
+        thermHeight = size * 0.6
+        bulbRadius = thermWidth / 2
         
         # Calcular la altura del mercurio
         mercuryHeight = thermHeight * percentage
@@ -0,0 +1,383 @@
+"""
+Gráfico de tendencia con desplazamiento incremental.
+
+La serie se dibuja en un QPixmap fuera de pantalla donde cada columna de
+píxeles representa window_s / ancho segundos. Cada muestra nueva solo
+actualiza su columna (una línea vertical del mínimo al máximo, unida con la
+columna anterior); cuando el tiempo avanza a una columna nueva, la imagen se
+desplaza a la izquierda con QPixmap.scroll(). El coste por frame no depende
+de cuántas muestras abarque la ventana: 24 horas a 1 Hz cuestan lo mismo
+que un minuto.
+
+draw_panel() dibuja el gráfico completo en un widget (panel, cuadrícula,
+eje Y y valor actual); lo comparten los widgets de todos los sensores en
+su modo gráfico. El pixmap se ajusta al widget con fit() desde su
+resizeEvent, nunca dentro de paintEvent: un cambio de tamaño rellena el
+gráfico entero.
+
+Al crear o redimensionar el pixmap se rellena desde una fuente de datos ya
+agregados (MainWindow._trend_source: la reducción LTTB del historial en
+memoria o RollupStore.query_range), un punto por columna. Las muestras
+anteriores a la columna actual (p. ej. lecturas atrasadas tras una
+reconexión) solo aparecen al volver a rellenar con backfill().
+
+La ventana se elige entre HISTORY_CONFIG["trend_windows_s"] con
+next_window(); los widgets la cambian con cada toque en modo gráfico.
+"""
+import math
+import time
+
+import numpy as np
+from PyQt6.QtCore import Qt, QPointF, QRect, QRectF
+from PyQt6.QtGui import QBrush, QColor, QFont, QPainter, QPen, QPixmap
+
+from config import HISTORY_CONFIG
+
+
+class TrendChart:
+    """Renderizador de una serie en un pixmap que se desplaza."""
+
+    # Ancho de los números del eje Y a la izquierda de la curva
+    LABEL_WIDTH = 38
+
+    def __init__(self, min_value, max_value, color, window_s=None):
+        """
+        Inicializa el gráfico.
+
+        Args:
+            min_value (float): Valor en el borde inferior
+            max_value (float): Valor en el borde superior
+            color (str | QColor): Color de la línea
+            window_s (float, optional): Segundos que abarca el ancho completo
+                (por defecto la primera de HISTORY_CONFIG["trend_windows_s"])
+        """
+        self.min_value = min_value
+        self.max_value = max_value
+        self.color = QColor(color)
+        self.window_s = window_s or HISTORY_CONFIG["trend_windows_s"][0]
+        self.source = None
+
+        self._pixmap = None
+        self._pen = QPen(self.color, 1)
+        # Columna más reciente (número absoluto de columna) y sus estadísticas
+        self._column = None
+        self._col_min = 0.0
+        self._col_max = 0.0
+        self._col_last = None
+        # Último valor de la columna anterior, para unir la línea
+        self._prev_last = None
+
+    def set_source(self, source):
+        """
+        Define de dónde se rellena el gráfico al crearse o redimensionarse.
+
+        Args:
+            source (callable): Función source(start, end, width) que devuelve
+                un dict con los arrays "start", "min", "max" y "last" y,
+                opcionalmente, "resolution" (segundos entre puntos)
+        """
+        self.source = source
+        self.backfill()
+
+    def set_range(self, min_value, max_value):
+        """
+        Cambia los valores de los bordes inferior y superior y redibuja.
+
+        Args:
+            min_value (float): Valor en el borde inferior
+            max_value (float): Valor en el borde superior
+        """
+        if (min_value, max_value) == (self.min_value, self.max_value):
+            return
+        self.min_value = min_value
+        self.max_value = max_value
+        self.backfill()
+
+    def set_window(self, window_s):
+        """
+        Cambia los segundos que abarca el gráfico y lo rellena de nuevo.
+
+        Args:
+            window_s (float): Segundos que abarca el ancho completo
+        """
+        if window_s == self.window_s:
+            return
+        self.window_s = window_s
+        self.backfill()
+
+    def next_window(self):
+        """
+        Pasa a la siguiente ventana de HISTORY_CONFIG["trend_windows_s"].
+
+        Returns:
+            bool: False si se ha vuelto a la primera (el widget sale del modo gráfico)
+        """
+        windows = HISTORY_CONFIG["trend_windows_s"]
+        index = windows.index(self.window_s) + 1 if self.window_s in windows else 0
+        self.set_window(windows[index % len(windows)])
+        return index < len(windows)
+
+    def window_label(self):
+        """
+        Devuelve la ventana actual como texto corto (p. ej. "24 h").
+
+        Returns:
+            str: Duración de la ventana
+        """
+        if self.window_s >= 3600:
+            return f"{self.window_s / 3600:g} h"
+        return f"{self.window_s / 60:g} min"
+
+    def resize(self, width, height):
+        """
+        Crea el pixmap con un tamaño nuevo y lo rellena desde la fuente.
+
+        Args:
+            width (int): Ancho en píxeles (una columna por píxel)
+            height (int): Alto en píxeles
+        """
+        width, height = max(1, int(width)), max(1, int(height))
+        if self._pixmap is not None and self._pixmap.width() == width and self._pixmap.height() == height:
+            return
+        self._pixmap = QPixmap(width, height)
+        self._pixmap.fill(Qt.GlobalColor.transparent)
+        self.backfill()
+
+    def fit(self, width, height):
+        """
+        Ajusta el pixmap a la zona de la curva de un widget de ese tamaño.
+
+        Args:
+            width (int): Ancho del widget
+            height (int): Alto del widget
+        """
+        _, plot = self._layout(width, height)
+        self.resize(plot.width(), plot.height())
+
+    def pixmap(self):
+        """
+        Devuelve la imagen actual del gráfico.
+
+        Returns:
+            QPixmap | None: Pixmap (None antes del primer resize())
+        """
+        return self._pixmap
+
+    def draw_panel(self, painter, width, height, value_text, axis_suffix="", text_color=None):
+        """
+        Dibuja el gráfico en un widget: panel, cuadrícula, curva, eje Y y valor actual.
+
+        Args:
+            painter (QPainter): Pintor del paintEvent del widget
+            width (int): Ancho del widget
+            height (int): Alto del widget
+            value_text (str): Valor actual, en la esquina superior derecha
+            axis_suffix (str, optional): Sufijo de los números del eje Y (p. ej. "%")
+            text_color (QColor, optional): Color del valor actual (por defecto blanco)
+        """
+        panel, plot = self._layout(width, height)
+        panel_x = panel.x()
+        plot_x, plot_y, plot_width, plot_height = plot.x(), plot.y(), plot.width(), plot.height()
+        label_width = self.LABEL_WIDTH
+
+        # Dibujar fondo del panel
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(QColor(45, 45, 45)))
+        painter.drawRoundedRect(panel, 5, 5)
+
+        # Dibujar líneas de la cuadrícula
+        painter.setPen(QPen(QColor(60, 60, 60), 1))
+        for i in range(5):
+            y = plot_y + (plot_height * i / 4)
+            painter.drawLine(QPointF(plot_x, y), QPointF(plot_x + plot_width, y))
+
+        # La curva ya está dibujada en el pixmap (ajustado con fit()): solo se copia
+        if self._pixmap is not None:
+            painter.drawPixmap(plot_x, plot_y, self._pixmap)
+
+        # Dibujar números del eje Y
+        font = QFont()
+        font.setPointSize(9)
+        font.setBold(True)
+        painter.setFont(font)
+
+        for i in range(5):
+            value = self.max_value - (i * (self.max_value - self.min_value) / 4)
+            y = plot_y + (i * plot_height / 4)
+
+            # Fondo negro para los números
+            text_rect = QRectF(panel_x + 2, y - 8, label_width - 6, 16)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QBrush(QColor(0, 0, 0)))
+            painter.drawRoundedRect(text_rect, 3, 3)
+
+            # Dibujar el texto
+            painter.setPen(QPen(QColor(200, 200, 200)))
+            painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, f"{int(value)}{axis_suffix}")
+
+        # Ventana en la esquina superior izquierda y valor actual en la derecha
+        painter.setPen(QPen(QColor(150, 150, 150)))
+        painter.drawText(
+            QRectF(plot_x + 4, plot_y, plot_width - 4, 16),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+            self.window_label()
+        )
+        painter.setPen(QPen(text_color or QColor("#FFFFFF")))
+        painter.drawText(
+            QRectF(plot_x, plot_y, plot_width - 4, 16),
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop,
+            value_text
+        )
+
+    def _layout(self, width, height):
+        """
+        Calcula el panel y la zona de la curva (a la derecha de los números del eje Y).
+
+        Returns:
+            tuple: (QRectF del panel, QRect de la curva)
+        """
+        margin = width * 0.07
+        panel = QRectF(margin, margin, width - (margin * 2), height - (margin * 2))
+        plot = QRect(
+            int(panel.x() + self.LABEL_WIDTH),
+            int(panel.y() + 8),
+            max(1, int(panel.width() - self.LABEL_WIDTH - 6)),
+            max(1, int(panel.height() - 16))
+        )
+        return panel, plot
+
+    def _column_span(self):
+        return self.window_s / self._pixmap.width()
+
+    def _y(self, value):
+        """Convierte un valor en la coordenada vertical del pixmap."""
+        height = self._pixmap.height()
+        span = self.max_value - self.min_value
+        normalized = (value - self.min_value) / span if span else 0.5
+        normalized = max(0.0, min(1.0, normalized))
+        return int(round((height - 1) * (1.0 - normalized)))
+
+    def add_sample(self, timestamp, value):
+        """
+        Añade una muestra actualizando solo su columna.
+
+        Args:
+            timestamp (float): Instante de la muestra
+            value (float): Valor
+        """
+        if self._pixmap is None:
+            return
+
+        column = math.floor(timestamp / self._column_span())
+        if self._column is None:
+            self._start_column(column, value)
+        elif column > self._column:
+            self._scroll(column - self._column)
+            # Solo se une con la columna anterior si es contigua
+            self._prev_last = self._col_last if column - self._column == 1 else None
+            self._start_column(column, value)
+        elif column == self._column and self._col_last is not None:
+            self._col_min = min(self._col_min, value)
+            self._col_max = max(self._col_max, value)
+            self._col_last = value
+        elif column == self._column:
+            self._start_column(column, value)
+        else:
+            # Muestras atrasadas: se ignoran (el relleno al redimensionar las incluye)
+            return
+
+        self._draw_column(self._pixmap.width() - 1, self._col_min, self._col_max, self._prev_last, clear=True)
+
+    def _start_column(self, column, value):
+        self._column = column
+        self._col_min = value
+        self._col_max = value
+        self._col_last = value
+
+    def _scroll(self, columns):
+        """Desplaza la imagen a la izquierda y limpia las columnas nuevas."""
+        width, height = self._pixmap.width(), self._pixmap.height()
+        if columns >= width:
+            self._pixmap.fill(Qt.GlobalColor.transparent)
+            self._col_last = None
+            return
+
+        self._pixmap.scroll(-columns, 0, self._pixmap.rect())
+        painter = QPainter(self._pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(QRect(width - columns, 0, columns, height), Qt.GlobalColor.transparent)
+        painter.end()
+
+    def _draw_column(self, x, low, high, prev_last, clear=False, painter=None):
+        """Dibuja una columna del mínimo al máximo, unida con el valor anterior."""
+        own_painter = painter is None
+        if own_painter:
+            painter = QPainter(self._pixmap)
+
+        if clear:
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            painter.fillRect(QRect(x, 0, 1, self._pixmap.height()), Qt.GlobalColor.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+
+        if prev_last is not None:
+            low = min(low, prev_last)
+            high = max(high, prev_last)
+        painter.setPen(self._pen)
+        painter.drawLine(x, self._y(high), x, self._y(low))
+
+        if own_painter:
+            painter.end()
+
+    def backfill(self):
+        """Rellena todas las columnas desde la fuente de datos agregados."""
+        # La columna en curso se reconstruye desde la fuente (o empieza con la próxima muestra)
+        self._column = None
+        self._col_min = 0.0
+        self._col_max = 0.0
+        self._col_last = None
+        self._prev_last = None
+        if self.source is None or self._pixmap is None:
+            return
+
+        width = self._pixmap.width()
+        span = self._column_span()
+        now = time.time()
+        current = math.floor(now / span)
+        data = self.source(now - self.window_s, now, width)
+
+        self._pixmap.fill(Qt.GlobalColor.transparent)
+        if data is None or not len(data["start"]):
+            return
+
+        # Con cubetas más anchas que una columna, los huecos de una cubeta no cortan la línea
+        starts = data["start"]
+        resolution = data.get("resolution")
+        if resolution is None:
+            resolution = float(np.diff(starts).min()) if len(starts) > 1 else span
+        max_gap = max(1, math.ceil(resolution / span))
+
+        painter = QPainter(self._pixmap)
+        before = prev_last = None
+        last_column = None
+        for start, low, high, last in zip(data["start"], data["min"], data["max"], data["last"]):
+            column = math.floor(start / span)
+            x = width - 1 - (current - column)
+            if x < 0:
+                continue
+            if last_column is not None and column - last_column > max_gap:
+                # Hueco sin datos: no unir la línea
+                prev_last = None
+            self._draw_column(x, low, high, prev_last, painter=painter)
+            before, prev_last = prev_last, float(last)
+            last_column = column
+        painter.end()
+
+        # La columna de la derecha es la actual: las muestras en vivo continúan ahí
+        self._column = current
+        if last_column == current:
+            self._col_min = float(data["min"][-1])
+            self._col_max = float(data["max"][-1])
+            self._col_last = prev_last
+            self._prev_last = before
+        elif last_column == current - 1:
+            self._prev_last = prev_last
@@ -0,0 +1,32 @@
+"""
+Utilidades de registro (logging) para la aplicación.
+"""
+import logging
+import sys
+
+# Formato común para todos los módulos
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+
+def setup_logger(name, level=logging.INFO):
+    """
+    Crea (o recupera) un logger configurado para el módulo indicado.
+    
+    Args:
+        name (str): Nombre del logger, normalmente __name__
+        level (int, optional): Nivel mínimo de registro
+        
+    Returns:
+        logging.Logger: Logger listo para usar
+    """
+    logger = logging.getLogger(name)
+    
+    # Evitar añadir manejadores duplicados si se llama varias veces
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.propagate = False
+    
+    logger.setLevel(level)
+    return logger